@@ -0,0 +1,34 @@
+"""Keyset pagination index on transactions.
+
+The Mini App lists and exports transactions ordered by
+(date DESC, created_at DESC, id DESC) within a family and pages with a
+row-value cursor on the same columns. This index serves both the ORDER BY
+and the cursor predicate. It also covers (family_id, date), so the older
+ix_transactions_family_date index is redundant and dropped.
+
+Revision ID: 034
+Revises: f9720751be03
+"""
+
+from alembic import op
+
+revision = "034"
+down_revision = "f9720751be03"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_family_keyset "
+        "ON transactions (family_id, date DESC, created_at DESC, id DESC);"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_transactions_family_date;")
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_family_date "
+        "ON transactions (family_id, date);"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_transactions_family_keyset;")
@@ -0,0 +1,100 @@
+"""Per-family data version counters maintained by triggers.
+
+Adds family_data_versions (family_id, domain) -> version and statement-level
+triggers on transactions and categories that bump the "transactions" domain
+for every family touched by an INSERT/UPDATE/DELETE. Transition tables keep
+it to one upsert per family per statement, so bulk deletes stay cheap.
+
+Triggers (rather than app-side bumps) cover every writer: ORM flushes, bulk
+delete()/update() statements, undo, GDPR erasure and raw SQL alike. The Mini
+App uses the version as an ETag validator for stats endpoints.
+
+Revision ID: 035
+Revises: 034
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "035"
+down_revision = "034"
+branch_labels = None
+depends_on = None
+
+# table -> data domain whose version the table's writes bump
+_TRACKED_TABLES = {
+    "transactions": "transactions",
+    "categories": "transactions",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "family_data_versions",
+        sa.Column(
+            "family_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("families.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("domain", sa.String(50), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_family_data_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO family_data_versions (family_id, domain, version, updated_at)
+                SELECT DISTINCT family_id, TG_ARGV[0], 1, now()
+                FROM new_rows WHERE family_id IS NOT NULL
+                ON CONFLICT (family_id, domain) DO UPDATE
+                SET version = family_data_versions.version + 1, updated_at = now();
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO family_data_versions (family_id, domain, version, updated_at)
+                SELECT family_id, TG_ARGV[0], 1, now()
+                FROM (SELECT family_id FROM new_rows UNION SELECT family_id FROM old_rows) f
+                WHERE family_id IS NOT NULL
+                ON CONFLICT (family_id, domain) DO UPDATE
+                SET version = family_data_versions.version + 1, updated_at = now();
+            ELSE
+                INSERT INTO family_data_versions (family_id, domain, version, updated_at)
+                SELECT DISTINCT family_id, TG_ARGV[0], 1, now()
+                FROM old_rows WHERE family_id IS NOT NULL
+                ON CONFLICT (family_id, domain) DO UPDATE
+                SET version = family_data_versions.version + 1, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table, domain in _TRACKED_TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER {table}_data_version_ins
+            AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_family_data_version('{domain}');
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_data_version_upd
+            AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_family_data_version('{domain}');
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_data_version_del
+            AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_family_data_version('{domain}');
+        """)
+
+
+def downgrade() -> None:
+    for table in _TRACKED_TABLES:
+        for suffix in ("ins", "upd", "del"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_data_version_{suffix} ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS bump_family_data_version();")
+    op.drop_table("family_data_versions")
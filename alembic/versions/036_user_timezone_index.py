@@ -0,0 +1,97 @@
+"""Timezone scheduling index for local-time crons.
+
+Adds user_timezones (timezone -> number of profiles) kept current by
+statement-level triggers on user_profiles, and an index on
+user_profiles.timezone. Local-time crons (morning reminder, evening
+reflection) read the few hundred rows of user_timezones, work out which
+timezones are inside their send window right now, and then load only those
+users through the index instead of scanning every user every 15 minutes.
+
+Triggers cover every writer of user_profiles.timezone (maybe_update_timezone,
+the Mini App geo/JS detection, onboarding, bulk fixes such as 033) without
+app-side bookkeeping. Counts may drop to 0; readers filter on users > 0.
+
+Revision ID: 036
+Revises: 035
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "036"
+down_revision = "035"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_timezones",
+        sa.Column("timezone", sa.String(50), primary_key=True),
+        sa.Column("users", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_user_profiles_timezone ON user_profiles (timezone);")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_user_timezones() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO user_timezones (timezone, users, updated_at)
+                SELECT COALESCE(timezone, ''), count(*), now()
+                FROM new_rows GROUP BY 1
+                ON CONFLICT (timezone) DO UPDATE
+                SET users = user_timezones.users + EXCLUDED.users, updated_at = now();
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO user_timezones (timezone, users, updated_at)
+                SELECT tz, sum(delta), now()
+                FROM (
+                    SELECT COALESCE(timezone, '') AS tz, 1 AS delta FROM new_rows
+                    UNION ALL
+                    SELECT COALESCE(timezone, ''), -1 FROM old_rows
+                ) d
+                GROUP BY tz HAVING sum(delta) <> 0
+                ON CONFLICT (timezone) DO UPDATE
+                SET users = user_timezones.users + EXCLUDED.users, updated_at = now();
+            ELSE
+                INSERT INTO user_timezones (timezone, users, updated_at)
+                SELECT COALESCE(timezone, ''), -count(*), now()
+                FROM old_rows GROUP BY 1
+                ON CONFLICT (timezone) DO UPDATE
+                SET users = user_timezones.users + EXCLUDED.users, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER user_profiles_timezone_ins
+        AFTER INSERT ON user_profiles REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_user_timezones();
+    """)
+    op.execute("""
+        CREATE TRIGGER user_profiles_timezone_upd
+        AFTER UPDATE ON user_profiles REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_user_timezones();
+    """)
+    op.execute("""
+        CREATE TRIGGER user_profiles_timezone_del
+        AFTER DELETE ON user_profiles REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_user_timezones();
+    """)
+
+    op.execute("""
+        INSERT INTO user_timezones (timezone, users)
+        SELECT COALESCE(timezone, ''), count(*) FROM user_profiles GROUP BY 1;
+    """)
+
+
+def downgrade() -> None:
+    for suffix in ("ins", "upd", "del"):
+        op.execute(f"DROP TRIGGER IF EXISTS user_profiles_timezone_{suffix} ON user_profiles;")
+    op.execute("DROP FUNCTION IF EXISTS count_user_timezones();")
+    op.execute("DROP INDEX IF EXISTS ix_user_profiles_timezone;")
+    op.drop_table("user_timezones")
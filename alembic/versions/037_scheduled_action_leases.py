@@ -0,0 +1,32 @@
+"""Lease columns for concurrent scheduled-action execution.
+
+The dispatcher claims due actions by setting claimed_until/worker_id and
+committing, then runs them outside the claim transaction. A lease that
+outlives its worker (crash, deploy) expires at claimed_until and the action
+becomes claimable again.
+
+Revision ID: 037
+Revises: 036
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "037"
+down_revision = "036"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "scheduled_actions",
+        sa.Column("claimed_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column("scheduled_actions", sa.Column("worker_id", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scheduled_actions", "worker_id")
+    op.drop_column("scheduled_actions", "claimed_until")
@@ -0,0 +1,72 @@
+"""Change tracking for incremental Google Sheets sync.
+
+Adds updated_at to the synced tables (transactions, tasks, contacts),
+maintained by a BEFORE UPDATE trigger so bulk update() statements and raw
+SQL move it too, with a (family_id, updated_at) index for delta scans.
+sheet_sync_configs gains sync_state (high-water mark, window and the sheet
+row of every synced record) and user_id (the member whose Google
+connection the sync uses).
+
+Revision ID: 038
+Revises: 037
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from alembic import op
+
+revision = "038"
+down_revision = "037"
+branch_labels = None
+depends_on = None
+
+_SYNCED_TABLES = ("transactions", "tasks", "contacts")
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in _SYNCED_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+        op.execute(f"""
+            CREATE TRIGGER {table}_touch_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+        """)
+        op.create_index(f"ix_{table}_family_updated", table, ["family_id", "updated_at"])
+
+    op.add_column("sheet_sync_configs", sa.Column("sync_state", JSONB, nullable=True))
+    op.add_column(
+        "sheet_sync_configs",
+        sa.Column(
+            "user_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sheet_sync_configs", "user_id")
+    op.drop_column("sheet_sync_configs", "sync_state")
+    for table in _SYNCED_TABLES:
+        op.drop_index(f"ix_{table}_family_updated", table_name=table)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_updated_at ON {table};")
+        op.drop_column(table, "updated_at")
+    op.execute("DROP FUNCTION IF EXISTS touch_updated_at();")
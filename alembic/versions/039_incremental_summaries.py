@@ -0,0 +1,73 @@
+"""Cursor for incremental dialog summaries, plus daily/weekly rollups.
+
+session_summaries gains last_message_id: the id of the newest conversation
+message folded into the summary. Each summarization run folds only messages
+after it. Existing summaries are backfilled with the newest message of their
+session, since the count-based scheme had covered (nearly) all of it.
+
+summary_rollups holds per-user daily and weekly digests. Daily digests are
+folded from that day's session summaries, and weekly digests from the
+daily ones.
+
+Revision ID: 039
+Revises: 038
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "039"
+down_revision = "038"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("session_summaries", sa.Column("last_message_id", sa.Integer, nullable=True))
+    op.execute("""
+        UPDATE session_summaries s
+        SET last_message_id = (
+            SELECT max(m.id) FROM conversation_messages m
+            WHERE m.user_id = s.user_id AND m.session_id = s.session_id
+        )
+    """)
+    op.create_index(
+        "ix_conversation_messages_session_id_id",
+        "conversation_messages",
+        ["user_id", "session_id", "id"],
+    )
+
+    op.create_table(
+        "summary_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("family_id", UUID(as_uuid=True), sa.ForeignKey("families.id"), nullable=False),
+        sa.Column("period", sa.String(10), nullable=False),
+        sa.Column("period_start", sa.Date, nullable=False),
+        sa.Column("summary", sa.Text, nullable=False),
+        sa.Column("source_count", sa.Integer, nullable=False),
+        sa.Column("token_count", sa.Integer, nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.UniqueConstraint("user_id", "period", "period_start", name="uq_summary_rollup_period"),
+    )
+    op.execute("ALTER TABLE summary_rollups ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY summary_rollups_family_isolation ON summary_rollups
+          FOR ALL
+          USING (family_id = current_setting('app.current_family_id', true)::uuid)
+          WITH CHECK (family_id = current_setting('app.current_family_id', true)::uuid)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS summary_rollups_family_isolation ON summary_rollups")
+    op.drop_table("summary_rollups")
+    op.drop_index("ix_conversation_messages_session_id_id", table_name="conversation_messages")
+    op.drop_column("session_summaries", "last_message_id")
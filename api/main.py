@@ -472,6 +472,24 @@ async def _typing_loop(gw, chat_id: str, interval: float = 4.0):
         pass
 
 
+_ERASURE_PENDING_TEXT = (
+    "Ваши данные ещё удаляются. Дождитесь завершения — после этого можно начать заново."
+)
+
+
+async def _erasure_pending(incoming) -> bool:
+    """Whether the sender's /delete_all erasure is still running."""
+    from src.core.gdpr import erasure_pending
+
+    try:
+        return await erasure_pending(
+            incoming.channel, incoming.channel_user_id or incoming.user_id
+        )
+    except Exception as e:
+        logger.warning("Erasure status check failed: %s", e)
+        return False
+
+
 async def on_message(incoming):
     """Main message handler called by Telegram gateway."""
     request_token = set_request_context(
@@ -479,6 +497,12 @@ async def on_message(incoming):
         correlation_id=f"{incoming.channel}:{incoming.chat_id}:{incoming.id}",
     )
     try:
+        # /start or new writes mid-erasure would recreate rows it is deleting
+        if await _erasure_pending(incoming):
+            await gateway.send(
+                OutgoingMessage(text=_ERASURE_PENDING_TEXT, chat_id=incoming.chat_id)
+            )
+            return
         context = await build_session_context(incoming.user_id)
         release_plan = await get_release_request_plan(context, subject_id=incoming.user_id)
         update_request_context(
@@ -730,6 +754,9 @@ async def _handle_channel_message(incoming, gw):
         correlation_id=f"{incoming.channel}:{incoming.chat_id}:{incoming.id}",
     )
     try:
+        if await _erasure_pending(incoming):
+            await gw.send(OutgoingMessage(text=_ERASURE_PENDING_TEXT, chat_id=incoming.chat_id))
+            return
         context = await build_context_from_channel(incoming.channel, incoming.channel_user_id)
         release_plan = await get_release_request_plan(
             context,
@@ -988,8 +1015,21 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning("Graph recovery failed (non-critical): %s", e)
 
+    from src.core.metrics import publish_snapshot, run_snapshot_publisher
+    from src.core.release import flush_release_events, run_release_flusher
+
+    background = [
+        asyncio.create_task(run_release_flusher()),
+        asyncio.create_task(run_snapshot_publisher()),
+    ]
+
     yield
 
+    for task in background:
+        task.cancel()
+    await flush_release_events()
+    await publish_snapshot(force=True)
+
     if gateway:
         await gateway.stop()
     if _slack_gw:
@@ -1093,6 +1133,22 @@ async def health_detailed(request: Request):
     except Exception:
         checks["database"] = "error"
 
+    # Connection pools: budget, saturation, acquire waits
+    try:
+        from src.core.connection_budget import pool_stats
+
+        checks["db_pools"] = pool_stats()
+    except Exception:
+        checks["db_pools"] = "unavailable"
+
+    # Read replica: lag and routing
+    try:
+        from src.core.replica import replica_status
+
+        checks["db_replica"] = replica_status()
+    except Exception:
+        checks["db_replica"] = "unavailable"
+
     # Circuit breakers
     try:
         from src.core.circuit_breaker import all_circuit_statuses
@@ -1101,6 +1157,14 @@ async def health_detailed(request: Request):
     except Exception:
         checks["circuits"] = "unavailable"
 
+    # LLM latency histograms + hedge budgets
+    try:
+        from src.core.llm.hedging import hedging_status
+
+        checks["llm_hedging"] = hedging_status()
+    except Exception:
+        checks["llm_hedging"] = "unavailable"
+
     # Mem0
     try:
         from src.core.memory.mem0_client import get_memory
@@ -1181,6 +1245,71 @@ async def release_ops_reset_health(request: Request) -> dict[str, Any]:
     return await reset_release_health_counters(actor=actor)
 
 
+@app.get("/ops/llm/prompt-cache")
+async def llm_prompt_cache_report(request: Request) -> dict[str, Any]:
+    """Return per-intent prompt-cache hit rates and cached-token ratios."""
+    _require_ops_auth(request)
+    from src.core.observability import get_prompt_cache_report
+
+    return get_prompt_cache_report()
+
+
+@app.get("/ops/query-cache")
+async def query_cache_stats(request: Request) -> dict[str, Any]:
+    """Return per-query-shape hit rates of the family aggregate cache."""
+    _require_ops_auth(request)
+    from src.core.query_cache import query_cache_report
+
+    return query_cache_report()
+
+
+@app.get("/ops/search-cache")
+async def search_cache_stats(request: Request) -> dict[str, Any]:
+    """Return hit rates of the shared web/places search answer cache."""
+    _require_ops_auth(request)
+    from src.core.metrics import merged_snapshot
+    from src.core.research.search_cache import search_cache_report
+
+    return search_cache_report(await merged_snapshot())
+
+
+@app.get("/ops/sia/source-cache")
+async def sia_source_cache_stats(request: Request) -> dict[str, Any]:
+    """Return hit rates and saved fetches of shared SIA source lookups."""
+    _require_ops_auth(request)
+    from src.core.metrics import merged_snapshot
+    from src.core.scheduled_actions.source_cache import source_cache_report
+
+    return source_cache_report(await merged_snapshot())
+
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request) -> Response:
+    """Prometheus exposition of in-process metrics, merged across processes."""
+    _require_ops_auth(request)
+    from src.core.metrics import render_all
+
+    return Response(await render_all(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ops/metrics/latency")
+async def metrics_latency(request: Request) -> dict[str, Any]:
+    """Return p50/p95/p99 per pipeline stage and intent for this process."""
+    _require_ops_auth(request)
+    from src.core.metrics import latency_report
+
+    return latency_report()
+
+
+@app.get("/ops/ocr/preprocess")
+async def ocr_preprocess_report(request: Request) -> dict[str, Any]:
+    """Return OCR image preprocessing byte savings and per-stage timings."""
+    _require_ops_auth(request)
+    from src.tools.image_preprocess import get_preprocess_report
+
+    return get_preprocess_report()
+
+
 @app.get("/ops/analytics/policy")
 async def analytics_policy(request: Request) -> dict[str, Any]:
     """Return the active analytics sampling policy."""
@@ -1346,10 +1475,19 @@ async def analytics_user_feedback(request: Request, limit: int = 25) -> dict[str
 
 
 @app.get("/ops/analytics/quality-metrics")
-async def analytics_quality_metrics(request: Request, limit: int = 100) -> dict[str, Any]:
+async def analytics_quality_metrics(request: Request, days: int = 7) -> dict[str, Any]:
     """Return aggregated review and feedback quality metrics for operator checks."""
     _require_ops_auth(request)
-    return await get_quality_metrics_snapshot(limit=max(1, min(limit, 500)))
+    return await get_quality_metrics_snapshot(days=max(1, min(days, 90)))
+
+
+@app.get("/ops/analytics/rollups")
+async def analytics_rollups(request: Request, days: int = 7) -> dict[str, Any]:
+    """Return raw daily analytics rollup counters for the window."""
+    _require_ops_auth(request)
+    from src.core.analytics_store import get_analytics_rollup
+
+    return await get_analytics_rollup(days=max(1, min(days, 90)))
 
 
 @app.get("/ops/analytics/golden-dialogues")
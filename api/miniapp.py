@@ -1,18 +1,24 @@
 """Mini App REST API — endpoints for Telegram WebView SPA."""
 
+import base64
 import csv
+import hashlib
 import io
 import ipaddress
+import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import asc, desc, func, select
+from sqlalchemy import asc, desc, func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from api.webapp_auth import validate_webapp_data
 from src.core.access import (
@@ -22,7 +28,7 @@ from src.core.access import (
     get_default_visibility,
 )
 from src.core.config import settings
-from src.core.db import async_session
+from src.core.db import async_session, rls_read_session
 from src.core.models.budget import Budget
 from src.core.models.category import Category
 from src.core.models.enums import (
@@ -35,12 +41,19 @@ from src.core.models.enums import (
     TransactionType,
 )
 from src.core.models.family import Family
+from src.core.models.family_data_version import FamilyDataVersion
 from src.core.models.life_event import LifeEvent
 from src.core.models.recurring_payment import RecurringPayment
-from src.core.models.tracker import Tracker, TrackerEntry
 from src.core.models.task import Task
+from src.core.models.tracker import Tracker, TrackerEntry
 from src.core.models.transaction import Transaction
 from src.core.models.user import User
+from src.core.stats_engine import (
+    category_breakdown,
+    grouped_totals,
+    month_starts,
+    monthly_series,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["miniapp"])
@@ -111,13 +124,6 @@ def _is_public_ip(ip_str: str) -> bool:
         return False
 
 
-def _month_offset(base: date, months_back: int) -> date:
-    m = base.month - months_back
-    y = base.year + (m - 1) // 12
-    m = (m - 1) % 12 + 1
-    return date(y, m, 1)
-
-
 def _parse_uuid(value: str, field_name: str) -> uuid.UUID:
     try:
         return uuid.UUID(value)
@@ -175,9 +181,11 @@ class TransactionItem(BaseModel):
 
 class TransactionListResponse(BaseModel):
     items: list[TransactionItem]
-    total: int
+    total: int | None
     page: int
     per_page: int
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 
 class TransactionCreateRequest(BaseModel):
@@ -411,12 +419,71 @@ async def list_categories(user: User = Depends(get_current_user)):
 # ---------------------------------------------------------------------------
 
 
+STATS_CACHE_CONTROL = "private, no-cache"
+
+
+async def _stats_validator(session, request: Request, user: User) -> tuple[str, str]:
+    """Return ``(currency, etag)`` for a family-scoped stats response.
+
+    One PK lookup fetches the family currency and its "transactions" data
+    version (bumped by DB triggers on every transaction/category write). The
+    ETag also covers the request URL, the viewer (visibility filtering) and
+    today's date (period windows move at midnight).
+    """
+    row = (
+        await session.execute(
+            select(Family.currency, FamilyDataVersion.version)
+            .outerjoin(
+                FamilyDataVersion,
+                (FamilyDataVersion.family_id == Family.id)
+                & (FamilyDataVersion.domain == "transactions"),
+            )
+            .where(Family.id == user.family_id)
+        )
+    ).first()
+    currency, version = (row[0], row[1]) if row else ("USD", None)
+    raw = "|".join(
+        [
+            str(user.family_id),
+            str(version or 0),
+            currency or "USD",
+            str(user.id),
+            user.role.value,
+            date.today().isoformat(),
+            str(request.url.path),
+            str(request.url.query),
+        ]
+    )
+    return currency or "USD", f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:20]}"'
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    """304 response if the client already holds *etag*, else None."""
+    client_etags = request.headers.get("if-none-match", "")
+    if etag in {tag.strip() for tag in client_etags.split(",")}:
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": STATS_CACHE_CONTROL}
+        )
+    return None
+
+
+def _set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = STATS_CACHE_CONTROL
+
+
 @router.get("/stats/{period}", response_model=StatsResponse)
 async def get_stats(
+    request: Request,
+    response: Response,
     period: str = "month",
     user: User = Depends(get_current_user),
 ):
-    """Get spending/income statistics for a period."""
+    """Get spending/income statistics for a period.
+
+    Served from one grouped query; answers 304 when the family's
+    transaction data is unchanged since the client's ETag.
+    """
     today = date.today()
     if period == "week":
         start = today - timedelta(days=today.weekday())
@@ -426,121 +493,58 @@ async def get_stats(
         start = today.replace(day=1)
         period = "month"
 
-    async with async_session() as session:
-        fam = await session.scalar(select(Family).where(Family.id == user.family_id))
-        currency = fam.currency if fam else "USD"
-
-        # Expenses by category
-        exp_stmt = (
-            select(
-                Category.id,
-                Category.name,
-                Category.icon,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .join(Category, Transaction.category_id == Category.id)
-            .where(
-                Transaction.family_id == user.family_id,
-                Transaction.date >= start,
-                Transaction.type == TransactionType.expense,
-            )
-            .group_by(Category.id, Category.name, Category.icon)
-            .order_by(desc("total"))
-        )
-        exp_result = await session.execute(
-            _apply_tx_filter(exp_stmt, user)
-        )
-        expense_rows = exp_result.all()
-        total_expense = sum(float(r[3]) for r in expense_rows)
-
-        # Income by category
-        inc_stmt = (
-            select(
-                Category.id,
-                Category.name,
-                Category.icon,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .join(Category, Transaction.category_id == Category.id)
-            .where(
-                Transaction.family_id == user.family_id,
-                Transaction.date >= start,
-                Transaction.type == TransactionType.income,
-            )
-            .group_by(Category.id, Category.name, Category.icon)
-            .order_by(desc("total"))
-        )
-        inc_result = await session.execute(
-            _apply_tx_filter(inc_stmt, user)
-        )
-        income_rows = inc_result.all()
-        total_income = sum(float(r[3]) for r in income_rows)
+    async with rls_read_session(str(user.family_id), str(user.id)) as session:
+        currency, etag = await _stats_validator(session, request, user)
+        if (cached := _not_modified(request, etag)) is not None:
+            return cached
 
-        return StatsResponse(
-            period=period,
-            total_expense=total_expense,
-            total_income=total_income,
-            balance=total_income - total_expense,
-            currency=currency,
-            expense_categories=[
-                CategoryStats(
-                    name=r[1],
-                    icon=r[2],
-                    total=float(r[3]),
-                    percent=(float(r[3]) / total_expense * 100) if total_expense > 0 else 0,
-                )
-                for r in expense_rows
-            ],
-            income_categories=[
-                CategoryStats(
-                    name=r[1],
-                    icon=r[2],
-                    total=float(r[3]),
-                    percent=(float(r[3]) / total_income * 100) if total_income > 0 else 0,
-                )
-                for r in income_rows
-            ],
+        rows = await grouped_totals(
+            session,
+            family_id=user.family_id,
+            role=user.role.value,
+            user_id=str(user.id),
+            start=start,
         )
 
+    total_expense, expense_categories = category_breakdown(rows, TransactionType.expense)
+    total_income, income_categories = category_breakdown(rows, TransactionType.income)
+    _set_validators(response, etag)
+    return StatsResponse(
+        period=period,
+        total_expense=total_expense,
+        total_income=total_income,
+        balance=total_income - total_expense,
+        currency=currency,
+        expense_categories=[CategoryStats(**c) for c in expense_categories],
+        income_categories=[CategoryStats(**c) for c in income_categories],
+    )
+
 
 @router.get("/stats/trend/monthly")
 async def get_monthly_trend(
+    request: Request,
+    response: Response,
     months: int = Query(6, ge=1, le=24),
     user: User = Depends(get_current_user),
 ):
-    """Get month-by-month expense/income trend."""
-    today = date.today()
-    result = []
-    async with async_session() as session:
-        for i in range(months - 1, -1, -1):
-            month_date = _month_offset(today, i)
-            if month_date.month == 12:
-                end = month_date.replace(year=month_date.year + 1, month=1, day=1)
-            else:
-                end = month_date.replace(month=month_date.month + 1, day=1)
+    """Get month-by-month expense/income trend (one grouped query)."""
+    month_list = month_starts(date.today(), months)
+    async with rls_read_session(str(user.family_id), str(user.id)) as session:
+        _, etag = await _stats_validator(session, request, user)
+        if (cached := _not_modified(request, etag)) is not None:
+            return cached
+
+        rows = await grouped_totals(
+            session,
+            family_id=user.family_id,
+            role=user.role.value,
+            user_id=str(user.id),
+            start=month_list[0],
+            bucket="month",
+        )
 
-            exp_stmt = select(func.sum(Transaction.amount)).where(
-                Transaction.family_id == user.family_id,
-                Transaction.date >= month_date,
-                Transaction.date < end,
-                Transaction.type == TransactionType.expense,
-            )
-            exp = await session.scalar(_apply_tx_filter(exp_stmt, user))
-            inc_stmt = select(func.sum(Transaction.amount)).where(
-                Transaction.family_id == user.family_id,
-                Transaction.date >= month_date,
-                Transaction.date < end,
-                Transaction.type == TransactionType.income,
-            )
-            inc = await session.scalar(_apply_tx_filter(inc_stmt, user))
-            result.append(
-                {
-                    "month": month_date.strftime("%b %Y"),
-                    "expense": float(exp or 0),
-                    "income": float(inc or 0),
-                }
-            )
-        return result
+    _set_validators(response, etag)
+    return monthly_series(rows, month_list)
 
 
 # ---------------------------------------------------------------------------
@@ -548,6 +552,69 @@ async def get_monthly_trend(
 # ---------------------------------------------------------------------------
 
 
+# Keyset order shared by list_transactions and the CSV export; served by
+# ix_transactions_family_keyset (family_id, date, created_at, id).
+_TX_KEYSET_ORDER = (
+    desc(Transaction.date),
+    desc(Transaction.created_at),
+    desc(Transaction.id),
+)
+EXPORT_BATCH_SIZE = 1000
+
+
+def _encode_tx_cursor(tx: Transaction) -> str:
+    """Opaque cursor pointing just past *tx* in keyset order."""
+    raw = json.dumps([tx.date.isoformat(), tx.created_at.isoformat(), str(tx.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_tx_cursor(cursor: str) -> tuple[date, datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tx_date, created_at, tx_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            date.fromisoformat(tx_date),
+            datetime.fromisoformat(created_at),
+            uuid.UUID(tx_id),
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, keeping its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _estimate_count(session, stmt) -> int | None:
+    """Planner row estimate for *stmt* via EXPLAIN; None if unavailable.
+
+    Avoids a full COUNT(*) over large families. Only PostgreSQL is supported;
+    other dialects (and any planner error) return None. Filter values such as
+    the search text stay bound parameters, never inlined SQL.
+    """
+    try:
+        conn = await session.connection()
+        if conn.dialect.name != "postgresql":
+            return None
+        plan = (await conn.execute(_Explain(stmt))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug("Transaction count estimate failed: %s", e)
+        return None
+
+
 def _tx_to_item(tx: Transaction, cat_name: str, cat_id: str) -> TransactionItem:
     return TransactionItem(
         id=str(tx.id),
@@ -571,9 +638,17 @@ async def list_transactions(
     date_from: str | None = None,
     date_to: str | None = None,
     search: str | None = None,
+    cursor: str | None = None,
+    count: str = Query("exact", pattern="^(exact|estimated|none)$"),
     user: User = Depends(get_current_user),
 ):
-    """List transactions with pagination and filters."""
+    """List transactions with keyset pagination and filters.
+
+    Pass ``next_cursor`` from the previous response as ``cursor`` to fetch
+    the next page; ``page`` (OFFSET paging) is kept for older clients and
+    ignored when a cursor is given. ``count`` selects an exact total, a
+    planner estimate (``total_estimated=True``) or no total at all.
+    """
     async with async_session() as session:
         base_filter = [Transaction.family_id == user.family_id]
         if type:
@@ -607,27 +682,47 @@ async def list_transactions(
                 )
             )
 
-        total_stmt = select(func.count(Transaction.id)).where(*base_filter)
-        total = (
-            await session.scalar(_apply_tx_filter(total_stmt, user))
-        ) or 0
+        total: int | None = None
+        total_estimated = False
+        if count == "estimated":
+            total = await _estimate_count(
+                session,
+                _apply_tx_filter(select(Transaction.id).where(*base_filter), user),
+            )
+            total_estimated = total is not None
+        if count == "exact" or (count == "estimated" and total is None):
+            total_stmt = select(func.count(Transaction.id)).where(*base_filter)
+            total = (
+                await session.scalar(_apply_tx_filter(total_stmt, user))
+            ) or 0
 
-        query = _apply_tx_filter(
+        query = (
             select(Transaction, Category.name.label("cat_name"), Category.id.label("cat_id"))
             .join(Category, Transaction.category_id == Category.id)
             .where(*base_filter)
-            .order_by(desc(Transaction.date), desc(Transaction.created_at))
-            .offset((page - 1) * per_page)
-            .limit(per_page),
-            user,
+        )
+        if cursor:
+            query = query.where(
+                tuple_(Transaction.date, Transaction.created_at, Transaction.id)
+                < tuple_(*_decode_tx_cursor(cursor))
+            )
+        elif page > 1:
+            query = query.offset((page - 1) * per_page)
+        # Fetch one extra row to know whether another page exists.
+        query = _apply_tx_filter(
+            query.order_by(*_TX_KEYSET_ORDER).limit(per_page + 1), user
         )
         rows = (await session.execute(query)).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
 
         return TransactionListResponse(
             items=[_tx_to_item(tx, cat_name, str(cat_id)) for tx, cat_name, cat_id in rows],
             total=total,
             page=page,
             per_page=per_page,
+            next_cursor=_encode_tx_cursor(rows[-1][0]) if has_more else None,
+            total_estimated=total_estimated,
         )
 
 
@@ -1367,62 +1462,115 @@ async def delete_task(
 # ---------------------------------------------------------------------------
 
 
+_EXPORT_HEADER = ["Date", "Type", "Amount", "Category", "Merchant", "Description", "Scope"]
+
+
+async def _stream_transactions_csv(stmt, *, bom: bool = False) -> AsyncIterator[str]:
+    """Yield CSV text one batch at a time from a server-side cursor.
+
+    Memory stays constant regardless of the number of exported rows: each
+    ``EXPORT_BATCH_SIZE`` partition is written, flushed to the client and
+    discarded before the next one is fetched.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if bom:
+        buffer.write("\ufeff")
+    writer.writerow(_EXPORT_HEADER)
+    yield buffer.getvalue()
+
+    async with async_session() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate(0)
+            for tx_date, tx_type, amount, cat_name, merchant, description, scope in partition:
+                writer.writerow(
+                    [
+                        tx_date.isoformat(),
+                        tx_type.value,
+                        float(amount),
+                        cat_name,
+                        merchant or "",
+                        description or "",
+                        scope.value,
+                    ]
+                )
+            yield buffer.getvalue()
+
+
 @router.get("/export/csv")
 async def export_csv(
     date_from: str | None = None,
     date_to: str | None = None,
+    excel: bool = False,
     user: User = Depends(get_current_user),
 ):
-    """Export all transactions as CSV."""
+    """Export all transactions as CSV, streamed in batches.
+
+    ``excel=true`` prefixes a UTF-8 BOM so Excel detects the encoding of
+    non-Latin merchant names and descriptions.
+    """
     async with async_session() as session:
         await _check_permission(user, "view_reports", session)
-        filters = [Transaction.family_id == user.family_id]
-        if date_from:
-            filters.append(Transaction.date >= date.fromisoformat(date_from))
-        if date_to:
-            filters.append(Transaction.date <= date.fromisoformat(date_to))
-
-        stmt = (
-                select(
-                    Transaction, Category.name.label("cat_name")
-                )
-                .join(
-                    Category,
-                    Transaction.category_id == Category.id,
-                )
-                .where(*filters)
-                .order_by(desc(Transaction.date))
-                .limit(10000)
-            )
-        rows = (
-            await session.execute(_apply_tx_filter(stmt, user))
-        ).all()
 
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Date", "Type", "Amount", "Category", "Merchant", "Description", "Scope"])
-        for tx, cat_name in rows:
-            writer.writerow(
-                [
-                    tx.date.isoformat(),
-                    tx.type.value,
-                    float(tx.amount),
-                    cat_name,
-                    tx.merchant or "",
-                    tx.description or "",
-                    tx.scope.value,
-                ]
-            )
+    filters = [Transaction.family_id == user.family_id]
+    if date_from:
+        filters.append(Transaction.date >= date.fromisoformat(date_from))
+    if date_to:
+        filters.append(Transaction.date <= date.fromisoformat(date_to))
+
+    stmt = _apply_tx_filter(
+        select(
+            Transaction.date,
+            Transaction.type,
+            Transaction.amount,
+            Category.name,
+            Transaction.merchant,
+            Transaction.description,
+            Transaction.scope,
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .where(*filters)
+        .order_by(*_TX_KEYSET_ORDER),
+        user,
+    )
 
-    output.seek(0)
     filename = f"transactions_{date.today().isoformat()}.csv"
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        _stream_transactions_csv(stmt, bom=excel),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _stream_gdpr_export(user_id: str, family_id: str) -> AsyncIterator[bytes]:
+    from src.core.gdpr import MemoryGDPR
+
+    async with rls_read_session(family_id, user_id) as session:
+        async for chunk in MemoryGDPR().iter_export_zip(session, user_id):
+            yield chunk
+
+
+@router.get("/export/my-data")
+async def export_my_data(user: User = Depends(get_current_user)):
+    """GDPR data export: a ZIP of NDJSON files, streamed as it is built."""
+    filename = f"my_data_{date.today().isoformat()}.zip"
+    return StreamingResponse(
+        _stream_gdpr_export(str(user.id), str(user.family_id)),
+        media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+@router.get("/export/erasure-status")
+async def erasure_status(user: User = Depends(get_current_user)):
+    """Progress of the user's data erasure request, if any."""
+    from src.core.gdpr import get_erasure_status
+
+    return await get_erasure_status(str(user.id)) or {"status": "none"}
+
+
 # ---------------------------------------------------------------------------
 # Members
 # ---------------------------------------------------------------------------
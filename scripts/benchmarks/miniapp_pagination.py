@@ -0,0 +1,244 @@
+"""Benchmark Mini App transaction paging and CSV export on a 1M-row family.
+
+Seeds a throwaway family with N transactions (``generate_series``, so seeding
+1M rows takes seconds), then compares:
+
+* OFFSET paging + exact COUNT(*) (the legacy ``?page=N`` path) against keyset
+  cursor paging with an estimated count, at several page depths;
+* streaming CSV export throughput and peak Python heap (tracemalloc), against
+  materialising every row in memory first (the pre-streaming approach without
+  its 10k row cap) when ``--legacy-export`` is given.
+
+Requires a PostgreSQL database with migrations applied (``DATABASE_URL``).
+The seeded family is deleted afterwards unless ``--keep`` is passed.
+
+Usage:
+    python scripts/benchmarks/miniapp_pagination.py
+    python scripts/benchmarks/miniapp_pagination.py --rows 200000 --depths 1 100 1000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from api import miniapp  # noqa: E402
+from src.core.db import async_session, engine  # noqa: E402
+from src.core.models.transaction import Transaction  # noqa: E402
+
+PER_PAGE = 20
+
+
+async def _seed(rows: int) -> SimpleNamespace:
+    family_id, user_id, category_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with async_session() as session:
+        await session.execute(
+            text(
+                "INSERT INTO families (id, name, invite_code, currency, timezone) "
+                "VALUES (:id, 'bench', :code, 'USD', 'UTC')"
+            ),
+            {"id": family_id, "code": f"bench-{family_id.hex[:12]}"},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO users (id, family_id, name, role, language, onboarded) "
+                "VALUES (:id, :fid, 'bench', 'owner', 'en', true)"
+            ),
+            {"id": user_id, "fid": family_id},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO categories (id, family_id, name, scope, icon, is_default) "
+                "VALUES (:id, :fid, 'Bench', 'family', '📦', false)"
+            ),
+            {"id": category_id, "fid": family_id},
+        )
+        # ~10 transactions per day going back in time, spread over the day.
+        await session.execute(
+            text(
+                "INSERT INTO transactions "
+                "(id, family_id, user_id, category_id, type, amount, merchant, description, "
+                " date, scope, ai_confidence, is_corrected, created_at) "
+                "SELECT gen_random_uuid(), :fid, :uid, :cid, 'expense', "
+                "       (g % 5000) / 100.0 + 1, 'Merchant ' || (g % 500), "
+                "       'Benchmark row ' || g, "
+                "       CURRENT_DATE - (g / 10), 'family', 1.0, false, "
+                "       now() - make_interval(secs => g * 8640 / 100) "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"fid": family_id, "uid": user_id, "cid": category_id, "rows": rows},
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE transactions"))
+    return SimpleNamespace(id=user_id, family_id=family_id, role=SimpleNamespace(value="owner"))
+
+
+async def _cleanup(user: SimpleNamespace) -> None:
+    async with async_session() as session:
+        for table in ("transactions", "categories", "users"):
+            await session.execute(
+                text(f"DELETE FROM {table} WHERE family_id = :fid"), {"fid": user.family_id}
+            )
+        await session.execute(text("DELETE FROM families WHERE id = :fid"), {"fid": user.family_id})
+        await session.commit()
+
+
+async def _list(user, *, page: int = 1, cursor: str | None = None, count: str = "exact"):
+    return await miniapp.list_transactions(
+        page=page,
+        per_page=PER_PAGE,
+        type=None,
+        category_id=None,
+        date_from=None,
+        date_to=None,
+        search=None,
+        cursor=cursor,
+        count=count,
+        user=user,
+    )
+
+
+async def _cursor_at(user, depth: int) -> str | None:
+    """Cursor for page *depth* (computed outside the timed section)."""
+    if depth <= 1:
+        return None
+    async with async_session() as session:
+        tx = await session.scalar(
+            select(Transaction)
+            .where(Transaction.family_id == user.family_id)
+            .order_by(*miniapp._TX_KEYSET_ORDER)
+            .offset((depth - 1) * PER_PAGE - 1)
+            .limit(1)
+        )
+    return miniapp._encode_tx_cursor(tx)
+
+
+async def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+async def bench_paging(user, depths: list[int], repeat: int) -> list[dict]:
+    results = []
+    for depth in depths:
+        cursor = await _cursor_at(user, depth)
+        offset_ms = await _time(lambda d=depth: _list(user, page=d), repeat)
+        keyset_ms = await _time(
+            lambda c=cursor: _list(user, cursor=c, count="estimated" if c is None else "none"),
+            repeat,
+        )
+        results.append({"page": depth, "offset_ms": offset_ms, "keyset_ms": keyset_ms})
+    return results
+
+
+async def bench_export(user, legacy: bool) -> dict:
+    response = await miniapp.export_csv(date_from=None, date_to=None, excel=False, user=user)
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = lines = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+        lines += chunk.count("\n")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "rows": lines - 1,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round((lines - 1) / elapsed),
+        "mb": round(size / 1e6, 1),
+        "peak_heap_mb": round(peak / 1e6, 1),
+    }
+
+    if legacy:
+        tracemalloc.start()
+        start = time.perf_counter()
+        async with async_session() as session:
+            stmt = miniapp._apply_tx_filter(
+                select(Transaction).where(Transaction.family_id == user.family_id), user
+            )
+            rows = (await session.execute(stmt)).scalars().all()
+        result["legacy_seconds"] = round(time.perf_counter() - start, 2)
+        result["legacy_peak_heap_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        tracemalloc.stop()
+        del rows
+    return result
+
+
+async def run_benchmark(
+    *, rows: int, depths: list[int], repeat: int, legacy: bool, keep: bool
+) -> dict:
+    user = await _seed(rows)
+    try:
+        return {
+            "rows": rows,
+            "paging": await bench_paging(user, depths, repeat),
+            "export": await bench_export(user, legacy),
+        }
+    finally:
+        if not keep:
+            await _cleanup(user)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-export", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded family")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run_benchmark(
+            rows=args.rows,
+            depths=args.depths,
+            repeat=args.repeat,
+            legacy=args.legacy_export,
+            keep=args.keep,
+        )
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"family with {results['rows']:,} transactions, {PER_PAGE} per page (median ms)")
+    header = f"{'page':>8}{'offset+count':>15}{'keyset':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results["paging"]:
+        print(f"{r['page']:>8}{r['offset_ms']:>15}{r['keyset_ms']:>10}")
+    print()
+    e = results["export"]
+    print(
+        f"CSV export: {e['rows']:,} rows, {e['mb']} MB in {e['seconds']}s "
+        f"({e['rows_per_s']:,} rows/s), peak heap {e['peak_heap_mb']} MB"
+    )
+    if "legacy_seconds" in e:
+        print(
+            f"materialised load: {e['legacy_seconds']}s, peak heap {e['legacy_peak_heap_mb']} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
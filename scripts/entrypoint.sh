@@ -3,7 +3,7 @@ set -e
 
 PROCESS_TYPE="${RAILWAY_PROCESS_TYPE:-web}"
 
-TASK_MODULES="src.core.tasks.memory_tasks src.core.tasks.notification_tasks src.core.tasks.life_tasks src.core.tasks.reminder_tasks src.core.tasks.tracker_tasks src.core.tasks.profile_tasks src.core.tasks.proactivity_tasks src.core.tasks.booking_tasks src.core.tasks.document_tasks src.core.tasks.crossdomain_tasks src.core.tasks.billing_tasks src.core.tasks.scheduled_action_tasks src.core.tasks.release_ops_tasks"
+TASK_MODULES="src.core.tasks.memory_tasks src.core.tasks.notification_tasks src.core.tasks.life_tasks src.core.tasks.reminder_tasks src.core.tasks.tracker_tasks src.core.tasks.profile_tasks src.core.tasks.proactivity_tasks src.core.tasks.booking_tasks src.core.tasks.document_tasks src.core.tasks.crossdomain_tasks src.core.tasks.billing_tasks src.core.tasks.scheduled_action_tasks src.core.tasks.release_ops_tasks src.core.tasks.analytics_tasks src.core.tasks.gdpr_tasks src.core.tasks.timer_tasks src.core.tasks.sheets_sync_tasks src.core.tasks.summary_tasks"
 
 if [ "$PROCESS_TYPE" = "worker" ]; then
     echo "Starting Taskiq scheduler (background)..."
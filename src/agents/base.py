@@ -218,6 +218,27 @@ class AgentRouter:
         )
         return system_prompt + block
 
+    @classmethod
+    def _compose_prompt(
+        cls, base_prompt: str, context: SessionContext, *, specialist: bool = True
+    ) -> tuple[str, str]:
+        """Lay out the agent prompt for provider prompt caching.
+
+        Returns ``(system_prompt, volatile_prompt)``. *system_prompt* is the
+        shared base prompt, a ``CACHE_BREAKPOINT``, then the per-user stable
+        cues (specialist, personality, language); assemble_context() adds
+        identity/rules to that per-user segment. *volatile_prompt* holds the
+        current date/time and goes into the per-request suffix, so it never
+        invalidates the cached prefixes.
+        """
+        from src.core.llm.prompts import CACHE_BREAKPOINT
+
+        user_cues = cls._add_specialist_knowledge("", context) if specialist else ""
+        user_cues = cls._add_personality_instruction(user_cues, context)
+        user_cues = cls._add_language_instruction(user_cues, context)
+        volatile = cls._add_date_instruction("", context)
+        return base_prompt + CACHE_BREAKPOINT + user_cues.lstrip("\n"), volatile.lstrip("\n")
+
     @observe(name="agent_route_with_tools")
     async def route_with_tools(
         self,
@@ -233,10 +254,11 @@ class AgentRouter:
         for individual skill handlers for basic CRUD operations.
         """
         from src.core.llm.clients import generate_text_with_tools
+        from src.core.llm.prompts import CACHE_BREAKPOINT
         from src.core.observability import update_trace_user
         from src.core.prompt_registry import prompt_registry
         from src.tools.data_tool_schemas import get_schemas_for_domain
-        from src.tools.tool_executor import execute_tool_call
+        from src.tools.tool_executor import READ_ONLY_TOOLS, execute_tool_call
 
         update_trace_user(context.user_id)
         pv = prompt_registry.get_version(intent)
@@ -245,19 +267,16 @@ class AgentRouter:
         if not agent:
             agent = self._intent_to_agent.get("general_chat")
 
-        # Build system prompt with data tools context
-        prompt = agent.system_prompt if agent else ""
-        prompt = self._add_specialist_knowledge(prompt, context)
-        prompt = self._add_personality_instruction(prompt, context)
-        prompt = self._add_language_instruction(prompt, context)
-        prompt = self._add_date_instruction(prompt, context)
-        prompt += (
+        # Build system prompt with data tools context (tool guidance is part of
+        # the shared prefix; the date goes to the per-request suffix)
+        base_prompt = (agent.system_prompt if agent else "") + (
             "\n\nYou have access to database tools. Use them to look up, create, "
             "update, or delete the user's records as needed. Always query first "
             "before answering questions about the user's data. "
             "For deletions of important data, you'll get a pending_id — "
             "ask the user to confirm via the button."
         )
+        prompt, volatile = self._compose_prompt(base_prompt, context)
 
         # Assemble context (memories, history, etc.)
         try:
@@ -270,15 +289,18 @@ class AgentRouter:
                 role=context.role,
                 intent_data=intent_data,
                 context_config_override=agent.context_config if agent else None,
+                volatile_prompt=volatile,
+            )
+            system_prompt = (
+                assembled.system_prompt if assembled else prompt + CACHE_BREAKPOINT + volatile
             )
-            system_prompt = assembled.system_prompt if assembled else prompt
             messages = assembled.messages if assembled else []
             if assembled:
                 intent_data["_assembled"] = assembled
                 intent_data["_context_config"] = assembled.context_config
         except Exception as e:
             logger.warning("Tool agent context assembly failed: %s", e)
-            system_prompt = prompt
+            system_prompt = prompt + CACHE_BREAKPOINT + volatile
             messages = []
 
         # Ensure we have at least the user message
@@ -313,6 +335,8 @@ class AgentRouter:
             tools=tool_schemas,
             tool_executor=_tool_executor,
             prompt_version=pv,
+            prompt_cache_key=agent_name,
+            read_only_tools=READ_ONLY_TOOLS,
         )
         if response_text.strip() == _TOOL_ROUND_EXHAUSTED_RESPONSE:
             raise RuntimeError("Tool-calling exhausted maximum rounds")
@@ -382,10 +406,7 @@ class AgentRouter:
         if agent:
             # Assemble context with agent-specific system prompt
             try:
-                prompt = self._add_specialist_knowledge(agent.system_prompt, context)
-                prompt = self._add_personality_instruction(prompt, context)
-                prompt = self._add_language_instruction(prompt, context)
-                prompt = self._add_date_instruction(prompt, context)
+                prompt, volatile = self._compose_prompt(agent.system_prompt, context)
                 assembled = await assemble_context(
                     user_id=context.user_id,
                     family_id=context.family_id,
@@ -395,6 +416,7 @@ class AgentRouter:
                     role=context.role,
                     intent_data=intent_data,
                     context_config_override=agent.context_config,
+                    volatile_prompt=volatile,
                 )
                 intent_data["_assembled"] = assembled
                 intent_data["_agent"] = agent.name
@@ -444,10 +466,9 @@ class AgentRouter:
             skill = self._registry.get("general_chat")
         if skill:
             try:
-                system_prompt = skill.get_system_prompt(context)
-                system_prompt = self._add_personality_instruction(system_prompt, context)
-                system_prompt = self._add_language_instruction(system_prompt, context)
-                system_prompt = self._add_date_instruction(system_prompt, context)
+                system_prompt, volatile = self._compose_prompt(
+                    skill.get_system_prompt(context), context, specialist=False
+                )
                 assembled = await assemble_context(
                     user_id=context.user_id,
                     family_id=context.family_id,
@@ -457,6 +478,7 @@ class AgentRouter:
                     role=context.role,
                     intent_data=intent_data,
                     context_config_override=getattr(self.get_agent(intent), "context_config", None),
+                    volatile_prompt=volatile,
                 )
                 intent_data["_assembled"] = assembled
                 intent_data["_context_config"] = assembled.context_config
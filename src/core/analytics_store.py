@@ -0,0 +1,301 @@
+"""Bounded Redis Streams storage for conversation analytics, with daily rollups.
+
+Sampled traces, human reviews and inline user feedback are appended to Redis
+Streams. ``compact_analytics_streams`` runs periodically on the Taskiq worker
+and, per stream:
+
+1. reads the entries past its cursor in batches;
+2. appends them to gzip NDJSON segments under ``analytics_archive_dir``,
+   partitioned as ``<kind>/dt=YYYY-MM-DD/`` so DuckDB/Parquet tooling can
+   query the archive in place;
+3. folds them into per-day rollup hashes and advances the cursor in the same
+   MULTI, so a rerun never double-counts;
+4. trims compacted entries older than the retention window (``MINID``), or
+   all compacted entries once the stream holds more than
+   ``analytics_stream_maxlen``.
+
+Writes don't cap the stream (an ``XADD MAXLEN ~`` could evict entries a burst
+pushed in before compaction read them); every trim stops at the compaction
+cursor, so no event is dropped unread.
+
+Ops snapshots read the rollup hashes for the requested window plus the small
+tail that has not been compacted yet, so their cost does not depend on how
+much history exists.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from src.core.config import settings
+from src.core.db import redis
+
+logger = logging.getLogger(__name__)
+
+STREAMS = {
+    "trace": "analytics:stream:traces",
+    "review": "analytics:stream:reviews",
+    "feedback": "analytics:stream:feedback",
+}
+TRACE_KEY_PREFIX = "analytics:trace"
+LEGACY_TRACE_INDEX_KEY = "analytics:trace_index"
+LEGACY_TRACE_EXPORT_QUEUE_KEY = "analytics:trace_exports"
+
+_CURSOR_KEY = "analytics:rollup:cursor"
+_ROLLUP_KEY_PREFIX = "analytics:rollup:day"
+_COMPACT_LOCK_KEY = "analytics:rollup:lock"
+_COMPACT_LOCK_TTL_SECONDS = 300
+_COMPACT_BATCH_SIZE = 1000
+_COMPACT_MAX_BATCHES = 50
+_LEGACY_MIGRATION_BATCH = 500
+# Upper bound on un-compacted entries folded into a snapshot per stream; only
+# reached when compaction has stalled.
+_TAIL_LIMIT = 5000
+
+
+def trace_key_name(trace_key: str) -> str:
+    return f"{TRACE_KEY_PREFIX}:{trace_key}"
+
+
+def _rollup_key(day: str) -> str:
+    return f"{_ROLLUP_KEY_PREFIX}:{day}"
+
+
+def add_stream_event(pipe: Any, kind: str, payload: dict[str, Any]) -> None:
+    """Queue an XADD of *payload* onto *pipe* (a Redis pipeline)."""
+    pipe.xadd(
+        STREAMS[kind],
+        {"data": json.dumps(payload, ensure_ascii=False, default=str)},
+    )
+
+
+def _entry_day(entry_id: str) -> str:
+    ms = int(entry_id.split("-", 1)[0])
+    return datetime.fromtimestamp(ms / 1000, UTC).date().isoformat()
+
+
+def _decode_entry(fields: dict[str, Any]) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(fields.get("data") or "")
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def rollup_fields(kind: str, payload: dict[str, Any]) -> list[str]:
+    """Counter fields one event contributes to its day's rollup hash."""
+    if kind == "trace":
+        fields = [
+            "trace:total",
+            f"trace:outcome:{payload.get('outcome') or 'unknown'}",
+            f"trace:review_label:{payload.get('review_label') or 'unknown'}",
+            f"trace:intent:{payload.get('intent') or 'unknown'}",
+        ]
+        if payload.get("queued_for_review"):
+            fields.append("trace:queued_for_review")
+        return fields
+    if kind == "review":
+        fields = [
+            "review:total",
+            f"review:label:{payload.get('final_label') or 'unknown'}",
+            f"review:action:{payload.get('action') or 'unknown'}",
+        ]
+        rubric = payload.get("rubric") or {}
+        fields.extend(f"review:rubric:{name}" for name, value in rubric.items() if value is True)
+        return fields
+    if kind == "feedback":
+        return ["feedback:total", f"feedback:value:{payload.get('feedback') or 'unknown'}"]
+    return []
+
+
+def rollup_group(counts: dict[str, int], prefix: str) -> dict[str, int]:
+    """``{"review:label:x": 3}`` → ``{"x": 3}`` for every field under *prefix*."""
+    return {
+        field[len(prefix) :]: value for field, value in counts.items() if field.startswith(prefix)
+    }
+
+
+# ------------------------------------------------------------------
+# Compaction
+# ------------------------------------------------------------------
+
+
+def _write_segments(kind: str, by_day: dict[str, list[tuple[str, dict[str, Any]]]]) -> int:
+    """Write one gzip NDJSON segment per day; the name makes reruns idempotent."""
+    root = Path(settings.analytics_archive_dir) / kind
+    written = 0
+    for day, entries in by_day.items():
+        part = root / f"dt={day}"
+        part.mkdir(parents=True, exist_ok=True)
+        name = f"{entries[0][0]}_{entries[-1][0]}.ndjson.gz"
+        tmp = part / f".{name}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            for entry_id, payload in entries:
+                fh.write(json.dumps({"id": entry_id, **payload}, ensure_ascii=False, default=str))
+                fh.write("\n")
+        os.replace(tmp, part / name)
+        written += len(entries)
+    return written
+
+
+async def _compact_stream(kind: str) -> dict[str, Any]:
+    stream = STREAMS[kind]
+    cursor = await redis.hget(_CURSOR_KEY, kind) or "0-0"
+    compacted = 0
+    for _ in range(_COMPACT_MAX_BATCHES):
+        entries = await redis.xrange(stream, min=f"({cursor}", count=_COMPACT_BATCH_SIZE)
+        if not entries:
+            break
+
+        by_day: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        counts: dict[str, Counter[str]] = {}
+        for entry_id, fields in entries:
+            payload = _decode_entry(fields)
+            if payload is None:
+                continue
+            day = _entry_day(entry_id)
+            by_day.setdefault(day, []).append((entry_id, payload))
+            counts.setdefault(day, Counter()).update(rollup_fields(kind, payload))
+
+        if settings.analytics_archive_dir and by_day:
+            await asyncio.to_thread(_write_segments, kind, by_day)
+
+        last_id = entries[-1][0]
+        ttl = settings.analytics_rollup_retention_days * 86400
+        async with redis.pipeline(transaction=True) as pipe:
+            for day, day_counts in counts.items():
+                for field, value in day_counts.items():
+                    pipe.hincrby(_rollup_key(day), field, value)
+                pipe.expire(_rollup_key(day), ttl)
+            pipe.hset(_CURSOR_KEY, kind, last_id)
+            await pipe.execute()
+
+        cursor = last_id
+        compacted += len(entries)
+        if len(entries) < _COMPACT_BATCH_SIZE:
+            break
+
+    # Keep compacted entries for the retention window (recent-trace views read
+    # them) unless the stream is over its size budget; never trim past the
+    # cursor, so unread entries survive.
+    cutoff_ms = int((time.time() - settings.analytics_stream_retention_hours * 3600) * 1000)
+    cursor_ms = int(cursor.split("-", 1)[0])
+    trimmed = 0
+    if cursor != "0-0":
+        if await redis.xlen(stream) > settings.analytics_stream_maxlen:
+            cutoff_ms = cursor_ms
+        minid = f"{min(cutoff_ms, cursor_ms)}-0"
+        trimmed = await redis.xtrim(stream, minid=minid, approximate=True)
+    return {"compacted": compacted, "trimmed": trimmed, "cursor": cursor}
+
+
+async def _migrate_legacy_trace_index() -> int:
+    """Move traces from the old unbounded hash to per-trace keys with a TTL."""
+    _, items = await redis.hscan(LEGACY_TRACE_INDEX_KEY, 0, count=_LEGACY_MIGRATION_BATCH)
+    if not items:
+        await redis.delete(LEGACY_TRACE_EXPORT_QUEUE_KEY)
+        return 0
+    async with redis.pipeline(transaction=False) as pipe:
+        for trace_key, serialized in items.items():
+            pipe.set(
+                trace_key_name(trace_key),
+                serialized,
+                ex=settings.analytics_trace_ttl_seconds,
+                nx=True,
+            )
+        pipe.hdel(LEGACY_TRACE_INDEX_KEY, *items.keys())
+        await pipe.execute()
+    return len(items)
+
+
+async def compact_analytics_streams() -> dict[str, Any]:
+    """Drain every analytics stream into the archive and daily rollups."""
+    acquired = await redis.set(
+        _COMPACT_LOCK_KEY, str(os.getpid()), nx=True, ex=_COMPACT_LOCK_TTL_SECONDS
+    )
+    if not acquired:
+        return {"status": "locked"}
+    started = time.perf_counter()
+    try:
+        result: dict[str, Any] = {"status": "ok", "streams": {}}
+        for kind in STREAMS:
+            result["streams"][kind] = await _compact_stream(kind)
+        result["legacy_traces_migrated"] = await _migrate_legacy_trace_index()
+    finally:
+        await redis.delete(_COMPACT_LOCK_KEY)
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+# ------------------------------------------------------------------
+# Reads
+# ------------------------------------------------------------------
+
+
+async def get_analytics_rollup(days: int = 7) -> dict[str, Any]:
+    """Summed rollup counters for the last *days* UTC days, including today.
+
+    Adds the un-compacted stream tail so results are current, not as of the
+    last compaction run.
+    """
+    days = max(1, days)
+    today = datetime.now(UTC).date()
+    window = [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+    first_day = window[-1]
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for day in window:
+            pipe.hgetall(_rollup_key(day))
+        pipe.hgetall(_CURSOR_KEY)
+        results = await pipe.execute()
+    cursors: dict[str, str] = results[-1] or {}
+
+    counts: Counter[str] = Counter()
+    for day_counts in results[:-1]:
+        counts.update({field: int(value) for field, value in (day_counts or {}).items()})
+
+    kinds = list(STREAMS)
+    async with redis.pipeline(transaction=False) as pipe:
+        for kind in kinds:
+            pipe.xrange(STREAMS[kind], min=f"({cursors.get(kind, '0-0')}", count=_TAIL_LIMIT)
+        tails = await pipe.execute()
+
+    tail_events = 0
+    for kind, entries in zip(kinds, tails, strict=True):
+        for entry_id, fields in entries or []:
+            if _entry_day(entry_id) < first_day:
+                continue
+            payload = _decode_entry(fields)
+            if payload is None:
+                continue
+            counts.update(rollup_fields(kind, payload))
+            tail_events += 1
+
+    return {
+        "days": days,
+        "from": first_day,
+        "to": window[0],
+        "counts": dict(counts),
+        "compacted_through": cursors,
+        "tail_events": tail_events,
+    }
+
+
+async def get_recent_stream_items(kind: str, limit: int) -> list[dict[str, Any]]:
+    """Newest-first payloads from one analytics stream."""
+    entries = await redis.xrevrange(STREAMS[kind], count=max(1, limit))
+    items = []
+    for _, fields in entries or []:
+        payload = _decode_entry(fields)
+        if payload is not None:
+            items.append(payload)
+    return items
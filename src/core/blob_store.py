@@ -0,0 +1,329 @@
+"""Async content-addressed blob store.
+
+File bytes (uploaded photos, documents, receipt images) are stored once under
+their SHA-256 digest and referenced everywhere else — Redis pending state,
+``last_file`` caches, DB rows — by a small string handle such as
+``"tmp/9f86d081884c7d65..."``. Re-uploading identical bytes is a no-op.
+
+Backends:
+
+* ``LocalBlobBackend`` — a directory on disk (dev, tests, single-node).
+* ``SupabaseBlobBackend`` — Supabase Storage over its REST API with one
+  shared ``httpx.AsyncClient``; uploads never block the event loop.
+
+``settings.blob_backend`` selects the backend (``auto`` uses Supabase when
+configured, else local). Blobs in the ``tmp`` namespace back short-lived
+state and are removed by the ``sweep_tmp_blobs`` cron after
+``settings.blob_tmp_max_age_s``.
+
+Usage::
+
+    from src.core.blob_store import get_blob_store
+
+    store = get_blob_store()
+    handle = await store.put(image_bytes, "image/jpeg")
+    data = await store.get(handle)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Protocol
+
+import httpx
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TMP_NAMESPACE = "tmp"
+# Hash in a worker thread above this size so large uploads don't stall the loop.
+_THREADED_HASH_MIN_BYTES = 1024 * 1024
+_HANDLE_RE = re.compile(r"^([a-z0-9_-]+)/([0-9a-f]{64})$")
+
+
+class BlobBackend(Protocol):
+    """Raw key/value byte storage used by BlobStore."""
+
+    async def put(self, key: str, data: bytes, mime_type: str) -> None: ...
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def age(self, key: str) -> float | None:
+        """Seconds since *key* was last written, or None if it does not exist."""
+        ...
+
+    async def delete(self, key: str) -> bool: ...
+
+    async def sweep(self, namespace: str, max_age_s: float) -> int:
+        """Delete blobs in *namespace* older than *max_age_s*; return count."""
+        ...
+
+
+class LocalBlobBackend:
+    """Blobs as files under ``root/<namespace>/<sha256>``."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    async def put(self, key: str, data: bytes, mime_type: str) -> None:
+        await asyncio.to_thread(self._write, self._path(key), data)
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # atomic: readers never see partial blobs
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def age(self, key: str) -> float | None:
+        try:
+            stat = await asyncio.to_thread(self._path(key).stat)
+        except FileNotFoundError:
+            return None
+        return max(0.0, time.time() - stat.st_mtime)
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self._path(key).unlink)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def sweep(self, namespace: str, max_age_s: float) -> int:
+        return await asyncio.to_thread(self._sweep, self.root / namespace, max_age_s)
+
+    @staticmethod
+    def _sweep(directory: Path, max_age_s: float) -> int:
+        if not directory.is_dir():
+            return 0
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for path in directory.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+class SupabaseBlobBackend:
+    """Supabase Storage via REST (``/storage/v1``) with a pooled async client."""
+
+    _LIST_PAGE = 1000
+
+    def __init__(self, url: str, service_key: str, bucket: str):
+        self.bucket = bucket
+        self._base = f"{url.rstrip('/')}/storage/v1"
+        self._headers = {"Authorization": f"Bearer {service_key}", "apikey": service_key}
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self._headers, timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return self._client
+
+    def _object_url(self, key: str, bucket: str | None = None) -> str:
+        return f"{self._base}/object/{bucket or self.bucket}/{key}"
+
+    async def put(
+        self, key: str, data: bytes, mime_type: str, *, bucket: str | None = None
+    ) -> None:
+        resp = await self.client.post(
+            self._object_url(key, bucket),
+            content=data,
+            headers={"Content-Type": mime_type, "x-upsert": "true"},
+        )
+        resp.raise_for_status()
+
+    async def get(self, key: str, *, bucket: str | None = None) -> bytes | None:
+        resp = await self.client.get(self._object_url(key, bucket))
+        if resp.status_code in (400, 404):
+            return None
+        resp.raise_for_status()
+        return resp.content
+
+    async def age(self, key: str) -> float | None:
+        resp = await self.client.head(self._object_url(key))
+        if resp.status_code in (400, 404):
+            return None
+        resp.raise_for_status()
+        modified = resp.headers.get("last-modified")
+        if not modified:
+            return 0.0
+        return max(0.0, time.time() - parsedate_to_datetime(modified).timestamp())
+
+    async def delete(self, key: str, *, bucket: str | None = None) -> bool:
+        resp = await self.client.request(
+            "DELETE",
+            f"{self._base}/object/{bucket or self.bucket}",
+            json={"prefixes": [key]},
+        )
+        return resp.is_success
+
+    async def sweep(self, namespace: str, max_age_s: float) -> int:
+        cutoff = time.time() - max_age_s
+        expired: list[str] = []
+        offset = 0
+        while True:
+            resp = await self.client.post(
+                f"{self._base}/object/list/{self.bucket}",
+                json={
+                    "prefix": namespace,
+                    "limit": self._LIST_PAGE,
+                    "offset": offset,
+                    # put() upserts: a refreshed blob keeps created_at and
+                    # only bumps updated_at, the same clock age() reads.
+                    "sortBy": {"column": "updated_at", "order": "asc"},
+                },
+            )
+            resp.raise_for_status()
+            items = resp.json()
+            for item in items:
+                updated = item.get("updated_at") or item.get("created_at")
+                if not updated:
+                    continue
+                if _parse_iso_timestamp(updated) >= cutoff:
+                    break
+                expired.append(f"{namespace}/{item['name']}")
+            else:
+                if len(items) == self._LIST_PAGE:
+                    offset += self._LIST_PAGE
+                    continue
+            break
+
+        for start in range(0, len(expired), self._LIST_PAGE):
+            await self.client.request(
+                "DELETE",
+                f"{self._base}/object/{self.bucket}",
+                json={"prefixes": expired[start : start + self._LIST_PAGE]},
+            )
+        return len(expired)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
+
+def _parse_iso_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class BlobStore:
+    """SHA-256 addressed blobs on top of a BlobBackend."""
+
+    def __init__(self, backend: BlobBackend, refresh_after_s: float | None = None):
+        self.backend = backend
+        # Re-write an existing blob once it is this old, so the tmp sweep never
+        # deletes content that was just referenced again.
+        self.refresh_after_s = (
+            refresh_after_s if refresh_after_s is not None else settings.blob_tmp_max_age_s / 2
+        )
+        self.puts = 0
+        self.dedup_hits = 0
+
+    @staticmethod
+    async def digest(data: bytes) -> str:
+        if len(data) >= _THREADED_HASH_MIN_BYTES:
+            return await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        return hashlib.sha256(data).hexdigest()
+
+    async def put(
+        self,
+        data: bytes,
+        mime_type: str = "application/octet-stream",
+        *,
+        namespace: str = TMP_NAMESPACE,
+    ) -> str:
+        """Store *data* and return its handle (``<namespace>/<sha256>``)."""
+        key = f"{namespace}/{await self.digest(data)}"
+        age = await self.backend.age(key)
+        self.puts += 1
+        if age is not None and age < self.refresh_after_s:
+            self.dedup_hits += 1
+            return key
+        await self.backend.put(key, data, mime_type)
+        return key
+
+    async def get(self, handle: str) -> bytes | None:
+        if not is_blob_handle(handle):
+            return None
+        return await self.backend.get(handle)
+
+    async def delete(self, handle: str) -> bool:
+        if not is_blob_handle(handle):
+            return False
+        return await self.backend.delete(handle)
+
+    async def sweep(self, namespace: str = TMP_NAMESPACE, max_age_s: float | None = None) -> int:
+        return await self.backend.sweep(
+            namespace, max_age_s if max_age_s is not None else settings.blob_tmp_max_age_s
+        )
+
+    def status(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "puts": self.puts,
+            "dedup_hits": self.dedup_hits,
+        }
+
+
+def is_blob_handle(value: str | None) -> bool:
+    return bool(value) and _HANDLE_RE.match(value) is not None
+
+
+_store: BlobStore | None = None
+_supabase_backend: SupabaseBlobBackend | None = None
+
+
+def get_supabase_backend() -> SupabaseBlobBackend | None:
+    """Shared Supabase Storage backend, or None if Supabase is not configured."""
+    global _supabase_backend
+    if not settings.supabase_url or not settings.supabase_service_key:
+        return None
+    if _supabase_backend is None:
+        _supabase_backend = SupabaseBlobBackend(
+            settings.supabase_url, settings.supabase_service_key, settings.blob_bucket
+        )
+    return _supabase_backend
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide BlobStore for the configured backend."""
+    global _store
+    if _store is None:
+        backend: BlobBackend | None = None
+        if settings.blob_backend in ("auto", "supabase"):
+            backend = get_supabase_backend()
+            if backend is None and settings.blob_backend == "supabase":
+                logger.warning("blob_backend=supabase but Supabase is not configured; using local")
+        if backend is None:
+            backend = LocalBlobBackend(settings.blob_local_dir)
+        _store = BlobStore(backend)
+    return _store
+
+
+def set_blob_store(store: BlobStore | None) -> None:
+    """Override the process-wide store (tests, benchmarks)."""
+    global _store
+    _store = store
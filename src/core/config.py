@@ -1,6 +1,14 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+def _asyncpg_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -17,6 +25,21 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_key: str = ""
     supabase_service_key: str = ""
+    # Postgres connections per process, split across pools (src/core/connection_budget.py)
+    process_role: str = ""  # web | worker; defaults to RAILWAY_PROCESS_TYPE
+    db_connection_budget_web: int = 30
+    db_connection_budget_worker: int = 15
+    db_pool_timeout_seconds: float = 10.0
+    # Read replica for heavy reads (src/core/db.py read_session); empty = primary only
+    database_replica_url: str = ""
+    replica_max_lag_seconds: float = 5.0  # route to the primary above this lag
+    replica_sticky_seconds: int = 15  # primary reads after a user's/family's write
+
+    # Blob storage (src/core/blob_store.py): auto | local | supabase
+    blob_backend: str = "auto"
+    blob_bucket: str = "blobs"
+    blob_local_dir: str = "/tmp/finance-bot-blobs"
+    blob_tmp_max_age_s: int = 7200
 
     # Supabase MCP (optional)
     supabase_access_token: str = ""
@@ -37,12 +60,12 @@ class Settings(BaseSettings):
     @property
     def async_database_url(self) -> str:
         """Return database URL with asyncpg driver for SQLAlchemy async."""
-        url = self.database_url
-        if url.startswith("postgresql://"):
-            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
-        if url.startswith("postgres://"):
-            return url.replace("postgres://", "postgresql+asyncpg://", 1)
-        return url
+        return _asyncpg_url(self.database_url)
+
+    @property
+    def async_replica_database_url(self) -> str:
+        """Read-replica URL with the asyncpg driver ("" when not configured)."""
+        return _asyncpg_url(self.database_replica_url) if self.database_replica_url else ""
 
     @property
     def public_base_url(self) -> str:
@@ -153,10 +176,35 @@ class Settings(BaseSettings):
     ff_langgraph_document: bool = False
     ff_scheduled_actions: bool = False
     ff_sia_synthesis: bool = False
+    sia_dispatch_concurrency: int = 8
+    sia_lease_seconds: int = 600  # a claim older than this is considered crashed
+    ff_sia_source_cache: bool = True
+    sia_source_cache_ttl_seconds: int = 1800  # also the topic time bucket
     ff_dual_search: bool = False
+    ff_search_cache: bool = True
     ff_post_gen_check: bool = True
     ff_browser_computer_use: bool = True
     ff_deep_agents: bool = False
+    ff_llm_hedging: bool = True
+    llm_hedge_budget_ratio: float = 0.1
+    ff_parallel_tool_calls: bool = True
+    llm_tool_max_concurrency: int = 4
+    ff_llm_batch: bool = True
+    llm_batch_min_requests: int = 5  # smaller groups go straight to live calls
+    llm_batch_max_requests: int = 5000  # per provider submission
+    llm_batch_poll_interval_s: float = 30.0
+    # Batch ids live only in the polling worker, so keep the wait short;
+    # anything unanswered by then is cancelled and sent as live calls
+    llm_batch_max_wait_s: float = 15 * 60.0
+    llm_batch_live_concurrency: int = 8
+    ff_query_cache: bool = True
+    query_cache_ttl_seconds: int = 900  # entries are also invalidated by data version
+    sheets_sync_concurrency: int = 4  # families synced in parallel
+    ff_sheets_push: bool = False  # sync a family's sheets shortly after its writes
+    sheets_push_delay_seconds: int = 60
+    summary_delay_seconds: int = 120  # fold new messages into the session summary after
+    ff_ocr_preprocess: bool = True
+    ocr_preprocess_workers: int = 2
     release_default_cohort: str = "normal"
     release_internal_user_ids: str = ""
     release_trusted_user_ids: str = ""
@@ -167,6 +215,7 @@ class Settings(BaseSettings):
     release_rollout_percent: int = 0
     release_shadow_mode: bool = False
     release_health_logging: bool = True
+    release_health_flush_interval_s: float = 5.0
     release_health_error_rate_threshold: float = 0.05
     release_health_no_reply_rate_threshold: float = 0.02
     release_health_rate_limited_threshold: float = 0.10
@@ -187,6 +236,13 @@ class Settings(BaseSettings):
     analytics_review_batch_limit: int = 200
     analytics_feedback_queue_limit: int = 500
     analytics_feedback_prompt_ttl_seconds: int = 604800
+    analytics_stream_maxlen: int = 20000  # compacted entries beyond this are trimmed early
+    analytics_stream_retention_hours: int = 48
+    analytics_trace_ttl_seconds: int = 1209600  # 14 days to review a trace
+    analytics_rollup_retention_days: int = 180
+    analytics_archive_dir: str = "/tmp/finance-bot-analytics"  # "" disables archiving
+    gdpr_erasure_batch_size: int = 1000
+    gdpr_erasure_stale_s: int = 600
 
     @property
     def is_production(self) -> bool:
@@ -0,0 +1,205 @@
+"""Postgres connection budget shared by every pool in the process.
+
+A process opens three pools against the same database: the SQLAlchemy
+asyncpg engine (``src.core.db``), the psycopg pool behind the LangGraph
+checkpointer and Mem0's pgvector pool. Each uvicorn and Taskiq process
+multiplies them, so sizing them independently exhausts ``max_connections``
+long before CPU. Instead each process gets one budget for its role
+(``db_connection_budget_web`` / ``db_connection_budget_worker``) and the
+pools split it by fixed shares — the budgets times the process count is
+what the database (or PgBouncer/Supavisor pool) has to accommodate.
+
+All pools are PgBouncer transaction-mode safe: no server-side prepared
+statements (asyncpg ``statement_cache_size=0`` with unique statement names,
+psycopg ``prepare_threshold=None``) and only transaction-local
+``set_config`` calls.
+
+Pools register here (``register_pool``) so their saturation and acquire
+wait times show up in ``/health/detailed`` and as ``db_pool_*`` metrics.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("web", "worker")
+# Share of the process budget per pool. Workers run few graphs but do the
+# batch SQL (sync, summaries, rollups), so SQLAlchemy gets more there.
+POOL_SHARES: dict[str, dict[str, float]] = {
+    "web": {"sqlalchemy": 0.6, "checkpointer": 0.2, "mem0": 0.2},
+    "worker": {"sqlalchemy": 0.7, "checkpointer": 0.15, "mem0": 0.15},
+}
+# With a read replica configured, this part of the SQLAlchemy share moves to
+# the replica pool (src/core/db.py read_session)
+REPLICA_SHARE = 0.4
+_SQLALCHEMY_POOLS = ("sqlalchemy", "replica")
+
+POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections",
+    "Connections per pool by state (in_use, idle, max)",
+    ("pool", "state"),
+)
+POOL_WAITING = REGISTRY.gauge(
+    "db_pool_waiting", "Requests waiting for a pooled connection", ("pool",)
+)
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "db_pool_wait_seconds", "Time to acquire a connection from the pool", ("pool",)
+)
+
+_pools: dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class PoolBudget:
+    """Connection limits for one pool."""
+
+    max_size: int
+    min_size: int
+
+    @property
+    def overflow(self) -> int:
+        """Connections above ``min_size`` (SQLAlchemy ``max_overflow``)."""
+        return self.max_size - self.min_size
+
+
+def process_role() -> str:
+    """``web`` or ``worker`` — from settings, else the Railway process type."""
+    role = settings.process_role or os.environ.get("RAILWAY_PROCESS_TYPE", "web")
+    return role if role in ROLES else "web"
+
+
+def process_budget(role: str | None = None) -> int:
+    role = role or process_role()
+    return getattr(settings, f"db_connection_budget_{role}")
+
+
+def budgets(role: str | None = None, total: int | None = None) -> dict[str, PoolBudget]:
+    """Split the process budget across pools (largest remainder, ≥1 each)."""
+    role = role or process_role()
+    shares = dict(POOL_SHARES[role])
+    if settings.database_replica_url:
+        shares["replica"] = shares["sqlalchemy"] * REPLICA_SHARE
+        shares["sqlalchemy"] -= shares["replica"]
+    total = process_budget(role) if total is None else total
+    if total < len(shares):
+        logger.warning(
+            "Connection budget %d is below one connection per pool (%d); using %d",
+            total,
+            len(shares),
+            len(shares),
+        )
+        total = len(shares)
+
+    # One connection each, the rest split by share
+    extra = total - len(shares)
+    exact = {name: extra * share for name, share in shares.items()}
+    sizes = {name: 1 + math.floor(value) for name, value in exact.items()}
+    spare = total - sum(sizes.values())
+    for name in sorted(exact, key=lambda n: exact[n] - math.floor(exact[n]), reverse=True):
+        if spare <= 0:
+            break
+        sizes[name] += 1
+        spare -= 1
+
+    # SQLAlchemy pools keep a third of their share open; psycopg pools grow on demand
+    return {
+        name: PoolBudget(
+            max_size=size,
+            min_size=max(1, math.ceil(size / 3)) if name in _SQLALCHEMY_POOLS else 1,
+        )
+        for name, size in sizes.items()
+    }
+
+
+def pool_budget(name: str) -> PoolBudget:
+    return budgets()[name]
+
+
+def asyncpg_connect_args() -> dict[str, Any]:
+    """asyncpg options that work behind PgBouncer/Supavisor transaction mode."""
+    return {
+        "statement_cache_size": 0,
+        # Unnamed statements can collide across server connections behind a pooler
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """SQLAlchemy queue pool that records acquire waits and waiter counts."""
+
+    pool_name = "sqlalchemy"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start, self.pool_name)
+
+
+def register_pool(name: str, pool: Any) -> None:
+    """Report *pool* (SQLAlchemy or psycopg) in ``pool_stats``."""
+    _pools[name] = pool
+
+
+def _read(name: str, pool: Any) -> dict[str, Any]:
+    if hasattr(pool, "get_stats"):  # psycopg_pool
+        stats = pool.get_stats()
+        size = stats.get("pool_size", 0)
+        requests = stats.get("requests_num", 0)
+        return {
+            "max": stats.get("pool_max", 0),
+            "in_use": size - stats.get("pool_available", 0),
+            "idle": stats.get("pool_available", 0),
+            "waiting": stats.get("requests_waiting", 0),
+            "wait_avg_ms": round(stats.get("requests_wait_ms", 0) / requests, 2)
+            if requests
+            else 0.0,
+        }
+    in_use = pool.checkedout()
+    return {
+        "max": pool.size() + max(pool._max_overflow, 0),
+        "in_use": in_use,
+        "idle": pool.checkedin(),
+        "waiting": getattr(pool, "waiting", 0),
+        "wait_p95_ms": round(POOL_WAIT_SECONDS.quantile(0.95, name) * 1000, 2),
+    }
+
+
+def pool_stats() -> dict[str, Any]:
+    """Budget, saturation and wait times per registered pool (also sets gauges)."""
+    report: dict[str, Any] = {"role": process_role(), "budget": process_budget(), "pools": {}}
+    for name, pool in _pools.items():
+        try:
+            stats = _read(name, pool)
+        except Exception:
+            logger.debug("Could not read %s pool stats", name, exc_info=True)
+            continue
+        stats["saturation"] = round(stats["in_use"] / stats["max"], 2) if stats["max"] else 0.0
+        for state in ("in_use", "idle", "max"):
+            POOL_CONNECTIONS.set(stats[state], name, state)
+        POOL_WAITING.set(stats["waiting"], name)
+        report["pools"][name] = stats
+    return report
+
+
+REGISTRY.add_collector(pool_stats)
@@ -10,6 +10,14 @@ import uuid
 from datetime import UTC, datetime
 from typing import Any
 
+from src.core.analytics_store import (
+    LEGACY_TRACE_INDEX_KEY,
+    add_stream_event,
+    get_analytics_rollup,
+    get_recent_stream_items,
+    rollup_group,
+    trace_key_name,
+)
 from src.core.config import settings
 from src.core.context import SessionContext
 from src.core.db import redis
@@ -53,8 +61,6 @@ _ALWAYS_SAMPLE_OUTCOMES = {
     "tool_failure",
 }
 _REVIEW_QUEUE_KEY = "analytics:review_queue"
-_TRACE_EXPORT_QUEUE_KEY = "analytics:trace_exports"
-_TRACE_INDEX_KEY = "analytics:trace_index"
 _REVIEW_RESULT_QUEUE_KEY = "analytics:review_results"
 _REVIEW_RESULT_INDEX_KEY = "analytics:review_results:index"
 _DATASET_CANDIDATE_QUEUE_KEY = "analytics:dataset_candidates"
@@ -128,6 +134,10 @@ def get_conversation_analytics_policy() -> dict[str, Any]:
         "feedback_values": list(_USER_FEEDBACK_VALUES),
         "feedback_queue_limit": settings.analytics_feedback_queue_limit,
         "feedback_prompt_ttl_seconds": settings.analytics_feedback_prompt_ttl_seconds,
+        "stream_maxlen": settings.analytics_stream_maxlen,
+        "stream_retention_hours": settings.analytics_stream_retention_hours,
+        "trace_ttl_seconds": settings.analytics_trace_ttl_seconds,
+        "rollup_retention_days": settings.analytics_rollup_retention_days,
     }
 
 
@@ -426,27 +436,29 @@ def build_review_suggestion(
     }
 
 
-async def _push_queue_item(key: str, payload: dict[str, Any], *, limit: int) -> None:
-    serialized = json.dumps(payload, ensure_ascii=False, default=str)
-    await redis.lpush(key, serialized)
-    await redis.ltrim(key, 0, max(limit - 1, 0))
+def _queue_item(pipe: Any, key: str, payload: dict[str, Any], *, limit: int) -> None:
+    pipe.lpush(key, json.dumps(payload, ensure_ascii=False, default=str))
+    pipe.ltrim(key, 0, max(limit - 1, 0))
 
 
 async def _store_review_batch_record(payload: dict[str, Any]) -> None:
     """Persist review batch audit records without breaking the main flow."""
     try:
         batch_id = str(payload.get("batch_id") or "")
-        if batch_id:
-            await redis.hset(
-                _REVIEW_BATCH_INDEX_KEY,
-                batch_id,
-                json.dumps(payload, ensure_ascii=False, default=str),
+        async with redis.pipeline(transaction=False) as pipe:
+            if batch_id:
+                pipe.hset(
+                    _REVIEW_BATCH_INDEX_KEY,
+                    batch_id,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                )
+            _queue_item(
+                pipe,
+                _REVIEW_BATCH_QUEUE_KEY,
+                payload,
+                limit=settings.analytics_review_batch_limit,
             )
-        await _push_queue_item(
-            _REVIEW_BATCH_QUEUE_KEY,
-            payload,
-            limit=settings.analytics_review_batch_limit,
-        )
+            await pipe.execute()
     except Exception:
         logging.getLogger(__name__).debug("Failed to store review batch record", exc_info=True)
 
@@ -456,26 +468,25 @@ def _feedback_prompt_key(token: str) -> str:
 
 
 async def _store_trace_artifacts(payload: dict[str, Any]) -> None:
-    """Persist analytics exports and review candidates in Redis lists."""
+    """Persist a trace (stream entry, lookup key, review candidate) in one round-trip."""
     try:
         trace_key = str(payload.get("trace_key") or "")
-        if trace_key:
-            await redis.hset(
-                _TRACE_INDEX_KEY,
-                trace_key,
-                json.dumps(payload, ensure_ascii=False, default=str),
-            )
-        await _push_queue_item(
-            _TRACE_EXPORT_QUEUE_KEY,
-            payload,
-            limit=settings.analytics_trace_export_queue_limit,
-        )
-        if payload.get("queued_for_review"):
-            await _push_queue_item(
-                _REVIEW_QUEUE_KEY,
-                payload,
-                limit=settings.analytics_review_queue_limit,
-            )
+        async with redis.pipeline(transaction=False) as pipe:
+            if trace_key:
+                pipe.set(
+                    trace_key_name(trace_key),
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    ex=settings.analytics_trace_ttl_seconds,
+                )
+            add_stream_event(pipe, "trace", payload)
+            if payload.get("queued_for_review"):
+                _queue_item(
+                    pipe,
+                    _REVIEW_QUEUE_KEY,
+                    payload,
+                    limit=settings.analytics_review_queue_limit,
+                )
+            await pipe.execute()
     except Exception:
         logging.getLogger(__name__).debug("Failed to store analytics artifact", exc_info=True)
 
@@ -518,19 +529,14 @@ async def get_review_queue(limit: int = 25) -> list[dict[str, Any]]:
 
 
 async def get_trace_exports(limit: int = 25) -> list[dict[str, Any]]:
-    """Return recent exported analytics traces."""
+    """Return recent exported analytics traces, newest first."""
     try:
-        items = await redis.lrange(_TRACE_EXPORT_QUEUE_KEY, 0, max(limit - 1, 0))
+        return await get_recent_stream_items(
+            "trace", min(limit, settings.analytics_trace_export_queue_limit)
+        )
     except Exception:
         logging.getLogger(__name__).debug("Failed to fetch trace exports", exc_info=True)
         return []
-    parsed: list[dict[str, Any]] = []
-    for item in items:
-        try:
-            parsed.append(json.loads(item))
-        except (TypeError, json.JSONDecodeError):
-            continue
-    return parsed
 
 
 async def get_trace_by_key(trace_key: str) -> dict[str, Any] | None:
@@ -538,7 +544,11 @@ async def get_trace_by_key(trace_key: str) -> dict[str, Any] | None:
     if not trace_key:
         return None
     try:
-        item = await redis.hget(_TRACE_INDEX_KEY, trace_key)
+        item = await redis.get(trace_key_name(trace_key))
+        if not item:
+            # Traces captured before the move to per-trace keys, until the
+            # compaction job has migrated them.
+            item = await redis.hget(LEGACY_TRACE_INDEX_KEY, trace_key)
     except Exception:
         logging.getLogger(__name__).debug("Failed to fetch trace by key", exc_info=True)
         return None
@@ -671,28 +681,35 @@ async def submit_trace_review(
         "source_outcome": trace_payload.get("outcome"),
     }
     serialized_review = json.dumps(review_payload, ensure_ascii=False, default=str)
-    await redis.hset(_REVIEW_RESULT_INDEX_KEY, normalized_trace_key, serialized_review)
-    await _push_queue_item(
-        _REVIEW_RESULT_QUEUE_KEY,
-        review_payload,
-        limit=settings.analytics_review_result_limit,
-    )
-
     dataset_candidate_created = action == "promote_to_dataset"
-    if dataset_candidate_created:
-        dataset_payload = {
-            "trace_key": normalized_trace_key,
-            "trace": trace_payload,
-            "review": review_payload,
-            "candidate_created_at": datetime.now(UTC).isoformat(),
-        }
-        serialized_candidate = json.dumps(dataset_payload, ensure_ascii=False, default=str)
-        await redis.hset(_DATASET_CANDIDATE_INDEX_KEY, normalized_trace_key, serialized_candidate)
-        await _push_queue_item(
-            _DATASET_CANDIDATE_QUEUE_KEY,
-            dataset_payload,
-            limit=settings.analytics_dataset_candidate_limit,
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(_REVIEW_RESULT_INDEX_KEY, normalized_trace_key, serialized_review)
+        _queue_item(
+            pipe,
+            _REVIEW_RESULT_QUEUE_KEY,
+            review_payload,
+            limit=settings.analytics_review_result_limit,
         )
+        add_stream_event(pipe, "review", review_payload)
+        if dataset_candidate_created:
+            dataset_payload = {
+                "trace_key": normalized_trace_key,
+                "trace": trace_payload,
+                "review": review_payload,
+                "candidate_created_at": datetime.now(UTC).isoformat(),
+            }
+            pipe.hset(
+                _DATASET_CANDIDATE_INDEX_KEY,
+                normalized_trace_key,
+                json.dumps(dataset_payload, ensure_ascii=False, default=str),
+            )
+            _queue_item(
+                pipe,
+                _DATASET_CANDIDATE_QUEUE_KEY,
+                dataset_payload,
+                limit=settings.analytics_dataset_candidate_limit,
+            )
+        await pipe.execute()
 
     return {
         "review": review_payload,
@@ -941,13 +958,17 @@ async def submit_user_feedback(
         "submitted_at": datetime.now(UTC).isoformat(),
     }
     serialized = json.dumps(record, ensure_ascii=False, default=str)
-    await redis.hset(_FEEDBACK_INDEX_KEY, normalized_token, serialized)
-    await _push_queue_item(
-        _FEEDBACK_QUEUE_KEY,
-        record,
-        limit=settings.analytics_feedback_queue_limit,
-    )
-    await redis.delete(_feedback_prompt_key(normalized_token))
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(_FEEDBACK_INDEX_KEY, normalized_token, serialized)
+        _queue_item(
+            pipe,
+            _FEEDBACK_QUEUE_KEY,
+            record,
+            limit=settings.analytics_feedback_queue_limit,
+        )
+        add_stream_event(pipe, "feedback", record)
+        pipe.delete(_feedback_prompt_key(normalized_token))
+        await pipe.execute()
     return record
 
 
@@ -1042,31 +1063,31 @@ async def get_golden_dialogues(limit: int = 25) -> list[dict[str, Any]]:
 
 
 async def get_weekly_curation_snapshot(limit: int = 25) -> dict[str, Any]:
-    """Return a compact operator snapshot for weekly trace-to-dataset curation."""
-    review_results = await get_review_results(limit=limit)
-    dataset_candidates = await get_dataset_candidates(limit=limit)
-    review_batches = await get_review_batches(limit=limit)
-    user_feedback = await get_user_feedback(limit=limit)
-    label_counts: dict[str, int] = {}
-    action_counts: dict[str, int] = {}
-    feedback_counts: dict[str, int] = {}
-    for review in review_results:
-        label = str(review.get("final_label") or "unknown")
-        action = str(review.get("action") or "unknown")
-        label_counts[label] = label_counts.get(label, 0) + 1
-        action_counts[action] = action_counts.get(action, 0) + 1
-    for feedback in user_feedback:
-        value = str(feedback.get("feedback") or "unknown")
-        feedback_counts[value] = feedback_counts.get(value, 0) + 1
+    """Return a compact operator snapshot for weekly trace-to-dataset curation.
+
+    Counts cover the last seven days and come from the daily rollups; the
+    recent items are the newest *limit* entries of each queue.
+    """
+    review_results, dataset_candidates, review_batches, user_feedback, rollup = (
+        await asyncio.gather(
+            get_review_results(limit=limit),
+            get_dataset_candidates(limit=limit),
+            get_review_batches(limit=limit),
+            get_user_feedback(limit=limit),
+            get_analytics_rollup(days=7),
+        )
+    )
+    counts = rollup["counts"]
     return {
         "policy": get_conversation_analytics_policy(),
+        "window": {"from": rollup["from"], "to": rollup["to"]},
         "review_result_size": len(review_results),
         "dataset_candidate_size": len(dataset_candidates),
         "review_batch_size": len(review_batches),
         "feedback_size": len(user_feedback),
-        "review_label_counts": label_counts,
-        "review_action_counts": action_counts,
-        "feedback_counts": feedback_counts,
+        "review_label_counts": rollup_group(counts, "review:label:"),
+        "review_action_counts": rollup_group(counts, "review:action:"),
+        "feedback_counts": rollup_group(counts, "feedback:value:"),
         "recent_reviews": review_results,
         "recent_review_batches": review_batches,
         "recent_feedback": user_feedback,
@@ -1074,36 +1095,25 @@ async def get_weekly_curation_snapshot(limit: int = 25) -> dict[str, Any]:
     }
 
 
-async def get_quality_metrics_snapshot(limit: int = 100) -> dict[str, Any]:
-    """Return aggregated outcome metrics from reviews, feedback, and queue state."""
-    normalized_limit = max(1, limit)
-    review_results = await get_review_results(limit=normalized_limit)
-    dataset_candidates = await get_dataset_candidates(limit=normalized_limit)
-    review_queue = await get_review_queue(limit=normalized_limit)
-    user_feedback = await get_user_feedback(limit=normalized_limit)
-
-    review_label_counts: dict[str, int] = {}
-    review_action_counts: dict[str, int] = {}
-    rubric_true_counts = {field: 0 for field in _REVIEW_RUBRIC_FIELDS}
-
-    for review in review_results:
-        final_label = str(review.get("final_label") or "unknown")
-        action = str(review.get("action") or "unknown")
-        review_label_counts[final_label] = review_label_counts.get(final_label, 0) + 1
-        review_action_counts[action] = review_action_counts.get(action, 0) + 1
-
-        rubric = dict(review.get("rubric") or {})
-        for field in _REVIEW_RUBRIC_FIELDS:
-            if rubric.get(field) is True:
-                rubric_true_counts[field] += 1
-
-    feedback_counts: dict[str, int] = {}
-    for feedback in user_feedback:
-        value = str(feedback.get("feedback") or "unknown")
-        feedback_counts[value] = feedback_counts.get(value, 0) + 1
-
-    review_total = len(review_results)
-    feedback_total = len(user_feedback)
+async def get_quality_metrics_snapshot(days: int = 7) -> dict[str, Any]:
+    """Return outcome metrics over the last *days* from the daily analytics rollups."""
+    window_days = max(1, days)
+    rollup = await get_analytics_rollup(days=window_days)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.llen(_REVIEW_QUEUE_KEY)
+        pipe.llen(_DATASET_CANDIDATE_QUEUE_KEY)
+        review_queue_size, dataset_candidate_size = await pipe.execute()
+
+    counts = rollup["counts"]
+    review_label_counts = rollup_group(counts, "review:label:")
+    review_action_counts = rollup_group(counts, "review:action:")
+    rubric_true_counts = {
+        field: counts.get(f"review:rubric:{field}", 0) for field in _REVIEW_RUBRIC_FIELDS
+    }
+    feedback_counts = rollup_group(counts, "feedback:value:")
+
+    review_total = counts.get("review:total", 0)
+    feedback_total = counts.get("feedback:total", 0)
     helpful = feedback_counts.get("helpful", 0)
     unhelpful = feedback_counts.get("unhelpful", 0)
 
@@ -1156,10 +1166,12 @@ async def get_quality_metrics_snapshot(limit: int = 100) -> dict[str, Any]:
     return {
         "policy": get_conversation_analytics_policy(),
         "status": status,
-        "sample_limit": normalized_limit,
+        "window_days": window_days,
+        "window": {"from": rollup["from"], "to": rollup["to"]},
         "review_count": review_total,
-        "review_queue_size": len(review_queue),
-        "dataset_candidate_size": len(dataset_candidates),
+        "trace_count": counts.get("trace:total", 0),
+        "review_queue_size": int(review_queue_size or 0),
+        "dataset_candidate_size": int(dataset_candidate_size or 0),
         "feedback_count": feedback_total,
         "review_label_counts": review_label_counts,
         "review_action_counts": review_action_counts,
@@ -1,24 +1,90 @@
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from redis.asyncio import Redis
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from src.core import timers  # noqa: F401 — registers the delay-queue session hooks
 from src.core.config import settings
+from src.core.connection_budget import (
+    TimedQueuePool,
+    asyncpg_connect_args,
+    pool_budget,
+    register_pool,
+)
+from src.core.metrics import record_stage
+from src.core.replica import route_read
 from src.core.request_context import get_current_family_id, get_current_user_id
 
+_budget = pool_budget("sqlalchemy")
 engine = create_async_engine(
     settings.async_database_url,
     echo=settings.app_env == "development",
-    pool_size=10,
-    max_overflow=20,
-    connect_args={"statement_cache_size": 0},
+    poolclass=TimedQueuePool,
+    pool_size=_budget.min_size,
+    max_overflow=_budget.overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    connect_args=asyncpg_connect_args(),
 )
+register_pool("sqlalchemy", engine.pool)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-redis = Redis.from_url(settings.redis_url, decode_responses=True)
+
+class _ReplicaPool(TimedQueuePool):
+    pool_name = "replica"
+
+
+# Read replica for heavy reads (read_session / rls_read_session); None = primary only
+replica_engine = None
+replica_session = None
+if settings.database_replica_url:
+    _replica_budget = pool_budget("replica")
+    replica_engine = create_async_engine(
+        settings.async_replica_database_url,
+        poolclass=_ReplicaPool,
+        pool_size=_replica_budget.min_size,
+        max_overflow=_replica_budget.overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        connect_args=asyncpg_connect_args(),
+    )
+    register_pool("replica", replica_engine.pool)
+    replica_session = async_sessionmaker(
+        replica_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+
+def _db_timer_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _db_timer_stop(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_query_start")
+    if started:
+        record_stage("db", time.perf_counter() - started.pop())
+
+
+for _engine in (engine, replica_engine):
+    if _engine is not None:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _db_timer_start)
+        event.listen(_engine.sync_engine, "after_cursor_execute", _db_timer_stop)
+
+
+class TimedRedis(Redis):
+    """Redis client that records each command's round-trip as the ``redis`` stage."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_stage("redis", time.perf_counter() - start)
+
+
+redis = TimedRedis.from_url(settings.redis_url, decode_responses=True)
 
 
 @asynccontextmanager
@@ -75,3 +141,50 @@ async def rls_session(
                 {"uid": user_id},
             )
         yield session
+
+
+@asynccontextmanager
+async def read_session(*, read_your_writes: bool = True) -> AsyncGenerator[AsyncSession, None]:
+    """Session for reads that may be served by the read replica.
+
+    Same RLS behaviour as ``get_session`` (family/user from the request
+    context). Reads go to the primary when no replica is configured, when it
+    lags or is down, and — unless ``read_your_writes=False`` — when the
+    context's user or family committed a write in the last
+    ``replica_sticky_seconds`` (see ``src.core.replica``). Never write
+    through it: a replica session is read-only.
+    """
+    async with _read_session(
+        get_current_family_id(), get_current_user_id(), read_your_writes
+    ) as session:
+        yield session
+
+
+@asynccontextmanager
+async def rls_read_session(
+    family_id: str, user_id: str | None = None, *, read_your_writes: bool = True
+) -> AsyncGenerator[AsyncSession, None]:
+    """``rls_session`` counterpart of ``read_session`` for an explicit family/user."""
+    async with _read_session(family_id, user_id, read_your_writes) as session:
+        yield session
+
+
+@asynccontextmanager
+async def _read_session(
+    family_id: str | None, user_id: str | None, read_your_writes: bool
+) -> AsyncGenerator[AsyncSession, None]:
+    target = await route_read(replica_engine, family_id, user_id, read_your_writes)
+    factory = replica_session if target == "replica" else async_session
+    async with factory() as session:
+        # One round trip for both settings (is_local=true, as in rls_session)
+        set_calls = []
+        params = {}
+        if family_id:
+            set_calls.append("set_config('app.current_family_id', :fid, true)")
+            params["fid"] = str(family_id)
+        if user_id:
+            set_calls.append("set_config('app.current_user_id', :uid, true)")
+            params["uid"] = str(user_id)
+        if set_calls:
+            await session.execute(text("SELECT " + ", ".join(set_calls)), params)
+        yield session
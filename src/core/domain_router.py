@@ -10,6 +10,7 @@ from typing import Any
 from src.agents.base import AgentRouter
 from src.core.context import SessionContext
 from src.core.domains import INTENT_DOMAIN_MAP, Domain
+from src.core.metrics import timed
 from src.core.observability import observe
 from src.gateway.types import IncomingMessage
 from src.skills.base import SkillResult
@@ -85,6 +86,7 @@ class DomainRouter:
         }
 
     @observe(name="domain_route")
+    @timed("skill")
     async def route(
         self,
         intent: str,
@@ -1,12 +1,31 @@
-"""GDPR compliance — export, delete, rectify user data."""
+"""GDPR compliance — export, delete, rectify user data.
 
+Export streams a ZIP of NDJSON files (one per table) straight from
+server-side cursors, so memory stays flat however much history a user has.
+Erasure runs as a Taskiq job (``start_user_erasure``) that deletes in small
+committed batches, records progress in ``gdpr:erasure:<user_id>`` and resumes
+from the last unfinished step if a worker dies. Until it finishes, messages
+from the requesting sender are held off (``erasure_pending``) so ``/start``
+can't recreate rows the job is still deleting; the user is told once it's done.
+"""
+
+import io
+import json
 import logging
+import os
+import time
 import uuid
+import zipfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.db import redis
+from src.core.config import settings
+from src.core.db import async_session, redis
 from src.core.memory.mem0_client import get_all_memories
 from src.core.memory.registry import clear_memory_registry, export_memory_registry
 from src.core.models.audit import AuditLog
@@ -18,228 +37,314 @@ from src.core.models.document_embedding import DocumentEmbedding
 from src.core.models.life_event import LifeEvent
 from src.core.models.scheduled_action import ScheduledAction
 from src.core.models.session_summary import SessionSummary
+from src.core.models.summary_rollup import SummaryRollup
 from src.core.models.task import Task
 from src.core.models.transaction import Transaction
 from src.core.models.user_context import UserContext
 from src.core.models.user_profile import UserProfile
 from src.core.models.user_project import UserProject
+from src.core.user_keys import delete_user_keys
 
 logger = logging.getLogger(__name__)
 
+EXPORT_BATCH_SIZE = 500
+
+_ERASURE_KEY_PREFIX = "gdpr:erasure"
+_ERASURE_ACTIVE_KEY = "gdpr:erasure:active"
+_ERASURE_SENDER_PREFIX = "gdpr:erasure:sender"
+_ERASURE_STATUS_TTL = 30 * 86400
+
+ProgressCallback = Callable[[int, str, int], Awaitable[None]]
+
+
+def _iso(value) -> str | None:
+    return value.isoformat() if value else None
+
+
+# (file name, model, row serializer). Rows are read with yield_per, so each
+# section holds at most EXPORT_BATCH_SIZE ORM objects at a time.
+_EXPORT_SECTIONS: tuple[tuple[str, Any, Callable[[Any], dict]], ...] = (
+    (
+        "transactions",
+        Transaction,
+        lambda t: {
+            "id": str(t.id),
+            "type": t.type.value,
+            "amount": float(t.amount),
+            "merchant": t.merchant,
+            "date": t.date.isoformat(),
+            "scope": t.scope.value,
+        },
+    ),
+    (
+        "conversation_logs",
+        ConversationMessage,
+        lambda m: {
+            "role": m.role.value,
+            "content": m.content,
+            "created_at": _iso(m.created_at),
+        },
+    ),
+    (
+        "session_summaries",
+        SessionSummary,
+        lambda s: {
+            "id": s.id,
+            "session_id": str(s.session_id),
+            "summary": s.summary,
+            "updated_at": _iso(s.updated_at),
+        },
+    ),
+    (
+        "summary_rollups",
+        SummaryRollup,
+        lambda r: {
+            "id": r.id,
+            "period": r.period,
+            "period_start": r.period_start.isoformat(),
+            "summary": r.summary,
+        },
+    ),
+    (
+        "life_events",
+        LifeEvent,
+        lambda e: {
+            "id": str(e.id),
+            "type": str(e.type),
+            "date": e.date.isoformat(),
+            "text": e.text,
+        },
+    ),
+    (
+        "tasks",
+        Task,
+        lambda t: {
+            "id": str(t.id),
+            "title": t.title,
+            "status": str(t.status),
+            "visibility": t.visibility,
+        },
+    ),
+    (
+        "scheduled_actions",
+        ScheduledAction,
+        lambda a: {"id": str(a.id), "title": a.title, "status": str(a.status)},
+    ),
+    (
+        "projects",
+        UserProject,
+        lambda p: {"id": str(p.id), "name": p.name, "status": str(p.status)},
+    ),
+    (
+        "contacts",
+        Contact,
+        lambda c: {"id": str(c.id), "name": c.name, "role": str(c.role)},
+    ),
+    (
+        "bookings",
+        Booking,
+        lambda b: {"id": str(b.id), "title": b.title, "status": str(b.status)},
+    ),
+    (
+        "documents",
+        Document,
+        lambda d: {
+            "id": str(d.id),
+            "title": d.title,
+            "file_name": d.file_name,
+            "visibility": d.visibility,
+        },
+    ),
+)
+
+
+@dataclass(frozen=True)
+class _ErasureStep:
+    name: str
+    model: Any = None
+    # Models with a surrogate ``id`` are deleted in batches; the rest hold
+    # at most a row or two per user.
+    batched: bool = True
+
+    def condition(self, uid: uuid.UUID):
+        if self.model is DocumentEmbedding:
+            return DocumentEmbedding.document_id.in_(
+                select(Document.id).where(Document.user_id == uid)
+            )
+        return self.model.user_id == uid
+
+
+# Order matters: referencing rows go before the rows they reference.
+ERASURE_STEPS: tuple[_ErasureStep, ...] = (
+    _ErasureStep("conversation_messages", ConversationMessage),
+    _ErasureStep("transactions", Transaction),
+    _ErasureStep("audit_log", AuditLog),
+    _ErasureStep("user_context", UserContext, batched=False),
+    _ErasureStep("memory_registry"),
+    _ErasureStep("user_profile", UserProfile, batched=False),
+    _ErasureStep("life_events", LifeEvent),
+    _ErasureStep("tasks", Task),
+    _ErasureStep("scheduled_actions", ScheduledAction),
+    _ErasureStep("user_projects", UserProject),
+    _ErasureStep("contacts", Contact),
+    _ErasureStep("bookings", Booking),
+    _ErasureStep("document_embeddings", DocumentEmbedding),
+    _ErasureStep("documents", Document),
+    _ErasureStep("session_summaries", SessionSummary),
+    _ErasureStep("summary_rollups", SummaryRollup),
+    _ErasureStep("redis"),
+)
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer that ``zipfile`` streams into."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 
 class MemoryGDPR:
     """GDPR operations for user data."""
 
-    async def export_user_data(self, session: AsyncSession, user_id: str) -> dict:
-        """GDPR Art. 15: Right of access — export all user data."""
-        uid = uuid.UUID(user_id)
+    async def iter_export_zip(self, session: AsyncSession, user_id: str) -> AsyncIterator[bytes]:
+        """GDPR Art. 15: Right of access — stream all user data as a ZIP.
 
-        # Transactions
-        tx_result = await session.execute(select(Transaction).where(Transaction.user_id == uid))
-        transactions = [
-            {
-                "id": str(t.id),
-                "type": t.type.value,
-                "amount": float(t.amount),
-                "merchant": t.merchant,
-                "date": t.date.isoformat(),
-                "scope": t.scope.value,
+        Each table becomes ``<section>.ndjson``; memories, the memory registry
+        and the profile are small and written as JSON documents.
+        """
+        uid = uuid.UUID(user_id)
+        sink = _ZipSink()
+        line_end = b"\n"
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            manifest = {
+                "user_id": user_id,
+                "exported_at": _now(),
+                "format": "ndjson",
+                "sections": [name for name, _, _ in _EXPORT_SECTIONS],
             }
-            for t in tx_result.scalars()
-        ]
+            zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
 
-        # Conversation logs
-        msg_result = await session.execute(
-            select(ConversationMessage).where(ConversationMessage.user_id == uid)
-        )
-        messages = [
-            {
-                "role": m.role.value,
-                "content": m.content,
-                "created_at": m.created_at.isoformat() if m.created_at else None,
-            }
-            for m in msg_result.scalars()
-        ]
-
-        # Mem0 memories
-        try:
-            memories = await get_all_memories(user_id)
-        except Exception:
-            memories = []
-        try:
-            memory_registry = await export_memory_registry(user_id, session=session)
-        except Exception:
-            memory_registry = []
-
-        profile = await session.scalar(select(UserProfile).where(UserProfile.user_id == uid))
-
-        summary_result = await session.execute(
-            select(SessionSummary).where(SessionSummary.user_id == uid)
-        )
-        summaries = [
-            {
-                "id": s.id,
-                "session_id": str(s.session_id),
-                "summary": s.summary,
-                "updated_at": s.updated_at.isoformat() if s.updated_at else None,
-            }
-            for s in summary_result.scalars()
-        ]
-
-        life_result = await session.execute(select(LifeEvent).where(LifeEvent.user_id == uid))
-        life_events = [
-            {
-                "id": str(event.id),
-                "type": str(event.type),
-                "date": event.date.isoformat(),
-                "text": event.text,
-            }
-            for event in life_result.scalars()
-        ]
-
-        task_result = await session.execute(select(Task).where(Task.user_id == uid))
-        tasks = [
-            {
-                "id": str(task.id),
-                "title": task.title,
-                "status": str(task.status),
-                "visibility": task.visibility,
-            }
-            for task in task_result.scalars()
-        ]
+            for name, model, serialize in _EXPORT_SECTIONS:
+                stmt = select(model).where(model.user_id == uid)
+                result = await session.stream_scalars(
+                    stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+                )
+                with zf.open(f"{name}.ndjson", "w", force_zip64=True) as fh:
+                    async for partition in result.partitions():
+                        for row in partition:
+                            fh.write(
+                                json.dumps(serialize(row), ensure_ascii=False, default=str).encode()
+                            )
+                            fh.write(line_end)
+                        if chunk := sink.drain():
+                            yield chunk
 
-        scheduled_result = await session.execute(
-            select(ScheduledAction).where(ScheduledAction.user_id == uid)
-        )
-        scheduled_actions = [
-            {
-                "id": str(action.id),
-                "title": action.title,
-                "status": str(action.status),
+            try:
+                memories = await get_all_memories(user_id)
+            except Exception:
+                memories = []
+            try:
+                memory_registry = await export_memory_registry(user_id, session=session)
+            except Exception:
+                memory_registry = []
+            profile = await session.scalar(select(UserProfile).where(UserProfile.user_id == uid))
+            documents = {
+                "memories.json": memories,
+                "memory_registry.json": memory_registry,
+                "profile.json": {
+                    "core_identity": profile.core_identity if profile else None,
+                    "active_rules": profile.active_rules if profile else None,
+                    "learned_patterns": profile.learned_patterns if profile else None,
+                },
             }
-            for action in scheduled_result.scalars()
-        ]
+            for file_name, payload in documents.items():
+                zf.writestr(
+                    file_name, json.dumps(payload, ensure_ascii=False, indent=2, default=str)
+                )
+        # Closing the archive writes the central directory.
+        yield sink.drain()
 
-        project_result = await session.execute(
-            select(UserProject).where(UserProject.user_id == uid)
-        )
-        projects = [
-            {
-                "id": str(project.id),
-                "name": project.name,
-                "status": str(project.status),
-            }
-            for project in project_result.scalars()
-        ]
-
-        contact_result = await session.execute(select(Contact).where(Contact.user_id == uid))
-        contacts = [
-            {
-                "id": str(contact.id),
-                "name": contact.name,
-                "role": str(contact.role),
-            }
-            for contact in contact_result.scalars()
-        ]
-
-        booking_result = await session.execute(select(Booking).where(Booking.user_id == uid))
-        bookings = [
-            {
-                "id": str(booking.id),
-                "title": booking.title,
-                "status": str(booking.status),
-            }
-            for booking in booking_result.scalars()
-        ]
-
-        document_result = await session.execute(select(Document).where(Document.user_id == uid))
-        documents = [
-            {
-                "id": str(doc.id),
-                "title": doc.title,
-                "file_name": doc.file_name,
-                "visibility": doc.visibility,
-            }
-            for doc in document_result.scalars()
-        ]
-
-        return {
-            "user_id": user_id,
-            "transactions": transactions,
-            "conversation_logs": messages,
-            "memories": memories,
-            "memory_registry": memory_registry,
-            "profile": {
-                "core_identity": profile.core_identity if profile else None,
-                "active_rules": profile.active_rules if profile else None,
-                "learned_patterns": profile.learned_patterns if profile else None,
-            },
-            "session_summaries": summaries,
-            "life_events": life_events,
-            "tasks": tasks,
-            "scheduled_actions": scheduled_actions,
-            "projects": projects,
-            "contacts": contacts,
-            "bookings": bookings,
-            "documents": documents,
-        }
-
-    async def delete_user_data(self, session: AsyncSession, user_id: str) -> bool:
-        """GDPR Art. 17: Right to erasure — delete all user data."""
+    async def delete_user_data(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        *,
+        start_step: int = 0,
+        on_progress: ProgressCallback | None = None,
+    ) -> dict[str, int]:
+        """GDPR Art. 17: Right to erasure — delete all user data.
+
+        Runs ``ERASURE_STEPS`` from *start_step*, committing every batch so no
+        lock is held for longer than one batch. Returns rows deleted per step.
+        *on_progress(step_index, step_name, rows)* is awaited after each batch
+        and, with the next step index, when a step completes.
+        """
         uid = uuid.UUID(user_id)
-        document_ids = list(
-            (
-                await session.execute(select(Document.id).where(Document.user_id == uid))
-            ).scalars()
-        )
+        deleted: dict[str, int] = {}
+        for index, step in enumerate(ERASURE_STEPS[start_step:], start=start_step):
+            deleted[step.name] = await self._erase_step(session, step, uid, on_progress, index)
+            if on_progress:
+                await on_progress(index + 1, step.name, 0)
+        logger.info("All data deleted for user %s", user_id)
+        return deleted
 
-        # Delete from PostgreSQL
-        await session.execute(delete(ConversationMessage).where(ConversationMessage.user_id == uid))
-        await session.execute(delete(Transaction).where(Transaction.user_id == uid))
-        await session.execute(delete(AuditLog).where(AuditLog.user_id == uid))
-        await session.execute(delete(UserContext).where(UserContext.user_id == uid))
-        try:
-            await clear_memory_registry(
-                user_id,
-                session=session,
-                include_stores={"mem0", "identity", "rule", "summary"},
-            )
-        except Exception as e:
-            logger.warning("Memory registry deletion failed: %s", e)
-        await session.execute(delete(UserProfile).where(UserProfile.user_id == uid))
-        await session.execute(delete(LifeEvent).where(LifeEvent.user_id == uid))
-        await session.execute(delete(Task).where(Task.user_id == uid))
-        await session.execute(delete(ScheduledAction).where(ScheduledAction.user_id == uid))
-        await session.execute(delete(UserProject).where(UserProject.user_id == uid))
-        await session.execute(delete(Contact).where(Contact.user_id == uid))
-        await session.execute(delete(Booking).where(Booking.user_id == uid))
-        if document_ids:
-            await session.execute(
-                delete(DocumentEmbedding).where(DocumentEmbedding.document_id.in_(document_ids))
-            )
-        await session.execute(delete(Document).where(Document.user_id == uid))
-        await session.commit()
-
-        # Delete from Redis
-        try:
-            keys = []
-            for pattern in (
-                f"conv:{user_id}:*",
-                f"session_facts:{user_id}",
-                f"proc_rt:{user_id}:*",
-                f"mem0_dlq:{user_id}",
-                f"mem0_dlq_idem:{user_id}",
-                f"core_identity:{user_id}",
-            ):
-                async for key in redis.scan_iter(match=pattern):
-                    keys.append(key)
-            if keys:
-                await redis.delete(*keys)
-        except Exception as e:
-            logger.warning("Redis deletion failed: %s", e)
+    async def _erase_step(
+        self,
+        session: AsyncSession,
+        step: _ErasureStep,
+        uid: uuid.UUID,
+        on_progress: ProgressCallback | None,
+        index: int,
+    ) -> int:
+        user_id = str(uid)
+        if step.name == "memory_registry":
+            try:
+                counts = await clear_memory_registry(
+                    user_id,
+                    session=session,
+                    include_stores={"mem0", "identity", "rule", "summary"},
+                )
+                await session.commit()
+                return sum(counts.values())
+            except Exception as e:
+                logger.warning("Memory registry deletion failed: %s", e)
+                return 0
+        if step.name == "redis":
+            try:
+                return await delete_user_keys(user_id)
+            except Exception as e:
+                logger.warning("Redis deletion failed: %s", e)
+                return 0
 
-        logger.info("All data deleted for user %s", user_id)
-        return True
+        batch_size = settings.gdpr_erasure_batch_size
+        total = 0
+        while True:
+            if step.batched:
+                ids = select(step.model.id).where(step.condition(uid)).limit(batch_size)
+                stmt = delete(step.model).where(step.model.id.in_(ids))
+            else:
+                stmt = delete(step.model).where(step.condition(uid))
+            result = await session.execute(stmt)
+            await session.commit()
+            rows = result.rowcount or 0
+            total += rows
+            if on_progress and rows:
+                await on_progress(index, step.name, rows)
+            if not step.batched or rows < batch_size:
+                return total
 
     async def rectify_memory(self, user_id: str, old: str, new: str) -> None:
         """GDPR Art. 16: Right to rectification."""
@@ -251,3 +356,172 @@ class MemoryGDPR:
         for mem in result_list:
             memory.update(mem["id"], new)
         logger.info("Rectified memory for user %s: '%s' → '%s'", user_id, old, new)
+
+
+# ------------------------------------------------------------------
+# Background erasure
+# ------------------------------------------------------------------
+
+
+def _erasure_key(user_id: str) -> str:
+    return f"{_ERASURE_KEY_PREFIX}:{user_id}"
+
+
+def _sender_key(channel: str, sender_id: str) -> str:
+    return f"{_ERASURE_SENDER_PREFIX}:{channel}:{sender_id}"
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+async def get_erasure_status(user_id: str) -> dict[str, Any] | None:
+    """Progress of the user's latest erasure request, or None."""
+    state = await redis.hgetall(_erasure_key(user_id))
+    if not state:
+        return None
+    deleted = {
+        field.removeprefix("deleted:"): int(value)
+        for field, value in state.items()
+        if field.startswith("deleted:")
+    }
+    status = {k: v for k, v in state.items() if not k.startswith("deleted:")}
+    status["step"] = int(status.get("step") or 0)
+    status["total_steps"] = len(ERASURE_STEPS)
+    status["deleted"] = deleted
+    return status
+
+
+async def erasure_pending(channel: str, sender_id: str) -> bool:
+    """Whether an erasure requested by this channel sender hasn't finished yet."""
+    return bool(await redis.exists(_sender_key(channel, sender_id)))
+
+
+async def start_user_erasure(
+    user_id: str,
+    channel: str | None = None,
+    sender_id: str | None = None,
+    chat_id: str | None = None,
+) -> dict[str, Any]:
+    """Record an erasure request and queue the background job (idempotent).
+
+    With *channel*/*sender_id*, that sender's messages are held off until the
+    job is done and *chat_id* is notified then.
+    """
+    current = await get_erasure_status(user_id)
+    if current and current.get("status") in {"queued", "running"}:
+        return current
+
+    key = _erasure_key(user_id)
+    now = _now()
+    state: dict[str, Any] = {"status": "queued", "step": 0, "requested_at": now, "updated_at": now}
+    if channel and sender_id:
+        state.update(channel=channel, sender_id=sender_id, chat_id=chat_id or sender_id)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.hset(key, mapping=state)
+        pipe.expire(key, _ERASURE_STATUS_TTL)
+        pipe.sadd(_ERASURE_ACTIVE_KEY, user_id)
+        if channel and sender_id:
+            pipe.set(_sender_key(channel, sender_id), user_id, ex=_ERASURE_STATUS_TTL)
+        await pipe.execute()
+
+    from src.core.tasks.gdpr_tasks import erase_user_data_task
+
+    await erase_user_data_task.kiq(user_id)
+    return await get_erasure_status(user_id) or {"status": "queued"}
+
+
+async def run_user_erasure(user_id: str) -> dict[str, Any] | None:
+    """Run (or resume) a queued erasure; called by the Taskiq job."""
+    key = _erasure_key(user_id)
+    state = await get_erasure_status(user_id)
+    if not state or state.get("status") == "done":
+        return state
+
+    await redis.hset(
+        key,
+        mapping={
+            "status": "running",
+            "worker": f"{os.uname().nodename}:{os.getpid()}",
+            "updated_at": _now(),
+        },
+    )
+
+    async def _progress(step_index: int, step_name: str, rows: int) -> None:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "step": step_index,
+                    "current_step": step_name,
+                    "updated_at": _now(),
+                },
+            )
+            if rows:
+                pipe.hincrby(key, f"deleted:{step_name}", rows)
+            await pipe.execute()
+
+    started = time.perf_counter()
+    try:
+        async with async_session() as session:
+            await MemoryGDPR().delete_user_data(
+                session, user_id, start_step=state["step"], on_progress=_progress
+            )
+    except Exception as e:
+        # Stays in the active set; resume_stalled_erasures retries from the
+        # last completed step.
+        logger.error("GDPR erasure for %s failed at step %s: %s", user_id, state["step"], e)
+        await redis.hset(
+            key,
+            mapping={"status": "failed", "error": str(e)[:500], "updated_at": _now()},
+        )
+        return await get_erasure_status(user_id)
+
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(
+            key,
+            mapping={
+                "status": "done",
+                "finished_at": _now(),
+                "updated_at": _now(),
+                "duration_s": round(time.perf_counter() - started, 2),
+            },
+        )
+        pipe.hdel(key, "error")
+        pipe.srem(_ERASURE_ACTIVE_KEY, user_id)
+        if state.get("sender_id"):
+            pipe.delete(_sender_key(state["channel"], state["sender_id"]))
+        await pipe.execute()
+    await _notify_erasure_done(state)
+    return await get_erasure_status(user_id)
+
+
+async def _notify_erasure_done(state: dict[str, Any]) -> None:
+    """Tell the requester they can start over (Telegram only; best effort)."""
+    if state.get("channel") != "telegram" or not state.get("chat_id"):
+        return
+    from src.core.notifications_pkg.dispatch import send_telegram_message
+
+    try:
+        await send_telegram_message(
+            int(state["chat_id"]),
+            "Все ваши данные удалены. Чтобы начать заново, отправьте /start",
+        )
+    except Exception as e:
+        logger.warning("Erasure-done notice for %s failed: %s", state["chat_id"], e)
+
+
+async def find_stalled_erasures() -> list[str]:
+    """Active erasures that failed or whose worker stopped reporting progress."""
+    stale_before = time.time() - settings.gdpr_erasure_stale_s
+    stalled = []
+    for user_id in await redis.smembers(_ERASURE_ACTIVE_KEY):
+        state = await get_erasure_status(user_id)
+        if not state or state.get("status") == "done":
+            await redis.srem(_ERASURE_ACTIVE_KEY, user_id)
+            continue
+        updated = datetime.fromisoformat(state.get("updated_at") or state["requested_at"])
+        if state.get("status") == "failed" or updated.timestamp() < stale_before:
+            stalled.append(user_id)
+    return stalled
@@ -6,6 +6,8 @@ with a single Gemini Flash Lite call (~0.3s) using the same safety prompt.
 
 import logging
 
+from src.core.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 REFUSAL_MESSAGE = "Я не могу помочь с этим запросом."
@@ -101,10 +103,41 @@ def _is_personalization(text: str) -> bool:
     return any(p in lower for p in _PERSONALIZATION_PATTERNS)
 
 
+async def _safety_answer_gemini(text: str) -> str:
+    from google.genai import types
+
+    from src.core.llm.clients import google_client
+
+    client = google_client()
+    response = await client.aio.models.generate_content(
+        model="gemini-3.1-flash-lite-preview",
+        contents=SAFETY_CHECK_PROMPT.format(user_input=text),
+        config=types.GenerateContentConfig(
+            max_output_tokens=16,
+        ),
+    )
+    return (response.text or "").strip().lower()
+
+
+async def _safety_answer_claude(text: str) -> str:
+    from src.core.llm.clients import generate_text
+
+    response = await generate_text(
+        "claude-haiku-4-5",
+        system="You are a content safety classifier. Answer only Yes or No.",
+        prompt=SAFETY_CHECK_PROMPT.format(user_input=text),
+        max_tokens=16,
+        trace_name="guardrails_hedge",
+    )
+    return response.strip().lower()
+
+
+@timed("guardrails")
 async def check_input(text: str) -> tuple[bool, str | None]:
     """Check if input passes safety guardrails.
 
-    Uses a single Gemini Flash Lite call instead of NeMo's full pipeline.
+    Uses a single Gemini Flash Lite call instead of NeMo's full pipeline,
+    hedged with Claude Haiku when Gemini is slower than its rolling p90.
     Personalization messages are fast-tracked (never sent to LLM) to avoid
     false positives like "тебя зовут Хюррем" being blocked as impersonation.
 
@@ -117,19 +150,16 @@ async def check_input(text: str) -> tuple[bool, str | None]:
         return True, None
 
     try:
-        from google.genai import types
-
-        from src.core.llm.clients import google_client
-
-        client = google_client()
-        response = await client.aio.models.generate_content(
-            model="gemini-3.1-flash-lite-preview",
-            contents=SAFETY_CHECK_PROMPT.format(user_input=text),
-            config=types.GenerateContentConfig(
-                max_output_tokens=16,
-            ),
+        from src.core.llm.hedging import hedged_call
+
+        # Hedge a slow Gemini call with Claude Haiku; errors still fail open
+        # below rather than paying for a second provider.
+        answer = await hedged_call(
+            "guardrails",
+            lambda: _safety_answer_gemini(text),
+            lambda: _safety_answer_claude(text),
+            fallback_on_error=False,
         )
-        answer = (response.text or "").strip().lower()
 
         if _should_block_answer(answer):
             logger.info("Guardrails blocked input: %r", text[:100])
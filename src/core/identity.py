@@ -1,7 +1,8 @@
 """Core identity layer — permanent user facts that are never dropped in overflow.
 
 Loaded as step 0 in assemble_context(), placed at the BEGINNING of the
-system prompt inside the cacheable prefix. Typical size: ~1-3K tokens.
+per-user cacheable segment (right after the shared agent prompt, before the
+per-request suffix). Typical size: ~1-3K tokens.
 
 Schema:
     name, occupation, family_members, preferred_currency, business_type,
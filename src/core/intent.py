@@ -4,6 +4,8 @@ import re
 from datetime import date
 
 from src.core.llm.clients import get_instructor_anthropic, google_client
+from src.core.llm.hedging import hedged_call
+from src.core.metrics import timed
 from src.core.observability import observe
 from src.core.personalization import has_forget_command, strip_forget_command
 from src.core.schemas.intent import IntentData, IntentDetectionResult
@@ -1854,6 +1856,7 @@ def _rule_based_generate_program(text: str) -> IntentDetectionResult | None:
 
 
 @observe(name="detect_intent")
+@timed("intent")
 async def detect_intent(
     text: str,
     categories: list[dict] | None = None,
@@ -1950,17 +1953,15 @@ async def detect_intent(
 
     system_prompt = INTENT_DETECTION_PROMPT.format(today=date.today().isoformat())
 
-    # Primary: Gemini Flash
+    # Primary: Gemini Flash, hedged with Claude Haiku when slow or failing
     try:
-        return await _detect_with_gemini(system_prompt, user_prompt, language)
-    except Exception as e:
-        logger.warning("Gemini intent detection failed: %s, falling back to Claude", e)
-
-    # Fallback: Claude Haiku
-    try:
-        return await _detect_with_claude(system_prompt, user_prompt, language)
+        return await hedged_call(
+            "intent_detection",
+            lambda: _detect_with_gemini(system_prompt, user_prompt, language),
+            lambda: _detect_with_claude(system_prompt, user_prompt, language),
+        )
     except Exception as e:
-        logger.error("Claude intent detection also failed: %s", e)
+        logger.error("Gemini and Claude intent detection both failed: %s", e)
         return IntentDetectionResult(
             intent="general_chat",
             confidence=0.5,
@@ -2228,6 +2229,7 @@ def _build_scoped_prompt(domain: str, intents: list[str]) -> str:
 
 
 @observe(name="detect_intent_scoped")
+@timed("intent")
 async def detect_intent_scoped(
     text: str,
     domain: str,
@@ -2337,23 +2339,18 @@ async def detect_intent_scoped(
     if recent_context:
         user_prompt = f"Недавний контекст диалога:\n{recent_context}\n\n{user_prompt}"
 
-    # Primary: Gemini Pro (same as full detection)
+    # Primary: Gemini (same as full detection), hedged with Claude Haiku
     try:
-        result = await _detect_with_gemini(system_prompt, user_prompt, language)
-        if result.data:
-            result.data.domain = domain
-        return result
-    except Exception as e:
-        logger.warning("Scoped Gemini detection failed: %s, falling back to Claude", e)
-
-    # Fallback: Claude Haiku
-    try:
-        result = await _detect_with_claude(system_prompt, user_prompt, language)
+        result = await hedged_call(
+            "intent_detection",
+            lambda: _detect_with_gemini(system_prompt, user_prompt, language),
+            lambda: _detect_with_claude(system_prompt, user_prompt, language),
+        )
         if result.data:
             result.data.domain = domain
         return result
     except Exception as e:
-        logger.error("Scoped Claude detection also failed: %s", e)
+        logger.error("Scoped Gemini and Claude detection both failed: %s", e)
         return IntentDetectionResult(
             intent="general_chat",
             confidence=0.3,
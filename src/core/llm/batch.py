@@ -0,0 +1,529 @@
+"""Provider batch-API execution for non-interactive LLM workloads.
+
+Nightly and weekly jobs build one prompt per user. Sending those through the
+synchronous APIs one at a time is slow and pays full price; the providers'
+asynchronous batch endpoints (Anthropic Message Batches, OpenAI Batch, Gemini
+Batch Mode) take the whole set at once at about half the token price.
+
+``LLMBatch`` collects prompts with a per-item handler, submits one batch per
+``(provider, model)``, polls until the batch ends and fans each result back to
+its handler::
+
+    batch = LLMBatch("weekly_digest")
+    for user in users:
+        batch.add(user.id, model="claude-sonnet-4-6", system=..., prompt=...,
+                  on_result=partial(deliver, user))
+    await batch.run()
+
+Anything the batch path does not answer goes through bounded-concurrency
+live ``generate_text`` calls instead. That covers a disabled flag, a group
+too small to be worth a batch, a submit error, per-item errors and the
+unanswered items of a batch that outlives ``llm_batch_max_wait_s``. That
+batch is cancelled, and the items it finished before the cancel are kept.
+Handlers always run once per item with a ``BatchResult`` that says which
+path answered.
+
+Batch ids are not persisted: the submitting worker polls in-process, so a
+restart loses the batch. The wait is therefore bounded to minutes (at most
+``MAX_BATCH_WAIT_S``) — long enough for most batches, short enough that a
+Taskiq worker isn't tied up for hours and a lost batch only costs a retry.
+
+Providers are looked up by name, so tests and benchmarks can install
+``FakeBatchServer`` (``src.core.llm.fake_batch``) with ``set_batch_provider``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BATCH_ITEMS = REGISTRY.counter(
+    "finbot_llm_batch_items_total",
+    "LLM batch items by job, provider and the path that answered them.",
+    ("job", "provider", "mode"),
+)
+
+# Upper bound on ``llm_batch_max_wait_s``; see the module docstring.
+MAX_BATCH_WAIT_S = 30 * 60.0
+
+# How long a cancelled batch gets to settle so the items it already answered
+# can still be read.
+_CANCEL_WAIT_S = 60.0
+
+# First poll comes quickly (small batches often finish in seconds), then the
+# interval doubles up to ``llm_batch_poll_interval_s``.
+_FIRST_POLL_S = 5.0
+
+ResultHandler = Callable[["BatchResult"], Awaitable[None]]
+
+
+@dataclass
+class BatchRequest:
+    """One prompt in a batch. ``custom_id`` is assigned by ``LLMBatch``."""
+
+    custom_id: str
+    model: str
+    system: str
+    messages: list[dict[str, str]]
+    max_tokens: int = 1024
+
+
+@dataclass
+class BatchResult:
+    key: str
+    text: str | None = None
+    error: str | None = None
+    mode: str = "batch"  # "batch" | "live"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.text is not None
+
+
+class BatchProvider(Protocol):
+    """Minimal surface of an asynchronous batch endpoint."""
+
+    async def submit(self, job: str, model: str, requests: list[BatchRequest]) -> str: ...
+
+    async def status(self, batch_id: str) -> str:
+        """``"running"``, ``"ended"`` (results readable) or ``"failed"``."""
+        ...
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        """Results keyed by ``custom_id``; missing ids were not answered."""
+        ...
+
+    async def cancel(self, batch_id: str) -> None: ...
+
+
+def provider_for_model(model: str) -> str | None:
+    if model.startswith("claude-"):
+        return "anthropic"
+    if model.startswith("gpt-"):
+        return "openai"
+    if model.startswith("gemini-"):
+        return "google"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Provider adapters
+# ---------------------------------------------------------------------------
+
+
+class AnthropicBatchProvider:
+    """Anthropic Message Batches API."""
+
+    def _client(self):
+        from src.core.llm.clients import anthropic_client
+
+        return anthropic_client()
+
+    async def submit(self, job: str, model: str, requests: list[BatchRequest]) -> str:
+        from src.core.llm.prompts import PromptAdapter
+
+        payload = []
+        for req in requests:
+            params: dict[str, Any] = {"model": req.model, "max_tokens": req.max_tokens}
+            if req.system:
+                params.update(PromptAdapter.for_claude(req.system, req.messages))
+            else:
+                params["messages"] = req.messages
+            payload.append({"custom_id": req.custom_id, "params": params})
+        batch = await self._client().messages.batches.create(requests=payload)
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self._client().messages.batches.retrieve(batch_id)
+        return "ended" if batch.processing_status == "ended" else "running"
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        out: dict[str, BatchResult] = {}
+        async for entry in await self._client().messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                text = next(
+                    (b.text for b in result.message.content if getattr(b, "type", "") == "text"),
+                    "",
+                )
+                out[entry.custom_id] = BatchResult(entry.custom_id, text=text)
+            else:
+                error = getattr(getattr(result, "error", None), "error", None)
+                out[entry.custom_id] = BatchResult(
+                    entry.custom_id, error=str(getattr(error, "message", "") or result.type)
+                )
+        return out
+
+    async def cancel(self, batch_id: str) -> None:
+        await self._client().messages.batches.cancel(batch_id)
+
+
+class OpenAIBatchProvider:
+    """OpenAI Batch API over ``/v1/chat/completions`` (JSONL file in and out)."""
+
+    _ENDED = {"completed", "expired", "cancelled"}
+
+    def _client(self):
+        from src.core.llm.clients import openai_client
+
+        return openai_client()
+
+    async def submit(self, job: str, model: str, requests: list[BatchRequest]) -> str:
+        from src.core.llm.prompts import PromptAdapter
+
+        lines = []
+        for req in requests:
+            body = {
+                "model": req.model,
+                "max_completion_tokens": req.max_tokens,
+                **PromptAdapter.for_openai(req.system, req.messages, cache_key=job),
+            }
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": req.custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+        client = self._client()
+        uploaded = await client.files.create(
+            file=(f"{job}.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"job": job},
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self._client().batches.retrieve(batch_id)
+        if batch.status in self._ENDED:
+            return "ended"
+        return "failed" if batch.status == "failed" else "running"
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        client = self._client()
+        batch = await client.batches.retrieve(batch_id)
+        out: dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                custom_id = row.get("custom_id", "")
+                response = row.get("response") or {}
+                if response.get("status_code") == 200:
+                    choices = (response.get("body") or {}).get("choices") or [{}]
+                    text = (choices[0].get("message") or {}).get("content") or ""
+                    out[custom_id] = BatchResult(custom_id, text=text)
+                else:
+                    error = row.get("error") or (response.get("body") or {}).get("error") or {}
+                    out[custom_id] = BatchResult(
+                        custom_id, error=str(error.get("message") or "request failed")
+                    )
+        return out
+
+    async def cancel(self, batch_id: str) -> None:
+        await self._client().batches.cancel(batch_id)
+
+
+class GeminiBatchProvider:
+    """Gemini Batch Mode with inlined requests (one model per job)."""
+
+    _ENDED = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+    _FAILED = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+    def __init__(self) -> None:
+        self._ids: dict[str, list[str]] = {}
+
+    def _client(self):
+        from src.core.llm.clients import google_client
+
+        return google_client()
+
+    async def submit(self, job: str, model: str, requests: list[BatchRequest]) -> str:
+        from src.core.llm.prompts import strip_cache_breakpoints
+
+        inlined = []
+        for req in requests:
+            config: dict[str, Any] = {"max_output_tokens": req.max_tokens}
+            if req.system:
+                config["system_instruction"] = strip_cache_breakpoints(req.system)
+            inlined.append(
+                {
+                    "contents": [
+                        {
+                            "role": "user" if m["role"] == "user" else "model",
+                            "parts": [{"text": m["content"]}],
+                        }
+                        for m in req.messages
+                    ],
+                    "config": config,
+                    "metadata": {"custom_id": req.custom_id},
+                }
+            )
+        batch = await self._client().aio.batches.create(
+            model=model, src=inlined, config={"display_name": job}
+        )
+        self._ids[batch.name] = [req.custom_id for req in requests]
+        return batch.name
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self._client().aio.batches.get(name=batch_id)
+        state = getattr(batch.state, "name", str(batch.state))
+        if state in self._ENDED:
+            return "ended"
+        return "failed" if state in self._FAILED else "running"
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = await self._client().aio.batches.get(name=batch_id)
+        ids = self._ids.pop(batch_id, [])
+        responses = (batch.dest.inlined_responses if batch.dest else None) or []
+        out: dict[str, BatchResult] = {}
+        for index, item in enumerate(responses):
+            custom_id = (item.metadata or {}).get("custom_id") or (
+                ids[index] if index < len(ids) else ""
+            )
+            if item.error is not None or item.response is None:
+                out[custom_id] = BatchResult(
+                    custom_id, error=str(getattr(item.error, "message", None) or "no response")
+                )
+            else:
+                out[custom_id] = BatchResult(custom_id, text=item.response.text or "")
+        return out
+
+    async def cancel(self, batch_id: str) -> None:
+        self._ids.pop(batch_id, None)
+        await self._client().aio.batches.cancel(name=batch_id)
+
+
+_PROVIDERS: dict[str, BatchProvider] = {
+    "anthropic": AnthropicBatchProvider(),
+    "openai": OpenAIBatchProvider(),
+    "google": GeminiBatchProvider(),
+}
+_DEFAULT_PROVIDERS = dict(_PROVIDERS)
+
+
+def set_batch_provider(name: str, provider: BatchProvider | None) -> None:
+    """Install *provider* for *name*; ``None`` restores the real adapter."""
+    if provider is None:
+        _PROVIDERS[name] = _DEFAULT_PROVIDERS[name]
+    else:
+        _PROVIDERS[name] = provider
+
+
+# ---------------------------------------------------------------------------
+# Collector
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Item:
+    key: str
+    request: BatchRequest
+    on_result: ResultHandler | None
+    result: BatchResult | None = None
+
+
+@dataclass
+class LLMBatch:
+    """Collects prompts for one job and executes them as provider batches."""
+
+    job: str
+    live_concurrency: int | None = None
+    _items: list[_Item] = field(default_factory=list)
+
+    def add(
+        self,
+        key: str,
+        *,
+        model: str,
+        system: str = "",
+        messages: list[dict[str, str]] | None = None,
+        prompt: str | None = None,
+        max_tokens: int = 1024,
+        on_result: ResultHandler | None = None,
+    ) -> None:
+        if messages is None:
+            if prompt is None:
+                raise ValueError("Either messages or prompt is required")
+            messages = [{"role": "user", "content": prompt}]
+        # Provider custom_id rules are strict (Anthropic: [A-Za-z0-9_-]{1,64}),
+        # so callers' keys stay local and requests get positional ids.
+        request = BatchRequest(
+            custom_id=f"r{len(self._items)}",
+            model=model,
+            system=system,
+            messages=messages,
+            max_tokens=max_tokens,
+        )
+        self._items.append(_Item(key=key, request=request, on_result=on_result))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def run(self) -> dict[str, BatchResult]:
+        """Execute every queued prompt, call the handlers, return results by key."""
+        started = time.monotonic()
+        groups: dict[tuple[str, str], list[_Item]] = {}
+        live: list[_Item] = []
+        for item in self._items:
+            provider = provider_for_model(item.request.model)
+            if provider is None or not settings.ff_llm_batch:
+                live.append(item)
+            else:
+                groups.setdefault((provider, item.request.model), []).append(item)
+
+        batched: list[tuple[str, str, list[_Item]]] = []
+        for (provider, model), items in groups.items():
+            if len(items) < settings.llm_batch_min_requests:
+                live.extend(items)
+            else:
+                batched.append((provider, model, items))
+
+        await asyncio.gather(
+            *(self._run_group(provider, model, items) for provider, model, items in batched)
+        )
+        live.extend(item for _, _, items in batched for item in items if item.result is None)
+
+        semaphore = asyncio.Semaphore(self.live_concurrency or settings.llm_batch_live_concurrency)
+        await asyncio.gather(*(self._run_live(item, semaphore) for item in live))
+        await asyncio.gather(*(self._deliver(item, semaphore) for item in self._items))
+
+        modes: dict[str, int] = {}
+        for item in self._items:
+            provider = provider_for_model(item.request.model) or "other"
+            mode = item.result.mode if item.result else "live"
+            BATCH_ITEMS.inc(self.job, provider, mode)
+            modes[mode] = modes.get(mode, 0) + 1
+        logger.info(
+            "LLM batch %s: %d items %s in %.1fs",
+            self.job,
+            len(self._items),
+            modes,
+            time.monotonic() - started,
+        )
+        return {item.key: item.result for item in self._items if item.result is not None}
+
+    async def _run_group(self, provider_name: str, model: str, items: list[_Item]) -> None:
+        provider = _PROVIDERS[provider_name]
+        size = max(1, settings.llm_batch_max_requests)
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        await asyncio.gather(
+            *(self._run_chunk(provider_name, provider, model, chunk) for chunk in chunks)
+        )
+
+    async def _run_chunk(
+        self, provider_name: str, provider: BatchProvider, model: str, items: list[_Item]
+    ) -> None:
+        by_id = {item.request.custom_id: item for item in items}
+        try:
+            batch_id = await provider.submit(self.job, model, [i.request for i in items])
+        except Exception as e:
+            logger.warning(
+                "Batch submit failed for %s (%s/%s, %d items), using live calls: %s",
+                self.job,
+                provider_name,
+                model,
+                len(items),
+                e,
+            )
+            return
+
+        max_wait = min(settings.llm_batch_max_wait_s, MAX_BATCH_WAIT_S)
+        status = await self._wait(provider, batch_id, max_wait)
+        if status == "running":
+            logger.warning(
+                "Batch %s for %s still running after %.0fs; cancelling, "
+                "using live calls for unanswered items",
+                batch_id,
+                self.job,
+                max_wait,
+            )
+            try:
+                await provider.cancel(batch_id)
+            except Exception as e:
+                logger.debug("Batch %s cancel failed: %s", batch_id, e)
+                return
+            # Items that finished before the cancel are still in the results
+            status = await self._wait(provider, batch_id, _CANCEL_WAIT_S)
+            if status == "running":
+                return
+        if status == "failed":
+            logger.warning("Batch %s for %s failed; using live calls", batch_id, self.job)
+            return
+
+        try:
+            results = await provider.results(batch_id)
+        except Exception as e:
+            logger.warning("Batch %s results unreadable, using live calls: %s", batch_id, e)
+            return
+        for custom_id, result in results.items():
+            item = by_id.get(custom_id)
+            if item is not None and result.ok:
+                item.result = BatchResult(item.key, text=result.text, mode="batch")
+            elif item is not None:
+                logger.debug("Batch item %s/%s errored: %s", self.job, item.key, result.error)
+
+    async def _wait(self, provider: BatchProvider, batch_id: str, max_wait: float) -> str:
+        """Poll *batch_id* until it stops running or *max_wait* runs out."""
+        deadline = time.monotonic() + max_wait
+        delay = min(_FIRST_POLL_S, settings.llm_batch_poll_interval_s)
+        status = "running"
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            try:
+                status = await provider.status(batch_id)
+            except Exception as e:
+                logger.debug("Batch %s status poll failed: %s", batch_id, e)
+                status = "running"
+            if status != "running":
+                break
+            delay = min(delay * 2, settings.llm_batch_poll_interval_s)
+        return status
+
+    async def _run_live(self, item: _Item, semaphore: asyncio.Semaphore) -> None:
+        from src.core.llm.clients import generate_text
+
+        req = item.request
+        async with semaphore:
+            try:
+                text = await generate_text(
+                    req.model,
+                    req.system,
+                    req.messages,
+                    max_tokens=req.max_tokens,
+                    trace_name=f"batch:{self.job}",
+                )
+                item.result = BatchResult(item.key, text=text, mode="live")
+            except Exception as e:
+                item.result = BatchResult(item.key, error=str(e), mode="live")
+
+    async def _deliver(self, item: _Item, semaphore: asyncio.Semaphore) -> None:
+        if item.on_result is None or item.result is None:
+            return
+        async with semaphore:
+            try:
+                await item.on_result(item.result)
+            except Exception:
+                logger.exception("Batch handler failed for %s/%s", self.job, item.key)
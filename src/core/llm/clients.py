@@ -1,8 +1,10 @@
+import asyncio
 import contextvars
 import json
 import logging
+import time
 import warnings
-from collections.abc import Callable
+from collections.abc import Callable, Collection
 from typing import Any
 
 import instructor
@@ -11,6 +13,7 @@ from google import genai
 from openai import AsyncOpenAI
 
 from src.core.config import settings
+from src.core.metrics import timed
 from src.core.observability import (
     LLMUsage,
     extract_usage_anthropic,
@@ -139,6 +142,7 @@ def _normalize_gemini_thinking_level(model: str, thinking_level: str):
         return types.ThinkingConfig(thinking_level=normalized)
 
 
+@timed("llm")
 async def generate_text(
     model: str,
     system: str,
@@ -176,7 +180,7 @@ async def generate_text(
         raise ValueError("Either messages or prompt is required")
 
     from src.core.circuit_breaker import circuits
-    from src.core.llm.prompts import PromptAdapter
+    from src.core.llm.prompts import PromptAdapter, strip_cache_breakpoints
 
     if model.startswith(("gpt-", "grok-")):
         circuit_name = "openai"
@@ -289,7 +293,7 @@ async def generate_text(
                 prompt_version=prompt_version,
             ) as _span:
                 gemini_config: dict[str, Any] = {
-                    "system_instruction": system,
+                    "system_instruction": strip_cache_breakpoints(system) or None,
                     "max_output_tokens": max_tokens,
                 }
                 if thinking_level:
@@ -305,6 +309,7 @@ async def generate_text(
                 _u = extract_usage_gemini(resp)
                 _span.tokens_input = _u.tokens_input
                 _span.tokens_output = _u.tokens_output
+                _span.cache_read_tokens = _u.cache_read_tokens
             if cb:
                 cb.record_success()
             _last_usage.set(_u)
@@ -324,8 +329,12 @@ async def generate_text(
 # ---------------------------------------------------------------------------
 
 
-def _convert_tools_to_anthropic(tools: list[dict]) -> list[dict]:
-    """Convert OpenAI tool schema format to Anthropic tool_use format."""
+def _convert_tools_to_anthropic(tools: list[dict], cache: bool = False) -> list[dict]:
+    """Convert OpenAI tool schema format to Anthropic tool_use format.
+
+    With ``cache=True`` the last tool carries a ``cache_control`` breakpoint,
+    so the tool block (rendered before the system prompt) is a cached prefix.
+    """
     result = []
     for t in tools:
         f = t["function"]
@@ -334,6 +343,8 @@ def _convert_tools_to_anthropic(tools: list[dict]) -> list[dict]:
             "description": f["description"],
             "input_schema": f["parameters"],
         })
+    if cache and result:
+        result[-1]["cache_control"] = {"type": "ephemeral", "ttl": "1h"}
     return result
 
 
@@ -354,6 +365,61 @@ def _convert_tools_to_gemini(tools: list[dict]):
     return [types.Tool(function_declarations=declarations)]
 
 
+async def _execute_tool_round(
+    calls: list[tuple[str, dict]],
+    tool_executor: Callable,
+    round_num: int,
+    read_only_tools: Collection[str] = (),
+    max_concurrency: int = 1,
+) -> list[dict]:
+    """Execute one round of tool calls, returning log entries in call order.
+
+    Consecutive calls to *read_only_tools* run concurrently (at most
+    *max_concurrency* at a time); any other call is a write and acts as a
+    barrier: it starts only after the preceding reads finish and runs alone,
+    so writes keep their relative order and reads never overtake them.
+    Each entry carries ``duration_ms`` and whether it ran in a parallel batch.
+    """
+    entries: list[dict] = [
+        {"round": round_num, "name": name, "args": args, "result": None}
+        for name, args in calls
+    ]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(entry: dict) -> None:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                entry["result"] = await tool_executor(entry["name"], entry["args"])
+            finally:
+                entry["duration_ms"] = int((time.monotonic() - started) * 1000)
+
+    parallel = settings.ff_parallel_tool_calls and max_concurrency > 1
+    batch: list[dict] = []
+
+    async def _flush() -> None:
+        if not batch:
+            return
+        outcomes = await asyncio.gather(*(_run(e) for e in batch), return_exceptions=True)
+        for entry in batch:
+            entry["parallel"] = len(batch) > 1
+        batch.clear()
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+    for entry in entries:
+        if parallel and entry["name"] in read_only_tools:
+            batch.append(entry)
+            continue
+        await _flush()
+        entry["parallel"] = False
+        await _run(entry)
+    await _flush()
+    return entries
+
+
+@timed("llm")
 async def generate_text_with_tools(
     model: str,
     system: str,
@@ -364,17 +430,37 @@ async def generate_text_with_tools(
     max_tool_rounds: int = 3,
     prompt_version: str = "",
     reasoning_effort: str | None = None,
+    prompt_cache_key: str | None = None,
+    read_only_tools: Collection[str] = (),
+    max_parallel_tools: int | None = None,
 ) -> tuple[str, list[dict]]:
     """LLM call with function calling / tool_use support.
 
     Routes to the correct SDK based on model prefix.
     Handles the multi-turn loop: LLM → tool_call → execute → LLM → ...
 
+    ``prompt_cache_key`` groups requests sharing a prompt prefix (e.g. the
+    agent name) for OpenAI prompt caching; Claude uses explicit breakpoints.
+
+    Tool calls named in ``read_only_tools`` run concurrently within a round
+    (capped by ``max_parallel_tools``, default ``llm_tool_max_concurrency``);
+    all other calls are executed in order (see _execute_tool_round()).
+
     Returns (final_text, tool_call_log).
     """
-    from src.core.llm.prompts import PromptAdapter
+    from src.core.llm.prompts import PromptAdapter, strip_cache_breakpoints
+    from src.core.observability import record_prompt_cache_usage
 
     tool_call_log: list[dict] = []
+    if max_parallel_tools is None:
+        max_parallel_tools = settings.llm_tool_max_concurrency
+
+    async def _run_round(calls: list[tuple[str, dict]], round_num: int) -> list[dict]:
+        entries = await _execute_tool_round(
+            calls, tool_executor, round_num, read_only_tools, max_parallel_tools
+        )
+        tool_call_log.extend(entries)
+        return entries
 
     for round_num in range(max_tool_rounds + 1):
         if model.startswith(("gpt-", "grok-")):
@@ -382,32 +468,34 @@ async def generate_text_with_tools(
             extra_tool_kwargs: dict = {}
             if reasoning_effort is not None and model.startswith("gpt-5."):
                 extra_tool_kwargs["reasoning"] = {"effort": reasoning_effort}
+            started = time.monotonic()
             resp = await client.chat.completions.create(
                 model=model,
                 max_completion_tokens=max_tokens,
                 tools=tools,
                 tool_choice="auto",
-                **PromptAdapter.for_openai(system, messages),
+                **PromptAdapter.for_openai(system, messages, cache_key=prompt_cache_key),
                 **extra_tool_kwargs,
             )
+            _u = extract_usage_openai(resp)
+            _u.model = model
+            _u.duration_ms = int((time.monotonic() - started) * 1000)
+            record_prompt_cache_usage(None, _u)
             msg = resp.choices[0].message
 
             if msg.tool_calls and tool_executor:
                 # Append assistant message with tool calls
                 messages.append(msg.model_dump(exclude_none=True))
-                for tc in msg.tool_calls:
-                    args = json.loads(tc.function.arguments)
-                    result = await tool_executor(tc.function.name, args)
-                    tool_call_log.append({
-                        "round": round_num,
-                        "name": tc.function.name,
-                        "args": args,
-                        "result": result,
-                    })
+                calls = [
+                    (tc.function.name, json.loads(tc.function.arguments))
+                    for tc in msg.tool_calls
+                ]
+                entries = await _run_round(calls, round_num)
+                for tc, entry in zip(msg.tool_calls, entries, strict=True):
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tc.id,
-                        "content": json.dumps(result, default=str),
+                        "content": json.dumps(entry["result"], default=str),
                     })
                 continue
 
@@ -415,7 +503,7 @@ async def generate_text_with_tools(
 
         elif model.startswith("claude-"):
             client = anthropic_client()
-            anthropic_tools = _convert_tools_to_anthropic(tools)
+            anthropic_tools = _convert_tools_to_anthropic(tools, cache=True)
 
             # Build Claude-format messages (filter out tool messages)
             claude_msgs = []
@@ -423,13 +511,20 @@ async def generate_text_with_tools(
                 if m.get("role") in ("user", "assistant"):
                     claude_msgs.append(m)
 
+            started = time.monotonic()
             resp = await client.messages.create(
                 model=model,
                 max_tokens=max_tokens,
-                system=system,
-                messages=claude_msgs if claude_msgs else [{"role": "user", "content": "."}],
+                **PromptAdapter.for_claude(
+                    system,
+                    claude_msgs if claude_msgs else [{"role": "user", "content": "."}],
+                ),
                 tools=anthropic_tools,
             )
+            _u = extract_usage_anthropic(resp)
+            _u.model = model
+            _u.duration_ms = int((time.monotonic() - started) * 1000)
+            record_prompt_cache_usage(None, _u)
 
             tool_use_blocks = [b for b in resp.content if b.type == "tool_use"]
             text_blocks = [b for b in resp.content if b.type == "text"]
@@ -439,20 +534,17 @@ async def generate_text_with_tools(
                     "role": "assistant",
                     "content": [b.model_dump() for b in resp.content],
                 })
-                tool_results = []
-                for tb in tool_use_blocks:
-                    result = await tool_executor(tb.name, tb.input)
-                    tool_call_log.append({
-                        "round": round_num,
-                        "name": tb.name,
-                        "args": tb.input,
-                        "result": result,
-                    })
-                    tool_results.append({
+                entries = await _run_round(
+                    [(tb.name, tb.input) for tb in tool_use_blocks], round_num
+                )
+                tool_results = [
+                    {
                         "type": "tool_result",
                         "tool_use_id": tb.id,
-                        "content": json.dumps(result, default=str),
-                    })
+                        "content": json.dumps(entry["result"], default=str),
+                    }
+                    for tb, entry in zip(tool_use_blocks, entries, strict=True)
+                ]
                 messages.append({"role": "user", "content": tool_results})
                 continue
 
@@ -484,7 +576,7 @@ async def generate_text_with_tools(
                 model=model,
                 contents=contents,
                 config=types.GenerateContentConfig(
-                    system_instruction=system,
+                    system_instruction=strip_cache_breakpoints(system),
                     max_output_tokens=max_tokens,
                     tools=gemini_tools,
                 ),
@@ -496,16 +588,11 @@ async def generate_text_with_tools(
             ]
 
             if fc_parts and tool_executor:
-                for fc_part in fc_parts:
-                    fc = fc_part.function_call
-                    args = dict(fc.args) if fc.args else {}
-                    result = await tool_executor(fc.name, args)
-                    tool_call_log.append({
-                        "round": round_num,
-                        "name": fc.name,
-                        "args": args,
-                        "result": result,
-                    })
+                calls = [
+                    (p.function_call.name, dict(p.function_call.args or {}))
+                    for p in fc_parts
+                ]
+                entries = await _run_round(calls, round_num)
 
                 # Rebuild messages with function responses for next round
                 if isinstance(contents, str):
@@ -534,8 +621,7 @@ async def generate_text_with_tools(
                                 "response": entry["result"],
                             }
                         }
-                        for entry in tool_call_log
-                        if entry["round"] == round_num
+                        for entry in entries
                     ],
                 })
                 # Convert back to messages format for next loop iteration
@@ -591,6 +677,7 @@ async def generate_text_responses(
         raise ValueError("Either messages or prompt is required")
 
     from src.core.circuit_breaker import circuits
+    from src.core.llm.prompts import strip_cache_breakpoints
 
     cb = circuits.get("openai")
     if cb and not cb.can_execute():
@@ -607,7 +694,7 @@ async def generate_text_responses(
                 extra["reasoning"] = {"effort": reasoning_effort}
             resp = await client.responses.create(
                 model=model,
-                instructions=system,
+                instructions=strip_cache_breakpoints(system),
                 input=messages,
                 max_output_tokens=max_tokens,
                 **extra,
@@ -703,10 +790,12 @@ async def count_tokens_anthropic(
 
     Returns the number of input tokens that would be consumed.
     """
+    from src.core.llm.prompts import strip_cache_breakpoints
+
     client = anthropic_client()
     kwargs: dict[str, Any] = {
         "model": model,
-        "system": system,
+        "system": strip_cache_breakpoints(system),
         "messages": messages,
     }
     if tools:
@@ -0,0 +1,93 @@
+"""In-process fake batch endpoint for tests, benchmarks and local runs.
+
+``FakeBatchServer`` implements the ``BatchProvider`` surface with the same
+lifecycle as the real endpoints: a submitted batch stays ``running`` for
+``polls_to_complete`` status calls, then ends and serves results. It can also
+fail submits, fail whole batches, error individual requests or never finish,
+which covers every fallback path in ``LLMBatch``. A cancelled batch settles
+after ``polls_to_cancel`` more status calls and serves results for the first
+``done_before_cancel`` requests only, like a real endpoint::
+
+    server = FakeBatchServer(responder=lambda req: "ok")
+    set_batch_provider("anthropic", server)
+    ...
+    set_batch_provider("anthropic", None)
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.core.llm.batch import BatchRequest, BatchResult
+
+
+def echo_responder(request: BatchRequest) -> str:
+    """Default response: the last user message, prefixed with the model."""
+    return f"[{request.model}] {request.messages[-1]['content']}"
+
+
+@dataclass
+class _FakeBatch:
+    job: str
+    model: str
+    requests: list[BatchRequest]
+    polls: int = 0
+    cancelled: bool = False
+    cancel_polls: int = 0
+
+
+@dataclass
+class FakeBatchServer:
+    responder: Callable[[BatchRequest], str] = echo_responder
+    polls_to_complete: int = 1
+    fail_submit: bool = False
+    fail_batch: bool = False
+    never_complete: bool = False
+    polls_to_cancel: int = 0
+    done_before_cancel: int = 0
+    # Requests whose last message contains any of these strings error out.
+    error_on: tuple[str, ...] = ()
+    batches: dict[str, _FakeBatch] = field(default_factory=dict)
+    _ids: itertools.count = field(default_factory=lambda: itertools.count(1))
+
+    async def submit(self, job: str, model: str, requests: list[BatchRequest]) -> str:
+        if self.fail_submit:
+            raise ConnectionError("fake batch server: submit rejected")
+        batch_id = f"fakebatch_{next(self._ids)}"
+        self.batches[batch_id] = _FakeBatch(job=job, model=model, requests=list(requests))
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        batch = self.batches[batch_id]
+        batch.polls += 1
+        if self.fail_batch:
+            return "failed"
+        if batch.cancelled:
+            batch.cancel_polls += 1
+            return "ended" if batch.cancel_polls > self.polls_to_cancel else "running"
+        if self.never_complete or batch.polls < self.polls_to_complete:
+            return "running"
+        return "ended"
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = self.batches[batch_id]
+        out: dict[str, BatchResult] = {}
+        for index, req in enumerate(batch.requests):
+            content = req.messages[-1]["content"]
+            if batch.cancelled and index >= self.done_before_cancel:
+                out[req.custom_id] = BatchResult(req.custom_id, error="canceled")
+            elif any(marker in content for marker in self.error_on):
+                out[req.custom_id] = BatchResult(req.custom_id, error="fake request error")
+            else:
+                out[req.custom_id] = BatchResult(req.custom_id, text=self.responder(req))
+        return out
+
+    async def cancel(self, batch_id: str) -> None:
+        self.batches[batch_id].cancelled = True
+
+    @property
+    def submitted(self) -> int:
+        """Requests received across all batches."""
+        return sum(len(batch.requests) for batch in self.batches.values())
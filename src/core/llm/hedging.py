@@ -0,0 +1,275 @@
+"""Request hedging for latency-critical LLM tasks.
+
+A slow-but-not-failing provider never trips the circuit breaker, yet it drags
+p99 for every message that waits on it. For tasks marked ``hedge=True`` in
+``TASK_MODEL_MAP`` we start the primary call and, if it has not answered by
+its rolling p90 latency, fire the fallback model too and take whichever
+response arrives first. The loser is cancelled.
+
+Latency histograms are kept per ``(provider, model)`` in a bounded ring of
+recent samples, so the hedge delay tracks the provider's current behaviour.
+A call that loses the race (or times out) records the time it ran before
+being cut off — a censored sample, a lower bound on its real latency — so
+slow calls aren't missing from the window and the p90 doesn't drift fast.
+A token-bucket ``HedgeBudget`` caps hedged calls to a fraction of primary
+calls, which bounds the extra spend even when a provider degrades badly.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from src.core.llm.router import ModelConfig, ModelRouter
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per (provider, model); older samples roll off.
+HISTOGRAM_WINDOW = 200
+# Below this many samples the configured default delay is used instead of p90.
+MIN_SAMPLES_FOR_PERCENTILE = 20
+HEDGE_PERCENTILE = 0.90
+# Clamp the computed delay so a noisy histogram can't hedge instantly or never.
+MIN_HEDGE_DELAY_MS = 50
+MAX_HEDGE_DELAY_MS = 5000
+
+
+class LatencyHistogram:
+    """Rolling latency samples (ms) for a single provider/model pair."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float) -> None:
+        self._samples.append(latency_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank percentile, or None when there are no samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class LatencyTracker:
+    """Registry of per-(provider, model) latency histograms."""
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self._window = window
+        self._histograms: dict[tuple[str, str], LatencyHistogram] = {}
+
+    def record(self, provider: str, model: str, latency_ms: float) -> None:
+        key = (provider, model)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = LatencyHistogram(self._window)
+        hist.record(latency_ms)
+
+    def percentile(self, provider: str, model: str, q: float) -> float | None:
+        hist = self._histograms.get((provider, model))
+        if hist is None or len(hist) < MIN_SAMPLES_FOR_PERCENTILE:
+            return None
+        return hist.percentile(q)
+
+    def hedge_delay_ms(self, config: ModelConfig) -> float:
+        """Delay before hedging a call to *config*'s primary model."""
+        p90 = self.percentile(config.provider, config.model_id, HEDGE_PERCENTILE)
+        delay = p90 if p90 is not None else float(config.hedge_delay_ms)
+        return max(MIN_HEDGE_DELAY_MS, min(MAX_HEDGE_DELAY_MS, delay))
+
+    def snapshot(self) -> dict[str, dict[str, float | int | None]]:
+        """Per-model sample counts and percentiles for health endpoints."""
+        return {
+            f"{provider}:{model}": {
+                "samples": len(hist),
+                "p50_ms": hist.percentile(0.50),
+                "p90_ms": hist.percentile(0.90),
+                "p99_ms": hist.percentile(0.99),
+            }
+            for (provider, model), hist in self._histograms.items()
+        }
+
+    def reset(self) -> None:
+        self._histograms.clear()
+
+
+class HedgeBudget:
+    """Token bucket limiting hedged calls to a fraction of primary calls.
+
+    Every primary call deposits ``ratio`` tokens (capped at ``burst``); every
+    hedge spends one token. With ``ratio=0.1`` at most ~10% of calls are
+    hedged over time, i.e. hedging costs at most ~10% extra on those tasks.
+    """
+
+    __slots__ = ("ratio", "burst", "tokens", "hedges", "denied")
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self.hedges = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        # Epsilon absorbs float drift from repeated fractional deposits.
+        if self.tokens >= 1.0 - 1e-9:
+            self.tokens -= 1.0
+            self.hedges += 1
+            return True
+        self.denied += 1
+        return False
+
+    def status(self) -> dict[str, float | int]:
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self.tokens, 3),
+            "hedges": self.hedges,
+            "denied": self.denied,
+        }
+
+
+latency_tracker = LatencyTracker()
+_budgets: dict[str, HedgeBudget] = {}
+_router = ModelRouter()
+
+
+def get_hedge_budget(task: str) -> HedgeBudget:
+    """Per-task hedge budget, created lazily from settings."""
+    budget = _budgets.get(task)
+    if budget is None:
+        from src.core.config import settings
+
+        budget = _budgets[task] = HedgeBudget(ratio=settings.llm_hedge_budget_ratio)
+    return budget
+
+
+def hedging_status() -> dict[str, dict]:
+    """Latency histograms and hedge budgets for health monitoring."""
+    return {
+        "latency": latency_tracker.snapshot(),
+        "budgets": {task: b.status() for task, b in _budgets.items()},
+    }
+
+
+async def _timed[T](
+    provider: str,
+    model: str,
+    factory: Callable[[], Awaitable[T]],
+) -> T:
+    start = time.monotonic()
+    try:
+        result = await factory()
+    except (asyncio.CancelledError, TimeoutError):
+        # Censored sample: the call took at least this long
+        latency_tracker.record(provider, model, (time.monotonic() - start) * 1000)
+        raise
+    latency_tracker.record(provider, model, (time.monotonic() - start) * 1000)
+    return result
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def hedged_call[T](
+    task: str,
+    primary: Callable[[], Awaitable[T]],
+    fallback: Callable[[], Awaitable[T]],
+    *,
+    fallback_on_error: bool = True,
+) -> T:
+    """Run *primary*, hedging with *fallback* when it is slower than its p90.
+
+    ``primary`` / ``fallback`` are zero-arg factories so the fallback request
+    is only issued when needed. Behaviour:
+
+    - primary answers before the hedge delay → its result, fallback never runs;
+    - primary is still pending at the delay and the budget allows → fallback
+      is started and the first *successful* result wins, the other is cancelled;
+    - primary raises → fallback is awaited (when ``fallback_on_error``),
+      matching the pre-hedging try-primary-then-fallback behaviour.
+
+    If both calls fail, the primary's exception is raised.
+    """
+    from src.core.config import settings
+
+    config = _router.get_model(task)
+    fallback_config = _router.get_fallback(task)
+    budget = get_hedge_budget(task)
+    budget.deposit()
+
+    primary_task = asyncio.ensure_future(_timed(config.provider, config.model_id, primary))
+
+    hedging = settings.ff_llm_hedging and config.hedge and fallback_config is not None
+    delay = latency_tracker.hedge_delay_ms(config) / 1000 if hedging else None
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if not done and not budget.try_spend():
+            logger.debug("Hedge budget exhausted for %s, waiting on primary", task)
+            done, _ = await asyncio.wait({primary_task})
+    except asyncio.CancelledError:
+        await _cancel(primary_task)
+        raise
+
+    if done:
+        exc = primary_task.exception()
+        if exc is None:
+            return primary_task.result()
+        if not fallback_on_error:
+            raise exc
+        logger.warning("Hedged task %s: primary %s failed: %s", task, config.model_id, exc)
+        return await _run_fallback(fallback_config, fallback, exc)
+
+    logger.info(
+        "Hedging %s: %s pending after %.0fms, starting %s",
+        task,
+        config.model_id,
+        delay * 1000,
+        fallback_config.model_id,
+    )
+    fallback_task = asyncio.ensure_future(
+        _timed(fallback_config.provider, fallback_config.model_id, fallback)
+    )
+    pending = {primary_task, fallback_task}
+    first_error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                exc = finished.exception()
+                if exc is None:
+                    return finished.result()
+                if finished is primary_task or first_error is None:
+                    first_error = exc
+        raise first_error  # type: ignore[misc]
+    finally:
+        for leftover in pending:
+            await _cancel(leftover)
+
+
+async def _run_fallback[T](
+    config: ModelConfig | None,
+    fallback: Callable[[], Awaitable[T]],
+    primary_error: BaseException,
+) -> T:
+    if config is None:
+        raise primary_error
+    try:
+        return await _timed(config.provider, config.model_id, fallback)
+    except Exception:
+        raise primary_error from None
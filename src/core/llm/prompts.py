@@ -1,9 +1,23 @@
 from typing import Any
 
-# Sentinel marker inserted by assemble_context() between static (cacheable)
-# and dynamic (per-request) sections of the system prompt.
+# Sentinel marker inserted by assemble_context() / AgentRouter between
+# sections of the system prompt, ordered most-shared first:
+#   shared agent prompt | per-user stable blocks | per-request suffix.
+# Every section except the last is a cache prefix.
 CACHE_BREAKPOINT = "\n<!-- CACHE_BREAKPOINT -->\n"
 
+# Anthropic allows 4 cache_control blocks per request; one is left for tools.
+MAX_SYSTEM_CACHE_BREAKPOINTS = 3
+
+
+def strip_cache_breakpoints(system: str) -> str:
+    """Remove CACHE_BREAKPOINT markers for providers with automatic caching.
+
+    Markers are replaced with a fixed separator so the rendered prefix stays
+    byte-identical across requests (required for OpenAI/Gemini prefix caching).
+    """
+    return system.replace(CACHE_BREAKPOINT, "\n")
+
 SYSTEM_PROMPT_TEMPLATE = """<role>
 Ты — AI Assistant для финансов и жизни в Telegram.
 Ты помогаешь {user_name} ({business_type}) вести учёт доходов, расходов,
@@ -47,25 +61,44 @@ class PromptAdapter:
     ) -> dict[str, Any]:
         """Format for Anthropic Claude API with 1h TTL prompt caching.
 
-        If *system* contains CACHE_BREAKPOINT, the text before the marker is
-        treated as static (cacheable) and the text after is dynamic. Only the
-        static prefix receives ``cache_control``, maximising cache hit rate.
+        If *system* contains CACHE_BREAKPOINT markers, it is split into
+        sections. Every section but the last is a cacheable prefix and gets
+        its own ``cache_control`` breakpoint (shared agent prompt, then
+        per-user blocks); the last section is the per-request suffix and is
+        never cached. Without markers the whole system prompt is cached.
         """
-        if cache and CACHE_BREAKPOINT in system:
-            static_part, dynamic_part = system.split(CACHE_BREAKPOINT, 1)
+        if not cache:
+            return {
+                "system": [{"type": "text", "text": strip_cache_breakpoints(system)}],
+                "messages": messages,
+            }
+
+        sections = system.split(CACHE_BREAKPOINT)
+        if len(sections) == 1:
             system_blocks: list[dict[str, Any]] = [
                 {
                     "type": "text",
-                    "text": static_part,
+                    "text": system,
                     "cache_control": {"type": "ephemeral", "ttl": "1h"},
-                },
+                }
+            ]
+        else:
+            *prefixes, dynamic_part = sections
+            prefixes = [p for p in prefixes if p.strip()]
+            # Fold surplus prefixes into the last cached one to respect the limit.
+            if len(prefixes) > MAX_SYSTEM_CACHE_BREAKPOINTS:
+                keep = MAX_SYSTEM_CACHE_BREAKPOINTS - 1
+                prefixes = prefixes[:keep] + ["\n".join(prefixes[keep:])]
+            system_blocks = [
+                {
+                    "type": "text",
+                    "text": prefix,
+                    "cache_control": {"type": "ephemeral", "ttl": "1h"},
+                }
+                for prefix in prefixes
             ]
             if dynamic_part.strip():
                 system_blocks.append({"type": "text", "text": dynamic_part})
-        else:
-            system_blocks = [{"type": "text", "text": system}]
-            if cache:
-                system_blocks[0]["cache_control"] = {"type": "ephemeral", "ttl": "1h"}
 
         return {
             "system": system_blocks,
@@ -76,25 +109,39 @@ class PromptAdapter:
     def for_openai(
         system: str,
         messages: list[dict[str, str]],
+        cache_key: str | None = None,
     ) -> dict[str, Any]:
-        """Format for OpenAI Chat Completions API (auto-caching)."""
-        return {
+        """Format for OpenAI Chat Completions API (auto-caching).
+
+        OpenAI caches the longest exact prefix automatically, so the marker
+        layout only needs stripping. ``cache_key`` (e.g. the agent name) is
+        sent as ``prompt_cache_key`` to route requests sharing a prefix to
+        the same cache shard.
+        """
+        result: dict[str, Any] = {
             "messages": [
-                {"role": "system", "content": system},
+                {"role": "system", "content": strip_cache_breakpoints(system)},
                 *messages,
             ],
         }
+        if cache_key:
+            result["prompt_cache_key"] = cache_key
+        return result
 
     @staticmethod
     def for_openai_responses(
         system: str,
         messages: list[dict[str, str]],
+        cache_key: str | None = None,
     ) -> dict[str, Any]:
         """Format for the current OpenAI Responses API contract."""
-        return {
-            "instructions": system,
+        result: dict[str, Any] = {
+            "instructions": strip_cache_breakpoints(system),
             "input": messages,
         }
+        if cache_key:
+            result["prompt_cache_key"] = cache_key
+        return result
 
     @staticmethod
     def for_gemini(
@@ -103,7 +150,7 @@ class PromptAdapter:
     ) -> dict[str, Any]:
         """Format for Google Gemini API."""
         return {
-            "system_instruction": system,
+            "system_instruction": strip_cache_breakpoints(system),
             "contents": [
                 {
                     "role": (m["role"] if m["role"] != "assistant" else "model"),
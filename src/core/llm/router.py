@@ -12,6 +12,11 @@ class ModelConfig:
     reasoning_effort: str | None = None
     # OpenAI Responses API: "low" | "medium" | "high"
     verbosity: str | None = None
+    # Latency-critical tasks: fire the fallback if the primary is slower than
+    # its rolling p90 (see src/core/llm/hedging.py). ``hedge_delay_ms`` is the
+    # hedge delay used until enough latency samples have been collected.
+    hedge: bool = False
+    hedge_delay_ms: int = 1500
 
 
 # Task → model mapping (from architecture doc section 2.2)
@@ -21,6 +26,24 @@ TASK_MODEL_MAP: dict[str, ModelConfig] = {
         model_id="gemini-3.1-flash-lite-preview",
         fallback_provider="anthropic",
         fallback_model_id="claude-haiku-4-5",
+        hedge=True,
+        hedge_delay_ms=1200,
+    ),
+    "guardrails": ModelConfig(
+        provider="google",
+        model_id="gemini-3.1-flash-lite-preview",
+        fallback_provider="anthropic",
+        fallback_model_id="claude-haiku-4-5",
+        hedge=True,
+        hedge_delay_ms=800,
+    ),
+    "quick_answer": ModelConfig(
+        provider="google",
+        model_id="gemini-3.1-flash-lite-preview",
+        fallback_provider="anthropic",
+        fallback_model_id="claude-haiku-4-5",
+        hedge=True,
+        hedge_delay_ms=2500,
     ),
     "ocr": ModelConfig(
         provider="google",
@@ -0,0 +1,192 @@
+"""Local token counting for context budgeting.
+
+Context assembly, summarization and the observer used ``len(text) // 4``
+as a token count. That holds for English but undercounts Cyrillic (most of
+our traffic) by 1.5–2×, so budgets overflowed and summarization fired at
+the wrong time. Counts now come from a local BPE tokenizer per provider
+family:
+
+* ``openai``, ``google``, ``xai`` — tiktoken ``o200k_base``;
+* ``anthropic`` — tiktoken ``cl100k_base`` with a 10% margin (Claude's
+  tokenizer is not published; ``count_tokens_anthropic`` in
+  ``src.core.llm.clients`` is the exact, remote count).
+
+If tiktoken or its encoding files are unavailable (first run offline), a
+script-aware estimate is used instead — ~4 Latin characters per token,
+~2.2 Cyrillic, one per CJK character — which is much closer than the flat
+``// 4``.
+
+Counts are memoized per text block (keyed by a BLAKE2 digest), so blocks
+that are re-counted on every overflow pass, and history messages counted on
+every turn, are tokenized once. ``TokenWindow`` keeps a running total for
+sliding-window histories, and ``truncate_to_tokens`` cuts on token
+boundaries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAMILY = "anthropic"
+FAMILY_ENCODINGS = {
+    "anthropic": "cl100k_base",
+    "openai": "o200k_base",
+    "google": "o200k_base",
+    "xai": "o200k_base",
+}
+# Safety margin for families whose own tokenizer is not available locally
+FAMILY_MARGINS = {"anthropic": 1.1}
+
+_CACHE_SIZE = 8192
+_MIN_CACHED_CHARS = 32  # shorter blocks are cheaper to count than to hash
+
+_encodings: dict[str, Any] = {}
+_counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+
+# Heuristic fallback: words, digit groups (BPE merges up to 3 digits),
+# single punctuation marks and whitespace runs.
+_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|\s+|.", re.DOTALL)
+
+
+def _encoding(family: str) -> Any | None:
+    name = FAMILY_ENCODINGS.get(family, FAMILY_ENCODINGS[DEFAULT_FAMILY])
+    if name not in _encodings:
+        try:
+            import tiktoken
+
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning("tiktoken %s unavailable, estimating token counts: %s", name, e)
+            _encodings[name] = None
+    return _encodings[name]
+
+
+def _char_cost(ch: str) -> float:
+    if ch.isascii():
+        return 0.25
+    if ch <= "\u052f":  # Latin-1/Extended, Greek, Cyrillic
+        return 0.45
+    return 1.0  # CJK and other scripts: roughly a token per character
+
+
+def _piece_cost(piece: str) -> float:
+    if piece.isspace():
+        return 0 if piece == " " else 1  # a single space merges into the next word
+    if len(piece) == 1 and not piece.isalnum():
+        return 1
+    if piece.isdigit():
+        return 1
+    return max(1, math.ceil(sum(_char_cost(ch) for ch in piece)))
+
+
+def _estimate(text: str) -> int:
+    return sum(_piece_cost(m.group()) for m in _PIECES.finditer(text))
+
+
+def _count(text: str, family: str) -> int:
+    enc = _encoding(family)
+    count = _estimate(text) if enc is None else len(enc.encode(text, disallowed_special=()))
+    return math.ceil(count * FAMILY_MARGINS.get(family, 1.0))
+
+
+def count_tokens(text: str, family: str = DEFAULT_FAMILY) -> int:
+    """Token count of *text* for a provider family (memoized per block)."""
+    if not text:
+        return 0
+    if len(text) < _MIN_CACHED_CHARS:
+        return _count(text, family)
+    key = (family, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    count = _counts.get(key)
+    if count is not None:
+        _counts.move_to_end(key)
+        return count
+    count = _counts[key] = _count(text, family)
+    if len(_counts) > _CACHE_SIZE:
+        _counts.popitem(last=False)
+    return count
+
+
+def count_message_tokens(messages: Iterable[dict], family: str = DEFAULT_FAMILY) -> int:
+    """Total tokens across message contents."""
+    return sum(count_tokens(m.get("content") or "", family) for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, family: str = DEFAULT_FAMILY) -> str:
+    """Longest prefix of *text* within *max_tokens*, cut on a token boundary."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, family) <= max_tokens:
+        return text
+    raw_budget = int(max_tokens / FAMILY_MARGINS.get(family, 1.0))
+    enc = _encoding(family)
+    if enc is not None:
+        tokens = enc.encode(text, disallowed_special=())[:raw_budget]
+        # A cut inside a multi-byte character decodes to U+FFFD — drop it
+        return enc.decode(tokens).rstrip("\ufffd")
+
+    used = 0.0
+    for match in _PIECES.finditer(text):
+        cost = _piece_cost(match.group())
+        if used + cost > raw_budget:
+            # Long words span several tokens: keep the part that still fits
+            end = match.start()
+            for ch in match.group():
+                used += _char_cost(ch)
+                if used > raw_budget:
+                    break
+                end += 1
+            return text[:end]
+        used += cost
+    return text
+
+
+def clear_cache() -> None:
+    _counts.clear()
+
+
+class TokenWindow:
+    """Oldest-first message window with a running token total.
+
+    Each message is counted once when it enters the window, so trimming a
+    history to a budget is linear instead of re-summing after every drop.
+    """
+
+    def __init__(self, messages: Iterable[dict] = (), family: str = DEFAULT_FAMILY):
+        self.family = family
+        self._items: deque[tuple[dict, int]] = deque()
+        self.total = 0
+        for message in messages:
+            self.append(message)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, message: dict) -> None:
+        tokens = count_tokens(message.get("content") or "", self.family)
+        self._items.append((message, tokens))
+        self.total += tokens
+
+    def popleft(self) -> dict:
+        message, tokens = self._items.popleft()
+        self.total -= tokens
+        return message
+
+    def trim(self, budget: int, keep: int = 0) -> int:
+        """Drop the oldest messages until within *budget* (keeping at least *keep*)."""
+        dropped = 0
+        while self.total > budget and len(self._items) > keep:
+            self.popleft()
+            dropped += 1
+        return dropped
+
+    @property
+    def messages(self) -> list[dict]:
+        return [message for message, _ in self._items]
@@ -16,8 +16,10 @@ from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from typing import Any
 
+from src.core.llm import tokenizer
 from src.core.memory import mem0_client, sliding_window
-from src.core.memory.summarization import get_session_summary
+from src.core.memory.summarization import get_latest_rollup, get_session_summary
+from src.core.metrics import timed
 from src.core.observability import observe
 
 logger = logging.getLogger(__name__)
@@ -471,21 +473,24 @@ def _apply_session_buffer_precedence(
 # ---------------------------------------------------------------------------
 # Token counting
 # ---------------------------------------------------------------------------
+TRUNCATION_MARKER = "\n...[обрезано]"
+
+
 def count_tokens(text: str) -> int:
-    """Rough token count estimate (1 token ~ 4 chars for Russian/English mix)."""
-    return len(text) // 4 + 1
+    """Token count of a context block (local tokenizer, memoized per block)."""
+    return tokenizer.count_tokens(text)
 
 
 def _truncate_to_budget(text: str, max_tokens: int) -> str:
     """Truncate text to fit within max_tokens budget.
 
-    Cuts at the character level (max_tokens * 4) and appends an ellipsis
-    marker so the model knows content was truncated.
+    Cuts on a token boundary and appends an ellipsis marker so the model
+    knows content was truncated; the marker counts towards the budget.
     """
-    max_chars = max(0, (max_tokens - 1) * 4)
-    if len(text) <= max_chars:
+    if count_tokens(text) <= max_tokens:
         return text
-    return text[:max_chars] + "\n...[обрезано]"
+    allowed = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    return tokenizer.truncate_to_tokens(text, allowed) + TRUNCATION_MARKER
 
 
 # ---------------------------------------------------------------------------
@@ -993,6 +998,7 @@ def _apply_overflow_trimming(
     """
     # Tokens from layers that are never trimmed.
     _fixed_tokens = system_prompt_tokens + user_msg_tokens + session_buffer_tokens
+    history = tokenizer.TokenWindow(history_messages)
 
     def _current_total() -> int:
         nonlocal observations_block, procedures_block, episodes_block, graph_block
@@ -1011,8 +1017,7 @@ def _apply_overflow_trimming(
             total += count_tokens(episodes_block)
         if graph_block:
             total += count_tokens(graph_block)
-        total += sum(count_tokens(m["content"]) for m in history_messages)
-        return total
+        return total + history.total
 
     # Overflow priority — conversation history is the most important short-term
     # context. Drop background data first, then history as last resort.
@@ -1054,8 +1059,7 @@ def _apply_overflow_trimming(
             sql_block = ""
 
     # Step 4: Trim oldest history messages (keep MIN_SLIDING_WINDOW)
-    while _current_total() > total_budget and len(history_messages) > MIN_SLIDING_WINDOW:
-        history_messages = history_messages[1:]
+    history.trim(total_budget - (_current_total() - history.total), keep=MIN_SLIDING_WINDOW)
 
     # Step 5: Trim core Mem0 memories (last resort)
     if _current_total() > total_budget and mem_block:
@@ -1077,8 +1081,8 @@ def _apply_overflow_trimming(
             memories = memories[:kept]
 
     # Step 6: Drop remaining history below MIN_SLIDING_WINDOW (absolute last resort)
-    while _current_total() > total_budget and len(history_messages) > 0:
-        history_messages = history_messages[1:]
+    history.trim(total_budget - (_current_total() - history.total))
+    history_messages = history.messages
 
     return (
         mem_block, sql_block, summary_block, history_messages, memories,
@@ -1090,6 +1094,7 @@ def _apply_overflow_trimming(
 # Main assembly function
 # ---------------------------------------------------------------------------
 @observe(name="assemble_context")
+@timed("context")
 async def assemble_context(
     user_id: str,
     family_id: str,
@@ -1100,13 +1105,24 @@ async def assemble_context(
     role: str = "owner",
     intent_data: dict[str, Any] | None = None,
     context_config_override: dict[str, Any] | None = None,
+    volatile_prompt: str = "",
 ) -> AssembledContext:
     """Assemble full context for LLM call from all memory layers.
 
     Respects token budget: S + M + A + H + U <= max_tokens * 0.75.
     Applies overflow priority trimming and Lost-in-the-Middle positioning.
+
+    The system prompt is laid out for provider prompt caching, most-shared
+    first: the caller's shared prefix (text before a ``CACHE_BREAKPOINT`` in
+    *system_prompt*, or all of it), then per-user stable blocks (identity,
+    caller's per-user cues, rules, project), then the per-request suffix
+    (*volatile_prompt* such as today's date, SQL stats, memories, buffer).
     """
+    from src.core.llm.prompts import CACHE_BREAKPOINT
+
     requested_ctx_config, ctx_config = _resolve_context_config(intent, context_config_override)
+    shared_prompt, _, user_prompt = system_prompt.partition(CACHE_BREAKPOINT)
+    user_blocks: list[str] = [user_prompt] if user_prompt else []
     memory_trace: list[dict[str, Any]] = []
     trimmed_layers: list[str] = []
 
@@ -1148,8 +1164,8 @@ async def assemble_context(
     except Exception as e:
         logger.debug("Core identity load failed: %s", e)
     if identity_block:
-        # Prepend identity to system prompt (inside cache prefix)
-        system_prompt = identity_block + "\n" + system_prompt
+        # Identity leads the per-user segment (cached, right after shared prefix)
+        user_blocks.insert(0, identity_block)
         memory_trace.append(
             _trace_layer_block(
                 "core_identity",
@@ -1173,8 +1189,8 @@ async def assemble_context(
     except Exception as e:
         logger.debug("User rules load failed: %s", e)
     if rules_block:
-        # Append rules right after identity block (inside cache prefix)
-        system_prompt = system_prompt + "\n" + rules_block
+        # Rules follow identity and caller cues in the per-user segment
+        user_blocks.append(rules_block)
         memory_trace.append(
             _trace_layer_block(
                 "user_rules",
@@ -1196,7 +1212,7 @@ async def assemble_context(
     except Exception as e:
         logger.debug("Project context load failed: %s", e)
     if project_block:
-        system_prompt = system_prompt + "\n" + project_block
+        user_blocks.append(project_block)
         memory_trace.append(
             _trace_layer_block(
                 "project_context",
@@ -1210,11 +1226,15 @@ async def assemble_context(
     # ------------------------------------------------------------------
     # 2b. System prompt (Priority 2 — NEVER drop, but cap)
     # ------------------------------------------------------------------
+    system_prompt = shared_prompt
+    if user_blocks:
+        system_prompt += CACHE_BREAKPOINT + "\n".join(user_blocks)
     system_tokens = count_tokens(system_prompt)
     if system_tokens > budget_system:
         system_prompt = _truncate_to_budget(system_prompt, budget_system)
         system_tokens = count_tokens(system_prompt)
     token_usage["system_prompt"] = system_tokens
+    token_usage["volatile"] = count_tokens(volatile_prompt) if volatile_prompt else 0
 
     # ------------------------------------------------------------------
     # 3. Current user message (Priority 1 — NEVER drop)
@@ -1475,6 +1495,11 @@ async def assemble_context(
     if ctx_config["sum"]:
         try:
             summary = await get_session_summary(user_id)
+            reason = "session_summary"
+            if summary is None:
+                # Fresh session: carry over the latest daily/weekly digest
+                summary = await get_latest_rollup(user_id)
+                reason = "summary_rollup"
             if summary:
                 summary_block = f"\n\n## Ранее в диалоге:\n{summary.summary}"
                 if count_tokens(summary_block) > budget_summary:
@@ -1484,7 +1509,7 @@ async def assemble_context(
                         _trace_layer_block(
                             "summary",
                             summary_block,
-                            reason="session_summary",
+                            reason=reason,
                             count=1,
                         )
                     )
@@ -1508,10 +1533,9 @@ async def assemble_context(
                 history_messages.append(msg_entry)
 
             # Pre-trim history to per-layer budget
-            hist_tokens = sum(count_tokens(m["content"]) for m in history_messages)
-            while hist_tokens > budget_history and len(history_messages) > MIN_SLIDING_WINDOW:
-                removed = history_messages.pop(0)
-                hist_tokens -= count_tokens(removed["content"])
+            window = tokenizer.TokenWindow(history_messages)
+            window.trim(budget_history, keep=MIN_SLIDING_WINDOW)
+            history_messages = window.messages
         except Exception as e:
             logger.warning("Sliding window fetch failed: %s", e)
 
@@ -1522,6 +1546,7 @@ async def assemble_context(
     # ------------------------------------------------------------------
     total_used = (
         system_tokens
+        + token_usage["volatile"]
         + user_msg_tokens
         + token_usage.get("session_buffer", 0)
         + token_usage.get("observations", 0)
@@ -1550,7 +1575,7 @@ async def assemble_context(
             mem_block, sql_block, summary_block, history_messages, memories,
             observations_block, procedures_block, episodes_block, graph_block,
         ) = _apply_overflow_trimming(
-            system_prompt_tokens=system_tokens,
+            system_prompt_tokens=system_tokens + token_usage["volatile"],
             user_msg_tokens=user_msg_tokens,
             session_buffer_tokens=token_usage.get("session_buffer", 0),
             observations_tokens=token_usage.get("observations", 0),
@@ -1663,6 +1688,7 @@ async def assemble_context(
 
     token_usage["total"] = (
         token_usage["system_prompt"]
+        + token_usage["volatile"]
         + token_usage["user_message"]
         + token_usage.get("session_buffer", 0)
         + token_usage.get("observations", 0)
@@ -1685,22 +1711,26 @@ async def assemble_context(
     # ------------------------------------------------------------------
 
     # Build the enriched system prompt with cache-friendly ordering:
-    #   STATIC PREFIX (cacheable — identical across requests for the same agent):
+    #   SHARED PREFIX (cacheable — identical across users of the same agent):
     #     base system prompt (role, rules, categories)
     #   CACHE BREAKPOINT
+    #   USER PREFIX (cacheable — stable across one user's requests):
+    #     identity, per-user cues (language, personality), rules, project
+    #   CACHE BREAKPOINT
     #   DYNAMIC SUFFIX (changes per request):
+    #     volatile prompt (current date/time)
     #     SQL block (MIDDLE — lower priority)
     #     summary block (MIDDLE)
     #     mem block (END of system prompt — high priority, close to recent msgs)
-    from src.core.llm.prompts import CACHE_BREAKPOINT
-
     has_dynamic = bool(
-        sql_block or summary_block or mem_block or buffer_block
+        volatile_prompt or sql_block or summary_block or mem_block or buffer_block
         or observations_block or procedures_block or episodes_block or graph_block
     )
     enriched_prompt_parts = [system_prompt]
     if has_dynamic:
         enriched_prompt_parts.append(CACHE_BREAKPOINT)
+        if volatile_prompt:
+            enriched_prompt_parts.append(volatile_prompt)
         if sql_block:
             enriched_prompt_parts.append(sql_block)
         if summary_block:
@@ -54,6 +54,12 @@ class _PatchedConnectionPool(_OrigConnectionPool):
 
         kw["configure"] = _configure
         super().__init__(*args, **kw)
+        try:
+            from src.core.connection_budget import register_pool
+
+            register_pool("mem0", self)
+        except Exception:
+            pass
 
     def __class_getitem__(cls, item):
         """Support generic type hints (e.g. ConnectionPool[Connection[DictRow]])."""
@@ -212,11 +218,15 @@ def get_memory() -> Memory:
 
     The psycopg_pool.ConnectionPool class is patched at module level (above)
     to disable prepared statements on every connection, so Mem0's
-    internally-created pool already has the fix applied.
+    internally-created pool already has the fix applied. Its size comes
+    from the process connection budget (``src.core.connection_budget``).
     """
     global _memory
     if _memory is None:
+        from src.core.connection_budget import pool_budget
+
         connection_string = _build_pgvector_url(settings.database_url)
+        budget = pool_budget("mem0")
         config = {
             "llm": {
                 "provider": "anthropic",
@@ -239,6 +249,8 @@ def get_memory() -> Memory:
                     "dbname": "postgres",
                     "connection_string": connection_string,
                     "collection_name": "mem0_memories",
+                    "minconn": budget.min_size,
+                    "maxconn": budget.max_size,
                 },
             },
             "custom_prompts": {
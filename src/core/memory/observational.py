@@ -11,6 +11,7 @@ Removes outdated observations, merges similar ones.
 import logging
 from datetime import UTC, datetime
 
+from src.core.llm.tokenizer import count_tokens
 from src.core.observability import observe
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,7 @@ logger = logging.getLogger(__name__)
 # Token thresholds
 OBSERVER_TOKEN_THRESHOLD = 25_000  # Trigger observation extraction
 REFLECTOR_TOKEN_THRESHOLD = 30_000  # Trigger observation restructuring
+OBSERVER_MAX_INPUT_TOKENS = 12_000  # Newest messages sent to the Observer per run
 MAX_STORED_OBSERVATIONS = 50  # Cap stored observations per user
 
 # Intents that benefit from behavioral observations in context
@@ -72,8 +74,8 @@ REFLECTOR_PROMPT = """Реструктурируй лог наблюдений 
 
 
 def estimate_tokens(text: str) -> int:
-    """Rough token count (1 token ~ 4 chars for Russian/English mix)."""
-    return len(text) // 4 + 1
+    """Token count of *text* (local tokenizer, see ``src.core.llm.tokenizer``)."""
+    return count_tokens(text)
 
 
 def estimate_message_tokens(messages: list[dict[str, str]]) -> int:
@@ -94,12 +96,18 @@ async def extract_observations(
     """Extract dated behavioral observations from conversation messages.
 
     Returns merged list: existing observations + newly extracted ones.
-    Uses Gemini Flash for cheap, fast extraction.
+    Uses Gemini Flash for cheap, fast extraction. Only the newest
+    ``OBSERVER_MAX_INPUT_TOKENS`` of messages are sent.
     """
     if not messages:
         return existing_observations or []
 
     from src.core.llm.clients import google_client
+    from src.core.llm.tokenizer import TokenWindow
+
+    window = TokenWindow(messages)
+    window.trim(OBSERVER_MAX_INPUT_TOKENS, keep=1)
+    messages = window.messages
 
     messages_text = "\n".join(
         f"{m.get('role', 'user')}: {m.get('content', '')}"
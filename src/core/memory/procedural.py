@@ -235,6 +235,29 @@ async def detect_workflow(
     return sorted(workflows, key=lambda w: w["count"], reverse=True)[:5]
 
 
+PROCEDURE_MODEL = "gemini-3.1-flash-lite-preview"
+
+
+def build_procedure_prompt(
+    domain: str,
+    corrections: list[dict[str, Any]],
+    patterns: list[str] | None = None,
+) -> str:
+    """Procedure-extraction prompt for one domain's correction history."""
+    corrections_text = "\n".join(
+        f"- Интент: {c.get('intent', '?')}, было: {c.get('original', '?')}, "
+        f"стало: {c.get('corrected', '?')}"
+        + (f" (контекст: {c.get('context', {})})" if c.get("context") else "")
+        for c in corrections
+    )
+    patterns_text = "\n".join(f"- {p}" for p in (patterns or [])) or "Нет данных"
+    return PROCEDURE_EXTRACTION_PROMPT.format(
+        domain=domain,
+        corrections=corrections_text,
+        patterns=patterns_text,
+    )
+
+
 @observe(name="extract_procedures")
 async def extract_procedures(
     domain: str,
@@ -243,7 +266,8 @@ async def extract_procedures(
 ) -> list[str]:
     """Extract procedural rules from correction history using LLM.
 
-    Called by weekly cron job. Uses Gemini Flash for cheap extraction.
+    Uses Gemini Flash for cheap extraction. The weekly cron batches the same
+    prompt (``build_procedure_prompt``) for all users instead.
     Returns list of rule strings.
     """
     if not corrections:
@@ -251,32 +275,20 @@ async def extract_procedures(
 
     from src.core.llm.clients import google_client
 
-    corrections_text = "\n".join(
-        f"- Интент: {c.get('intent', '?')}, было: {c.get('original', '?')}, "
-        f"стало: {c.get('corrected', '?')}"
-        + (f" (контекст: {c.get('context', {})})" if c.get("context") else "")
-        for c in corrections
-    )
-    patterns_text = "\n".join(f"- {p}" for p in (patterns or [])) or "Нет данных"
-
     try:
         client = google_client()
-        prompt = PROCEDURE_EXTRACTION_PROMPT.format(
-            domain=domain,
-            corrections=corrections_text,
-            patterns=patterns_text,
-        )
+        prompt = build_procedure_prompt(domain, corrections, patterns)
         response = await client.aio.models.generate_content(
-            model="gemini-3.1-flash-lite-preview",
+            model=PROCEDURE_MODEL,
             contents=prompt,
         )
-        return _parse_procedures(response.text or "")
+        return parse_procedures(response.text or "")
     except Exception as e:
         logger.warning("Procedure extraction failed for domain %s: %s", domain, e)
         return []
 
 
-def _parse_procedures(text: str) -> list[str]:
+def parse_procedures(text: str) -> list[str]:
     """Parse LLM output into procedure rule strings."""
     rules: list[str] = []
     for line in text.strip().split("\n"):
@@ -489,15 +501,19 @@ async def _cache_realtime_procedure(
         import json
 
         from src.core.db import redis
+        from src.core.user_keys import track_user_key
 
         rule = (
             f"КОГДА {correction['intent']}: \"{correction['original']}\" "
             f"→ ТОГДА: \"{correction['corrected']}\""
         )
         key = f"{_REALTIME_PROCEDURE_KEY}:{user_id}:{domain}"
-        await redis.rpush(key, json.dumps(rule, ensure_ascii=False))
-        await redis.ltrim(key, -_MAX_REALTIME_RULES, -1)
-        await redis.expire(key, _REALTIME_PROCEDURE_TTL)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, json.dumps(rule, ensure_ascii=False))
+            pipe.ltrim(key, -_MAX_REALTIME_RULES, -1)
+            pipe.expire(key, _REALTIME_PROCEDURE_TTL)
+            track_user_key(user_id, key, pipe)
+            await pipe.execute()
         logger.debug("Cached realtime procedure for %s/%s: %s", user_id, domain, rule)
     except Exception as e:
         logger.debug("Realtime procedure cache failed: %s", e)
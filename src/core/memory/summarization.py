@@ -1,21 +1,32 @@
 """Layer 5 — Incremental dialog summarization.
 
-Triggers when message_count > 15 inside the active conversation session.
-Uses Gemini 3 Flash for cheap, fast summarization and stores results in
-session_summaries.
+Each session summary carries a cursor (``last_message_id``); a run folds
+only the messages after it into the existing summary, in chunks of at most
+``FOLD_MAX_TOKENS``, so the cost of a run does not grow with the history.
+The first summary is written once a session has ``SUMMARY_THRESHOLD`` new
+messages, later folds every ``FOLD_BATCH`` (or ``TOKEN_THRESHOLD`` tokens).
+Runs are triggered by ``summary`` timers shortly after messages are
+persisted and execute in the Taskiq worker, never on the request path.
+
+Session summaries roll up into per-user daily digests, and those into
+weekly digests (``rollup_period``, nightly in ``summary_tasks``). Uses
+Gemini Flash-Lite for cheap, fast summarization.
 """
 
 import logging
 import uuid
-from datetime import UTC, datetime
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, time, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from src.core.db import async_session
 from src.core.llm.clients import google_client
+from src.core.llm.tokenizer import count_tokens, truncate_to_tokens
 from src.core.memory.user_context import get_current_session_id
 from src.core.models.conversation import ConversationMessage
 from src.core.models.session_summary import SessionSummary
+from src.core.models.summary_rollup import SummaryRollup
 from src.core.observability import observe
 
 logger = logging.getLogger(__name__)
@@ -48,228 +59,360 @@ FINANCIAL_SUMMARY_PROMPT = """
 ОБНОВЛЁННОЕ САММАРИ:
 """
 
-SUMMARY_THRESHOLD = 15  # Trigger summarization after 15 messages (fallback)
-TOKEN_THRESHOLD = 25_000  # Primary trigger: token-based (Phase 3.1)
+ROLLUP_PROMPT = """
+Составь сводку {period_label} по саммари диалогов пользователя с AI Assistant.
 
+САММАРИ (в хронологическом порядке):
+{sources}
 
-@observe(name="summarize_dialog")
-async def summarize_dialog(
-    user_id: str,
-    family_id: str,
-    session_id: str | None = None,
-) -> str | None:
-    """Create or update an incremental summary for the active session."""
+ПРАВИЛА:
+1. НИКОГДА не удаляй финансовые цифры (суммы, проценты, даты)
+2. Сохраняй ТОЧНЫЕ суммы и названия категорий
+3. Объедини повторы, оставь решения, изменения и открытые вопросы
+4. Если данные противоречат друг другу — оставь более поздние
+5. Максимум {max_tokens} токенов
+
+СВОДКА:
+"""
+
+SUMMARY_THRESHOLD = 15  # First summary once a session has this many new messages
+FOLD_BATCH = 10  # Afterwards, fold whenever this many new messages are pending
+TOKEN_THRESHOLD = 25_000  # ...or sooner when the pending messages are this large
+FOLD_MAX_MESSAGES = 40  # Messages folded per LLM call
+FOLD_MAX_TOKENS = 6_000  # Tokens of new messages folded per LLM call
+MESSAGE_MAX_TOKENS = 1_500  # Longer messages are truncated before folding
+MAX_FOLDS_PER_RUN = 5
+ROLLUP_MAX_SOURCES = 12
+ROLLUP_SOURCE_MAX_TOKENS = 800
+# period -> (length, prompt label, max digest tokens)
+ROLLUP_PERIODS = {
+    "day": (timedelta(days=1), "за день", 400),
+    "week": (timedelta(days=7), "за неделю", 600),
+}
+_LOCK_SECONDS = 300
+
+
+async def _generate(prompt: str, max_tokens: int = 512) -> str:
+    """Run a summarization prompt on Gemini Flash-Lite (Claude Haiku fallback on 429)."""
     try:
-        async with async_session() as session:
-            session_uuid = (
-                uuid.UUID(session_id)
-                if session_id
-                else await get_current_session_id(session, user_id)
+        client = google_client()
+        response = await client.aio.models.generate_content(
+            model="gemini-3.1-flash-lite-preview",
+            contents=prompt,
+        )
+        return response.text
+    except Exception as gemini_err:
+        if "429" in str(gemini_err) or "RESOURCE_EXHAUSTED" in str(gemini_err):
+            logger.warning("Gemini rate limit hit, falling back to Claude Haiku")
+            from src.core.llm.clients import anthropic_client
+
+            haiku = anthropic_client()
+            haiku_resp = await haiku.messages.create(
+                model="claude-haiku-4-5",
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
             )
-            if session_uuid is None:
-                return None
+            return haiku_resp.content[0].text
+        raise
 
-            # Count recent messages
-            count_result = await session.execute(
-                select(func.count(ConversationMessage.id)).where(
-                    ConversationMessage.user_id == uuid.UUID(user_id),
-                    ConversationMessage.session_id == session_uuid,
-                )
-            )
-            msg_count = count_result.scalar() or 0
-
-            # GAP-H8 + GAP-M6: For sparse conversations (below message threshold),
-            # check token count. If exceeded: trigger observer AND fall through
-            # to summarization (token-based trigger supplements message count).
-            if msg_count < SUMMARY_THRESHOLD:
-                sparse_tokens_exceeded = False
-                try:
-                    from src.core.memory.observational import (
-                        OBSERVER_TOKEN_THRESHOLD,
-                        estimate_tokens,
-                        extract_observations,
-                        load_user_observations,
-                        save_user_observations,
-                    )
 
-                    obs_query = (
-                        select(ConversationMessage)
-                        .where(
-                            ConversationMessage.user_id == uuid.UUID(user_id),
-                            ConversationMessage.session_id == session_uuid,
-                        )
-                        .order_by(ConversationMessage.created_at.desc())
-                        .limit(msg_count)
-                    )
-                    obs_result = await session.execute(obs_query)
-                    obs_messages = obs_result.scalars().all()
-                    total_tokens = sum(
-                        estimate_tokens(m.content or "") for m in obs_messages
-                    )
-                    if total_tokens > OBSERVER_TOKEN_THRESHOLD:
-                        msg_dicts = [
-                            {"role": m.role.value, "content": m.content or ""}
-                            for m in reversed(list(obs_messages))
-                        ]
-                        existing_obs = await load_user_observations(user_id)
-                        updated_obs = await extract_observations(msg_dicts, existing_obs)
-                        await save_user_observations(user_id, updated_obs)
-                        logger.info(
-                            "Observer triggered for sparse conversation (user=%s, "
-                            "%d msgs, %d tokens)",
-                            user_id, msg_count, total_tokens,
-                        )
-                    # GAP-M6: Also trigger summarization if tokens high
-                    if total_tokens > TOKEN_THRESHOLD:
-                        sparse_tokens_exceeded = True
-                except Exception as e:
-                    logger.debug("Sparse observer trigger failed: %s", e)
-                if not sparse_tokens_exceeded:
-                    return None
-                # Fall through to summarization (token threshold exceeded)
-
-            # Get existing summary
-            sum_result = await session.execute(
-                select(SessionSummary)
-                .where(
-                    SessionSummary.user_id == uuid.UUID(user_id),
-                    SessionSummary.session_id == session_uuid,
-                )
-                .limit(1)
-            )
-            existing = sum_result.scalar_one_or_none()
-            existing_text = (
-                existing.summary if existing and existing.summary else "Нет предыдущего саммари."
-            )
-            last_count = existing.message_count if existing else 0
+@asynccontextmanager
+async def _summary_lock(name: str):
+    """Best-effort Redis lock so concurrent runs don't fold the same messages twice.
 
-            # Skip if no new messages since last summary
-            new_count = msg_count - last_count
-            if new_count <= 0:
-                return existing_text
+    Yields False if another run holds the lock. Without Redis the run goes
+    ahead: the cursor is committed with each fold, so a duplicate run can at
+    worst fold one chunk twice.
+    """
+    from src.core.db import redis
 
-            # Get new messages since last summary
-            query = (
-                select(ConversationMessage)
-                .where(
-                    ConversationMessage.user_id == uuid.UUID(user_id),
-                    ConversationMessage.session_id == session_uuid,
-                )
-                .order_by(ConversationMessage.created_at.desc())
-                .limit(new_count)
-            )
-            msg_result = await session.execute(query)
-            new_messages = msg_result.scalars().all()
-
-            if not new_messages:
-                return existing_text
-
-            # Phase 3.1: Check token threshold for Observer trigger
-            run_observer = False
-            try:
-                from src.core.memory.observational import (
-                    OBSERVER_TOKEN_THRESHOLD,
-                    estimate_tokens,
-                )
+    key = f"summary:lock:{name}"
+    try:
+        acquired = await redis.set(key, "1", nx=True, ex=_LOCK_SECONDS)
+    except Exception as e:
+        logger.debug("Summary lock unavailable for %s: %s", name, e)
+        yield True
+        return
+    if not acquired:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        try:
+            await redis.delete(key)
+        except Exception:
+            pass
+
+
+def _chunk(messages: list[ConversationMessage]) -> list[ConversationMessage]:
+    """Leading messages that fit one fold (always at least one)."""
+    chunk: list[ConversationMessage] = []
+    used = 0
+    for m in messages:
+        tokens = min(count_tokens(m.content or ""), MESSAGE_MAX_TOKENS)
+        if chunk and used + tokens > FOLD_MAX_TOKENS:
+            break
+        chunk.append(m)
+        used += tokens
+    return chunk
+
+
+def _format_messages(messages: list[ConversationMessage]) -> str:
+    return "\n".join(
+        f"{m.role.value}: {truncate_to_tokens(m.content or '', MESSAGE_MAX_TOKENS)}"
+        for m in messages
+    )
 
-                total_tokens = sum(
-                    estimate_tokens(m.content or "") for m in new_messages
-                )
-                run_observer = total_tokens > OBSERVER_TOKEN_THRESHOLD
-            except Exception as e:
-                logger.debug("Token threshold check failed: %s", e)
 
-            # Format messages for prompt (reverse to chronological order)
-            messages_text = "\n".join(
-                f"{m.role.value}: {m.content}" for m in reversed(list(new_messages))
+@observe(name="summarize_dialog")
+async def summarize_dialog(
+    user_id: str,
+    family_id: str,
+    session_id: str | None = None,
+) -> str | None:
+    """Fold messages newer than the summary's cursor into the session summary.
+
+    Each fold sends the current summary plus at most ``FOLD_MAX_TOKENS`` of
+    new messages and commits the new summary together with the advanced
+    cursor (``last_message_id``), so input stays bounded however long the
+    session gets, and re-running after a failure resumes where it stopped.
+    Runs off the request path (``summary`` timers, see
+    ``src.core.tasks.summary_tasks``).
+    """
+    async with _summary_lock(user_id) as acquired:
+        if not acquired:
+            return None
+        try:
+            return await _summarize_session(user_id, family_id, session_id)
+        except Exception as e:
+            logger.error("Dialog summarization failed: %s", e, exc_info=True)
+            return None
+
+
+async def _summarize_session(user_id: str, family_id: str, session_id: str | None) -> str | None:
+    async with async_session() as session:
+        session_uuid = (
+            uuid.UUID(session_id)
+            if session_id
+            else await get_current_session_id(session, user_id, allow_stale=True)
+        )
+        if session_uuid is None:
+            return None
+
+        sum_result = await session.execute(
+            select(SessionSummary)
+            .where(
+                SessionSummary.user_id == uuid.UUID(user_id),
+                SessionSummary.session_id == session_uuid,
             )
-
-            # Call Gemini 3 Flash for summarization (Claude Haiku fallback on 429)
-            prompt = FINANCIAL_SUMMARY_PROMPT.format(
-                existing_summary=existing_text,
-                new_messages=messages_text,
+            .limit(1)
+        )
+        existing = sum_result.scalar_one_or_none()
+        cursor = existing.last_message_id if existing else None
+        summary_text = existing.summary if existing and existing.summary else None
+
+        folded: list[ConversationMessage] = []
+        for _ in range(MAX_FOLDS_PER_RUN):
+            query = select(ConversationMessage).where(
+                ConversationMessage.user_id == uuid.UUID(user_id),
+                ConversationMessage.session_id == session_uuid,
             )
-
-            summary_text: str
-            try:
-                client = google_client()
-                response = await client.aio.models.generate_content(
-                    model="gemini-3.1-flash-lite-preview",
-                    contents=prompt,
+            if cursor is not None:
+                query = query.where(ConversationMessage.id > cursor)
+            msg_result = await session.execute(
+                query.order_by(ConversationMessage.id).limit(FOLD_MAX_MESSAGES)
+            )
+            pending = list(msg_result.scalars().all())
+            threshold = FOLD_BATCH if summary_text else SUMMARY_THRESHOLD
+            if not pending or (
+                len(pending) < threshold
+                and sum(count_tokens(m.content or "") for m in pending) <= TOKEN_THRESHOLD
+            ):
+                break
+
+            chunk = _chunk(pending)
+            summary_text = await _generate(
+                FINANCIAL_SUMMARY_PROMPT.format(
+                    existing_summary=summary_text or "Нет предыдущего саммари.",
+                    new_messages=_format_messages(chunk),
                 )
-                summary_text = response.text
-            except Exception as gemini_err:
-                if "429" in str(gemini_err) or "RESOURCE_EXHAUSTED" in str(gemini_err):
-                    logger.warning("Gemini rate limit hit, falling back to Claude Haiku")
-                    from src.core.llm.clients import anthropic_client
-                    haiku = anthropic_client()
-                    haiku_resp = await haiku.messages.create(
-                        model="claude-haiku-4-5",
-                        max_tokens=512,
-                        messages=[{"role": "user", "content": prompt}],
-                    )
-                    summary_text = haiku_resp.content[0].text
-                else:
-                    raise
-
-            # Save or update summary
-            target_summary: SessionSummary
-            if existing:
-                existing.summary = summary_text
-                existing.message_count = msg_count
-                existing.token_count = len(summary_text.split())  # rough estimate
-                existing.updated_at = datetime.now(UTC)
-                target_summary = existing
-            else:
-                target_summary = SessionSummary(
+            )
+            cursor = chunk[-1].id
+            if existing is None:
+                existing = SessionSummary(
                     user_id=uuid.UUID(user_id),
                     family_id=uuid.UUID(family_id),
                     session_id=session_uuid,
                     summary=summary_text,
-                    message_count=msg_count,
-                    token_count=len(summary_text.split()),
+                    message_count=0,
+                    token_count=0,
                 )
-                session.add(target_summary)
+                session.add(existing)
+            existing.summary = summary_text
+            existing.last_message_id = cursor
+            existing.message_count = (existing.message_count or 0) + len(chunk)
+            existing.token_count = count_tokens(summary_text)
+            existing.updated_at = datetime.now(UTC)
+            await session.commit()
+            folded.extend(chunk)
 
-            # Phase 3.2: Extract episode metadata before commit (single txn)
-            try:
-                from src.core.memory.episodic import extract_episode_metadata
+        if not folded:
+            return summary_text
 
-                episode_meta = await extract_episode_metadata(summary_text)
-                if episode_meta:
-                    meta = target_summary.episode_metadata or {}
-                    meta["episode_info"] = episode_meta
-                    target_summary.episode_metadata = meta
-            except Exception as e:
-                logger.debug("Episode metadata extraction failed: %s", e)
+        # Phase 3.2: Episode metadata from the final summary of this run
+        try:
+            from src.core.memory.episodic import extract_episode_metadata
+
+            episode_meta = await extract_episode_metadata(summary_text)
+            if episode_meta:
+                meta = dict(existing.episode_metadata or {})
+                meta["episode_info"] = episode_meta
+                existing.episode_metadata = meta
+                await session.commit()
+        except Exception as e:
+            logger.debug("Episode metadata extraction failed: %s", e)
+
+    # Phase 3.1: Observer over what this run folded, when it was large
+    await _maybe_observe(user_id, folded)
+    return summary_text
 
-            await session.commit()
 
-            # Phase 3.1: Run Observer alongside summarization
-            if run_observer:
-                try:
-                    from src.core.memory.observational import (
-                        extract_observations,
-                        load_user_observations,
-                        save_user_observations,
+async def _maybe_observe(user_id: str, messages: list[ConversationMessage]) -> None:
+    try:
+        from src.core.memory.observational import (
+            OBSERVER_TOKEN_THRESHOLD,
+            extract_observations,
+            load_user_observations,
+            save_user_observations,
+        )
+
+        total_tokens = sum(count_tokens(m.content or "") for m in messages)
+        if total_tokens <= OBSERVER_TOKEN_THRESHOLD:
+            return
+        msg_dicts = [{"role": m.role.value, "content": m.content or ""} for m in messages]
+        existing_obs = await load_user_observations(user_id)
+        updated_obs = await extract_observations(msg_dicts, existing_obs)
+        await save_user_observations(user_id, updated_obs)
+        logger.info(
+            "Observer triggered by summarization (user=%s, %d msgs, %d tokens)",
+            user_id, len(messages), total_tokens,
+        )
+    except Exception as e:
+        logger.debug("Observer alongside summarization failed: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Hierarchical rollups: session summaries -> daily -> weekly
+# ---------------------------------------------------------------------------
+
+
+async def rollup_period(
+    user_id: str,
+    family_id: str,
+    period: str,
+    start: date,
+) -> str | None:
+    """Build (or refresh) the user's ``day`` or ``week`` digest starting at *start*.
+
+    Daily digests fold that day's session summaries, weekly digests the
+    week's daily digests. Inputs are capped at ``ROLLUP_MAX_SOURCES`` ×
+    ``ROLLUP_SOURCE_MAX_TOKENS``. Re-running is a no-op (no LLM call) unless
+    a source changed since the digest was written.
+    """
+    length, label, max_tokens = ROLLUP_PERIODS[period]
+    begin = datetime.combine(start, time.min, tzinfo=UTC)
+    user_uuid = uuid.UUID(user_id)
+    try:
+        async with async_session() as session:
+            if period == "day":
+                source_query = (
+                    select(SessionSummary.summary, SessionSummary.updated_at)
+                    .where(
+                        SessionSummary.user_id == user_uuid,
+                        SessionSummary.updated_at >= begin,
+                        SessionSummary.updated_at < begin + length,
                     )
+                    .order_by(SessionSummary.updated_at)
+                )
+            else:
+                source_query = (
+                    select(SummaryRollup.summary, SummaryRollup.updated_at)
+                    .where(
+                        SummaryRollup.user_id == user_uuid,
+                        SummaryRollup.period == "day",
+                        SummaryRollup.period_start >= start,
+                        SummaryRollup.period_start < start + length,
+                    )
+                    .order_by(SummaryRollup.period_start)
+                )
+            sources = (await session.execute(source_query.limit(ROLLUP_MAX_SOURCES))).all()
+            if not sources:
+                return None
 
-                    msg_dicts = [
-                        {"role": m.role.value, "content": m.content or ""}
-                        for m in reversed(list(new_messages))
-                    ]
-                    existing_obs = await load_user_observations(user_id)
-                    updated_obs = await extract_observations(
-                        msg_dicts, existing_obs
+            existing = (
+                await session.execute(
+                    select(SummaryRollup).where(
+                        SummaryRollup.user_id == user_uuid,
+                        SummaryRollup.period == period,
+                        SummaryRollup.period_start == start,
                     )
-                    await save_user_observations(user_id, updated_obs)
-                except Exception as e:
-                    logger.debug("Observer alongside summarization failed: %s", e)
+                )
+            ).scalar_one_or_none()
+            newest = max(updated_at for _, updated_at in sources)
+            if (
+                existing is not None
+                and existing.source_count == len(sources)
+                and existing.updated_at >= newest
+            ):
+                return existing.summary
+
+            text = await _generate(
+                ROLLUP_PROMPT.format(
+                    period_label=label,
+                    sources="\n\n---\n\n".join(
+                        truncate_to_tokens(summary, ROLLUP_SOURCE_MAX_TOKENS)
+                        for summary, _ in sources
+                    ),
+                    max_tokens=max_tokens,
+                ),
+                max_tokens=max_tokens + 200,
+            )
+            if existing is None:
+                existing = SummaryRollup(
+                    user_id=user_uuid,
+                    family_id=uuid.UUID(family_id),
+                    period=period,
+                    period_start=start,
+                    summary=text,
+                    source_count=0,
+                    token_count=0,
+                )
+                session.add(existing)
+            existing.summary = text
+            existing.source_count = len(sources)
+            existing.token_count = count_tokens(text)
+            existing.updated_at = datetime.now(UTC)
+            await session.commit()
+            return text
+    except Exception as e:
+        logger.error("Summary rollup failed (%s %s %s): %s", user_id, period, start, e)
+        return None
 
-            return summary_text
 
+async def get_latest_rollup(user_id: str) -> SummaryRollup | None:
+    """The user's most recently written daily or weekly digest."""
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                select(SummaryRollup)
+                .where(SummaryRollup.user_id == uuid.UUID(user_id))
+                .order_by(SummaryRollup.updated_at.desc())
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
     except Exception as e:
-        logger.error("Dialog summarization failed: %s", e, exc_info=True)
+        logger.warning("Failed to retrieve summary rollup: %s", e)
         return None
 
 
@@ -0,0 +1,454 @@
+"""In-process metrics: counters, gauges and log-bucketed latency histograms.
+
+Recording is a dict lookup plus an integer increment — no locks, no I/O.
+All updates happen on the event-loop thread, so coroutines never interleave
+inside an update. ``/metrics`` renders the registry in Prometheus text
+exposition format.
+
+Histograms use fixed log-linear buckets (four per power of two, ~19% wide)
+from 100µs to ~5 min. That keeps percentile error bounded like an HDR
+histogram while a series stays a flat list of ints. Prometheus output
+exposes every fourth boundary (powers of two) to keep scrapes small;
+``quantile()`` uses the full resolution.
+
+Pipeline stages are timed with ``stage_timer``. Inside ``request_scope()``
+(one per handled message) stage timings are buffered per task and recorded
+when the request finishes, labelled with the *final* resolved intent —
+guardrails and intent detection run before the intent is known.
+
+Worker processes (Taskiq, extra uvicorn workers) publish snapshots to Redis
+(``publish_snapshot``). ``/metrics`` merges them, so one scrape covers the
+whole deployment.
+
+Usage::
+
+    from src.core.metrics import stage_timer, timed
+
+    async with stage_timer("context"):
+        ...
+
+    @timed("llm")
+    async def generate_text(...): ...
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import math
+import os
+import socket
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# 100µs * 2**(i/4): 0.0001s … ~330s
+BUCKET_BOUNDS: tuple[float, ...] = tuple(0.0001 * 2 ** (i / 4) for i in range(88))
+_EXPORT_EVERY = 4
+_INF_LE = 'le="+Inf"'
+
+SNAPSHOT_KEY_PREFIX = "metrics:snapshot:"
+# Sorted set of publishing processes (score = last publish time), so a scrape
+# finds peers without scanning the keyspace
+SNAPSHOT_INDEX_KEY = "metrics:snapshots"
+SNAPSHOT_TTL_S = 60
+SNAPSHOT_INTERVAL_S = 15.0
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(value, 6))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.series: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: tuple[Any, ...]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "series": [[list(k), self._dump(v)] for k, v in self.series.items()],
+        }
+
+    def _dump(self, value: Any) -> Any:
+        return value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        key = self._key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self.series.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        self.series[self._key(labels)] = value
+
+    def value(self, *labels: Any) -> float:
+        return self.series.get(self._key(labels), 0)
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if not n:
+                continue
+            if seen + n >= rank:
+                lo = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                hi = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else BUCKET_BOUNDS[-1]
+                return lo + (hi - lo) * ((rank - seen) / n)
+            seen += n
+        return BUCKET_BOUNDS[-1]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = _HistogramSeries()
+        series.observe(value)
+
+    def quantile(self, q: float, *labels: Any) -> float:
+        series = self.series.get(self._key(labels))
+        return series.quantile(q) if series else 0.0
+
+    def _dump(self, value: _HistogramSeries) -> Any:
+        return {"counts": value.counts, "sum": value.sum, "count": value.count}
+
+
+class MetricsRegistry:
+    """Named metrics for this process."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Any]] = []
+
+    def _get(self, cls: type, name: str, help: str, labelnames: Iterable[str]) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, tuple(labelnames))
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Histogram:
+        return self._get(Histogram, name, help, labelnames)
+
+    def add_collector(self, collector: Callable[[], Any]) -> None:
+        """Call *collector* before every snapshot (to refresh sampled gauges)."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict[str, Any]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.debug("Metrics collector %r failed", collector, exc_info=True)
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.series.clear()
+
+
+def merge_snapshots(snapshots: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Sum series with identical labels across process snapshots."""
+    merged: dict[str, Any] = {}
+    for snap in snapshots:
+        for name, metric in snap.items():
+            target = merged.setdefault(name, {**metric, "series": {}})
+            for labels, value in metric["series"]:
+                key = tuple(labels)
+                if metric["type"] == "histogram":
+                    cur = target["series"].get(key)
+                    if cur is None:
+                        target["series"][key] = {
+                            "counts": list(value["counts"]),
+                            "sum": value["sum"],
+                            "count": value["count"],
+                        }
+                    else:
+                        cur["counts"] = [a + b for a, b in zip(cur["counts"], value["counts"])]
+                        cur["sum"] += value["sum"]
+                        cur["count"] += value["count"]
+                else:
+                    # Counters add up; gauges here describe per-process capacity
+                    # or in-flight work, so the deployment-wide value is the sum.
+                    target["series"][key] = target["series"].get(key, 0) + value
+    return merged
+
+
+def render_prometheus(merged: dict[str, Any]) -> str:
+    """Prometheus text exposition (v0.0.4) for a merged snapshot."""
+    lines: list[str] = []
+    for name in sorted(merged):
+        metric = merged[name]
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key in sorted(metric["series"]):
+            value = metric["series"][key]
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, key)} {_fmt(value)}")
+                continue
+            cumulative = 0
+            counts = value["counts"]
+            for i, bound in enumerate(BUCKET_BOUNDS):
+                cumulative += counts[i]
+                if (i + 1) % _EXPORT_EVERY == 0:
+                    le = f'le="{_fmt(round(bound, 6))}"'
+                    lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{name}_bucket{_labels(labelnames, key, _INF_LE)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {_fmt(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "finbot_stage_seconds",
+    "Time spent per pipeline stage, labelled with the request's resolved intent.",
+    ("stage", "intent"),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "finbot_stage_errors_total", "Pipeline stages that raised.", ("stage", "intent")
+)
+TASK_SECONDS = REGISTRY.histogram(
+    "finbot_task_seconds", "Taskiq task execution time.", ("task", "status")
+)
+
+
+# --- Stage timing -------------------------------------------------------------
+
+_request_stages: ContextVar[list[tuple[str, float, bool]] | None] = ContextVar(
+    "metrics_request_stages", default=None
+)
+
+
+def _current_intent() -> str:
+    from src.core.request_context import get_current_request_intent
+
+    return get_current_request_intent() or "unknown"
+
+
+def record_stage(stage: str, seconds: float, *, error: bool = False) -> None:
+    """Record one stage timing (buffered when inside ``request_scope``)."""
+    buffer = _request_stages.get()
+    if buffer is not None:
+        buffer.append((stage, seconds, error))
+        return
+    intent = _current_intent()
+    STAGE_SECONDS.observe(seconds, stage, intent)
+    if error:
+        STAGE_ERRORS.inc(stage, intent)
+
+
+class stage_timer:  # noqa: N801 — used like a function
+    """Time a block as pipeline *stage* (sync or async ``with``)."""
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> "stage_timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        record_stage(self.stage, time.perf_counter() - self._start, error=exc_type is not None)
+
+    async def __aenter__(self) -> "stage_timer":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorate an async function so each call is timed as *stage*."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException:
+                record_stage(stage, time.perf_counter() - start, error=True)
+                raise
+            record_stage(stage, time.perf_counter() - start)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def request_scope(stage: str = "handle_message"):
+    """Buffer stage timings for one request; record them under its final intent.
+
+    The whole block is itself recorded as *stage*. Nested scopes (e.g. a
+    message re-dispatched internally) fold into the outermost one.
+    """
+    if _request_stages.get() is not None:
+        with stage_timer(stage):
+            yield
+        return
+
+    buffer: list[tuple[str, float, bool]] = []
+    token = _request_stages.set(buffer)
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _request_stages.reset(token)
+        buffer.append((stage, time.perf_counter() - start, failed))
+        intent = _current_intent()
+        for name, seconds, error in buffer:
+            STAGE_SECONDS.observe(seconds, name, intent)
+            if error:
+                STAGE_ERRORS.inc(name, intent)
+
+
+def latency_report(quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> dict[str, Any]:
+    """p50/p95/p99 (ms) per stage × intent for ops endpoints."""
+    qs = tuple(quantiles)
+    report: dict[str, Any] = {}
+    for (stage, intent), series in sorted(STAGE_SECONDS.series.items()):
+        report.setdefault(stage, {})[intent] = {
+            "count": series.count,
+            **{f"p{round(q * 100)}_ms": round(series.quantile(q) * 1000, 2) for q in qs},
+        }
+    return report
+
+
+# --- Cross-process snapshots ---------------------------------------------------
+
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+_last_publish = 0.0
+
+
+async def publish_snapshot(force: bool = False) -> None:
+    """Store this process's snapshot in Redis (throttled to SNAPSHOT_INTERVAL_S)."""
+    global _last_publish
+    now = time.monotonic()
+    if not force and now - _last_publish < SNAPSHOT_INTERVAL_S:
+        return
+    _last_publish = now
+    try:
+        from src.core.db import redis
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                f"{SNAPSHOT_KEY_PREFIX}{PROCESS_ID}",
+                json.dumps(REGISTRY.snapshot()),
+                ex=SNAPSHOT_TTL_S,
+            )
+            pipe.zadd(SNAPSHOT_INDEX_KEY, {PROCESS_ID: time.time()})
+            pipe.zremrangebyscore(SNAPSHOT_INDEX_KEY, "-inf", time.time() - SNAPSHOT_TTL_S)
+            await pipe.execute()
+    except Exception:
+        logger.debug("Metrics snapshot publish failed", exc_info=True)
+
+
+async def run_snapshot_publisher() -> None:
+    """Publish this process's snapshot every SNAPSHOT_INTERVAL_S (app lifetime)."""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL_S)
+        await publish_snapshot(force=True)
+
+
+async def merged_snapshot() -> dict[str, Any]:
+    """This process's snapshot merged with live snapshots from other processes."""
+    snapshots = [REGISTRY.snapshot()]
+    try:
+        from src.core.db import redis
+
+        peers = await redis.zrangebyscore(SNAPSHOT_INDEX_KEY, time.time() - SNAPSHOT_TTL_S, "+inf")
+        keys = [f"{SNAPSHOT_KEY_PREFIX}{p}" for p in peers if p != PROCESS_ID]
+        if keys:
+            for raw in await redis.mget(keys):
+                if raw:
+                    snapshots.append(json.loads(raw))
+    except Exception:
+        logger.debug("Could not load peer metrics snapshots", exc_info=True)
+    return merge_snapshots(snapshots)
+
+
+async def render_all() -> str:
+    """This process's metrics merged with live snapshots from other processes."""
+    return render_prometheus(await merged_snapshot())
@@ -43,6 +43,7 @@ from src.core.models.enums import (
     UserRole,
 )
 from src.core.models.family import Family
+from src.core.models.family_data_version import FamilyDataVersion
 from src.core.models.invoice import Invoice
 from src.core.models.life_event import LifeEvent
 from src.core.models.load import Load
@@ -56,6 +57,7 @@ from src.core.models.scheduled_action_run import ScheduledActionRun
 from src.core.models.session_summary import SessionSummary
 from src.core.models.shopping_list import ShoppingList, ShoppingListItem
 from src.core.models.subscription import Subscription
+from src.core.models.summary_rollup import SummaryRollup
 from src.core.models.task import Task
 from src.core.models.transaction import Transaction
 from src.core.models.usage_log import UsageLog
@@ -63,6 +65,7 @@ from src.core.models.user import User
 from src.core.models.user_context import UserContext
 from src.core.models.user_profile import UserProfile
 from src.core.models.user_project import UserProject
+from src.core.models.user_timezone import UserTimezone
 from src.core.models.tracker import Tracker, TrackerEntry
 from src.core.models.workspace_membership import WorkspaceMembership
 
@@ -100,6 +103,7 @@ __all__ = [
     "MembershipType",
     "ResourceVisibility",
     "Family",
+    "FamilyDataVersion",
     "User",
     "Category",
     "Transaction",
@@ -110,6 +114,7 @@ __all__ = [
     "ConversationMessage",
     "UserContext",
     "SessionSummary",
+    "SummaryRollup",
     "AuditLog",
     "RecurringPayment",
     "SalesTaxRateCache",
@@ -128,6 +133,7 @@ __all__ = [
     "Task",
     "UsageLog",
     "UserProfile",
+    "UserTimezone",
     "UserBrowserSession",
     "BrowserActionLog",
     "UserProject",
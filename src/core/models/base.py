@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, FetchedValue, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -13,5 +13,17 @@ class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class UpdatedAtMixin:
+    """``updated_at`` set by the ``touch_updated_at`` trigger on every UPDATE (migration 038)."""
+
+    # Fetch server-generated values in the flush (RETURNING) instead of
+    # expiring them: a later lazy refresh fails in async sessions.
+    __mapper_args__ = {"eager_defaults": True}
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue()
+    )
+
+
 def gen_uuid():
     return uuid.uuid4()
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models.base import Base
+
+
+class FamilyDataVersion(Base):
+    """Per-family change counter for a data domain.
+
+    Maintained by database triggers (migration 035), never written by the
+    app: every statement touching the domain's tables bumps ``version`` for
+    each affected family. Readers use it as a cheap cache validator.
+    """
+
+    __tablename__ = "family_data_versions"
+
+    family_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("families.id", ondelete="CASCADE"), primary_key=True
+    )
+    domain: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
@@ -42,6 +42,9 @@ class ScheduledAction(Base, TimestampMixin):
     max_failures: Mapped[int] = mapped_column(Integer, default=3)
     end_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     max_runs: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Dispatcher lease: set when a worker claims the action, cleared after the run
+    claimed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default="now()",
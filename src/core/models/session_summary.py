@@ -17,6 +17,8 @@ class SessionSummary(Base):
     session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
     summary: Mapped[str] = mapped_column(Text)
     message_count: Mapped[int] = mapped_column(Integer)
+    # Newest conversation message folded into the summary (incremental cursor)
+    last_message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     token_count: Mapped[int] = mapped_column(Integer)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     episode_metadata: Mapped[dict | None] = mapped_column(
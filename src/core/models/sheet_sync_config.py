@@ -3,8 +3,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, DateTime, ForeignKey, String, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.models.base import Base
@@ -22,6 +22,12 @@ class SheetSyncConfig(Base):
     sync_scope: Mapped[str] = mapped_column(String, default="expenses")
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     last_synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Delta sync bookkeeping (src/core/sheets_sync.py): window, cursor, record → sheet row
+    sync_state: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Family member whose Google connection the sync writes with
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=text("now()"), nullable=False
     )
@@ -0,0 +1,30 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models.base import Base
+
+
+class SummaryRollup(Base):
+    """Per-user daily or weekly digest of dialog summaries."""
+
+    __tablename__ = "summary_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "period_start", name="uq_summary_rollup_period"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
+    family_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("families.id"))
+    period: Mapped[str] = mapped_column(String(10))  # "day" | "week"
+    period_start: Mapped[date] = mapped_column(Date)
+    summary: Mapped[str] = mapped_column(Text)
+    source_count: Mapped[int] = mapped_column(Integer)
+    token_count: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
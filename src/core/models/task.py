@@ -5,11 +5,11 @@ from sqlalchemy import DateTime, ForeignKey, String, Text
 from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.core.models.base import Base, TimestampMixin
+from src.core.models.base import Base, TimestampMixin, UpdatedAtMixin
 from src.core.models.enums import ReminderRecurrence, TaskPriority, TaskStatus
 
 
-class Task(Base, TimestampMixin):
+class Task(Base, TimestampMixin, UpdatedAtMixin):
     __tablename__ = "tasks"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models.base import Base
+
+
+class UserTimezone(Base):
+    """Number of user profiles per timezone name.
+
+    Maintained by database triggers on ``user_profiles`` (migration 036),
+    never written by the app. Local-time crons read this small table to find
+    which timezones are in their send window instead of loading every user.
+    ``timezone`` is ``''`` for profiles whose timezone is NULL.
+    """
+
+    __tablename__ = "user_timezones"
+
+    timezone: Mapped[str] = mapped_column(String(50), primary_key=True)
+    users: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -156,10 +156,27 @@ async def check_budgets(family_id: str, language: str = "en") -> list[str]:
     return alerts
 
 
+@observe(name="check_forecast_shortfall")
+async def check_forecast_shortfall(family_id: str, language: str = "en") -> list[str]:
+    """Warn when the 30-day cash-flow forecast expects spending above income.
+
+    Reads the forecast the nightly batch cached for today (computing it on a
+    cache miss).
+    """
+    from src.core.forecast import get_forecast
+
+    forecast = await get_forecast(family_id)
+    deficit = forecast.shortfall() if forecast else None
+    if not deficit:
+        return []
+    return [get_financial_text(language)["shortfall"].format(amount=deficit)]
+
+
 async def collect_alerts(family_id: str, language: str = "en") -> list[str]:
     """Collect all alerts for a family.
 
-    Runs anomaly detection and budget checks, combining results.
+    Runs anomaly detection, budget checks and the cash-flow shortfall
+    check, combining results.
     Each check is wrapped in its own try/except so a failure in one
     does not prevent the others from running.
     """
@@ -184,6 +201,16 @@ async def collect_alerts(family_id: str, language: str = "en") -> list[str]:
             e,
         )
 
+    try:
+        shortfall_alerts = await check_forecast_shortfall(family_id, language=language)
+        alerts.extend(shortfall_alerts)
+    except Exception as e:
+        logger.warning(
+            "Forecast check failed for family %s: %s",
+            family_id,
+            e,
+        )
+
     return alerts
 
 
@@ -149,6 +149,10 @@ FINANCIAL_TEXTS: dict[str, dict[str, str]] = {
         ),
         "total": "Total",
         "category_fallback": "Category",
+        "shortfall": (
+            "📉 Forecast: spending is expected to exceed income "
+            "by ${amount:.2f} over the next 30 days"
+        ),
     },
     "es": {
         "header": "📊 Notificaciones financieras:\n\n",
@@ -166,6 +170,10 @@ FINANCIAL_TEXTS: dict[str, dict[str, str]] = {
         ),
         "total": "Total",
         "category_fallback": "Categoría",
+        "shortfall": (
+            "📉 Pronóstico: se espera que los gastos superen los ingresos "
+            "en ${amount:.2f} en los próximos 30 días"
+        ),
     },
     "zh": {
         "header": "📊 财务通知：\n\n",
@@ -183,6 +191,7 @@ FINANCIAL_TEXTS: dict[str, dict[str, str]] = {
         ),
         "total": "总计",
         "category_fallback": "类别",
+        "shortfall": "📉 预测：未来 30 天支出预计将超出收入 ${amount:.2f}",
     },
     "ru": {
         "header": "📊 Финансовые уведомления:\n\n",
@@ -200,6 +209,10 @@ FINANCIAL_TEXTS: dict[str, dict[str, str]] = {
         ),
         "total": "Общий",
         "category_fallback": "Категория",
+        "shortfall": (
+            "📉 Прогноз: в ближайшие 30 дней расходы превысят доходы "
+            "на ${amount:.2f}"
+        ),
     },
 }
 
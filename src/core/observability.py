@@ -7,6 +7,7 @@ Enhanced with:
 - traced_llm_call() context manager for per-call token/cost/cache tracking
 - update_trace_user() for tagging traces with user_id
 - LLMUsage dataclass for structured token usage extraction
+- per-intent prompt-cache hit-rate stats (record_prompt_cache_usage())
 """
 
 import logging
@@ -112,6 +113,103 @@ def extract_usage_gemini(response: Any) -> LLMUsage:
     )
 
 
+@dataclass
+class PromptCacheStats:
+    """Per-intent prompt-cache counters, aggregated in-process."""
+
+    calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    hit_latency_ms: int = 0
+    miss_latency_ms: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        misses = self.calls - self.cache_hits
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.calls, 4) if self.calls else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+            "cached_token_ratio": (
+                round(self.cache_read_tokens / self.prompt_tokens, 4)
+                if self.prompt_tokens
+                else 0.0
+            ),
+            "avg_latency_hit_ms": (
+                round(self.hit_latency_ms / self.cache_hits) if self.cache_hits else None
+            ),
+            "avg_latency_miss_ms": round(self.miss_latency_ms / misses) if misses else None,
+        }
+
+
+_prompt_cache_stats: dict[str, PromptCacheStats] = {}
+
+
+def record_prompt_cache_usage(intent: str | None, usage: LLMUsage) -> None:
+    """Fold one LLM call's cache usage into the per-intent stats.
+
+    ``prompt_tokens`` is normalised to the full prompt size: Anthropic reports
+    ``input_tokens`` excluding cache reads/writes, while OpenAI and Gemini
+    report totals that already include cached tokens.
+    """
+    if not intent:
+        from src.core.request_context import get_current_request_intent
+
+        intent = get_current_request_intent() or "unknown"
+    try:
+        prompt_tokens = int(usage.tokens_input)
+        cache_read = int(usage.cache_read_tokens)
+        cache_creation = int(usage.cache_creation_tokens)
+    except (TypeError, ValueError):
+        logger.debug("Skipping prompt cache stats for malformed usage: %r", usage)
+        return
+    if usage.model.startswith("claude-"):
+        prompt_tokens += cache_read + cache_creation
+
+    stats = _prompt_cache_stats.get(intent)
+    if stats is None:
+        stats = _prompt_cache_stats[intent] = PromptCacheStats()
+    stats.calls += 1
+    stats.prompt_tokens += prompt_tokens
+    stats.cache_read_tokens += cache_read
+    stats.cache_creation_tokens += cache_creation
+    if cache_read > 0:
+        stats.cache_hits += 1
+        stats.hit_latency_ms += usage.duration_ms
+    else:
+        stats.miss_latency_ms += usage.duration_ms
+
+
+def get_prompt_cache_report() -> dict[str, Any]:
+    """Per-intent and overall prompt-cache hit rates for ops endpoints."""
+    total = PromptCacheStats()
+    for stats in _prompt_cache_stats.values():
+        total.calls += stats.calls
+        total.cache_hits += stats.cache_hits
+        total.prompt_tokens += stats.prompt_tokens
+        total.cache_read_tokens += stats.cache_read_tokens
+        total.cache_creation_tokens += stats.cache_creation_tokens
+        total.hit_latency_ms += stats.hit_latency_ms
+        total.miss_latency_ms += stats.miss_latency_ms
+    return {
+        "overall": total.as_dict(),
+        "intents": {
+            intent: stats.as_dict()
+            for intent, stats in sorted(
+                _prompt_cache_stats.items(), key=lambda item: -item[1].calls
+            )
+        },
+    }
+
+
+def reset_prompt_cache_stats() -> None:
+    _prompt_cache_stats.clear()
+
+
 def get_langfuse():
     global _langfuse
     if _langfuse is None and settings.langfuse_public_key:
@@ -187,6 +285,8 @@ async def traced_llm_call(
     finally:
         elapsed_ms = int((time.monotonic() - start) * 1000)
         usage.duration_ms = elapsed_ms
+        if usage.tokens_input or usage.cache_read_tokens:
+            record_prompt_cache_usage(intent, usage)
 
         if span:
             try:
@@ -240,11 +340,15 @@ def _is_coroutine(fn: Callable) -> bool:
 
 __all__ = [
     "LLMUsage",
+    "PromptCacheStats",
     "extract_usage_anthropic",
     "extract_usage_gemini",
     "extract_usage_openai",
     "get_langfuse",
+    "get_prompt_cache_report",
     "observe",
+    "record_prompt_cache_usage",
+    "reset_prompt_cache_stats",
     "traced_llm_call",
     "update_trace_user",
 ]
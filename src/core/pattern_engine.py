@@ -0,0 +1,682 @@
+"""Vectorized anomaly and pattern detection across all families at once.
+
+Weekly pattern analysis used to send each family's recent transactions to an
+LLM and ask it to find trends, regular payments and anomalies; the
+cross-domain cron looped over every user with two queries and dict
+arithmetic per user. Here all recent expenses and life events are loaded in
+bulk, encoded as NumPy columns, and every statistic for every family and
+user comes out of a few grouped array operations (``np.bincount`` over
+composite keys, one ``lexsort`` for payment intervals). The LLM only phrases
+the resulting findings.
+
+Family findings (``family_findings``):
+
+* ``trend`` — top categories of the last 30 days and their change against
+  the 30 days before;
+* ``anomaly`` — expenses of the last week whose z-score against the
+  family's trailing per-category baseline exceeds ``Z_THRESHOLD``;
+* ``recurring`` — payees paid at a regular interval with a stable amount;
+  the period is the mean gap between payments and the next date is
+  projected from the last one;
+* ``weekday`` — weekday seasonality of the average expense.
+
+User findings (``user_findings``): mood × spending (good/low-mood day means
+plus Pearson r), meal tracking × food spending, heavy-drink days ×
+spending, weekday seasonality of the family's spending and of the user's
+own life tracking.
+
+Usage::
+
+    async with async_session() as session:
+        tx = await load_transactions(session, days=90)
+    for family_id, findings in family_findings(tx).items():
+        prompt = pattern_prompt(findings)
+"""
+
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+
+from src.core.models.category import Category
+from src.core.models.enums import LifeEventType, TransactionType
+from src.core.models.life_event import LifeEvent
+from src.core.models.transaction import Transaction
+
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+FOOD_KEYWORDS = (
+    "cafe",
+    "coffee",
+    "restaurant",
+    "food",
+    "lunch",
+    "dinner",
+    "кофе",
+    "кафе",
+    "ресторан",
+)
+
+# Anomalies: last RECENT_DAYS against the trailing baseline before them.
+RECENT_DAYS = 7
+Z_THRESHOLD = 3.0
+MIN_BASELINE = 5
+# Trends: TREND_DAYS against the TREND_DAYS before.
+TREND_DAYS = 30
+TOP_CATEGORIES = 3
+MIN_TREND_CHANGE = 0.25
+# Recurring payees: regular gaps and stable amounts.
+RECURRING_MIN_PAYMENTS = 3
+RECURRING_MIN_PERIOD = 5
+RECURRING_MAX_GAP_CV = 0.25
+RECURRING_MAX_AMOUNT_CV = 0.2
+# Weekday seasonality.
+WEEKDAY_MIN_RATIO = 1.5
+MIN_ACTIVE_WEEKDAYS = 4
+
+_MOOD, _FOOD, _DRINK, _OTHER = 0, 1, 2, 3
+_EVENT_KINDS = {LifeEventType.mood: _MOOD, LifeEventType.food: _FOOD, LifeEventType.drink: _DRINK}
+
+
+@dataclass(frozen=True)
+class Finding:
+    """One statistically detected fact; ``text`` is a plain English rendering."""
+
+    kind: str
+    text: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+def _encode(values: Iterable[str], missing: str | None = None) -> tuple[np.ndarray, list[str]]:
+    """Dictionary-encode *values*; *missing* maps to -1."""
+    index: dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v == missing else index.setdefault(v, len(index)) for v in values),
+        dtype=np.int64,
+    )
+    return codes, list(index)
+
+
+def _is_food(description: str | None, merchant: str | None, cache: dict) -> bool:
+    key = (description, merchant)
+    hit = cache.get(key)
+    if hit is None:
+        text = f"{description or ''} {merchant or ''}".lower()
+        hit = cache[key] = any(kw in text for kw in FOOD_KEYWORDS)
+    return hit
+
+
+@dataclass(frozen=True)
+class TxColumns:
+    """Expense transactions as parallel arrays; ``day`` 0 is ``start``."""
+
+    start: date
+    days: int
+    families: list[str]
+    categories: list[str]
+    payees: list[str]
+    family: np.ndarray
+    day: np.ndarray
+    amount: np.ndarray
+    category: np.ndarray
+    payee: np.ndarray  # merchant, else description; -1 when both are empty
+    food: np.ndarray  # bool: merchant/description matches FOOD_KEYWORDS
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Any], *, start: date, days: int, family_id: str | None = None
+    ) -> "TxColumns":
+        kept = [r for r in rows if 0 <= (r.date - start).days < days]
+        family, families = _encode(family_id or str(r.family_id) for r in kept)
+        category, categories = _encode(str(r.category or "") for r in kept)
+        labels = [(r.merchant or r.description or "").strip() for r in kept]
+        payee, payees = _encode(labels, missing="")
+        food_cache: dict[tuple[str | None, str | None], bool] = {}
+        food = np.fromiter(
+            (_is_food(r.description, r.merchant, food_cache) for r in kept),
+            dtype=bool,
+            count=len(kept),
+        )
+        return cls(
+            start=start,
+            days=days,
+            families=families,
+            categories=categories,
+            payees=payees,
+            family=family,
+            day=np.fromiter(((r.date - start).days for r in kept), dtype=np.int64, count=len(kept)),
+            amount=np.fromiter((float(r.amount) for r in kept), dtype=np.float64, count=len(kept)),
+            category=category,
+            payee=payee,
+            food=food,
+        )
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @property
+    def weekday(self) -> np.ndarray:
+        return (self.start.weekday() + self.day) % 7
+
+    def daily(self, mask: np.ndarray | None = None) -> np.ndarray:
+        """Expense totals as a (families × days) matrix."""
+        weights = self.amount if mask is None else np.where(mask, self.amount, 0.0)
+        size = len(self.families) * self.days
+        totals = np.bincount(self.family * self.days + self.day, weights, minlength=size)
+        return totals.reshape(len(self.families), self.days)
+
+
+@dataclass(frozen=True)
+class EventColumns:
+    """Life events as parallel arrays aligned with a ``TxColumns`` window."""
+
+    users: list[str]
+    user_family: np.ndarray  # family code in the TxColumns, -1 without expenses
+    user: np.ndarray
+    day: np.ndarray
+    kind: np.ndarray
+    score: np.ndarray  # mood score, NaN when absent
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Any], tx: TxColumns, users: Iterable[tuple[str, str]]
+    ) -> "EventColumns":
+        """*users* are ``(user_id, family_id)`` pairs; events of other users are dropped."""
+        family_of = {str(uid): str(fid) for uid, fid in users}
+        names = list(family_of)
+        index = {uid: i for i, uid in enumerate(names)}
+        family_codes = {fid: i for i, fid in enumerate(tx.families)}
+        kept = [
+            r for r in rows if str(r.user_id) in index and 0 <= (r.date - tx.start).days < tx.days
+        ]
+        n = len(kept)
+        return cls(
+            users=names,
+            user_family=np.fromiter(
+                (family_codes.get(family_of[uid], -1) for uid in names),
+                dtype=np.int64,
+                count=len(names),
+            ),
+            user=np.fromiter((index[str(r.user_id)] for r in kept), dtype=np.int64, count=n),
+            day=np.fromiter(((r.date - tx.start).days for r in kept), dtype=np.int64, count=n),
+            kind=np.fromiter((_EVENT_KINDS.get(r.type, _OTHER) for r in kept), np.int64, n),
+            score=np.fromiter((_mood_score(r.data) for r in kept), dtype=np.float64, count=n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.user)
+
+
+def _mood_score(data: dict | None) -> float:
+    try:
+        return float((data or {})["score"])
+    except (KeyError, TypeError, ValueError):
+        return float("nan")
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+async def load_transactions(
+    session: Any, *, days: int, today: date | None = None, family_id: str | None = None
+) -> TxColumns:
+    """Expenses of the last *days* days for every family (or just *family_id*)."""
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    stmt = (
+        select(
+            Transaction.family_id,
+            Transaction.date,
+            Transaction.amount,
+            Transaction.merchant,
+            Transaction.description,
+            Category.name.label("category"),
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .where(
+            Transaction.date >= start,
+            Transaction.date <= today,
+            Transaction.type == TransactionType.expense,
+        )
+    )
+    if family_id:
+        stmt = stmt.where(Transaction.family_id == uuid.UUID(family_id))
+    result = await session.execute(stmt)
+    return TxColumns.from_rows(result.all(), start=start, days=days, family_id=family_id)
+
+
+async def load_life_events(
+    session: Any, tx: TxColumns, users: Iterable[tuple[str, str]]
+) -> EventColumns:
+    """Life events inside the *tx* window for the given ``(user_id, family_id)`` pairs."""
+    result = await session.execute(
+        select(LifeEvent.user_id, LifeEvent.type, LifeEvent.date, LifeEvent.data).where(
+            LifeEvent.date >= tx.start,
+            LifeEvent.date < tx.start + timedelta(days=tx.days),
+        )
+    )
+    return EventColumns.from_rows(result.all(), tx, users)
+
+
+# ---------------------------------------------------------------------------
+# Family findings
+# ---------------------------------------------------------------------------
+
+
+def category_trends(tx: TxColumns) -> list[tuple[int, Finding]]:
+    """Top categories of the last TREND_DAYS and their change vs the period before."""
+    ncat = len(tx.categories)
+    size = len(tx.families) * ncat
+    if not size:
+        return []
+    keys = tx.family * ncat + tx.category
+    recent = tx.day >= tx.days - TREND_DAYS
+    before = ~recent & (tx.day >= tx.days - 2 * TREND_DAYS)
+    cur = np.bincount(keys[recent], tx.amount[recent], minlength=size)
+    prev = np.bincount(keys[before], tx.amount[before], minlength=size)
+    has_prev = tx.days >= 2 * TREND_DAYS
+
+    cells = np.flatnonzero(cur > 0)
+    fam, cat = cells // ncat, cells % ncat
+    order = np.lexsort((-cur[cells], fam))
+    cells, fam, cat = cells[order], fam[order], cat[order]
+    first = np.r_[True, fam[1:] != fam[:-1]]
+    rank = np.arange(len(cells)) - np.maximum.accumulate(np.where(first, np.arange(len(cells)), 0))
+    totals = np.bincount(fam, cur[cells], minlength=len(tx.families))
+
+    top = rank < TOP_CATEGORIES
+    fam, cat, cells = fam[top], cat[top], cells[top]
+    out: list[tuple[int, Finding]] = []
+    for f, c, amount, previous, share in zip(
+        fam.tolist(),
+        cat.tolist(),
+        cur[cells].tolist(),
+        prev[cells].tolist(),
+        (cur[cells] / totals[fam]).tolist(),
+        strict=True,
+    ):
+        text = f"{tx.categories[c]}: {amount:.0f} in the last {TREND_DAYS} days ({share:.0%})"
+        change = None
+        if has_prev and previous > 0:
+            change = amount / previous - 1
+            if abs(change) >= MIN_TREND_CHANGE:
+                text += f", {change:+.0%} vs the previous {TREND_DAYS} days"
+        elif has_prev:
+            text += ", new this period"
+        out.append(
+            (
+                f,
+                Finding(
+                    "trend",
+                    text,
+                    {
+                        "category": tx.categories[c],
+                        "amount": round(amount, 2),
+                        "share": round(share, 3),
+                        "change": None if change is None else round(change, 3),
+                    },
+                ),
+            )
+        )
+    return out
+
+
+def zscore_anomalies(tx: TxColumns) -> list[tuple[int, Finding]]:
+    """Expenses of the last RECENT_DAYS far above their category's trailing baseline."""
+    ncat = len(tx.categories)
+    size = len(tx.families) * ncat
+    if not size:
+        return []
+    keys = tx.family * ncat + tx.category
+    recent = tx.day >= tx.days - RECENT_DAYS
+    base = ~recent
+    n = np.bincount(keys[base], minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(keys[base], tx.amount[base], minlength=size) / n
+        dev = (tx.amount[base] - mean[keys[base]]) ** 2
+        std = np.sqrt(np.bincount(keys[base], dev, minlength=size) / n)
+
+    idx = np.flatnonzero(recent)
+    k = keys[idx]
+    ok = (n[k] >= MIN_BASELINE) & (std[k] > 0)
+    z = np.zeros(len(idx))
+    z[ok] = (tx.amount[idx[ok]] - mean[k[ok]]) / std[k[ok]]
+
+    out: list[tuple[int, Finding]] = []
+    for i in np.flatnonzero(z >= Z_THRESHOLD):
+        row, key = idx[i], k[i]
+        category = tx.categories[tx.category[row]]
+        day = tx.start + timedelta(days=int(tx.day[row]))
+        payee = tx.payees[tx.payee[row]] if tx.payee[row] >= 0 else ""
+        text = (
+            f"{day.isoformat()}: {tx.amount[row]:.0f} on {category}"
+            f"{f' ({payee})' if payee else ''}, usual {mean[key]:.0f} ± {std[key]:.0f}"
+        )
+        out.append(
+            (
+                int(tx.family[row]),
+                Finding(
+                    "anomaly",
+                    text,
+                    {
+                        "date": day.isoformat(),
+                        "category": category,
+                        "payee": payee,
+                        "amount": round(float(tx.amount[row]), 2),
+                        "baseline": round(float(mean[key]), 2),
+                        "z": round(float(z[i]), 1),
+                    },
+                ),
+            )
+        )
+    return out
+
+
+def _period_label(days: float) -> str:
+    if 6 <= days <= 8:
+        return "weekly"
+    if 13 <= days <= 16:
+        return "every two weeks"
+    if 27 <= days <= 32:
+        return "monthly"
+    return f"every {days:.0f} days"
+
+
+def recurring_payees(tx: TxColumns) -> list[tuple[int, Finding]]:
+    """Payees paid at a regular interval with a stable amount that are still active."""
+    has = tx.payee >= 0
+    npay = len(tx.payees)
+    if not has.any():
+        return []
+    keys = (tx.family * npay + tx.payee)[has]
+    day, amount = tx.day[has], tx.amount[has]
+    order = np.lexsort((day, keys))
+    keys, day, amount = keys[order], day[order], amount[order]
+    groups, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    gid = np.repeat(np.arange(len(groups)), counts)
+
+    gaps = np.diff(day)
+    valid = (gid[1:] == gid[:-1]) & (gaps > 0)  # same-day repeats are one payment
+    g, gap = gid[1:][valid], gaps[valid].astype(np.float64)
+    ng = np.bincount(g, minlength=len(groups))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period = np.bincount(g, gap, minlength=len(groups)) / ng
+        gap_cv = (
+            np.sqrt(np.bincount(g, (gap - period[g]) ** 2, minlength=len(groups)) / ng) / period
+        )
+        mean_amount = np.bincount(gid, amount) / counts
+        amount_cv = (
+            np.sqrt(np.bincount(gid, (amount - mean_amount[gid]) ** 2) / counts) / mean_amount
+        )
+    last = day[first + counts - 1]
+    active = (tx.days - 1 - last) <= 1.5 * period
+    hits = (
+        (ng >= RECURRING_MIN_PAYMENTS - 1)
+        & (period >= RECURRING_MIN_PERIOD)
+        & (gap_cv <= RECURRING_MAX_GAP_CV)
+        & (amount_cv <= RECURRING_MAX_AMOUNT_CV)
+        & active
+    )
+
+    out: list[tuple[int, Finding]] = []
+    for key, avg, days, payments, last_day in zip(
+        groups[hits].tolist(),
+        mean_amount[hits].tolist(),
+        period[hits].tolist(),
+        (ng[hits] + 1).tolist(),
+        last[hits].tolist(),
+        strict=True,
+    ):
+        f, p = divmod(key, npay)
+        next_day = tx.start + timedelta(days=last_day + round(days))
+        out.append(
+            (
+                f,
+                Finding(
+                    "recurring",
+                    f"{tx.payees[p]}: {avg:.0f} {_period_label(days)}, "
+                    f"next expected around {next_day.isoformat()}",
+                    {
+                        "payee": tx.payees[p],
+                        "amount": round(avg, 2),
+                        "period_days": round(days, 1),
+                        "payments": payments,
+                        "next_date": next_day.isoformat(),
+                    },
+                ),
+            )
+        )
+    return out
+
+
+def weekday_seasonality(tx: TxColumns) -> list[tuple[int, Finding]]:
+    """Families whose average expense differs strongly between weekdays."""
+    nf = len(tx.families)
+    if not nf:
+        return []
+    keys = tx.family * 7 + tx.weekday
+    sums = np.bincount(keys, tx.amount, minlength=nf * 7).reshape(nf, 7)
+    counts = np.bincount(keys, minlength=nf * 7).reshape(nf, 7)
+    active = counts > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = sums / counts
+    peak = np.where(active, avg, -np.inf).argmax(axis=1)
+    low = np.where(active, avg, np.inf).argmin(axis=1)
+    rows = np.arange(nf)
+    peak_avg, low_avg = avg[rows, peak], avg[rows, low]
+    hits = (active.sum(axis=1) >= MIN_ACTIVE_WEEKDAYS) & (peak_avg > low_avg * WEEKDAY_MIN_RATIO)
+
+    return [
+        (
+            int(f),
+            Finding(
+                "weekday",
+                f"Highest spending on {DAY_NAMES[peak[f]]}s (avg {peak_avg[f]:.0f}), "
+                f"lowest on {DAY_NAMES[low[f]]}s ({low_avg[f]:.0f})",
+                {
+                    "peak_day": DAY_NAMES[peak[f]],
+                    "peak_avg": round(float(peak_avg[f]), 2),
+                    "low_day": DAY_NAMES[low[f]],
+                    "low_avg": round(float(low_avg[f]), 2),
+                },
+            ),
+        )
+        for f in np.flatnonzero(hits)
+    ]
+
+
+def family_findings(tx: TxColumns, *, min_transactions: int = 0) -> dict[str, list[Finding]]:
+    """All family findings, keyed by family id (families with enough expenses only)."""
+    counts = np.bincount(tx.family, minlength=len(tx.families))
+    out: dict[str, list[Finding]] = {}
+    for analysis in (category_trends, zscore_anomalies, recurring_payees, weekday_seasonality):
+        for f, finding in analysis(tx):
+            if counts[f] >= min_transactions:
+                out.setdefault(tx.families[f], []).append(finding)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# User (cross-domain) findings
+# ---------------------------------------------------------------------------
+
+
+def _user_daily(ev: EventColumns, mask: np.ndarray, days: int, weights=None) -> np.ndarray:
+    """(users × days) event counts (or summed *weights*) for events in *mask*."""
+    size = len(ev.users) * days
+    cells = ev.user[mask] * days + ev.day[mask]
+    w = None if weights is None else weights[mask]
+    return np.bincount(cells, w, minlength=size).reshape(len(ev.users), days)
+
+
+def _family_rows(ev: EventColumns, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Each user's row of a (families × days) matrix; zeros for users without one."""
+    padded = np.vstack([matrix, np.zeros((1, matrix.shape[1]))])
+    return padded[ev.user_family], ev.user_family >= 0
+
+
+def _split_means(values: np.ndarray, a: np.ndarray, b: np.ndarray):
+    """Row-wise means of *values* under masks *a* and *b*, plus mask sizes."""
+    na, nb = a.sum(axis=1), b.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values * a).sum(axis=1) / na, (values * b).sum(axis=1) / nb, na, nb
+
+
+def mood_spending(tx: TxColumns, ev: EventColumns, spend: np.ndarray) -> list[tuple[int, Finding]]:
+    """Spending on good-mood (>= 4) vs low-mood (<= 2) days, with Pearson r."""
+    scored = (ev.kind == _MOOD) & ~np.isnan(ev.score)
+    if not scored.any():
+        return []
+    mood_sum = _user_daily(ev, scored, tx.days, ev.score)
+    mood_n = _user_daily(ev, scored, tx.days)
+    family_spend, _ = _family_rows(ev, spend)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mood = mood_sum / mood_n
+    common = (mood_n > 0) & (family_spend > 0)
+    good_avg, bad_avg, n_good, n_bad = _split_means(
+        family_spend, common & (mood >= 4), common & (mood <= 2)
+    )
+
+    n = common.sum(axis=1)
+    x, y = np.where(common, mood, 0.0), np.where(common, family_spend, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * (x * y).sum(1) - x.sum(1) * y.sum(1)
+        var = (n * (x * x).sum(1) - x.sum(1) ** 2) * (n * (y * y).sum(1) - y.sum(1) ** 2)
+        r = cov / np.sqrt(var)
+
+    out: list[tuple[int, Finding]] = []
+    eligible = (n >= 3) & (n_good > 0) & (n_bad > 0)
+    for u in np.flatnonzero(eligible & ((bad_avg > good_avg * 1.3) | (good_avg > bad_avg * 1.3))):
+        good, bad = float(good_avg[u]), float(bad_avg[u])
+        if bad > good:
+            text = (
+                f"Spending tends to increase on low-mood days "
+                f"(avg {bad:.0f} vs {good:.0f} on good days)"
+            )
+        else:
+            text = (
+                f"Spending tends to increase on good-mood days "
+                f"(avg {good:.0f} vs {bad:.0f} on low-mood days)"
+            )
+        corr = None if np.isnan(r[u]) else round(float(r[u]), 2)
+        out.append((int(u), Finding("mood_spending", text, {"good": good, "low": bad, "r": corr})))
+    return out
+
+
+def food_tracking(tx: TxColumns, ev: EventColumns, food_spend: np.ndarray):
+    """Food spending on days with vs without meal tracking."""
+    tracked = _user_daily(ev, ev.kind == _FOOD, tx.days) > 0
+    spend, has_family = _family_rows(ev, food_spend)
+    spent = spend > 0
+    tracked_avg, untracked_avg, n_tracked, n_untracked = _split_means(
+        spend, spent & tracked, spent & ~tracked
+    )
+    hits = (
+        has_family
+        & tracked.any(axis=1)
+        & (n_tracked > 0)
+        & (n_untracked >= 2)
+        & (untracked_avg > tracked_avg * 1.2)
+    )
+    return [
+        (
+            int(u),
+            Finding(
+                "food_tracking",
+                f"Food spending is lower on days you track meals "
+                f"(avg {tracked_avg[u]:.0f} vs {untracked_avg[u]:.0f})",
+                {"tracked": float(tracked_avg[u]), "untracked": float(untracked_avg[u])},
+            ),
+        )
+        for u in np.flatnonzero(hits)
+    ]
+
+
+def drink_spending(tx: TxColumns, ev: EventColumns, spend: np.ndarray):
+    """Spending on days with 3+ drinks vs other spending days."""
+    heavy = _user_daily(ev, ev.kind == _DRINK, tx.days) >= 3
+    family_spend, has_family = _family_rows(ev, spend)
+    spent = family_spend > 0
+    heavy_avg, normal_avg, n_heavy, n_normal = _split_means(
+        family_spend, spent & heavy, spent & ~heavy
+    )
+    hits = has_family & (n_heavy > 0) & (n_normal > 0) & (heavy_avg > normal_avg * 1.3)
+    return [
+        (
+            int(u),
+            Finding(
+                "drink_spending",
+                f"Spending is higher on days with 3+ drinks "
+                f"(avg {heavy_avg[u]:.0f} vs {normal_avg[u]:.0f})",
+                {"heavy": float(heavy_avg[u]), "normal": float(normal_avg[u])},
+            ),
+        )
+        for u in np.flatnonzero(hits)
+    ]
+
+
+def life_weekday_activity(tx: TxColumns, ev: EventColumns) -> list[tuple[int, Finding]]:
+    """Users whose life tracking concentrates on some weekdays."""
+    nu = len(ev.users)
+    if not len(ev):
+        return []
+    weekday = (tx.start.weekday() + ev.day) % 7
+    counts = np.bincount(ev.user * 7 + weekday, minlength=nu * 7).reshape(nu, 7)
+    active = counts > 0
+    most = counts.argmax(axis=1)
+    least = np.where(active, counts, np.iinfo(np.int64).max).argmin(axis=1)
+    rows = np.arange(nu)
+    hits = (active.sum(axis=1) >= MIN_ACTIVE_WEEKDAYS) & (
+        counts[rows, most] > counts[rows, least] * 2
+    )
+    return [
+        (
+            int(u),
+            Finding(
+                "life_weekday",
+                f"Most life-tracking activity on {DAY_NAMES[most[u]]}s "
+                f"({counts[u, most[u]]} events), least on "
+                f"{DAY_NAMES[least[u]]}s ({counts[u, least[u]]})",
+                {"most": DAY_NAMES[most[u]], "least": DAY_NAMES[least[u]]},
+            ),
+        )
+        for u in np.flatnonzero(hits)
+    ]
+
+
+def user_findings(
+    tx: TxColumns, ev: EventColumns, *, min_transactions: int = 0, min_events: int = 0
+) -> dict[str, list[Finding]]:
+    """Cross-domain findings keyed by user id.
+
+    A user is analysed when their family has at least *min_transactions*
+    expenses or they logged at least *min_events* life events.
+    """
+    nu = len(ev.users)
+    family_tx = np.bincount(tx.family, minlength=len(tx.families))
+    tx_per_user = np.r_[family_tx, 0][ev.user_family]  # -1 (no family) picks the 0
+    events_per_user = np.bincount(ev.user, minlength=nu)
+    eligible = (tx_per_user >= min_transactions) | (events_per_user >= min_events)
+
+    spend = tx.daily()
+    by_family: dict[int, list[Finding]] = {}
+    for f, finding in weekday_seasonality(tx):
+        by_family.setdefault(f, []).append(finding)
+
+    out: dict[str, list[Finding]] = {}
+    pairs = [
+        *mood_spending(tx, ev, spend),
+        *food_tracking(tx, ev, tx.daily(tx.food)),
+        *drink_spending(tx, ev, spend),
+        *((u, finding) for u in range(nu) for finding in by_family.get(int(ev.user_family[u]), [])),
+        *life_weekday_activity(tx, ev),
+    ]
+    for u, finding in pairs:
+        if eligible[u]:
+            out.setdefault(ev.users[u], []).append(finding)
+    return out
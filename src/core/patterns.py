@@ -1,37 +1,31 @@
-"""Financial pattern detection -- weekly LLM analysis of spending."""
+"""Financial pattern detection -- weekly analysis of spending.
+
+Trends, anomalies, recurring payments and weekday seasonality are computed
+statistically by ``src.core.pattern_engine``; the LLM only phrases those
+findings as patterns and recommendations.
+"""
 
 import json
 import logging
-import uuid
-from datetime import date, timedelta
-
-from sqlalchemy import select
 
 from src.core.db import async_session
 from src.core.llm.clients import google_client
-from src.core.models.category import Category
-from src.core.models.enums import TransactionType
-from src.core.models.transaction import Transaction
 from src.core.observability import observe
+from src.core.pattern_engine import Finding, family_findings, load_transactions
 
 logger = logging.getLogger(__name__)
 
-PATTERN_EXTRACTION_PROMPT = """
-Проанализируй транзакции пользователя и историю диалогов.
-Извлеки финансовые паттерны.
+PATTERN_PHRASING_PROMPT = """
+Ниже — результаты статистического анализа расходов семьи за последние 90 дней.
+Сформулируй их для пользователя. Не добавляй фактов, которых нет в данных.
 
-ТРАНЗАКЦИИ:
-{transactions}
+НАХОДКИ:
+{findings}
 
-СУЩЕСТВУЮЩИЕ ПАТТЕРНЫ:
-{existing_patterns}
-
-ИЗВЛЕКИ:
-1. ТРЕНДЫ РАСХОДОВ: рост/снижение в категориях?
-2. РЕГУЛЯРНЫЕ ПЛАТЕЖИ: новые подписки, повторяющиеся суммы?
-3. АНОМАЛИИ: нетипичные траты по сравнению с историей?
-4. ВРЕМЕННЫЕ ПАТТЕРНЫ: когда обычно тратит (день недели, время)?
-5. СМЕНА КАТЕГОРИЙ: меняются ли приоритеты расходов?
+ВЕРНИ:
+1. ПАТТЕРНЫ: тренды по категориям, регулярные платежи, дни недели.
+2. АНОМАЛИИ: необычные траты из раздела anomaly.
+3. РЕКОМЕНДАЦИИ: 1-3 практических совета по этим находкам.
 
 Верни JSON:
 {{
@@ -42,80 +36,73 @@ PATTERN_EXTRACTION_PROMPT = """
 """
 
 MIN_TRANSACTIONS_FOR_ANALYSIS = 5
+PATTERN_LOOKBACK_DAYS = 90
+
+PATTERN_MODEL = "gemini-3.1-flash-lite-preview"
+
+
+def pattern_prompt(findings: list[Finding]) -> str:
+    """Phrasing prompt for one family's statistical findings."""
+    lines = "\n".join(f"- [{f.kind}] {f.text}" for f in findings)
+    return PATTERN_PHRASING_PROMPT.format(findings=lines)
+
+
+def patterns_from_findings(findings: list[Finding]) -> dict:
+    """Unphrased fallback when the LLM does not answer: the findings as they are."""
+    return {
+        "patterns": [f.text for f in findings if f.kind != "anomaly"],
+        "anomalies": [f.text for f in findings if f.kind == "anomaly"],
+        "recommendations": [],
+    }
+
+
+def parse_patterns(family_id: str, text: str) -> dict | None:
+    """Extract the patterns JSON from an LLM response (may contain fences etc.)."""
+    start_idx = text.find("{")
+    end_idx = text.rfind("}") + 1
+    if start_idx >= 0 and end_idx > start_idx:
+        parsed: dict = json.loads(text[start_idx:end_idx])
+        logger.info(
+            "Pattern detection for family %s: %d patterns, %d anomalies, %d recs",
+            family_id,
+            len(parsed.get("patterns", [])),
+            len(parsed.get("anomalies", [])),
+            len(parsed.get("recommendations", [])),
+        )
+        return parsed
+
+    logger.warning("No JSON found in LLM response for family %s", family_id)
+    return None
 
 
 @observe(name="detect_patterns")
 async def detect_patterns(family_id: str) -> dict | None:
-    """Analyze last 30 days of transactions for a family and extract patterns.
+    """Detect spending patterns of one family and have the LLM phrase them.
 
     Returns a dict with keys ``patterns``, ``anomalies``, ``recommendations``
     or *None* when there is not enough data or the LLM call fails.
     """
-    today = date.today()
-    start = today - timedelta(days=30)
-
     async with async_session() as session:
-        result = await session.execute(
-            select(
-                Transaction.description,
-                Transaction.amount,
-                Transaction.date,
-                Transaction.merchant,
-                Category.name.label("category"),
-            )
-            .join(Category, Transaction.category_id == Category.id)
-            .where(
-                Transaction.family_id == uuid.UUID(family_id),
-                Transaction.date >= start,
-                Transaction.type == TransactionType.expense,
-            )
-            .order_by(Transaction.date.desc())
-            .limit(100)
-        )
-        transactions = result.all()
+        tx = await load_transactions(session, days=PATTERN_LOOKBACK_DAYS, family_id=family_id)
 
-    if len(transactions) < MIN_TRANSACTIONS_FOR_ANALYSIS:
+    if len(tx) < MIN_TRANSACTIONS_FOR_ANALYSIS:
         logger.debug(
             "Skipping pattern detection for family %s: only %d transactions",
             family_id,
-            len(transactions),
+            len(tx),
         )
         return None
-
-    # Format transactions for the prompt
-    tx_text = "\n".join(
-        f"- {t.date}: {t.category} | {t.merchant or t.description} | ${float(t.amount):.2f}"
-        for t in transactions
-    )
-
-    prompt = PATTERN_EXTRACTION_PROMPT.format(
-        transactions=tx_text,
-        existing_patterns="Нет предыдущих паттернов.",
-    )
+    findings = family_findings(tx).get(family_id)
+    if not findings:
+        return None
 
     try:
         client = google_client()
         response = await client.aio.models.generate_content(
-            model="gemini-3.1-flash-lite-preview",
-            contents=prompt,
+            model=PATTERN_MODEL,
+            contents=pattern_prompt(findings),
         )
-        text = response.text
-
-        # Extract JSON from LLM response (may contain markdown fences etc.)
-        start_idx = text.find("{")
-        end_idx = text.rfind("}") + 1
-        if start_idx >= 0 and end_idx > start_idx:
-            parsed: dict = json.loads(text[start_idx:end_idx])
-            logger.info(
-                "Pattern detection for family %s: %d patterns, %d anomalies, %d recs",
-                family_id,
-                len(parsed.get("patterns", [])),
-                len(parsed.get("anomalies", [])),
-                len(parsed.get("recommendations", [])),
-            )
-            return parsed
-
-        logger.warning("No JSON found in LLM response for family %s", family_id)
+        return parse_patterns(family_id, response.text)
     except Exception as e:
         logger.error("Pattern detection failed for family %s: %s", family_id, e)
 
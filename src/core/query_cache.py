@@ -0,0 +1,178 @@
+"""Read-through cache for family aggregate queries, validated by data version.
+
+Finance skills and the brief recompute the same family aggregates (category
+totals, income, period comparisons) within minutes of each other, often in
+the same conversation. Aggregates are cached in Redis under::
+
+    qcache:{family_id}:{role}:{user_id}:{shape}:v{version}:{params_hash}
+
+* ``role``/``user_id`` — the visibility scope the query was filtered with;
+* ``shape`` — a name for the query (``"financial_summary.categories"``);
+* ``version`` — the family's ``transactions`` data version from
+  ``family_data_versions``. Database triggers (migration 035) bump it on
+  every write to transactions or categories, whatever the writer: bot
+  skills, receipt scans, data tools, undo, Mini App CRUD, bulk deletes and
+  raw SQL. A write therefore moves readers to a new key; nothing has to be
+  deleted, stale entries just expire.
+
+Reading the version is one primary-key lookup, much cheaper than the
+aggregate it guards. If the version or Redis is unavailable the query runs
+uncached (``bypass``). Lookups are counted per shape in
+``finbot_query_cache_requests_total``; ``query_cache_report()`` turns them
+into hit rates for ``/ops/query-cache``.
+
+Cached values must be JSON-serializable (floats, not ``Decimal``).
+
+Usage::
+
+    @staticmethod
+    @cached_query("financial_summary.income")
+    async def _get_income_total(family_id, start, end, role="owner", user_id=""):
+        ...
+
+    totals = await cached_aggregate(
+        "report.month", lambda: _month_totals(session, ...),
+        family_id=family_id, role=role, user_id=user_id, params={"start": start},
+    )
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import select
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.models.family_data_version import FamilyDataVersion
+
+logger = logging.getLogger(__name__)
+
+DATA_DOMAIN = "transactions"
+_SCOPE_ARGS = ("family_id", "role", "user_id")
+_SKIP_ARGS = ("self", "cls", "session")
+
+QUERY_CACHE_REQUESTS = REGISTRY.counter(
+    "finbot_query_cache_requests_total",
+    "Family aggregate cache lookups by query shape and result (hit, miss, bypass).",
+    ("shape", "result"),
+)
+
+
+def params_hash(params: dict[str, Any]) -> str:
+    """Stable 16-char hash of the query parameters."""
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+async def data_version(family_id: str) -> int | None:
+    """The family's transactions data version (0 before its first write)."""
+    from src.core.db import async_session
+
+    async with async_session() as session:
+        version = await session.scalar(
+            select(FamilyDataVersion.version).where(
+                FamilyDataVersion.family_id == uuid.UUID(str(family_id)),
+                FamilyDataVersion.domain == DATA_DOMAIN,
+            )
+        )
+    if version is None:
+        return 0
+    return version if isinstance(version, int) else None
+
+
+async def cached_aggregate(
+    shape: str,
+    compute: Callable[[], Awaitable[Any]],
+    *,
+    family_id: str,
+    role: str = "owner",
+    user_id: str | None = "",
+    params: dict[str, Any] | None = None,
+    ttl: int | None = None,
+) -> Any:
+    """Return ``compute()`` for this family, scope and parameters, cached.
+
+    *compute* only runs on a miss; its result must be JSON-serializable.
+    """
+    if not settings.ff_query_cache or not family_id:
+        return await compute()
+
+    from src.core.db import redis
+
+    key = None
+    try:
+        version = await data_version(family_id)
+        if version is not None:
+            key = (
+                f"qcache:{family_id}:{role}:{user_id or '-'}:{shape}:"
+                f"v{version}:{params_hash(params or {})}"
+            )
+            raw = await redis.get(key)
+            if raw:
+                QUERY_CACHE_REQUESTS.inc(shape, "hit")
+                return json.loads(raw)
+    except Exception as e:
+        logger.debug("Query cache lookup failed for %s: %s", shape, e)
+        key = None
+
+    result = await compute()
+    if key is None:
+        QUERY_CACHE_REQUESTS.inc(shape, "bypass")
+        return result
+
+    QUERY_CACHE_REQUESTS.inc(shape, "miss")
+    try:
+        await redis.set(key, json.dumps(result), ex=ttl or settings.query_cache_ttl_seconds)
+    except Exception as e:
+        logger.debug("Query cache store failed for %s: %s", shape, e)
+    return result
+
+
+def cached_query(shape: str, *, ttl: int | None = None) -> Callable[[Callable], Callable]:
+    """Decorate an aggregate coroutine with ``cached_aggregate``.
+
+    The function must take ``family_id``; ``role`` and ``user_id`` are the
+    visibility scope when present. Every other argument except ``self``,
+    ``cls`` and ``session`` is part of the cache key.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            values = bound.arguments
+            params = {k: v for k, v in values.items() if k not in _SCOPE_ARGS + _SKIP_ARGS}
+            return await cached_aggregate(
+                shape,
+                lambda: fn(*args, **kwargs),
+                family_id=values["family_id"],
+                role=values.get("role", "owner"),
+                user_id=values.get("user_id", ""),
+                params=params,
+                ttl=ttl,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def query_cache_report() -> dict[str, dict[str, Any]]:
+    """Per-shape hit/miss/bypass counts and hit rate for this process."""
+    report: dict[str, dict[str, Any]] = {}
+    for (shape, result), count in QUERY_CACHE_REQUESTS.series.items():
+        entry = report.setdefault(shape, {"hit": 0, "miss": 0, "bypass": 0})
+        entry[result] = int(count)
+    for entry in report.values():
+        cacheable = entry["hit"] + entry["miss"]
+        entry["hit_rate"] = round(entry["hit"] / cacheable, 4) if cacheable else 0.0
+    return dict(sorted(report.items()))
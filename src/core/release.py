@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
+import time
 from datetime import UTC, datetime
 from typing import Any
 
 from src.core.config import settings
 from src.core.context import SessionContext
 from src.core.db import redis
+from src.core.metrics import REGISTRY
 from src.core.request_context import (
     get_current_correlation_id,
     get_current_release_enabled,
@@ -30,6 +33,13 @@ _RELEASE_OVERRIDE_KEY_PREFIX = "release_override"
 _RELEASE_ACTIONS_KEY_PREFIX = "release_actions"
 logger = logging.getLogger(__name__)
 
+RELEASE_EVENTS = REGISTRY.counter(
+    "finbot_release_events_total", "Release-health events recorded by this process.", ("event",)
+)
+# Release-health increments not yet written to Redis (flushed in batches).
+_pending_release_events: dict[str, int] = {}
+_last_release_flush = 0.0
+
 
 def _parse_csv(value: str) -> set[str]:
     return {item.strip() for item in value.split(",") if item.strip()}
@@ -230,31 +240,68 @@ _HEALTH_COUNTER_FIELDS = (
 async def reset_release_health_counters(actor: str) -> dict[str, Any]:
     """Reset all error/event counters for the active rollout, preserving rollout metadata."""
     key = _release_health_key()
+    _pending_release_events.clear()
     await redis.hdel(key, *_HEALTH_COUNTER_FIELDS)
     logger.info("Release health counters reset by %s (key=%s)", actor, key)
     return {"reset": True, "key": key, "actor": actor, "fields_cleared": list(_HEALTH_COUNTER_FIELDS)}
 
 
 async def record_release_event(event: str, increment: int = 1) -> None:
-    """Record a release-health counter for the active rollout."""
+    """Record a release-health counter for the active rollout.
+
+    Increments are buffered in-process and written to Redis in one pipeline
+    at most every ``release_health_flush_interval_s`` (and by
+    ``run_release_flusher`` / on shutdown), instead of several round-trips
+    per event.
+    """
     if not settings.release_health_logging:
         return
 
+    RELEASE_EVENTS.inc(event, amount=increment)
+    _pending_release_events[event] = _pending_release_events.get(event, 0) + increment
+    if time.monotonic() - _last_release_flush >= settings.release_health_flush_interval_s:
+        await flush_release_events()
+
+
+async def flush_release_events() -> int:
+    """Write buffered release-health increments to Redis; return events flushed."""
+    global _last_release_flush
+    _last_release_flush = time.monotonic()
+    if not _pending_release_events:
+        return 0
+
+    pending = dict(_pending_release_events)
+    _pending_release_events.clear()
     try:
         effective_runtime = await get_effective_release_runtime_state()
         key = _release_health_key()
-        await redis.hincrby(key, event, increment)
-        await redis.hset(
-            key,
-            mapping={
-                "rollout_name": effective_runtime["rollout_name"],
-                "rollout_percent": effective_runtime["rollout_percent"],
-                "shadow_mode": int(effective_runtime["shadow_mode"]),
-            },
-        )
-        await redis.expire(key, _RELEASE_HEALTH_TTL_SECONDS)
+        async with redis.pipeline(transaction=False) as pipe:
+            for event, increment in pending.items():
+                pipe.hincrby(key, event, increment)
+            pipe.hset(
+                key,
+                mapping={
+                    "rollout_name": effective_runtime["rollout_name"],
+                    "rollout_percent": effective_runtime["rollout_percent"],
+                    "shadow_mode": int(effective_runtime["shadow_mode"]),
+                },
+            )
+            pipe.expire(key, _RELEASE_HEALTH_TTL_SECONDS)
+            await pipe.execute()
     except Exception:
-        logger.debug("Release health counter update failed for %s", event, exc_info=True)
+        # Keep the counts for the next flush rather than dropping them.
+        for event, increment in pending.items():
+            _pending_release_events[event] = _pending_release_events.get(event, 0) + increment
+        logger.debug("Release health counter flush failed", exc_info=True)
+        return 0
+    return sum(pending.values())
+
+
+async def run_release_flusher() -> None:
+    """Flush buffered release events periodically (runs for the app's lifetime)."""
+    while True:
+        await asyncio.sleep(settings.release_health_flush_interval_s)
+        await flush_release_events()
 
 
 def _safe_rate(numerator: int, denominator: int) -> float:
@@ -294,6 +341,7 @@ async def get_release_health_snapshot() -> dict[str, Any]:
             "rollout_name": settings.release_rollout_name or "default",
         }
     effective_runtime = await get_effective_release_runtime_state()
+    await flush_release_events()
 
     try:
         metrics = await redis.hgetall(_release_health_key())
@@ -0,0 +1,222 @@
+"""Read-replica routing: lag monitoring and read-your-writes stickiness.
+
+``read_session()`` / ``rls_read_session()`` in ``src.core.db`` send heavy
+reads — reports, exports, Mini App stats, background scans — to the replica
+pool (``DATABASE_REPLICA_URL``) when it is safe to, and to the primary
+otherwise:
+
+* **Read-your-writes.** Committing a session that wrote rows marks the
+  families of those rows and the request's user/family as recent writers
+  for ``replica_sticky_seconds`` — in this process and in Redis, so other
+  replicas of the app see it too. A read for a recent writer goes to the
+  primary (callers that don't care pass ``read_your_writes=False``). ORM
+  flushes and bulk ``insert/update/delete`` statements are both covered;
+  raw SQL on a connection is not.
+* **Lag.** Replica lag is sampled at most every ``LAG_CHECK_SECONDS``. Above
+  ``replica_max_lag_seconds``, or when the replica can't be queried, reads
+  go to the primary until the next sample says otherwise. Keep
+  ``replica_sticky_seconds`` above the lag threshold so a writer is never
+  routed to a replica that hasn't replayed their write.
+
+Routing decisions are counted in ``finbot_db_read_routes_total``; the last
+lag sample is the ``db_replica_lag_seconds`` gauge and part of
+``/health/detailed``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.request_context import get_current_family_id, get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+LAG_CHECK_SECONDS = 5.0
+WRITE_KEY_PREFIX = "db:wrote:"
+_SESSION_KEY = "written_scopes"
+_LOCAL_WRITES_MAX = 10_000
+
+# Seconds since the last replayed transaction; 0 when the replica has
+# replayed everything it received (an idle primary is not lag).
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+REPLICA_LAG = REGISTRY.gauge("db_replica_lag_seconds", "Last sampled read-replica lag")
+READ_ROUTES = REGISTRY.counter(
+    "finbot_db_read_routes_total",
+    "Reads routed by read_session, by target (replica, primary) and reason.",
+    ("target", "reason"),
+)
+
+_lag: float | None = None
+_lag_checked_at = 0.0
+_lag_probe: asyncio.Task | None = None
+_local_writes: dict[str, float] = {}  # scope -> monotonic expiry
+_background: set[asyncio.Task] = set()
+
+
+def _scopes(family_id: Any, user_id: Any) -> list[str]:
+    scopes = []
+    if family_id:
+        scopes.append(f"family:{family_id}")
+    if user_id:
+        scopes.append(f"user:{user_id}")
+    return scopes
+
+
+# --- Write tracking --------------------------------------------------------------
+
+
+def _context_scopes(session: Session) -> set[str]:
+    scopes = session.info.setdefault(_SESSION_KEY, set())
+    scopes.update(_scopes(get_current_family_id(), get_current_user_id()))
+    return scopes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_scopes(session: Session, flush_context: Any) -> None:
+    if not settings.database_replica_url:
+        return
+    scopes = _context_scopes(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        # __dict__ rather than getattr: never trigger a lazy load here
+        family_id = obj.__dict__.get("family_id")
+        if family_id:
+            scopes.add(f"family:{family_id}")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_write_scopes(orm_execute_state: Any) -> None:
+    if not settings.database_replica_url:
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _context_scopes(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_written_scopes(session: Session) -> None:
+    scopes = session.info.pop(_SESSION_KEY, None)
+    if not scopes:
+        return
+    mark_recent_write(scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_scopes(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def mark_recent_write(scopes: set[str] | list[str]) -> None:
+    """Route reads for *scopes* to the primary for ``replica_sticky_seconds``."""
+    now = time.monotonic()
+    expires = now + settings.replica_sticky_seconds
+    if len(_local_writes) > _LOCAL_WRITES_MAX:
+        for scope in [s for s, t in _local_writes.items() if t <= now]:
+            del _local_writes[scope]
+    for scope in scopes:
+        _local_writes[scope] = expires
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_publish(list(scopes)))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _publish(scopes: list[str]) -> None:
+    try:
+        from src.core.db import redis
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.set(f"{WRITE_KEY_PREFIX}{scope}", "1", ex=settings.replica_sticky_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.debug("Recent-write marker publish failed: %s", e)
+
+
+async def wrote_recently(family_id: Any, user_id: Any) -> bool:
+    """Whether the family or user committed a write within the sticky window."""
+    scopes = _scopes(family_id, user_id)
+    if not scopes:
+        return False
+    now = time.monotonic()
+    if any(_local_writes.get(scope, 0) > now for scope in scopes):
+        return True
+    try:
+        from src.core.db import redis
+
+        return any(await redis.mget([f"{WRITE_KEY_PREFIX}{s}" for s in scopes]))
+    except Exception:
+        return True  # unknown — the primary is always consistent
+
+
+# --- Lag monitoring ----------------------------------------------------------------
+
+
+async def _sample_lag(engine: Any) -> float | None:
+    global _lag, _lag_checked_at
+    try:
+        async with engine.connect() as conn:
+            lag = float((await conn.execute(_LAG_SQL)).scalar() or 0.0)
+        REPLICA_LAG.set(lag)
+    except Exception as e:
+        logger.warning("Read replica unavailable, reading from the primary: %s", e)
+        lag = None
+    _lag, _lag_checked_at = lag, time.monotonic()
+    return lag
+
+
+async def replica_lag(engine: Any) -> float | None:
+    """Replica lag in seconds (sampled every ``LAG_CHECK_SECONDS``); None if down."""
+    global _lag_probe
+    if time.monotonic() - _lag_checked_at < LAG_CHECK_SECONDS:
+        return _lag
+    # One probe at a time; concurrent readers share its result
+    if _lag_probe is None or _lag_probe.done():
+        _lag_probe = asyncio.ensure_future(_sample_lag(engine))
+    return await asyncio.shield(_lag_probe)
+
+
+async def route_read(
+    engine: Any, family_id: Any, user_id: Any, read_your_writes: bool = True
+) -> str:
+    """``"replica"`` or ``"primary"`` for a read in this family/user scope."""
+    if engine is None:
+        return "primary"
+    if read_your_writes and await wrote_recently(family_id, user_id):
+        target, reason = "primary", "read_your_writes"
+    else:
+        lag = await replica_lag(engine)
+        if lag is None:
+            target, reason = "primary", "replica_down"
+        elif lag > settings.replica_max_lag_seconds:
+            target, reason = "primary", "lag"
+        else:
+            target, reason = "replica", "ok"
+    READ_ROUTES.inc(target, reason)
+    return target
+
+
+def replica_status() -> dict[str, Any]:
+    """Replica configuration, last lag sample and routing counts for health checks."""
+    if not settings.database_replica_url:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "lag_seconds": _lag,
+        "max_lag_seconds": settings.replica_max_lag_seconds,
+        "healthy": _lag is not None and _lag <= settings.replica_max_lag_seconds,
+        "routes": {"/".join(k): v for k, v in READ_ROUTES.series.items()},
+    }
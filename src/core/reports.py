@@ -5,17 +5,19 @@ import logging
 import uuid
 from collections import Counter
 from datetime import date
+from typing import Any
 
 from jinja2 import BaseLoader, Environment
 from sqlalchemy import func, select
 
 from src.core.access import apply_scope_filter, apply_visibility_filter
-from src.core.db import async_session
+from src.core.db import rls_read_session
 from src.core.models.category import Category
 from src.core.models.enums import LifeEventType, TransactionType
 from src.core.models.life_event import LifeEvent
 from src.core.models.transaction import Transaction
 from src.core.observability import observe
+from src.core.query_cache import cached_aggregate, cached_query
 
 logger = logging.getLogger(__name__)
 
@@ -780,13 +782,14 @@ def render_report_html(
     )
 
 
+@cached_query("report.has_transactions")
 async def has_transactions_for_period(
     family_id: str, year: int, month: int, role: str = "owner", user_id: str = "",
 ) -> bool:
     """Check if any transactions exist for the given year/month."""
     start_date = date(year, month, 1)
     end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
-    async with async_session() as session:
+    async with rls_read_session(family_id, user_id or None) as session:
         stmt = select(func.count()).select_from(Transaction).where(
             Transaction.family_id == uuid.UUID(family_id),
             Transaction.date >= start_date,
@@ -800,6 +803,99 @@ async def has_transactions_for_period(
         return (result.scalar() or 0) > 0
 
 
+async def _month_totals(
+    session: Any,
+    family_id: str,
+    start_date: date,
+    end_date: date,
+    role: str,
+    user_id: str | None,
+) -> dict[str, Any]:
+    """Expense/income totals and per-category rows for a month (four queries)."""
+    # Get expenses by category
+    expense_stmt = (
+        select(
+            Category.name,
+            Category.icon,
+            func.sum(Transaction.amount).label("total"),
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .where(
+            Transaction.family_id == uuid.UUID(family_id),
+            Transaction.date >= start_date,
+            Transaction.date < end_date,
+            Transaction.type == TransactionType.expense,
+        )
+        .group_by(Category.name, Category.icon)
+        .order_by(func.sum(Transaction.amount).desc())
+    )
+    expense_result = await session.execute(
+        apply_visibility_filter(expense_stmt, Transaction, role, user_id)
+        if user_id
+        else apply_scope_filter(expense_stmt, Transaction, role)
+    )
+    expense_rows = expense_result.all()
+
+    # Get total expense
+    total_exp_stmt = select(func.sum(Transaction.amount)).where(
+        Transaction.family_id == uuid.UUID(family_id),
+        Transaction.date >= start_date,
+        Transaction.date < end_date,
+        Transaction.type == TransactionType.expense,
+    )
+    total_exp_result = await session.execute(
+        apply_visibility_filter(total_exp_stmt, Transaction, role, user_id)
+        if user_id
+        else apply_scope_filter(total_exp_stmt, Transaction, role)
+    )
+    total_expense = float(total_exp_result.scalar() or 0)
+
+    # Get income by category
+    income_stmt = (
+        select(
+            Category.name,
+            Category.icon,
+            func.sum(Transaction.amount).label("total"),
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .where(
+            Transaction.family_id == uuid.UUID(family_id),
+            Transaction.date >= start_date,
+            Transaction.date < end_date,
+            Transaction.type == TransactionType.income,
+        )
+        .group_by(Category.name, Category.icon)
+        .order_by(func.sum(Transaction.amount).desc())
+    )
+    income_result = await session.execute(
+        apply_visibility_filter(income_stmt, Transaction, role, user_id)
+        if user_id
+        else apply_scope_filter(income_stmt, Transaction, role)
+    )
+    income_rows = income_result.all()
+
+    # Get total income
+    total_inc_stmt = select(func.sum(Transaction.amount)).where(
+        Transaction.family_id == uuid.UUID(family_id),
+        Transaction.date >= start_date,
+        Transaction.date < end_date,
+        Transaction.type == TransactionType.income,
+    )
+    total_inc_result = await session.execute(
+        apply_visibility_filter(total_inc_stmt, Transaction, role, user_id)
+        if user_id
+        else apply_scope_filter(total_inc_stmt, Transaction, role)
+    )
+    total_income = float(total_inc_result.scalar() or 0)
+
+    return {
+        "expense_rows": [[name, icon, float(total)] for name, icon, total in expense_rows],
+        "total_expense": total_expense,
+        "income_rows": [[name, icon, float(total)] for name, icon, total in income_rows],
+        "total_income": total_income,
+    }
+
+
 @observe(name="generate_report")
 async def generate_monthly_report(
     family_id: str,
@@ -826,82 +922,19 @@ async def generate_monthly_report(
     else:
         end_date = date(year, month + 1, 1)
 
-    async with async_session() as session:
-        # Get expenses by category
-        expense_stmt = (
-            select(
-                Category.name,
-                Category.icon,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .join(Category, Transaction.category_id == Category.id)
-            .where(
-                Transaction.family_id == uuid.UUID(family_id),
-                Transaction.date >= start_date,
-                Transaction.date < end_date,
-                Transaction.type == TransactionType.expense,
-            )
-            .group_by(Category.name, Category.icon)
-            .order_by(func.sum(Transaction.amount).desc())
-        )
-        expense_result = await session.execute(
-            apply_visibility_filter(expense_stmt, Transaction, role, user_id)
-            if user_id
-            else apply_scope_filter(expense_stmt, Transaction, role)
-        )
-        expense_rows = expense_result.all()
-
-        # Get total expense
-        total_exp_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.family_id == uuid.UUID(family_id),
-            Transaction.date >= start_date,
-            Transaction.date < end_date,
-            Transaction.type == TransactionType.expense,
-        )
-        total_exp_result = await session.execute(
-            apply_visibility_filter(total_exp_stmt, Transaction, role, user_id)
-            if user_id
-            else apply_scope_filter(total_exp_stmt, Transaction, role)
-        )
-        total_expense = float(total_exp_result.scalar() or 0)
-
-        # Get income by category
-        income_stmt = (
-            select(
-                Category.name,
-                Category.icon,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .join(Category, Transaction.category_id == Category.id)
-            .where(
-                Transaction.family_id == uuid.UUID(family_id),
-                Transaction.date >= start_date,
-                Transaction.date < end_date,
-                Transaction.type == TransactionType.income,
-            )
-            .group_by(Category.name, Category.icon)
-            .order_by(func.sum(Transaction.amount).desc())
-        )
-        income_result = await session.execute(
-            apply_visibility_filter(income_stmt, Transaction, role, user_id)
-            if user_id
-            else apply_scope_filter(income_stmt, Transaction, role)
-        )
-        income_rows = income_result.all()
-
-        # Get total income
-        total_inc_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.family_id == uuid.UUID(family_id),
-            Transaction.date >= start_date,
-            Transaction.date < end_date,
-            Transaction.type == TransactionType.income,
-        )
-        total_inc_result = await session.execute(
-            apply_visibility_filter(total_inc_stmt, Transaction, role, user_id)
-            if user_id
-            else apply_scope_filter(total_inc_stmt, Transaction, role)
+    async with rls_read_session(family_id, user_id) as session:
+        totals = await cached_aggregate(
+            "report.month_totals",
+            lambda: _month_totals(session, family_id, start_date, end_date, role, user_id),
+            family_id=family_id,
+            role=role,
+            user_id=user_id,
+            params={"start": start_date, "end": end_date},
         )
-        total_income = float(total_inc_result.scalar() or 0)
+        expense_rows = totals["expense_rows"]
+        total_expense = totals["total_expense"]
+        income_rows = totals["income_rows"]
+        total_income = totals["total_income"]
 
         # Get life events for the period
         life_events: list[LifeEvent] = []
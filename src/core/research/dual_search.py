@@ -146,6 +146,27 @@ async def dual_search(
     if not settings.xai_api_key or not settings.ff_dual_search:
         return await gemini_searcher(query, language, original_message)
 
+    from src.core.research.search_cache import cached_search
+
+    lang = language if language in _ERROR_MESSAGES else "en"
+    searcher_name = getattr(gemini_searcher, "__name__", "search").strip("_")
+    return await cached_search(
+        f"dual:{searcher_name}",
+        query,
+        language,
+        lambda: _dual_search(query, language, original_message, gemini_searcher, trace_user_id),
+        original_message=original_message,
+        cacheable=lambda answer: bool(answer) and answer != _ERROR_MESSAGES[lang],
+    )
+
+
+async def _dual_search(
+    query: str,
+    language: str,
+    original_message: str,
+    gemini_searcher: Callable[..., Coroutine[Any, Any, str]],
+    trace_user_id: str,
+) -> str:
     t0 = time.monotonic()
 
     gemini_result, grok_result = await asyncio.gather(
@@ -0,0 +1,246 @@
+"""Shared answer cache for grounded web and places search.
+
+``search_and_answer``, ``search_places_grounding`` and ``dual_search`` run a
+grounded LLM search on every call, although many queries are neither
+personal nor different between users ("weather in Berlin", "EUR to USD",
+"best sushi near Times Square"). Answers are cached in Redis under::
+
+    search:{kind}:{language}:{hash(normalized query, locale, message)}
+
+where ``kind`` names the searcher (``web``, ``places``, ``dual:web``),
+``locale`` is whatever location context the prompt was given and
+``message`` is the user's normalized original message. The searchers build
+their prompt from the full message, so its names, amounts and constraints
+shape the answer; keying on it keeps one user's answer from being served
+for another user's message that merely maps to the same search query (a
+message that is just the query is keyed like the bare query).
+
+How long an answer stays fresh depends on its tier, picked by
+``classify_freshness`` from keywords alone — no LLM call:
+
+* ``news``      — 10 minutes: news, prices, rates, currencies and amounts,
+  weather, "today", "now";
+* ``places``    — 1 day: place lookups and directions;
+* ``evergreen`` — 7 days: everything else.
+
+Past its tier an answer is still served for as long again
+(stale-while-revalidate) while one caller refreshes it in the background.
+Queries that look personal (first-person pronouns, e-mail addresses, phone
+numbers) bypass the cache, as do error and fallback answers. Lookups are
+counted in ``finbot_search_cache_total``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FRESHNESS_TIERS = {"news": 600, "places": 86400, "evergreen": 7 * 86400}
+STALE_FACTOR = 2  # serve stale answers until STALE_FACTOR × tier age
+_REFRESH_LOCK_SECONDS = 60
+
+SEARCH_CACHE = REGISTRY.counter(
+    "finbot_search_cache_total",
+    "Search answer cache lookups by kind and result (fresh, stale, miss, bypass).",
+    ("kind", "result"),
+)
+
+_NEWS_WORDS = frozenset(
+    # en
+    "today tonight now currently current latest news breaking live weather forecast "
+    "price prices rate rates exchange stock stocks score scores results traffic "
+    "yesterday tomorrow week open "
+    # ru
+    "сегодня сейчас новости последние погода прогноз курс цена цены стоимость "
+    "акции счет результаты вчера завтра открыто "
+    # es
+    "hoy ahora noticias último últimas clima tiempo pronóstico precio precios cambio "
+    "acciones resultados ayer mañana abierto".split()
+)
+_PLACE_WORDS = frozenset(
+    "near nearby restaurant restaurants cafe cafes bar bars hotel hotels shop store "
+    "directions address museum pharmacy gym "
+    "рядом ресторан рестораны кафе бар отель гостиница магазин адрес музей аптека "
+    "cerca restaurante restaurantes café hotel tienda dirección museo farmacia".split()
+)
+_PERSONAL_WORDS = frozenset(
+    "my mine me our ours "
+    "мой моя моё мое мои моего моей моих мне меня мной наш наша наше наши "
+    "mi mis mío mía nuestro nuestra nuestros nuestras".split()
+)
+_CURRENCY_PAIR = re.compile(r"\b[a-z]{3} (?:to|in|vs) [a-z]{3}\b")
+# Currency symbols, codes and names; an amount glued to a code ("100usd") counts
+_CURRENCY = re.compile(
+    r"[$€£₽¥₴₸]|(?:\b|(?<=\d))(?:usd|eur|gbp|rub|jpy|cny|chf|uah|kzt|"
+    r"dollars?|euros?|pounds?|rubles?|roubles?|yen|yuan|"
+    r"доллар\w*|евро|рубл\w*|руб|фунт\w*|юан\w*|гривн\w*|тенге|"
+    r"dólar(?:es)?|pesos?|libras?)\b"
+)
+# Symbols that change what a query asks for: "$100" vs "€100", "c++" vs "c#"
+_KEPT_SYMBOLS = "$€£₽¥₴₸+#%<>"
+_STRIPPED = re.compile(rf"[^\w\s{re.escape(_KEPT_SYMBOLS)}]")
+_YEAR = re.compile(r"\b20\d\d\b")
+_EMAIL = re.compile(r"\S+@\S+\.\w+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+_background: set[asyncio.Task] = set()
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form of a query.
+
+    Currency, math and language symbols (``$€£₽+#%<>``) are kept.
+    """
+    return " ".join(_STRIPPED.sub(" ", query.casefold()).split())
+
+
+def is_personal(*texts: str) -> bool:
+    """True if any text refers to the user or contains contact details."""
+    for text in texts:
+        if not text:
+            continue
+        if _EMAIL.search(text) or _PHONE.search(text):
+            return True
+        if _PERSONAL_WORDS.intersection(normalize_query(text).split()):
+            return True
+    return False
+
+
+def classify_freshness(query: str, kind: str = "web") -> str:
+    """Pick the freshness tier of a query from its wording."""
+    normalized = normalize_query(query)
+    words = set(normalized.split())
+    if (
+        words & _NEWS_WORDS
+        or _CURRENCY_PAIR.search(normalized)
+        or _CURRENCY.search(normalized)
+        or _YEAR.search(normalized)
+    ):
+        return "news"
+    if kind.endswith("places") or words & _PLACE_WORDS:
+        return "places"
+    return "evergreen"
+
+
+def cache_key(kind: str, query: str, language: str, locale: str = "", message: str = "") -> str:
+    normalized = normalize_query(query)
+    # A message that is just the query adds nothing the answer could depend on
+    context = normalize_query(message)
+    if context == normalized:
+        context = ""
+    raw = f"{normalized}\x1f{normalize_query(locale)}\x1f{context}"
+    digest = hashlib.sha256(raw.encode()).hexdigest()[:24]
+    return f"search:{kind}:{language or 'en'}:{digest}"
+
+
+async def cached_search(
+    kind: str,
+    query: str,
+    language: str,
+    fetch: Callable[[], Awaitable[str]],
+    *,
+    locale: str = "",
+    original_message: str = "",
+    cacheable: Callable[[str], bool] = bool,
+) -> str:
+    """Return ``fetch()``'s answer for *query*, shared across users while fresh.
+
+    *cacheable* decides whether an answer may be stored (error and fallback
+    answers should not be).
+    """
+    if not settings.ff_search_cache or not normalize_query(query):
+        return await fetch()
+    if is_personal(query, original_message):
+        SEARCH_CACHE.inc(kind, "bypass")
+        return await fetch()
+
+    from src.core.db import redis
+
+    key = cache_key(kind, query, language, locale, original_message)
+    tier = classify_freshness(query, kind)
+    try:
+        raw = await redis.get(key)
+    except Exception as e:
+        logger.debug("Search cache lookup failed for %s: %s", key, e)
+        raw = None
+
+    if raw:
+        entry = json.loads(raw)
+        age = time.time() - entry["fetched_at"]
+        if age < FRESHNESS_TIERS[tier]:
+            SEARCH_CACHE.inc(kind, "fresh")
+            return entry["answer"]
+        SEARCH_CACHE.inc(kind, "stale")
+        await _revalidate(key, tier, fetch, cacheable)
+        return entry["answer"]
+
+    SEARCH_CACHE.inc(kind, "miss")
+    answer = await fetch()
+    if cacheable(answer):
+        await _store(key, tier, answer)
+    return answer
+
+
+async def _store(key: str, tier: str, answer: str) -> None:
+    from src.core.db import redis
+
+    entry = {"answer": answer, "fetched_at": time.time(), "tier": tier}
+    try:
+        await redis.set(key, json.dumps(entry), ex=FRESHNESS_TIERS[tier] * STALE_FACTOR)
+    except Exception as e:
+        logger.debug("Search cache store failed for %s: %s", key, e)
+
+
+async def _revalidate(
+    key: str, tier: str, fetch: Callable[[], Awaitable[str]], cacheable: Callable[[str], bool]
+) -> None:
+    """Refresh a stale entry in the background; only one caller refreshes."""
+    from src.core.db import redis
+
+    try:
+        if not await redis.set(f"{key}:refresh", "1", nx=True, ex=_REFRESH_LOCK_SECONDS):
+            return
+    except Exception as e:
+        logger.debug("Search cache refresh lock failed for %s: %s", key, e)
+        return
+
+    async def _refresh() -> None:
+        try:
+            answer = await fetch()
+        except Exception as e:
+            logger.warning("Search cache refresh failed for %s: %s", key, e)
+            return
+        if cacheable(answer):
+            await _store(key, tier, answer)
+
+    task = asyncio.create_task(_refresh())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def search_cache_report(snapshot: dict[str, Any] | None = None) -> dict[str, dict[str, Any]]:
+    """Per-kind lookup counts and hit rate (fresh + stale over cacheable lookups)."""
+    if snapshot is None:
+        series = SEARCH_CACHE.series.items()
+    else:
+        series = snapshot.get(SEARCH_CACHE.name, {}).get("series", {}).items()
+    report: dict[str, dict[str, Any]] = {}
+    for (kind, result), count in series:
+        entry = report.setdefault(kind, {"fresh": 0, "stale": 0, "miss": 0, "bypass": 0})
+        entry[result] = int(count)
+    for entry in report.values():
+        served = entry["fresh"] + entry["stale"]
+        total = served + entry["miss"]
+        entry["hit_rate"] = round(served / total, 4) if total else 0.0
+    return dict(sorted(report.items()))
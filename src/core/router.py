@@ -22,7 +22,7 @@ from src.core.conversation_analytics import (
     schedule_review_trace_capture,
     submit_user_feedback,
 )
-from src.core.db import async_session
+from src.core.db import async_session, read_session
 from src.core.db import redis as redis_client
 from src.core.domain_router import DomainRouter
 from src.core.family import create_family
@@ -31,7 +31,7 @@ from src.core.guardrails import check_input
 from src.core.intent import detect_intent, detect_intent_v2
 from src.core.llm.clients import generate_text
 from src.core.memory import sliding_window
-from src.core.memory.summarization import summarize_dialog
+from src.core.metrics import request_scope
 from src.core.models.conversation import ConversationMessage
 from src.core.models.document import Document
 from src.core.models.enums import (
@@ -360,45 +360,48 @@ _LAST_FILE_TTL = 300  # 5 minutes
 
 
 async def _cache_last_file(user_id: str, message: IncomingMessage) -> None:
-    """Cache file data from a document/photo message in Redis for follow-up conversion."""
+    """Remember the last document/photo for follow-up conversion.
+
+    The bytes go to the blob store; Redis only holds metadata and the handle.
+    """
     import json
 
     try:
+        from src.core.blob_store import get_blob_store
         from src.core.db import redis
 
         file_bytes = message.document_bytes or message.photo_bytes
         if not file_bytes or len(file_bytes) > 20 * 1024 * 1024:
             return
 
-        key_data = f"last_file:{user_id}:data"
-        key_meta = f"last_file:{user_id}:meta"
+        mime = message.document_mime_type or ("image/jpeg" if message.photo_bytes else None)
+        handle = await get_blob_store().put(file_bytes, mime or "application/octet-stream")
         meta = {
-            "mime": message.document_mime_type or ("image/jpeg" if message.photo_bytes else None),
+            "blob": handle,
+            "mime": mime,
             "name": message.document_file_name or ("photo.jpg" if message.photo_bytes else None),
             "is_photo": bool(message.photo_bytes and not message.document_bytes),
         }
-        await redis.set(key_data, file_bytes, ex=_LAST_FILE_TTL)
-        await redis.set(key_meta, json.dumps(meta), ex=_LAST_FILE_TTL)
+        await redis.set(f"last_file:{user_id}:meta", json.dumps(meta), ex=_LAST_FILE_TTL)
     except Exception as e:
         logger.warning("Failed to cache last file: %s", e)
 
 
 async def _get_cached_file(user_id: str) -> dict | None:
-    """Retrieve cached file data from Redis (non-destructive, TTL handles cleanup)."""
+    """Retrieve the last cached file (non-destructive, TTL handles cleanup)."""
     import json
 
     try:
+        from src.core.blob_store import get_blob_store
         from src.core.db import redis
 
-        key_data = f"last_file:{user_id}:data"
-        key_meta = f"last_file:{user_id}:meta"
-        meta_raw = await redis.get(key_meta)
+        meta_raw = await redis.get(f"last_file:{user_id}:meta")
         if not meta_raw:
             return None
-        data = await redis.get(key_data)
+        meta = json.loads(meta_raw)
+        data = await get_blob_store().get(meta.get("blob"))
         if not data:
             return None
-        meta = json.loads(meta_raw)
         return {
             "bytes": data,
             "mime": meta.get("mime"),
@@ -476,7 +479,8 @@ async def handle_message(
         except Exception as e:
             logger.warning("Failed to ensure active user session: %s", e)
 
-        response = await _dispatch_message(message, context, registry)
+        with request_scope():
+            response = await _dispatch_message(message, context, registry)
         resolved_tags = get_current_analytics_tags() or []
         resolved_intent = get_current_request_intent()
         outcome = "success"
@@ -1077,8 +1081,8 @@ async def _dispatch_message(
     except Exception as e:
         logger.debug("Usage logging failed: %s", e)
 
-    # Layer 5: Trigger incremental dialog summarization in the background
-    asyncio.create_task(summarize_dialog(context.user_id, context.family_id))
+    # Layer 5: dialog summarization runs from the ``summary`` timer that
+    # persisting the message schedules (src.core.tasks.summary_tasks)
 
     # C2: Write key facts to session buffer for immediate availability
     try:
@@ -1213,22 +1217,27 @@ async def _handle_slash_command(
             )
 
     if text == "/export":
-        import json
+        import tempfile
 
         from src.core.gdpr import MemoryGDPR
 
         gdpr = MemoryGDPR()
+        # Spool the streamed archive so large exports go to disk, not RAM; the
+        # gateway uploads it from the file in chunks and closes it.
+        archive = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
         try:
-            async with async_session() as session:
-                data = await gdpr.export_user_data(session, context.user_id)
-            json_bytes = json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+            async with read_session() as session:
+                async for chunk in gdpr.iter_export_zip(session, context.user_id):
+                    archive.write(chunk)
+            archive.seek(0)
             return OutgoingMessage(
-                text="Ваши данные:",
+                text="Ваши данные (ZIP, по файлу NDJSON на раздел):",
                 chat_id=message.chat_id,
-                document=json_bytes,
-                document_name="my_data.json",
+                document_file=archive,
+                document_name="my_data.zip",
             )
         except Exception as e:
+            archive.close()
             logger.error("GDPR export failed: %s", e)
             return OutgoingMessage(text="Ошибка при экспорте данных.", chat_id=message.chat_id)
 
@@ -1640,9 +1649,6 @@ async def _run_post_skill_side_effects(
     except Exception:
         pass
 
-    # Dialog summarization
-    asyncio.create_task(summarize_dialog(context.user_id, context.family_id))
-
     # Session buffer facts
     try:
         from src.core.memory.mem0_domains import get_domain_for_category
@@ -2001,12 +2007,24 @@ async def _execute_pending_action(
             )
 
         elif intent == "delete_all":
-            from src.core.gdpr import MemoryGDPR
+            from src.core.gdpr import start_user_erasure
 
-            gdpr = MemoryGDPR()
-            async with async_session() as session:
-                await gdpr.delete_user_data(session, context.user_id)
-            result_text = "Все ваши данные удалены. Для нового старта отправьте /start"
+            await start_user_erasure(
+                context.user_id,
+                channel=message.channel,
+                sender_id=message.channel_user_id or message.user_id,
+                chat_id=message.chat_id,
+            )
+            result_text = (
+                "Удаление всех ваших данных запущено и займёт несколько минут. "
+                "Пока оно идёт, новые сообщения не обрабатываются. "
+                + (
+                    "Мы напишем, когда всё будет удалено — после этого можно "
+                    "начать заново через /start"
+                    if message.channel == "telegram"
+                    else "Когда всё будет удалено, можно начать заново."
+                )
+            )
 
         elif intent == "voice_tool_execution":
             from src.voice.tool_adapter import execute_pending_voice_tool
@@ -3819,6 +3837,17 @@ def _resolve_receipt_category_for_scope(
     return context.categories[0]["id"]
 
 
+async def _pending_image_bytes(pending: dict) -> bytes | None:
+    """Image bytes for a pending scan: blob handle, or legacy inline base64."""
+    if pending.get("image_blob"):
+        from src.core.blob_store import get_blob_store
+
+        return await get_blob_store().get(pending["image_blob"])
+    if pending.get("image_b64"):
+        return base64.b64decode(pending["image_b64"])
+    return None
+
+
 async def _save_scanned_document(
     pending_id: str,
     message: IncomingMessage,
@@ -3840,7 +3869,6 @@ async def _save_scanned_document(
 
     doc_type = pending["doc_type"]
     ocr_data = pending["ocr_data"]
-    image_b64 = pending["image_b64"]
     mime_type = pending["mime_type"]
     fallback_used = pending["fallback_used"]
 
@@ -3855,7 +3883,7 @@ async def _save_scanned_document(
     }
 
     # Upload image to Supabase Storage before opening the DB session
-    image_bytes = base64.b64decode(image_b64) if image_b64 else None
+    image_bytes = await _pending_image_bytes(pending)
     storage_path = "pending"
     if image_bytes:
         ext = mime_type.split("/")[-1] if "/" in mime_type else "bin"
@@ -3876,7 +3904,11 @@ async def _save_scanned_document(
                 type=doc_type_enum_map.get(doc_type, DocumentType.other),
                 storage_path=storage_path,
                 ocr_model=ocr_model,
-                ocr_raw={"image_b64": image_b64, "mime_type": mime_type},
+                # The image itself lives at storage_path; keep only its digest here.
+                ocr_raw={
+                    "image_sha256": (pending.get("image_blob") or "").rpartition("/")[2] or None,
+                    "mime_type": mime_type,
+                },
                 ocr_parsed=ocr_data,
                 ocr_confidence=Decimal("0.9"),
                 ocr_fallback_used=fallback_used,
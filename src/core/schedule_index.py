@@ -0,0 +1,115 @@
+"""Timezone scheduling index for local-time crons.
+
+Crons like the morning reminder fire at a fixed *local* time, but run every
+15 minutes in UTC. Instead of loading every user and asking each one whether
+it is 08:00 where they are, a tick:
+
+1. reads ``user_timezones`` — one row per timezone name in use, kept current
+   by triggers on ``user_profiles`` (migration 036);
+2. groups those names by their current UTC offset (DST-aware, computed at
+   tick time, so nothing needs rewriting when clocks change);
+3. checks the send window once per offset bucket;
+4. loads only users whose timezone is in an open bucket, through
+   ``ix_user_profiles_timezone``.
+
+Users without a profile, with a NULL/blank timezone or an unknown zone name
+are treated as UTC, matching ``normalize_timezone``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import false, or_, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.core.models.user_profile import UserProfile
+from src.core.models.user_timezone import UserTimezone
+from src.core.notifications_pkg.dispatch import normalize_timezone
+
+
+def utc_offset_minutes(timezone: str | None, now: datetime) -> int:
+    """Current UTC offset of *timezone* in minutes (unknown zones count as UTC)."""
+    offset = now.astimezone(ZoneInfo(normalize_timezone(timezone))).utcoffset()
+    return int(offset.total_seconds() // 60) if offset else 0
+
+
+def offset_buckets(zones: Iterable[str], now: datetime) -> dict[int, list[str]]:
+    """Group timezone names by their UTC offset at *now*."""
+    buckets: dict[int, list[str]] = {}
+    for zone in zones:
+        buckets.setdefault(utc_offset_minutes(zone, now), []).append(zone)
+    return buckets
+
+
+def offset_in_window(
+    offset_minutes: int,
+    now: datetime,
+    *,
+    target_hour: int,
+    target_minute: int = 0,
+    window_minutes: int = 15,
+) -> bool:
+    """Same check as ``is_send_window``, for a fixed UTC offset."""
+    local = now.astimezone(UTC) + timedelta(minutes=offset_minutes)
+    start = local.replace(hour=target_hour, minute=target_minute, second=0, microsecond=0)
+    return start <= local < start + timedelta(minutes=window_minutes)
+
+
+def open_timezones(
+    zones: Iterable[str],
+    now: datetime,
+    *,
+    target_hour: int,
+    target_minute: int = 0,
+    window_minutes: int = 15,
+) -> list[str]:
+    """Timezone names whose local time is inside the send window at *now*."""
+    matched: list[str] = []
+    for offset, names in offset_buckets(zones, now).items():
+        if offset_in_window(
+            offset,
+            now,
+            target_hour=target_hour,
+            target_minute=target_minute,
+            window_minutes=window_minutes,
+        ):
+            matched.extend(names)
+    return sorted(matched)
+
+
+async def timezones_in_window(
+    session,
+    *,
+    target_hour: int,
+    target_minute: int = 0,
+    window_minutes: int = 15,
+    now: datetime | None = None,
+) -> tuple[list[str], bool]:
+    """Open timezone names in use, and whether the UTC bucket itself is open.
+
+    The flag decides whether users without a profile (implicitly UTC) are due.
+    """
+    now = now or datetime.now(UTC)
+    zones = (
+        await session.scalars(select(UserTimezone.timezone).where(UserTimezone.users > 0))
+    ).all()
+    window = {
+        "target_hour": target_hour,
+        "target_minute": target_minute,
+        "window_minutes": window_minutes,
+    }
+    return open_timezones(zones, now, **window), offset_in_window(0, now, **window)
+
+
+def timezone_filter(zones: list[str], utc_open: bool) -> ColumnElement[bool]:
+    """WHERE clause selecting users (outer-joined to profiles) in *zones*."""
+    clauses: list[ColumnElement[bool]] = []
+    if zones:
+        clauses.append(UserProfile.timezone.in_(zones))
+    if utc_open:
+        clauses.append(UserProfile.id.is_(None))
+        clauses.append(UserProfile.timezone.is_(None))
+    return or_(*clauses) if clauses else false()
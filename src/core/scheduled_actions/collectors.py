@@ -20,6 +20,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from src.core.models.scheduled_action import ScheduledAction
+from src.core.scheduled_actions.source_cache import shared_fetch
 
 SourceStatus = dict[str, dict[str, Any]]
 SOURCE_TIMEOUT_SECONDS = 15.0
@@ -150,22 +151,29 @@ def _news_adapter():
             getattr(settings, "ff_dual_search", False)
             and getattr(settings, "xai_api_key", None)
         )
-        try:
-            if use_dual:
-                text = await dual_search(
-                    topic,
-                    ctx.language,
-                    topic,
-                    gemini_searcher=_gemini_search,
-                    trace_user_id=ctx.user_id,
+
+        async def _fetch() -> tuple[str, str]:
+            try:
+                if use_dual:
+                    text = await dual_search(
+                        topic,
+                        ctx.language,
+                        topic,
+                        gemini_searcher=_gemini_search,
+                        trace_user_id=ctx.user_id,
+                    )
+                else:
+                    text = await _gemini_search(topic, ctx.language)
+                return text, "success" if text else "empty"
+            except Exception as exc:
+                import logging
+                logging.getLogger(__name__).warning(
+                    "News collector failed for topic=%r: %s", topic, exc
                 )
-            else:
-                text = await _gemini_search(topic, ctx.language)
-            return text, "success" if text else "empty"
-        except Exception as exc:
-            import logging
-            logging.getLogger(__name__).warning("News collector failed for topic=%r: %s", topic, exc)
-            return "", "failed"
+                return "", "failed"
+
+        # Same topic + language in the same window → one search for all users
+        return await shared_fetch("news", topic, ctx.language, _fetch)
 
     _collect_news.__name__ = "collect_news"
     return _collect_news
@@ -202,33 +210,36 @@ def _event_check_adapter():
             f"- Do not add any other text when responding NOT_YET."
         )
 
-        try:
-            from google.genai import types  # lazy import
+        async def _fetch() -> tuple[str, str]:
+            try:
+                from google.genai import types  # lazy import
 
-            from src.core.llm.clients import google_client  # lazy import
+                from src.core.llm.clients import google_client  # lazy import
 
-            client = google_client()
-            response = await client.aio.models.generate_content(
-                model="gemini-3.1-flash-lite-preview",
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                ),
-            )
-            text = (response.text or "").strip()
+                client = google_client()
+                response = await client.aio.models.generate_content(
+                    model="gemini-3.1-flash-lite-preview",
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        tools=[types.Tool(google_search=types.GoogleSearch())],
+                    ),
+                )
+                text = (response.text or "").strip()
 
-            # If Gemini says NOT_YET (or empty) → event not yet detected
-            if not text or "NOT_YET" in text:
-                return "", "not_triggered"
+                # If Gemini says NOT_YET (or empty) → event not yet detected
+                if not text or "NOT_YET" in text:
+                    return "", "not_triggered"
 
-            return text, "triggered"
+                return text, "triggered"
 
-        except Exception as exc:
-            import logging as _logging
-            _logging.getLogger(__name__).warning(
-                "Event check failed for condition=%r: %s", condition, exc
-            )
-            return "", "failed"
+            except Exception as exc:
+                import logging as _logging
+                _logging.getLogger(__name__).warning(
+                    "Event check failed for condition=%r: %s", condition, exc
+                )
+                return "", "failed"
+
+        return await shared_fetch("event_check", condition, ctx.language, _fetch)
 
     _collect_event.__name__ = "collect_event_check"
     return _collect_event
@@ -0,0 +1,166 @@
+"""Shared, coalesced fetches for user-independent SIA sources.
+
+The news and event-check collectors run a grounded web search whose result
+depends only on the topic and language, yet every user's action used to
+run its own. Hundreds of users following "bitcoin" at 08:00 meant hundreds
+of identical searches. Fetches are now keyed by::
+
+    sia:src:{source}:{language}:{bucket}:{topic_hash}
+
+where a news topic is normalized (case, whitespace, punctuation). Event
+checks only fold case and whitespace: "BTC > 100k" and "BTC < 100k", or
+"$2000" and "€2000", are different conditions, and a shared "triggered"
+result completes every watch on the key. ``bucket`` is the current
+``sia_source_cache_ttl_seconds`` window. For each key:
+
+1. a result already fetched by this process in the window is reused
+   (``local`` — the common case within one dispatch tick);
+2. a fetch already in flight is awaited by every other caller
+   (``coalesced``). The fetch runs as its own task, so one caller timing out
+   does not cancel it for the others;
+3. a result another worker stored in Redis is reused (``hit``);
+4. otherwise the source is fetched (``miss``) and the result stored.
+
+Failed fetches are not cached. Lookups are counted per source in
+``finbot_sia_source_fetches_total``; ``source_cache_report()`` turns them
+into hit rates and saved calls for ``/ops/sia/source-cache``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_MAX_ENTRIES = 1024
+_UNCACHED_STATUSES = frozenset({"failed"})
+# Sources whose text is keyed exactly (modulo case and whitespace)
+_EXACT_SOURCES = frozenset({"event_check"})
+
+SOURCE_FETCHES = REGISTRY.counter(
+    "finbot_sia_source_fetches_total",
+    "Shared SIA source lookups by source and result (local, coalesced, hit, miss).",
+    ("source", "result"),
+)
+
+Fetched = tuple[str, str]  # (text, status) as returned by a collector
+
+_inflight: dict[str, asyncio.Task] = {}
+_local: dict[str, tuple[float, Fetched]] = {}
+
+
+def normalize_topic(topic: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form of a topic."""
+    words = re.sub(r"[^\w\s]", " ", topic.casefold()).split()
+    return " ".join(words)
+
+
+def normalize_source_text(source: str, topic: str) -> str:
+    """The form of *topic* that keys *source*'s shared fetches."""
+    if source in _EXACT_SOURCES:
+        return " ".join(topic.casefold().split())
+    return normalize_topic(topic)
+
+
+def fetch_key(source: str, topic: str, language: str, now: float | None = None) -> str:
+    ttl = max(1, settings.sia_source_cache_ttl_seconds)
+    bucket = int((time.time() if now is None else now) // ttl)
+    digest = hashlib.sha256(normalize_source_text(source, topic).encode()).hexdigest()[:16]
+    return f"sia:src:{source}:{language or 'en'}:{bucket}:{digest}"
+
+
+async def shared_fetch(
+    source: str,
+    topic: str,
+    language: str,
+    fetch: Callable[[], Awaitable[Fetched]],
+) -> Fetched:
+    """Return ``fetch()`` for (*source*, *topic*, *language*), shared across users."""
+    if not settings.ff_sia_source_cache or not normalize_source_text(source, topic):
+        return await fetch()
+
+    key = fetch_key(source, topic, language)
+    cached = _local.get(key)
+    if cached and cached[0] > time.monotonic():
+        SOURCE_FETCHES.inc(source, "local")
+        return cached[1]
+
+    task = _inflight.get(key)
+    if task is not None:
+        SOURCE_FETCHES.inc(source, "coalesced")
+    else:
+        task = asyncio.create_task(_fetch_once(source, key, fetch))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _fetch_once(source: str, key: str, fetch: Callable[[], Awaitable[Fetched]]) -> Fetched:
+    from src.core.db import redis
+
+    try:
+        raw = await redis.get(key)
+        if raw:
+            result = tuple(json.loads(raw))
+            SOURCE_FETCHES.inc(source, "hit")
+            _remember(key, result)
+            return result
+    except Exception as e:
+        logger.debug("SIA source cache lookup failed for %s: %s", key, e)
+
+    SOURCE_FETCHES.inc(source, "miss")
+    result = await fetch()
+    if result[1] in _UNCACHED_STATUSES:
+        return result
+    _remember(key, result)
+    try:
+        await redis.set(key, json.dumps(result), ex=settings.sia_source_cache_ttl_seconds)
+    except Exception as e:
+        logger.debug("SIA source cache store failed for %s: %s", key, e)
+    return result
+
+
+def _remember(key: str, result: Fetched) -> None:
+    now = time.monotonic()
+    if len(_local) >= _LOCAL_MAX_ENTRIES:
+        for stale in [k for k, (expires, _) in _local.items() if expires <= now]:
+            del _local[stale]
+        if len(_local) >= _LOCAL_MAX_ENTRIES:
+            _local.pop(next(iter(_local)))
+    _local[key] = (now + settings.sia_source_cache_ttl_seconds, result)
+
+
+def clear_local_cache() -> None:
+    _local.clear()
+
+
+def source_cache_report(snapshot: dict[str, Any] | None = None) -> dict[str, dict[str, Any]]:
+    """Per-source lookup counts, hit rate and saved fetches.
+
+    *snapshot* is a merged metrics snapshot (``metrics.merged_snapshot()``),
+    so worker processes are included; without one, this process is reported.
+    """
+    if snapshot is None:
+        series = SOURCE_FETCHES.series.items()
+    else:
+        series = snapshot.get(SOURCE_FETCHES.name, {}).get("series", {}).items()
+    report: dict[str, dict[str, Any]] = {}
+    for (source, result), count in series:
+        entry = report.setdefault(source, {"local": 0, "coalesced": 0, "hit": 0, "miss": 0})
+        entry[result] = int(count)
+    for entry in report.values():
+        saved = entry["local"] + entry["coalesced"] + entry["hit"]
+        total = saved + entry["miss"]
+        entry["saved_fetches"] = saved
+        entry["hit_rate"] = round(saved / total, 4) if total else 0.0
+    return dict(sorted(report.items()))
@@ -0,0 +1,381 @@
+"""Incremental Google Sheets sync.
+
+Each active ``sheet_sync_configs`` row mirrors one scope (expenses, tasks,
+contacts) of a family into a sheet. Instead of rewriting the whole table,
+the sync keeps per-config state in ``sync_state``::
+
+    {"window": "2026-03", "cursor": "<max updated_at seen>", "next_row": 42,
+     "rows": {"<record id>": [<sheet row>, "<values hash>"], ...}}
+
+and on every run:
+
+1. counts the records in scope and reads those with ``updated_at`` past the
+   cursor (minus ``CURSOR_OVERLAP``, since ``now()`` is the transaction
+   start and a slow transaction can commit behind the cursor; rows seen
+   before are skipped by hash);
+2. appends new records below the last synced row and rewrites just the
+   rows of edited ones, one write per contiguous run of rows;
+3. rebuilds the sheet from A1 when there is no usable state, the window
+   moved (expenses cover the current month) or the count shows records were
+   deleted or left the scope — ``updated_at`` cannot see those.
+
+``updated_at`` is maintained by a trigger (migration 038), so every writer
+is covered. Configs are synced concurrently across families
+(``sheets_sync_concurrency``) and sequentially within one, reusing its
+Google client. The Google connection is only looked up when there is
+something to write. New records appear in sheet order of arrival; a rebuild
+restores the scope's ordering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select, text, update
+
+from src.core.config import settings
+from src.core.db import async_session
+from src.core.metrics import REGISTRY
+from src.core.models.sheet_sync_config import SheetSyncConfig
+
+logger = logging.getLogger(__name__)
+
+CURSOR_OVERLAP = timedelta(minutes=5)
+ROW_LIMIT = 10000
+_MAX_CLIENT_CANDIDATES = 5
+
+SHEETS_SYNC_RUNS = REGISTRY.counter(
+    "finbot_sheets_sync_total",
+    "Sheets sync runs by outcome (unchanged, delta, rebuild, skipped, failed).",
+    ("outcome",),
+)
+SHEETS_SYNC_ROWS = REGISTRY.counter(
+    "finbot_sheets_sync_rows_total",
+    "Sheet rows written by kind (append, update, rebuild).",
+    ("kind",),
+)
+
+
+@dataclass(frozen=True)
+class SyncScope:
+    """How one sync scope is read from the database and rendered as rows."""
+
+    header: list[str]
+    source: str  # FROM clause; the synced table is aliased ``t``
+    columns: str
+    where: str
+    order: str
+    render: Callable[[Any], list[str]]
+    window: Callable[[date], str] = lambda today: "all"
+
+
+SCOPES: dict[str, SyncScope] = {
+    "expenses": SyncScope(
+        header=["Date", "Merchant", "Category", "Amount", "Description"],
+        source="transactions t LEFT JOIN categories c ON c.id = t.category_id",
+        columns="t.date, t.merchant, c.name AS category, t.amount, t.description",
+        where="t.type = 'expense' AND t.date >= date_trunc('month', CURRENT_DATE)",
+        order="t.date DESC, t.id",
+        render=lambda r: [
+            str(r.date),
+            r.merchant or "",
+            r.category or "",
+            str(r.amount),
+            r.description or "",
+        ],
+        window=lambda today: today.strftime("%Y-%m"),
+    ),
+    "tasks": SyncScope(
+        header=["Title", "Status", "Due Date", "Created"],
+        source="tasks t",
+        columns="t.title, t.status, t.due_at, t.created_at",
+        where="true",
+        order="t.created_at DESC, t.id",
+        render=lambda r: [
+            r.title,
+            r.status or "",
+            str(r.due_at or ""),
+            str(r.created_at or ""),
+        ],
+    ),
+    "contacts": SyncScope(
+        header=["Name", "Phone", "Email", "Role", "Notes"],
+        source="contacts t",
+        columns="t.name, t.phone, t.email, t.role, t.notes",
+        where="true",
+        order="t.name, t.id",
+        render=lambda r: [r.name, r.phone or "", r.email or "", r.role or "", r.notes or ""],
+    ),
+}
+
+
+@dataclass
+class SheetPlan:
+    """Writes for one config and the state to save once they succeed."""
+
+    state: dict[str, Any]
+    rebuild: bool = False
+    appends: list[list[str]] = field(default_factory=list)
+    append_at: int = 2
+    updates: dict[int, list[str]] = field(default_factory=dict)
+    clear_rows: int = 0  # trailing rows a rebuild must blank out
+
+    @property
+    def has_writes(self) -> bool:
+        return self.rebuild or bool(self.appends or self.updates)
+
+
+Record = tuple[str, datetime, list[str]]  # (id, updated_at, rendered row)
+
+
+def row_hash(values: list[str]) -> str:
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()[:16]
+
+
+def _cursor(records: Iterable[Record], previous: str | None = None) -> str | None:
+    stamps = [updated_at.isoformat() for _, updated_at, _ in records]
+    if previous:
+        stamps.append(previous)
+    return max(stamps, default=None)
+
+
+def plan_delta(state: dict[str, Any], records: list[Record], count: int) -> SheetPlan | None:
+    """Plan appends and row updates from *records* changed since the cursor.
+
+    Returns ``None`` when the sheet has to be rebuilt instead: *count* (the
+    records currently in scope) no longer matches what the sheet would hold.
+    """
+    rows = {key: list(value) for key, value in state.get("rows", {}).items()}
+    next_row = state.get("next_row", len(rows) + 2)
+    plan = SheetPlan(state={}, append_at=next_row)
+    for record_id, _, values in records:
+        digest = row_hash(values)
+        known = rows.get(record_id)
+        if known is None:
+            if len(rows) >= ROW_LIMIT:
+                continue
+            rows[record_id] = [next_row + len(plan.appends), digest]
+            plan.appends.append(values)
+        elif known[1] != digest:
+            known[1] = digest
+            plan.updates[known[0]] = values
+    if len(rows) != min(count, ROW_LIMIT):
+        return None
+    plan.state = {
+        "window": state["window"],
+        "cursor": _cursor(records, state.get("cursor")),
+        "next_row": next_row + len(plan.appends),
+        "rows": rows,
+    }
+    return plan
+
+
+def plan_rebuild(
+    state: dict[str, Any], records: list[Record], header: list[str], window: str
+) -> SheetPlan:
+    """Plan a full rewrite from A1, blanking rows left over from the last sync."""
+    records = records[:ROW_LIMIT]
+    rows = {
+        record_id: [i + 2, row_hash(values)] for i, (record_id, _, values) in enumerate(records)
+    }
+    previous_rows = state.get("next_row", 1) - 1
+    return SheetPlan(
+        state={
+            "window": window,
+            "cursor": _cursor(records),
+            "next_row": len(records) + 2,
+            "rows": rows,
+        },
+        rebuild=True,
+        appends=[header] + [values for _, _, values in records],
+        append_at=1,
+        clear_rows=max(0, previous_rows - len(records) - 1),
+    )
+
+
+def _runs(updates: dict[int, list[str]]) -> list[tuple[int, list[list[str]]]]:
+    """Group row updates into contiguous runs: [(first row, [values, ...]), ...]."""
+    runs: list[tuple[int, list[list[str]]]] = []
+    for row in sorted(updates):
+        if runs and runs[-1][0] + len(runs[-1][1]) == row:
+            runs[-1][1].append(updates[row])
+        else:
+            runs.append((row, [updates[row]]))
+    return runs
+
+
+async def _load(
+    session: Any, family_id: str, scope: SyncScope, since: datetime | None = None
+) -> list[Record]:
+    where = f"t.family_id = :fid AND {scope.where}"
+    params: dict[str, Any] = {"fid": family_id, "limit": ROW_LIMIT}
+    if since is not None:
+        where += " AND t.updated_at >= :since"
+        params["since"] = since
+        order = "t.updated_at, t.id"
+    else:
+        order = scope.order
+    result = await session.execute(
+        text(f"""
+            SELECT t.id, t.updated_at, {scope.columns}
+            FROM {scope.source}
+            WHERE {where}
+            ORDER BY {order}
+            LIMIT :limit
+        """),
+        params,
+    )
+    return [(str(r.id), r.updated_at, scope.render(r)) for r in result.all()]
+
+
+async def _count(session: Any, family_id: str, scope: SyncScope) -> int:
+    result = await session.execute(
+        text(f"SELECT count(*) FROM {scope.source} WHERE t.family_id = :fid AND {scope.where}"),
+        {"fid": family_id},
+    )
+    return int(result.scalar() or 0)
+
+
+async def plan_sync(config: Any, today: date | None = None) -> SheetPlan | None:
+    """Work out the writes *config*'s sheet needs (``None`` for an unknown scope)."""
+    scope = SCOPES.get(config.sync_scope)
+    if scope is None:
+        return None
+    family_id = str(config.family_id)
+    state = config.sync_state or {}
+    window = scope.window(today or datetime.now(UTC).date())
+
+    async with async_session() as session:
+        count = await _count(session, family_id, scope)
+        if state.get("window") == window and state.get("cursor"):
+            since = datetime.fromisoformat(state["cursor"]) - CURSOR_OVERLAP
+            plan = plan_delta(state, await _load(session, family_id, scope, since), count)
+            if plan is not None:
+                return plan
+        records = await _load(session, family_id, scope)
+    return plan_rebuild(state, records, scope.header, window)
+
+
+async def apply_plan(client: Any, config: Any, plan: SheetPlan) -> None:
+    """Write *plan* to the config's sheet."""
+    sheet = config.sheet_name
+    if plan.appends:
+        values = plan.appends
+        if plan.clear_rows:
+            values = values + [[""] * len(values[0])] * plan.clear_rows
+        await client.write_values(config.spreadsheet_id, f"{sheet}!A{plan.append_at}", values)
+    for first_row, values in _runs(plan.updates):
+        await client.write_values(config.spreadsheet_id, f"{sheet}!A{first_row}", values)
+
+    if plan.rebuild:
+        SHEETS_SYNC_ROWS.inc("rebuild", amount=max(0, len(plan.appends) - 1))
+    else:
+        SHEETS_SYNC_ROWS.inc("append", amount=len(plan.appends))
+        SHEETS_SYNC_ROWS.inc("update", amount=len(plan.updates))
+
+
+async def _save(config: Any, *, state: dict[str, Any] | None, user_id: Any = None) -> None:
+    values: dict[str, Any] = {"sync_state": state, "last_synced_at": func.now()}
+    if user_id is not None:
+        values["user_id"] = user_id
+    async with async_session() as session:
+        await session.execute(
+            update(SheetSyncConfig).where(SheetSyncConfig.id == config.id).values(**values)
+        )
+        await session.commit()
+
+
+async def _resolve_client(config: Any) -> tuple[Any, Any]:
+    """The Google client to write with and the member it belongs to."""
+    from src.core.google_auth import get_google_client
+
+    candidates = [config.user_id] if config.user_id else []
+    async with async_session() as session:
+        result = await session.execute(
+            text("""
+                SELECT id FROM users WHERE family_id = :fid
+                ORDER BY (role = 'owner') DESC, created_at
+                LIMIT :limit
+            """),
+            {"fid": str(config.family_id), "limit": _MAX_CLIENT_CANDIDATES},
+        )
+        candidates += [r.id for r in result.all() if r.id != config.user_id]
+    for user_id in candidates:
+        client = await get_google_client(str(user_id), service="sheets")
+        if client is not None:
+            return client, user_id
+    return None, None
+
+
+async def sync_config(config: Any, clients: dict[str, Any] | None = None) -> str:
+    """Bring one config's sheet up to date. Returns the outcome.
+
+    *clients* caches the Google client per family across a batch.
+    """
+    clients = {} if clients is None else clients
+    plan = await plan_sync(config)
+    if plan is None:
+        return "skipped"
+    if not plan.has_writes:
+        if plan.state != config.sync_state:
+            await _save(config, state=plan.state)  # cursor moved past unchanged rows
+        return "unchanged"
+
+    family_id = str(config.family_id)
+    if family_id not in clients:
+        clients[family_id] = await _resolve_client(config)
+    client, user_id = clients[family_id]
+    if client is None:
+        logger.info("Sheets sync %s skipped: no Google Sheets connection", config.id)
+        return "skipped"
+
+    try:
+        await apply_plan(client, config, plan)
+    except Exception:
+        # Some writes may have landed; drop the state so the next run rebuilds
+        await _save(config, state=None)
+        raise
+    await _save(config, state=plan.state, user_id=user_id if user_id != config.user_id else None)
+    return "rebuild" if plan.rebuild else "delta"
+
+
+async def sync_configs(configs: Iterable[Any]) -> Counter:
+    """Sync *configs*: families concurrently, each family's configs in turn."""
+    by_family: dict[str, list[Any]] = {}
+    for config in configs:
+        by_family.setdefault(str(config.family_id), []).append(config)
+    semaphore = asyncio.Semaphore(max(1, settings.sheets_sync_concurrency))
+    outcomes: Counter = Counter()
+
+    async def _family(family_configs: list[Any]) -> None:
+        clients: dict[str, Any] = {}
+        async with semaphore:
+            for config in family_configs:
+                try:
+                    outcome = await sync_config(config, clients)
+                except Exception as e:
+                    logger.warning("Failed to sync config %s: %s", config.id, e)
+                    outcome = "failed"
+                SHEETS_SYNC_RUNS.inc(outcome)
+                outcomes[outcome] += 1
+
+    await asyncio.gather(*(_family(group) for group in by_family.values()))
+    return outcomes
+
+
+async def active_configs(family_ids: list[str] | None = None) -> list[SheetSyncConfig]:
+    """Active sync configs, optionally only those of *family_ids*."""
+    stmt = select(SheetSyncConfig).where(SheetSyncConfig.is_active.is_(True))
+    if family_ids is not None:
+        stmt = stmt.where(SheetSyncConfig.family_id.in_(family_ids))
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
@@ -0,0 +1,141 @@
+"""Single-pass transaction statistics for dashboards.
+
+Every series a dashboard needs — per-period totals, income/expense trend,
+per-category breakdown — is derived from one grouped query:
+``SUM(amount)`` grouped by (``date_trunc`` bucket × type × category). The
+number of DB round-trips is constant no matter how many buckets are
+requested; shaping the rows into series happens in Python.
+
+Usage::
+
+    rows = await grouped_totals(
+        session, family_id=fid, role="owner", user_id=uid,
+        start=month_starts(today, 12)[0], bucket="month",
+    )
+    trend = monthly_series(rows, month_starts(today, 12))
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Date, cast, func, select
+
+from src.core.access import apply_visibility_filter
+from src.core.models.category import Category
+from src.core.models.enums import TransactionType
+from src.core.models.transaction import Transaction
+
+BUCKETS = ("day", "week", "month", "year")
+
+
+@dataclass(frozen=True)
+class TotalsRow:
+    """One (bucket, type, category) cell of the grouped totals."""
+
+    bucket: date | None
+    type: TransactionType
+    category_id: uuid.UUID
+    category_name: str
+    category_icon: str | None
+    total: float
+
+
+def month_starts(today: date, months: int) -> list[date]:
+    """First day of each of the last *months* months, oldest first."""
+    starts = []
+    for back in range(months - 1, -1, -1):
+        m = today.month - back
+        y = today.year + (m - 1) // 12
+        starts.append(date(y, (m - 1) % 12 + 1, 1))
+    return starts
+
+
+async def grouped_totals(
+    session: Any,
+    *,
+    family_id: uuid.UUID | str,
+    role: str,
+    user_id: str,
+    start: date,
+    end: date | None = None,
+    bucket: str | None = None,
+) -> list[TotalsRow]:
+    """Sum transactions in ``[start, end)`` by bucket × type × category.
+
+    With ``bucket=None`` the whole range is a single bucket (``bucket`` is
+    None on every row). The visibility filter for *role*/*user_id* applies.
+    """
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+
+    keys: list[Any] = [Transaction.type, Category.id, Category.name, Category.icon]
+    if bucket is not None:
+        # date_trunc returns timestamptz; cast so buckets don't shift with the
+        # session time zone.
+        keys.insert(0, cast(func.date_trunc(bucket, Transaction.date), Date).label("bucket"))
+
+    stmt = (
+        select(*keys, func.sum(Transaction.amount).label("total"))
+        .join(Category, Transaction.category_id == Category.id)
+        .where(Transaction.family_id == family_id, Transaction.date >= start)
+        .group_by(*keys)
+    )
+    if end is not None:
+        stmt = stmt.where(Transaction.date < end)
+    stmt = apply_visibility_filter(stmt, Transaction, role, str(user_id))
+
+    rows = []
+    for row in (await session.execute(stmt)).all():
+        values = list(row)
+        row_bucket = values.pop(0) if bucket is not None else None
+        tx_type, cat_id, cat_name, cat_icon, total = values
+        rows.append(
+            TotalsRow(
+                bucket=row_bucket,
+                type=tx_type,
+                category_id=cat_id,
+                category_name=cat_name,
+                category_icon=cat_icon,
+                total=float(total or 0),
+            )
+        )
+    return rows
+
+
+def category_breakdown(
+    rows: list[TotalsRow], tx_type: TransactionType
+) -> tuple[float, list[dict[str, Any]]]:
+    """Total and per-category share for one transaction type, largest first."""
+    by_category: dict[uuid.UUID, dict[str, Any]] = {}
+    for row in rows:
+        if row.type != tx_type:
+            continue
+        entry = by_category.setdefault(
+            row.category_id,
+            {"name": row.category_name, "icon": row.category_icon, "total": 0.0},
+        )
+        entry["total"] += row.total
+
+    total = sum(entry["total"] for entry in by_category.values())
+    categories = sorted(by_category.values(), key=lambda e: e["total"], reverse=True)
+    for entry in categories:
+        entry["percent"] = (entry["total"] / total * 100) if total > 0 else 0
+    return total, categories
+
+
+def monthly_series(rows: list[TotalsRow], months: list[date]) -> list[dict[str, Any]]:
+    """Expense/income per month for *months*, zero-filling empty months."""
+    sums = {m: {"expense": 0.0, "income": 0.0} for m in months}
+    for row in rows:
+        if row.bucket in sums:
+            sums[row.bucket][row.type.value] += row.total
+    return [
+        {
+            "month": m.strftime("%b %Y"),
+            "expense": sums[m]["expense"],
+            "income": sums[m]["income"],
+        }
+        for m in months
+    ]
@@ -0,0 +1,23 @@
+"""Scheduled conversation-analytics maintenance (Taskiq cron)."""
+
+import logging
+from typing import Any
+
+from src.core.analytics_store import compact_analytics_streams
+from src.core.tasks.broker import broker
+
+logger = logging.getLogger(__name__)
+
+
+@broker.task(schedule=[{"cron": "*/5 * * * *"}])  # Every 5 minutes
+async def compact_analytics_traces() -> dict[str, Any]:
+    """Fold analytics streams into daily rollups and the on-disk archive."""
+    try:
+        result = await compact_analytics_streams()
+    except Exception as e:
+        logger.error("Analytics compaction failed: %s", e)
+        return {"status": "error", "error": str(e)}
+    compacted = sum(s["compacted"] for s in result.get("streams", {}).values())
+    if compacted:
+        logger.info("Compacted %d analytics events in %sms", compacted, result["duration_ms"])
+    return result
@@ -1,7 +1,7 @@
 """Scheduled booking tasks — reminders, no-show detection, follow-ups."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 from sqlalchemy import select, update
 
@@ -10,34 +10,41 @@ from src.core.models.booking import Booking
 from src.core.models.enums import BookingStatus
 from src.core.request_context import reset_family_context, set_family_context
 from src.core.tasks.broker import broker
+from src.core.timers import BOOKING_LEADS, TIMER_GRACE
 
 logger = logging.getLogger(__name__)
 
 
-@broker.task(schedule=[{"cron": "* * * * *"}])  # Every minute
-async def dispatch_booking_reminders():
-    """Send reminders for bookings starting in 24h and 1h."""
-    now = datetime.utcnow()
+@broker.task
+async def dispatch_booking_reminders(booking_ids: list[str] | None = None):
+    """Send reminders for bookings starting in 24h and 1h.
+
+    Fired by the delay-queue timer service at ``start_at - 24h`` / ``- 1h``.
+    Each window reaches ``TIMER_GRACE`` past the lead time, so a late timer
+    still finds its booking.
+    """
+    now = datetime.now(UTC)
     windows = [
-        ("24h", now + timedelta(hours=23, minutes=59), now + timedelta(hours=24, minutes=1)),
-        ("1h", now + timedelta(minutes=59), now + timedelta(hours=1, minutes=1)),
+        (label, now + lead - TIMER_GRACE, now + lead + timedelta(minutes=1))
+        for label, lead in BOOKING_LEADS
     ]
 
     for label, window_start, window_end in windows:
         async with async_session() as session:
-            result = await session.execute(
-                select(Booking).where(
-                    Booking.start_at >= window_start,
-                    Booking.start_at <= window_end,
-                    Booking.reminder_sent.is_(False),
-                    Booking.status.in_(
-                        [
-                            BookingStatus.scheduled,
-                            BookingStatus.confirmed,
-                        ]
-                    ),
-                )
+            query = select(Booking).where(
+                Booking.start_at >= window_start,
+                Booking.start_at <= window_end,
+                Booking.reminder_sent.is_(False),
+                Booking.status.in_(
+                    [
+                        BookingStatus.scheduled,
+                        BookingStatus.confirmed,
+                    ]
+                ),
             )
+            if booking_ids is not None:
+                query = query.where(Booking.id.in_(booking_ids))
+            result = await session.execute(query)
             bookings = result.scalars().all()
 
         for booking in bookings:
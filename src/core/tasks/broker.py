@@ -1,12 +1,36 @@
 """Taskiq broker + scheduler configuration."""
 
-from taskiq import TaskiqScheduler
+import time
+from typing import Any
+
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult, TaskiqScheduler
 from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_redis import ListQueueBroker
 
 from src.core.config import settings
+from src.core.metrics import TASK_SECONDS, publish_snapshot
+
+
+class MetricsMiddleware(TaskiqMiddleware):
+    """Record task durations and publish the worker's metrics snapshot."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._started: dict[str, float] = {}
+
+    def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        self._started[message.task_id] = time.perf_counter()
+        return message
+
+    async def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        started = self._started.pop(message.task_id, None)
+        if started is not None:
+            status = "error" if result.is_err else "ok"
+            TASK_SECONDS.observe(time.perf_counter() - started, message.task_name, status)
+        await publish_snapshot()
+
 
-broker = ListQueueBroker(url=settings.redis_url)
+broker = ListQueueBroker(url=settings.redis_url).with_middlewares(MetricsMiddleware())
 
 scheduler = TaskiqScheduler(
     broker=broker,
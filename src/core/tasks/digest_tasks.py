@@ -1,8 +1,13 @@
-"""Weekly digest cron task — sends digest every Sunday at 09:00 UTC."""
+"""Weekly digest cron task — sends digest every Sunday at 09:00 UTC.
 
+Digest texts for all users are generated through one provider batch
+(``LLMBatch``) and sent from the per-user result handlers.
+"""
+
+import functools
 import logging
-import os
 
+from src.core.notifications_pkg.dispatch import send_telegram_message
 from src.core.tasks.broker import broker
 
 logger = logging.getLogger(__name__)
@@ -32,16 +37,27 @@ async def send_weekly_digests() -> None:
         logger.error("Failed to fetch users for weekly digest: %s", e)
         return
 
+    from src.core.context import SessionContext
+    from src.core.llm.batch import BatchResult, LLMBatch
+    from src.skills.weekly_digest.handler import WeeklyDigestSkill
+
+    digest_skill = WeeklyDigestSkill()
+    batch = LLMBatch("weekly_digest")
     sent = 0
+
+    async def _deliver(result: BatchResult, *, telegram_id: int, user_id: str) -> None:
+        nonlocal sent
+        if not result.ok or not result.text:
+            logger.warning("Weekly digest generation failed for user %s: %s", user_id, result.error)
+            return
+        await send_telegram_message(telegram_id, result.text)
+        sent += 1
+
     for user in users:
         if user.comm_mode == "silent":
             continue
 
         try:
-            from src.core.context import SessionContext
-            from src.gateway.types import IncomingMessage, MessageType
-            from src.skills.weekly_digest.handler import WeeklyDigestSkill
-
             ctx = SessionContext(
                 user_id=str(user.user_id),
                 family_id=str(user.family_id),
@@ -52,30 +68,27 @@ async def send_weekly_digests() -> None:
                 categories=[],
                 merchant_mappings=[],
             )
-            msg = IncomingMessage(
-                id="digest",
-                user_id=str(user.telegram_id),
-                chat_id=str(user.telegram_id),
-                type=MessageType.text,
-                text="weekly digest",
-            )
-            digest_skill = WeeklyDigestSkill()
-            skill_result = await digest_skill.execute(msg, ctx, {})
-
-            if skill_result.response_text:
-                from aiogram import Bot
-
-                bot = Bot(token=os.environ["TELEGRAM_BOT_TOKEN"])
-                await bot.send_message(
-                    chat_id=user.telegram_id,
-                    text=skill_result.response_text,
-                    parse_mode="HTML",
+            built = await digest_skill.build_prompt(ctx)
+            if built is None:
+                await send_telegram_message(
+                    user.telegram_id, digest_skill.no_data_text(ctx.language)
                 )
-                await bot.session.close()
                 sent += 1
-        except Exception as e:
-            logger.warning(
-                "Failed to send digest to user %s: %s", user.user_id, e
+                continue
+
+            system, user_content = built
+            batch.add(
+                str(user.user_id),
+                model=digest_skill.model,
+                system=system,
+                messages=[{"role": "user", "content": user_content}],
+                on_result=functools.partial(
+                    _deliver, telegram_id=user.telegram_id, user_id=str(user.user_id)
+                ),
             )
+        except Exception as e:
+            logger.warning("Failed to build digest for user %s: %s", user.user_id, e)
 
+    if batch:
+        await batch.run()
     logger.info("Weekly digest sent to %d users", sent)
@@ -55,6 +55,17 @@ async def batch_embed_documents() -> None:
         logger.info("Queued %d documents for embedding", len(doc_ids))
 
 
+@broker.task(schedule=[{"cron": "15 * * * *"}])  # Hourly at :15
+async def sweep_tmp_blobs() -> int:
+    """Remove expired short-lived blobs (pending scans, last-file cache)."""
+    from src.core.blob_store import get_blob_store
+
+    removed = await get_blob_store().sweep()
+    if removed:
+        logger.info("Swept %d expired tmp blobs", removed)
+    return removed
+
+
 @broker.task(schedule=[{"cron": "0 3 * * *"}])  # Daily at 03:00 UTC
 async def cleanup_old_documents() -> None:
     """Delete documents older than 90 days, skipping templates, invoices, and parents."""
@@ -0,0 +1,29 @@
+"""Background GDPR erasure (Taskiq)."""
+
+import logging
+from typing import Any
+
+from src.core.gdpr import find_stalled_erasures, run_user_erasure
+from src.core.tasks.broker import broker
+
+logger = logging.getLogger(__name__)
+
+
+@broker.task()
+async def erase_user_data_task(user_id: str) -> dict[str, Any] | None:
+    """Delete a user's data in batches, resuming from recorded progress."""
+    return await run_user_erasure(user_id)
+
+
+@broker.task(schedule=[{"cron": "*/10 * * * *"}])  # Every 10 minutes
+async def resume_stalled_erasures() -> int:
+    """Re-queue erasures that failed or whose worker stopped reporting."""
+    try:
+        stalled = await find_stalled_erasures()
+    except Exception as e:
+        logger.error("Stalled erasure scan failed: %s", e)
+        return 0
+    for user_id in stalled:
+        logger.warning("Resuming stalled GDPR erasure for %s", user_id)
+        await erase_user_data_task.kiq(user_id)
+    return len(stalled)
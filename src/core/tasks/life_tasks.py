@@ -1,5 +1,6 @@
 """Life-tracking cron tasks: weekly digest, morning reminder, evening reflection."""
 
+import functools
 import logging
 from datetime import date, timedelta
 
@@ -8,6 +9,7 @@ from sqlalchemy import select
 from src.core.config import settings
 from src.core.db import async_session
 from src.core.life_helpers import get_communication_mode, query_life_events
+from src.core.llm.batch import BatchResult, LLMBatch
 from src.core.locale_resolution import resolve_notification_locale
 from src.core.models.enums import LifeEventType
 from src.core.models.user import User
@@ -20,28 +22,48 @@ from src.core.notifications_pkg.dispatch import (
     send_telegram_message,
 )
 from src.core.notifications_pkg.templates import get_life_text
+from src.core.schedule_index import timezone_filter, timezones_in_window
 from src.core.tasks.broker import broker
 
 logger = logging.getLogger(__name__)
 
 _t = get_life_text  # Alias for backward compat within this module
 
+_DIGEST_MODEL = "claude-sonnet-4-6"
 
-async def _get_family_users() -> list[tuple[str, str, int, str, str, str, str]]:
-    """Get user locale/scheduling data for notification tasks."""
+# Local (hour, minute) at which each reminder's 15-minute send window opens.
+_MORNING_WINDOW = (8, 0)
+_EVENING_WINDOW = (21, 30)
+
+
+async def _get_family_users(
+    *, local_window: tuple[int, int] | None = None
+) -> list[tuple[str, str, int, str, str, str, str]]:
+    """Get user locale/scheduling data for notification tasks.
+
+    With ``local_window=(hour, minute)`` only users whose local time is inside
+    that 15-minute send window are loaded, via the timezone scheduling index.
+    """
     async with async_session() as session:
-        result = await session.execute(
-            select(
-                User.family_id,
-                User.id,
-                User.telegram_id,
-                User.language,
-                UserProfile.preferred_language,
-                UserProfile.notification_language,
-                UserProfile.timezone,
-                UserProfile.timezone_source,
-            ).outerjoin(UserProfile, UserProfile.user_id == User.id)
-        )
+        stmt = select(
+            User.family_id,
+            User.id,
+            User.telegram_id,
+            User.language,
+            UserProfile.preferred_language,
+            UserProfile.notification_language,
+            UserProfile.timezone,
+            UserProfile.timezone_source,
+        ).outerjoin(UserProfile, UserProfile.user_id == User.id)
+        if local_window is not None:
+            hour, minute = local_window
+            zones, utc_open = await timezones_in_window(
+                session, target_hour=hour, target_minute=minute
+            )
+            if not zones and not utc_open:
+                return []
+            stmt = stmt.where(timezone_filter(zones, utc_open))
+        result = await session.execute(stmt)
         users: list[tuple[str, str, int, str, str, str, str]] = []
         for row in result.all():
             resolved = resolve_notification_locale(
@@ -67,20 +89,21 @@ async def _get_family_users() -> list[tuple[str, str, int, str, str, str, str]]:
         return users
 
 
-
 @broker.task(schedule=[{"cron": "0 20 * * 0"}])  # Sunday 20:00
 async def weekly_life_digest() -> None:
-    """Generate and send a weekly life digest for all users."""
+    """Generate and send a weekly life digest for all users.
+
+    The per-user AI insight is generated through one provider batch for all
+    users; each digest is sent from its batch result handler.
+    """
     today = date.today()
     week_ago = today - timedelta(days=7)
 
     users = await _get_family_users()
+    batch = LLMBatch("weekly_life_digest")
 
     for row in users:
         family_id, user_id, telegram_id, lang = row[:4]
-        language_source = row[5] if len(row) >= 6 else "legacy_preferred_or_user"
-        timezone = row[4] if len(row) >= 5 else "UTC"
-        timezone_source = row[6] if len(row) >= 7 else "unknown"
         try:
             events = await query_life_events(
                 family_id=family_id,
@@ -93,122 +116,134 @@ async def weekly_life_digest() -> None:
             if not events:
                 continue
 
-            t = _t(lang)
-
-            # Count events by type
-            type_counts: dict[str, int] = {}
-            for ev in events:
-                tp = ev.type.value if hasattr(ev.type, "value") else str(ev.type)
-                type_counts[tp] = type_counts.get(tp, 0) + 1
-
-            # Build digest
-            summary_parts = [
-                f"<b>{t['weekly_title']}</b>",
-                f"{t['weekly_period']}: {week_ago.strftime('%d.%m')}"
-                f" — {today.strftime('%d.%m.%Y')}",
-                f"{t['weekly_entries']}: {len(events)}",
-                "",
-            ]
-
-            type_icons = {
-                "note": "\U0001f4dd",
-                "food": "\U0001f37d",
-                "drink": "\u2615",
-                "mood": "\U0001f60a",
-                "task": "\u2705",
-                "reflection": "\U0001f319",
-            }
-
-            for t, count in sorted(type_counts.items(), key=lambda x: -x[1]):
-                icon = type_icons.get(t, "\U0001f4cc")
-                summary_parts.append(f"  {icon} {t}: {count}")
-
-            # Mood analysis if available
-            mood_events = [e for e in events if e.type == LifeEventType.mood]
-            if mood_events:
-                mood_values = []
-                for me in mood_events:
-                    if me.data and isinstance(me.data, dict):
-                        m = me.data.get("mood")
-                        if m is not None:
-                            mood_values.append(int(m))
-                if mood_values:
-                    avg_mood = sum(mood_values) / len(mood_values)
-                    summary_parts.append(f"\n\U0001f4ca {t['weekly_avg_mood']}: {avg_mood:.1f}/10")
-
-            # Task completion
-            task_events = [e for e in events if e.type == LifeEventType.task]
-            if task_events:
-                done = sum(
-                    1
-                    for te in task_events
-                    if te.data and isinstance(te.data, dict) and te.data.get("done")
-                )
-                summary_parts.append(
-                    f"\u2705 {t['weekly_tasks'].format(done=done, total=len(task_events))}"
-                )
-
-            # AI analysis via Claude Sonnet
-            try:
-                analysis = await _generate_digest_analysis(events, lang)
-                if analysis:
-                    summary_parts.append(f"\n\U0001f4a1 <b>{t['weekly_insights']}:</b>\n{analysis}")
-            except Exception as e:
-                logger.warning("Digest analysis failed: %s", e)
-
-            digest_text = "\n".join(summary_parts)
-            await send_telegram_message(telegram_id, digest_text)
-
-            # Store digest in Mem0
-            try:
-                from src.core.memory.mem0_client import add_memory
-
-                await add_memory(
-                    content=digest_text,
-                    user_id=user_id,
-                    source="life_weekly_digest",
-                    category="life_digest",
-                    memory_type="weekly_digest",
-                )
-            except Exception as e:
-                logger.warning("Mem0 digest storage failed: %s", e)
-
-            logger.info(
-                "Weekly digest sent: telegram_id=%s user_id=%s language=%s language_source=%s "
-                "timezone=%s timezone_source=%s ff_locale_v2_read=%s",
-                telegram_id,
+            batch.add(
                 user_id,
-                lang,
-                language_source,
-                timezone,
-                timezone_source,
-                settings.ff_locale_v2_read,
+                model=_DIGEST_MODEL,
+                system=_t(lang)["digest_system"],
+                prompt=_digest_events_text(events),
+                max_tokens=300,
+                on_result=functools.partial(
+                    _deliver_life_digest,
+                    row=row,
+                    summary_parts=_build_digest_summary(events, lang, week_ago, today),
+                ),
             )
-
         except Exception as e:
             logger.error("Weekly digest failed for user %s: %s", user_id, e)
 
+    if batch:
+        await batch.run()
+
+
+def _build_digest_summary(events: list, lang: str, week_ago: date, today: date) -> list[str]:
+    """Digest lines (title, counts, mood, tasks) before the AI insight."""
+    t = _t(lang)
+
+    # Count events by type
+    type_counts: dict[str, int] = {}
+    for ev in events:
+        tp = ev.type.value if hasattr(ev.type, "value") else str(ev.type)
+        type_counts[tp] = type_counts.get(tp, 0) + 1
+
+    summary_parts = [
+        f"<b>{t['weekly_title']}</b>",
+        f"{t['weekly_period']}: {week_ago.strftime('%d.%m')} — {today.strftime('%d.%m.%Y')}",
+        f"{t['weekly_entries']}: {len(events)}",
+        "",
+    ]
+
+    type_icons = {
+        "note": "\U0001f4dd",
+        "food": "\U0001f37d",
+        "drink": "\u2615",
+        "mood": "\U0001f60a",
+        "task": "\u2705",
+        "reflection": "\U0001f319",
+    }
+
+    for tp, count in sorted(type_counts.items(), key=lambda x: -x[1]):
+        icon = type_icons.get(tp, "\U0001f4cc")
+        summary_parts.append(f"  {icon} {tp}: {count}")
+
+    # Mood analysis if available
+    mood_events = [e for e in events if e.type == LifeEventType.mood]
+    if mood_events:
+        mood_values = []
+        for me in mood_events:
+            if me.data and isinstance(me.data, dict):
+                m = me.data.get("mood")
+                if m is not None:
+                    mood_values.append(int(m))
+        if mood_values:
+            avg_mood = sum(mood_values) / len(mood_values)
+            summary_parts.append(f"\n\U0001f4ca {t['weekly_avg_mood']}: {avg_mood:.1f}/10")
+
+    # Task completion
+    task_events = [e for e in events if e.type == LifeEventType.task]
+    if task_events:
+        done = sum(
+            1 for te in task_events if te.data and isinstance(te.data, dict) and te.data.get("done")
+        )
+        tasks_line = t["weekly_tasks"].format(done=done, total=len(task_events))
+        summary_parts.append(f"\u2705 {tasks_line}")
+    return summary_parts
+
+
+async def _deliver_life_digest(
+    result: BatchResult, *, row: tuple, summary_parts: list[str]
+) -> None:
+    """Batch handler: append the AI insight (if any), send, store in Mem0."""
+    family_id, user_id, telegram_id, lang = row[:4]
+    language_source = row[5] if len(row) >= 6 else "legacy_preferred_or_user"
+    timezone = row[4] if len(row) >= 5 else "UTC"
+    timezone_source = row[6] if len(row) >= 7 else "unknown"
+
+    analysis = (result.text or "").strip()
+    if analysis:
+        summary_parts.append(f"\n\U0001f4a1 <b>{_t(lang)['weekly_insights']}:</b>\n{analysis}")
+    else:
+        logger.warning("Digest analysis failed for user %s: %s", user_id, result.error)
+
+    digest_text = "\n".join(summary_parts)
+    await send_telegram_message(telegram_id, digest_text)
+
+    # Store digest in Mem0
+    try:
+        from src.core.memory.mem0_client import add_memory
+
+        await add_memory(
+            content=digest_text,
+            user_id=user_id,
+            source="life_weekly_digest",
+            category="life_digest",
+            memory_type="weekly_digest",
+        )
+    except Exception as e:
+        logger.warning("Mem0 digest storage failed: %s", e)
 
-async def _generate_digest_analysis(events: list, lang: str = "en") -> str:
-    """Generate AI analysis of weekly life events using Claude Sonnet."""
-    from src.core.llm.clients import anthropic_client
+    logger.info(
+        "Weekly digest sent: telegram_id=%s user_id=%s language=%s language_source=%s "
+        "timezone=%s timezone_source=%s ff_locale_v2_read=%s via=%s",
+        telegram_id,
+        user_id,
+        lang,
+        language_source,
+        timezone,
+        timezone_source,
+        settings.ff_locale_v2_read,
+        result.mode,
+    )
 
-    events_text = "\n".join(f"- [{e.type.value}] {e.date}: {e.text or ''}" for e in events[:50])
 
-    client = anthropic_client()
-    response = await client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=300,
-        system=_t(lang)["digest_system"],
-        messages=[{"role": "user", "content": events_text}],
-    )
-    return response.content[0].text.strip()
+def _digest_events_text(events: list) -> str:
+    """Prompt body for the weekly AI insight (at most 50 events)."""
+    return "\n".join(f"- [{e.type.value}] {e.date}: {e.text or ''}" for e in events[:50])
 
 
 @broker.task(schedule=[{"cron": "*/15 * * * *"}])  # Every 15 min, local-time gated
 async def morning_plan_reminder() -> None:
     """Remind users who haven't created a day plan yet."""
-    users = await _get_family_users()
+    users = await _get_family_users(local_window=_MORNING_WINDOW)
     sent_count = 0
     language_stats: dict[str, int] = {}
 
@@ -225,7 +260,9 @@ async def morning_plan_reminder() -> None:
             language_source = "legacy_preferred_or_user"
             timezone_source = "default"
         try:
-            if not is_send_window(timezone, target_hour=8, target_minute=0):
+            if not is_send_window(
+                timezone, target_hour=_MORNING_WINDOW[0], target_minute=_MORNING_WINDOW[1]
+            ):
                 continue
 
             today = now_in_timezone(timezone).date()
@@ -285,7 +322,7 @@ async def morning_plan_reminder() -> None:
 @broker.task(schedule=[{"cron": "*/15 * * * *"}])  # Every 15 min, local-time gated
 async def evening_reflection_prompt() -> None:
     """Prompt users who haven't done their daily reflection."""
-    users = await _get_family_users()
+    users = await _get_family_users(local_window=_EVENING_WINDOW)
     sent_count = 0
     language_stats: dict[str, int] = {}
 
@@ -302,7 +339,9 @@ async def evening_reflection_prompt() -> None:
             language_source = "legacy_preferred_or_user"
             timezone_source = "default"
         try:
-            if not is_send_window(timezone, target_hour=21, target_minute=30):
+            if not is_send_window(
+                timezone, target_hour=_EVENING_WINDOW[0], target_minute=_EVENING_WINDOW[1]
+            ):
                 continue
 
             today = now_in_timezone(timezone).date()
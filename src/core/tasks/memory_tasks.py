@@ -182,16 +182,20 @@ async def async_update_merchant_mapping(
 async def async_procedural_update() -> None:
     """Weekly (Sunday 4am): analyze corrections → generate domain procedures.
 
-    For each user with corrections, groups by domain, extracts procedural
-    rules via LLM, and saves to learned_patterns["procedures"].
+    For each user with corrections, groups by domain and extracts procedural
+    rules via LLM — one provider batch for all users and domains — then saves
+    them to learned_patterns["procedures"].
     """
     from sqlalchemy import select
 
     from src.core.db import async_session
+    from src.core.llm.batch import LLMBatch
     from src.core.memory.procedural import (
         PROCEDURAL_DOMAINS,
+        PROCEDURE_MODEL,
+        build_procedure_prompt,
         detect_workflow,
-        extract_procedures,
+        parse_procedures,
         save_procedures,
     )
     from src.core.models.user import User
@@ -206,6 +210,8 @@ async def async_procedural_update() -> None:
             )
             users = result.all()
 
+        batch = LLMBatch("procedural_update")
+        targets: dict[str, tuple[str, str]] = {}
         for user_id, patterns in users:
             if not patterns or not isinstance(patterns, dict):
                 continue
@@ -224,25 +230,17 @@ async def async_procedural_update() -> None:
                     continue
                 by_domain.setdefault(domain, []).append(c)
 
-            # Extract procedures per domain
+            # Queue procedure extraction per domain
             for domain, domain_corrections in by_domain.items():
                 if len(domain_corrections) < 2:
                     continue  # Need at least 2 corrections to infer a pattern
-                try:
-                    rules = await extract_procedures(
-                        domain, domain_corrections, observations
-                    )
-                    if rules:
-                        await save_procedures(uid, domain, rules)
-                        logger.info(
-                            "Generated %d procedures for user %s domain %s",
-                            len(rules), uid, domain,
-                        )
-                except Exception as e:
-                    logger.debug(
-                        "Procedure extraction failed for user %s domain %s: %s",
-                        uid, domain, e,
-                    )
+                key = f"{uid}:{domain}"
+                targets[key] = (uid, domain)
+                batch.add(
+                    key,
+                    model=PROCEDURE_MODEL,
+                    prompt=build_procedure_prompt(domain, domain_corrections, observations),
+                )
 
             # Detect workflow patterns from correction intent sequences
             intent_sequence = [c.get("intent", "") for c in corrections if c.get("intent")]
@@ -257,6 +255,26 @@ async def async_procedural_update() -> None:
                         )
                 except Exception as e:
                     logger.debug("Workflow detection failed for user %s: %s", uid, e)
+
+        if not batch:
+            return
+        # Saves run sequentially: save_procedures rewrites the whole
+        # learned_patterns document, so one user's domains must not race.
+        for key, batch_result in (await batch.run()).items():
+            uid, domain = targets[key]
+            if not batch_result.ok:
+                logger.debug(
+                    "Procedure extraction failed for user %s domain %s: %s",
+                    uid, domain, batch_result.error,
+                )
+                continue
+            rules = parse_procedures(batch_result.text or "")
+            if rules:
+                await save_procedures(uid, domain, rules)
+                logger.info(
+                    "Generated %d procedures for user %s domain %s",
+                    len(rules), uid, domain,
+                )
     except Exception as e:
         logger.error("Procedural update cron failed: %s", e)
 
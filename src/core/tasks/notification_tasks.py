@@ -1,5 +1,6 @@
 """Scheduled notification tasks (Taskiq cron)."""
 
+import functools
 import logging
 from datetime import date, timedelta
 from decimal import Decimal
@@ -25,7 +26,7 @@ logger = logging.getLogger(__name__)
 
 @broker.task(schedule=[{"cron": "0 21 * * *"}])  # Daily at 21:00
 async def daily_notifications():
-    """Run daily anomaly and budget checks for all families."""
+    """Run daily anomaly, budget and cash-flow shortfall checks for all families."""
     async with async_session() as session:
         # Get all families
         result = await session.execute(select(Family))
@@ -88,32 +89,82 @@ async def daily_notifications():
             reset_family_context(token)
 
 
+@broker.task(schedule=[{"cron": "30 3 * * *"}])  # Daily at 03:30
+async def precompute_cash_flow_forecasts():
+    """Forecast every family in one vectorized pass and cache today's results.
+
+    The cash-flow skill and the daily shortfall alert then read the cache.
+    """
+    from src.core.forecast import precompute_forecasts
+
+    forecasts = await precompute_forecasts()
+    short = sum(1 for fc in forecasts.values() if fc.shortfall())
+    logger.info(
+        "Cash-flow forecasts cached for %d families (%d projected shortfalls)",
+        len(forecasts),
+        short,
+    )
+
+
 @broker.task(schedule=[{"cron": "0 10 * * 1"}])  # Weekly on Monday at 10:00
 async def weekly_pattern_analysis():
-    """Weekly pattern detection for all families."""
-    from src.core.patterns import detect_patterns, store_patterns
+    """Weekly pattern detection for all families.
+
+    Statistics for every family come from one bulk load and one vectorized
+    pass; the LLM phrases each family's findings in one provider batch.
+    """
+    from src.core.llm.batch import BatchResult, LLMBatch
+    from src.core.pattern_engine import Finding, family_findings, load_transactions
+    from src.core.patterns import (
+        MIN_TRANSACTIONS_FOR_ANALYSIS,
+        PATTERN_LOOKBACK_DAYS,
+        PATTERN_MODEL,
+        parse_patterns,
+        pattern_prompt,
+        patterns_from_findings,
+        store_patterns,
+    )
 
     async with async_session() as session:
-        result = await session.execute(select(Family))
-        families = result.scalars().all()
-
-    for family in families:
-        family_id = str(family.id)
+        tx = await load_transactions(session, days=PATTERN_LOOKBACK_DAYS)
+    findings_by_family = family_findings(tx, min_transactions=MIN_TRANSACTIONS_FOR_ANALYSIS)
+
+    async def _store(result: BatchResult, *, family_id: str, findings: list[Finding]) -> None:
+        patterns = None
+        if result.ok:
+            try:
+                patterns = parse_patterns(family_id, result.text or "")
+            except ValueError as e:
+                logger.warning("Bad pattern JSON for family %s: %s", family_id, e)
+        else:
+            logger.warning("Pattern phrasing failed for family %s: %s", family_id, result.error)
         token = set_family_context(family_id)
         try:
-            patterns = await detect_patterns(family_id)
-            if patterns:
-                await store_patterns(family_id, patterns)
-                logger.info(
-                    "Pattern analysis complete for family %s: %d patterns",
-                    family.id,
-                    len(patterns.get("patterns", [])),
-                )
-        except Exception as e:
-            logger.error("Pattern analysis failed for family %s: %s", family.id, e)
+            await store_patterns(family_id, patterns or patterns_from_findings(findings))
+            logger.info(
+                "Pattern analysis complete for family %s: %d findings",
+                family_id,
+                len(findings),
+            )
         finally:
             reset_family_context(token)
 
+    batch = LLMBatch("weekly_pattern_analysis")
+    for family_id, findings in findings_by_family.items():
+        batch.add(
+            family_id,
+            model=PATTERN_MODEL,
+            prompt=pattern_prompt(findings),
+            on_result=functools.partial(_store, family_id=family_id, findings=findings),
+        )
+    logger.info(
+        "Pattern engine: %d transactions, %d families with findings",
+        len(tx),
+        len(findings_by_family),
+    )
+    if batch:
+        await batch.run()
+
 
 @broker.task(schedule=[{"cron": "0 8 * * *"}])  # Daily at 08:00
 async def process_recurring_payments():
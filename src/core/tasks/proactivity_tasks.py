@@ -5,7 +5,7 @@ import logging
 from sqlalchemy import select
 
 from src.core.config import settings
-from src.core.db import async_session
+from src.core.db import read_session
 from src.core.locale_resolution import resolve_notification_locale
 from src.core.models.user import User
 from src.core.models.user_profile import UserProfile
@@ -24,7 +24,7 @@ async def evaluate_proactive_triggers():
     """
     from src.proactivity.engine import run_for_user
 
-    async with async_session() as session:
+    async with read_session(read_your_writes=False) as session:
         result = await session.execute(
             select(
                 User.id,
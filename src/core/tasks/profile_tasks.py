@@ -14,7 +14,7 @@ from datetime import UTC, datetime, timedelta
 
 from sqlalchemy import select
 
-from src.core.db import async_session
+from src.core.db import async_session, read_session
 from src.core.models.conversation import ConversationMessage
 from src.core.models.enums import MessageRole
 from src.core.models.user import User
@@ -30,7 +30,7 @@ MIN_MESSAGES_FOR_LEARNING = 10
 @broker.task(schedule=[{"cron": "0 3 * * *"}])
 async def update_user_profiles():
     """Daily at 3am: analyze recent messages and update learned_patterns."""
-    async with async_session() as session:
+    async with read_session(read_your_writes=False) as session:
         result = await session.execute(select(User.id, User.family_id))
         users = result.all()
 
@@ -47,7 +47,7 @@ async def _learn_for_user(user_id: str, family_id: str) -> None:
 
     cutoff = datetime.now(UTC) - timedelta(days=7)
 
-    async with async_session() as session:
+    async with read_session(read_your_writes=False) as session:
         result = await session.execute(
             select(ConversationMessage)
             .where(
@@ -2,6 +2,9 @@
 
 Supports one-shot and recurring (daily/weekly/monthly) reminders.
 Recurring reminders advance reminder_at to the next occurrence after firing.
+
+Fired by the delay-queue timer service (``src.core.timers``) with the ids of
+the due tasks; reconciliation calls it without ids to sweep everything due.
 """
 
 import logging
@@ -20,6 +23,7 @@ from src.core.notifications_pkg.dispatch import send_telegram_message
 from src.core.notifications_pkg.templates import get_reminder_label
 from src.core.scheduled_actions.engine import _monthly_next
 from src.core.tasks.broker import broker
+from src.core.timers import schedule_timers
 
 logger = logging.getLogger(__name__)
 
@@ -90,14 +94,14 @@ def _extract_due_row(row: tuple) -> dict[str, str | int | Task | None]:
     }
 
 
-@broker.task(schedule=[{"cron": "* * * * *"}])  # Every minute
-async def dispatch_due_reminders() -> None:
-    """Check for due reminders and send them via Telegram."""
+@broker.task
+async def dispatch_due_reminders(task_ids: list[str] | None = None) -> None:
+    """Send due reminders (all of them, or only *task_ids*) via Telegram."""
     now = datetime.now(UTC)
 
     async with async_session() as session:
-        # Find all pending tasks with reminder_at <= now
-        result = await session.execute(
+        # Find pending tasks with reminder_at <= now
+        query = (
             select(
                 Task,
                 User.telegram_id,
@@ -116,8 +120,12 @@ async def dispatch_due_reminders() -> None:
                 Task.status == TaskStatus.pending,
                 Task.reminder_at.isnot(None),
             )
+            .with_for_update(of=Task, skip_locked=True)
             .limit(100)
         )
+        if task_ids is not None:
+            query = query.where(Task.id.in_(task_ids))
+        result = await session.execute(query)
         due_tasks = result.all()
 
         if not due_tasks:
@@ -198,6 +206,7 @@ async def dispatch_due_reminders() -> None:
             )
 
         # Advance recurring reminders to next occurrence
+        timers: list[tuple] = []
         for task in recurring_tasks:
             next_at = _compute_next_reminder(task, now)
             if next_at and (not task.recurrence_end_at or next_at <= task.recurrence_end_at):
@@ -206,6 +215,7 @@ async def dispatch_due_reminders() -> None:
                     .where(Task.id == task.id)
                     .values(reminder_at=next_at, due_at=next_at)
                 )
+                timers.append(("reminder", str(task.id), next_at))
                 logger.info(
                     "Recurring reminder %s advanced to %s", task.id, next_at
                 )
@@ -219,6 +229,11 @@ async def dispatch_due_reminders() -> None:
                 logger.info("Recurring reminder %s ended (past end date)", task.id)
 
         await session.commit()
+        if timers:
+            try:
+                await schedule_timers(timers)
+            except Exception as e:
+                logger.warning("Failed to schedule %d recurring reminders: %s", len(timers), e)
         logger.info(
             "Processed %d reminders (%d one-shot, %d recurring)",
             len(sent_ids),
@@ -1,9 +1,13 @@
-"""Scheduled actions dispatcher cron task."""
+"""Scheduled actions dispatcher task."""
 
+import asyncio
 import logging
+import os
+import socket
+import uuid
 from datetime import datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 
 from src.core.config import settings
@@ -30,6 +34,7 @@ from src.core.tasks.broker import broker
 logger = logging.getLogger(__name__)
 
 DISPATCH_BATCH_LIMIT = 50
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"[:64]
 
 
 def _in_active_hours(timezone: str, start_hour: int, end_hour: int) -> bool:
@@ -157,42 +162,123 @@ async def _notify_auto_paused(session, action: ScheduledAction) -> None:  # noqa
         logger.exception("SIA auto-pause notification failed for action %s", action.id)
 
 
-@broker.task(schedule=[{"cron": "* * * * *"}])
-async def dispatch_scheduled_actions() -> None:
-    """Fetch due scheduled actions and execute them."""
+@broker.task
+async def dispatch_scheduled_actions(action_ids: list[str] | None = None) -> None:
+    """Claim due scheduled actions (all, or only *action_ids*) and execute them.
+
+    Due rows are leased (``claimed_until``/``worker_id``) in one short
+    transaction, so no row lock or connection is held while actions run.
+    Claimed actions then run concurrently, up to ``sia_dispatch_concurrency``,
+    each in its own session. An action whose lease expired without being
+    released (worker crash) is claimed again and its interrupted run failed.
+
+    Fired by the delay-queue timer service; the next run is rescheduled by
+    the session hooks when ``next_run_at`` changes on commit.
+    """
     if not settings.ff_scheduled_actions:
         return
 
     now = now_utc()
+    claimed = await _claim_due_actions(now, action_ids)
+    if not claimed:
+        return
+
+    logger.info("SIA dispatcher: %d due actions claimed by %s", len(claimed), WORKER_ID)
+    semaphore = asyncio.Semaphore(max(1, settings.sia_dispatch_concurrency))
+
+    async def _bounded(action_id: uuid.UUID, recovered: bool) -> None:
+        async with semaphore:
+            try:
+                await _run_claimed_action(action_id, now, recovered=recovered)
+            except Exception:
+                logger.exception("SIA run failed to finish for action %s", action_id)
+
+    await asyncio.gather(*(_bounded(action_id, recovered) for action_id, recovered in claimed))
+
+
+async def _claim_due_actions(
+    now: datetime, action_ids: list[str] | None = None
+) -> list[tuple[uuid.UUID, bool]]:
+    """Lease due actions to this worker; returns ``(id, recovered_from_expired_lease)``."""
     async with async_session() as session:
-        result = await session.execute(
+        query = (
             select(ScheduledAction)
             .join(User, User.id == ScheduledAction.user_id)
             .where(
                 ScheduledAction.status == ActionStatus.active,
                 ScheduledAction.next_run_at <= now,
+                or_(
+                    ScheduledAction.claimed_until.is_(None),
+                    ScheduledAction.claimed_until <= now,
+                ),
                 User.telegram_id.is_not(None),
                 User.onboarded.is_(True),
             )
             .with_for_update(skip_locked=True)
             .limit(DISPATCH_BATCH_LIMIT)
         )
+        if action_ids is not None:
+            query = query.where(ScheduledAction.id.in_(action_ids))
+        result = await session.execute(query)
         due_actions = list(result.scalars().all())
         if not due_actions:
-            return
+            return []
 
-        logger.info("SIA dispatcher: %d due actions found", len(due_actions))
+        lease_until = now + timedelta(seconds=settings.sia_lease_seconds)
+        claimed = []
         for action in due_actions:
-            try:
+            claimed.append((action.id, action.worker_id is not None))
+            action.claimed_until = lease_until
+            action.worker_id = WORKER_ID
+        await session.commit()
+    return claimed
+
+
+async def _run_claimed_action(action_id: uuid.UUID, now: datetime, *, recovered: bool) -> None:
+    """Execute one leased action in its own session and release the lease."""
+    async with async_session() as session:
+        action = await session.get(ScheduledAction, action_id)
+        if action is None or action.worker_id != WORKER_ID:
+            return  # deleted, or the lease expired and another worker took over
+        try:
+            if not (recovered and await _fail_interrupted_run(session, action, now)):
                 await _execute_action(session, action, now)
-            except Exception:
-                logger.exception("SIA dispatch failed for action %s", action.id)
-                apply_failure(action, now)
-                if action.status == ActionStatus.paused:
-                    await _notify_auto_paused(session, action)
+        except Exception:
+            logger.exception("SIA dispatch failed for action %s", action.id)
+            apply_failure(action, now)
+            if action.status == ActionStatus.paused:
+                await _notify_auto_paused(session, action)
+        action.claimed_until = None
+        action.worker_id = None
         await session.commit()
 
 
+async def _fail_interrupted_run(session, action: ScheduledAction, now: datetime) -> bool:  # noqa: ANN001
+    """Fail a run left ``running`` by a crashed worker. Returns True if one was found.
+
+    The crash may have happened after the message was sent, so the run is
+    not repeated; the action is retried through the normal failure backoff.
+    """
+    run = await session.scalar(
+        select(ScheduledActionRun).where(
+            ScheduledActionRun.scheduled_action_id == action.id,
+            ScheduledActionRun.planned_run_at == action.next_run_at,
+            ScheduledActionRun.status == RunStatus.running,
+        )
+    )
+    if run is None:
+        return False
+    run.status = RunStatus.failed
+    run.error_code = "lease_expired"
+    run.finished_at = now
+    run.duration_ms = _run_duration_ms(run)
+    apply_failure(action, now)
+    if action.status == ActionStatus.paused:
+        await _notify_auto_paused(session, action)
+    _log_run_event("scheduled_action_run_failed", action, run)
+    return True
+
+
 def _extract_budget_data(finance_text: str) -> tuple[float, float] | None:
     """Parse 'This month: $X total' and 'Monthly budget: $Y' from finance data."""
     import re
@@ -283,6 +369,9 @@ async def _execute_action(session, action: ScheduledAction, now: datetime) -> No
         _log_run_event("scheduled_action_run_skipped", action, run)
         return
 
+    # Commit the run record and release the connection while sources, the LLM
+    # and Telegram are slow; the outcome is written in a second transaction.
+    await session.commit()
     payload, sources_status = await collect_sources(action)
 
     # Epic G3: Check if action is completed via condition (e.g. sources are empty)
@@ -0,0 +1,84 @@
+"""Dialog summarization — incremental folds after messages, nightly rollups.
+
+A persisted conversation message schedules a ``summary`` timer for its user
+(``summary_delay_seconds`` later, see ``src.core.timers``), which runs
+``summarize_dialogs``: the user's new messages are folded into the session
+summary from its cursor. Nightly, yesterday's session summaries are rolled
+up into daily digests and, on Mondays, last week's daily digests into a
+weekly one. The engine lives in ``src.core.memory.summarization``.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime, time, timedelta
+
+from sqlalchemy import select
+
+from src.core.db import async_session
+from src.core.memory.summarization import rollup_period, summarize_dialog
+from src.core.models.session_summary import SessionSummary
+from src.core.models.summary_rollup import SummaryRollup
+from src.core.tasks.broker import broker
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_CONCURRENCY = 4
+
+
+async def _bounded(jobs: list, limit: int = ROLLUP_CONCURRENCY) -> None:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(job) -> None:
+        async with semaphore:
+            await job
+
+    await asyncio.gather(*(_run(job) for job in jobs))
+
+
+@broker.task
+async def summarize_dialogs(ids: list[str] | None = None) -> None:
+    """Fold new messages into the session summaries of *ids* (``"{user_id}:{family_id}"``)."""
+    jobs = []
+    for entry in ids or []:
+        user_id, _, family_id = entry.partition(":")
+        if user_id and family_id:
+            jobs.append(summarize_dialog(user_id, family_id))
+    await _bounded(jobs)
+
+
+@broker.task(schedule=[{"cron": "20 2 * * *"}])
+async def rollup_summaries_nightly() -> None:
+    """Daily digests for yesterday; on Mondays also weekly digests for last week."""
+    today = datetime.now(UTC).date()
+    yesterday = today - timedelta(days=1)
+    since = datetime.combine(yesterday, time.min, tzinfo=UTC)
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(SessionSummary.user_id, SessionSummary.family_id)
+            .where(
+                SessionSummary.updated_at >= since,
+                SessionSummary.updated_at < since + timedelta(days=1),
+            )
+            .distinct()
+        )
+        daily = result.all()
+    await _bounded([rollup_period(str(u), str(f), "day", yesterday) for u, f in daily])
+
+    weekly = []
+    if today.weekday() == 0:
+        week_start = today - timedelta(days=7)
+        async with async_session() as session:
+            result = await session.execute(
+                select(SummaryRollup.user_id, SummaryRollup.family_id)
+                .where(
+                    SummaryRollup.period == "day",
+                    SummaryRollup.period_start >= week_start,
+                    SummaryRollup.period_start < today,
+                )
+                .distinct()
+            )
+            weekly = result.all()
+        await _bounded([rollup_period(str(u), str(f), "week", week_start) for u, f in weekly])
+
+    logger.info("Summary rollups: %d daily, %d weekly", len(daily), len(weekly))
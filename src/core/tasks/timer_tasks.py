@@ -0,0 +1,130 @@
+"""Delay-queue dispatcher and database reconciliation for time-triggered work.
+
+Each Taskiq worker runs ``run_timer_dispatcher`` (see ``src.core.timers``),
+which kicks the kind's dispatch task with the ids of due timers. Every
+``RECONCILE_MINUTES`` the database is rescanned for anything due soon and
+the timers are re-added — the safety net for lost timers and writes that
+bypass the session hooks. If Redis is unreachable, overdue rows are swept
+directly by calling the dispatch tasks without ids.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import func, or_, select
+from taskiq import TaskiqEvents, TaskiqState
+
+from src.core.db import async_session
+from src.core.models.booking import Booking
+from src.core.models.enums import ActionStatus, BookingStatus, TaskStatus
+from src.core.models.scheduled_action import ScheduledAction
+from src.core.models.task import Task
+from src.core.tasks.booking_tasks import dispatch_booking_reminders
+from src.core.tasks.broker import broker
+from src.core.tasks.reminder_tasks import dispatch_due_reminders
+from src.core.tasks.scheduled_action_tasks import dispatch_scheduled_actions
+from src.core.tasks.sheets_sync_tasks import push_sheets_sync
+from src.core.tasks.summary_tasks import summarize_dialogs
+from src.core.tasks.tracker_tasks import dispatch_tracker_reminders, tracker_timers
+from src.core.timers import (
+    BOOKING_LEADS,
+    RECONCILE_HORIZON,
+    RECONCILE_MINUTES,
+    booking_reminder_at,
+    run_timer_dispatcher,
+    schedule_timers,
+)
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_TASKS = {
+    "reminder": dispatch_due_reminders,
+    "action": dispatch_scheduled_actions,
+    "tracker": dispatch_tracker_reminders,
+    "booking": dispatch_booking_reminders,
+    "sheets": push_sheets_sync,
+    "summary": summarize_dialogs,
+}
+
+
+async def fire_timers(kind: str, ids: list[str]) -> None:
+    """Queue the dispatch task for *kind* with the ids of its due timers."""
+    task = DISPATCH_TASKS.get(kind)
+    if task is None:
+        logger.warning("Dropping %d timers of unknown kind %r", len(ids), kind)
+        return
+    await task.kiq(ids)
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def start_timer_dispatcher(state: TaskiqState) -> None:
+    state.timer_dispatcher = asyncio.create_task(run_timer_dispatcher(fire_timers))
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def stop_timer_dispatcher(state: TaskiqState) -> None:
+    dispatcher = getattr(state, "timer_dispatcher", None)
+    if dispatcher is not None:
+        dispatcher.cancel()
+
+
+async def due_timers(now: datetime) -> list[tuple]:
+    """Timer entries for every reminder, action, booking and tracker due before the horizon."""
+    until = now + RECONCILE_HORIZON
+    longest_lead = max(lead for _, lead in BOOKING_LEADS)
+    async with async_session() as session:
+        reminders = await session.execute(
+            select(Task.id, Task.reminder_at).where(
+                Task.status == TaskStatus.pending,
+                Task.reminder_at.isnot(None),
+                Task.reminder_at <= until,
+            )
+        )
+        actions = await session.execute(
+            select(
+                ScheduledAction.id,
+                func.greatest(ScheduledAction.next_run_at, ScheduledAction.claimed_until),
+            ).where(
+                ScheduledAction.status == ActionStatus.active,
+                ScheduledAction.next_run_at <= until,
+                or_(
+                    ScheduledAction.claimed_until.is_(None),
+                    ScheduledAction.claimed_until <= until,
+                ),
+            )
+        )
+        bookings = await session.execute(
+            select(Booking.id, Booking.start_at).where(
+                Booking.start_at > now,
+                Booking.start_at <= until + longest_lead,
+                Booking.reminder_sent.is_(False),
+                Booking.status.in_([BookingStatus.scheduled, BookingStatus.confirmed]),
+            )
+        )
+        entries = [("reminder", str(i), at) for i, at in reminders.all()]
+        entries += [("action", str(i), at) for i, at in actions.all()]
+        for booking_id, start_at in bookings.all():
+            fire_at = booking_reminder_at(start_at, now)
+            if fire_at and fire_at <= until:
+                entries.append(("booking", str(booking_id), fire_at))
+        entries += await tracker_timers(session, until)
+    return entries
+
+
+@broker.task(schedule=[{"cron": f"*/{RECONCILE_MINUTES} * * * *"}])
+async def reconcile_timers() -> None:
+    """Re-add timers due soon from the database; sweep directly if Redis is down."""
+    now = datetime.now(UTC)
+    entries = await due_timers(now)
+    try:
+        await schedule_timers(entries)
+    except Exception as e:
+        logger.warning("Timer reconciliation could not reach Redis, sweeping: %s", e)
+        for task in DISPATCH_TASKS.values():
+            try:
+                await task()
+            except Exception:
+                logger.exception("Timer sweep failed for %s", task.task_name)
+        return
+    logger.info("Timer reconciliation: %d timers due within the horizon", len(entries))
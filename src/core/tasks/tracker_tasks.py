@@ -1,8 +1,9 @@
-"""Tracker reminder cron task — sends daily reminders for unlogged trackers.
+"""Tracker reminder task — sends daily reminders for unlogged trackers.
 
-Runs every minute. For each active tracker with reminder_enabled=true:
+Fired by the delay-queue timer service (``src.core.timers``). For each
+active tracker with reminder_enabled=true:
   1. Converts reminder_time (HH:MM) to user's local timezone
-  2. Fires within a 1-minute window of the scheduled time (one-shot mode)
+  2. Fires within ``TIMER_GRACE`` of the scheduled time (one-shot mode)
      OR fires whenever dedup key expires (repeat mode — until logged today)
   3. Skips if tracker is already logged today (goal-aware for sum mode)
   4. Uses Redis dedup key to rate-limit sends:
@@ -10,14 +11,15 @@ Runs every minute. For each active tracker with reminder_enabled=true:
        - Repeat mode (reminder_repeat_minutes > 0):
            * dedup TTL = reminder_repeat_minutes * 60 → fires again after interval
            * Once logged → dedup reset with 25h TTL → stops for the day
+  5. Schedules each tracker's next timer: the next reminder_time, or the end
+     of the repeat interval while repeat mode is still reminding.
 """
 
 import logging
-from datetime import UTC, date, datetime, timezone
+from datetime import UTC, date, datetime, time, timedelta, timezone
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import JSONB
 
 from src.core.db import async_session
 from src.core.locale_resolution import resolve_notification_locale
@@ -26,12 +28,15 @@ from src.core.models.user import User
 from src.core.models.user_profile import UserProfile
 from src.core.notifications_pkg.dispatch import send_telegram_message
 from src.core.tasks.broker import broker
+from src.core.timers import TIMER_GRACE, schedule_timers
 
 logger = logging.getLogger(__name__)
 
 # Redis TTL for dedup keys: 25 h — clears before next day's reminder window
 _DEDUP_TTL = 60 * 60 * 25
 
+# Trackers are loaded in keyset-paginated pages so every tracker is considered.
+_PAGE_SIZE = 500
 _REMINDER_TEXT = {
     "en": "⏰ Don't forget to log your {emoji} <b>{name}</b> today!",
     "ru": "⏰ Не забудь записать {emoji} <b>{name}</b> сегодня!",
@@ -61,13 +66,22 @@ def _parse_tz(tz_str: str | None) -> timezone:
         return UTC
 
 
-def _matches_reminder_time(reminder_time: str, now_local: datetime) -> bool:
-    """Return True if HH:MM reminder_time matches now_local within the current minute (one-shot)."""
+def _parse_hhmm(reminder_time: str) -> tuple[int, int] | None:
     try:
         h, m = map(int, reminder_time.split(":"))
-        return now_local.hour == h and now_local.minute == m
+        time(h, m)
     except (ValueError, AttributeError):
+        return None
+    return h, m
+
+
+def _in_fire_window(reminder_time: str, now_local: datetime) -> bool:
+    """Return True if now_local is within ``TIMER_GRACE`` after reminder_time (one-shot)."""
+    parsed = _parse_hhmm(reminder_time)
+    if parsed is None:
         return False
+    reminder_dt = now_local.replace(hour=parsed[0], minute=parsed[1], second=0, microsecond=0)
+    return reminder_dt <= now_local < reminder_dt + TIMER_GRACE
 
 
 def _is_past_reminder_time(reminder_time: str, now_local: datetime) -> bool:
@@ -80,181 +94,256 @@ def _is_past_reminder_time(reminder_time: str, now_local: datetime) -> bool:
         return False
 
 
-@broker.task(schedule=[{"cron": "* * * * *"}])
-async def dispatch_tracker_reminders() -> None:
-    """Check all active trackers with reminders enabled and fire due ones."""
+def next_fire_at(
+    reminder_time: str, tz: timezone, now_utc: datetime, *, grace: timedelta = timedelta(0)
+) -> datetime | None:
+    """UTC time of the next local reminder_time — today's if less than *grace* ago."""
+    parsed = _parse_hhmm(reminder_time)
+    if parsed is None:
+        return None
+    now_local = now_utc.astimezone(tz)
+    at = datetime.combine(now_local.date(), time(*parsed), tzinfo=tz)
+    if now_local >= at + grace:
+        at = datetime.combine(now_local.date() + timedelta(days=1), time(*parsed), tzinfo=tz)
+    return at.astimezone(UTC)
+
+
+async def _load_trackers(session, tracker_ids: list[str] | None) -> list[tuple]:  # noqa: ANN001
+    """Reminder-enabled trackers with their user's locale columns, all pages."""
+    query = (
+        select(
+            Tracker,
+            User.telegram_id,
+            User.language,
+            UserProfile.preferred_language,
+            UserProfile.notification_language,
+            UserProfile.timezone,
+            UserProfile.timezone_source,
+        )
+        .join(User, Tracker.user_id == User.id)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(
+            Tracker.is_active.is_(True),
+            # JSONB boolean check: config->>'reminder_enabled' == 'true'
+            Tracker.config["reminder_enabled"].astext == "true",
+            Tracker.config["reminder_time"].astext.isnot(None),
+        )
+    )
+    if tracker_ids is not None:
+        return list((await session.execute(query.where(Tracker.id.in_(tracker_ids)))).all())
+
+    rows: list[tuple] = []
+    last_id = None
+    while True:
+        page_query = query.order_by(Tracker.id).limit(_PAGE_SIZE)
+        if last_id is not None:
+            page_query = page_query.where(Tracker.id > last_id)
+        page = (await session.execute(page_query)).all()
+        rows.extend(page)
+        if len(page) < _PAGE_SIZE:
+            return rows
+        last_id = page[-1][0].id
+
+
+@broker.task
+async def dispatch_tracker_reminders(tracker_ids: list[str] | None = None) -> None:
+    """Fire due reminders for active trackers (all, or only *tracker_ids*)."""
     now_utc = datetime.now(UTC)
-    today_iso = now_utc.date().isoformat()
+    timers: dict[str, datetime | None] = {}
 
-    # ── 1. Load all candidates ──────────────────────────────────────────────
+    # ── 1. Load candidates ──────────────────────────────────────────────────
     async with async_session() as session:
-        rows = (
-            await session.execute(
-                select(
-                    Tracker,
-                    User.telegram_id,
-                    User.language,
-                    UserProfile.preferred_language,
-                    UserProfile.notification_language,
-                    UserProfile.timezone,
-                    UserProfile.timezone_source,
-                )
-                .join(User, Tracker.user_id == User.id)
-                .outerjoin(UserProfile, UserProfile.user_id == User.id)
-                .where(
-                    Tracker.is_active.is_(True),
-                    # JSONB boolean check: config->>'reminder_enabled' == 'true'
-                    Tracker.config["reminder_enabled"].astext == "true",
-                    Tracker.config["reminder_time"].astext.isnot(None),
-                )
-                .limit(500)
+        rows = await _load_trackers(session, tracker_ids)
+        sent = await _fire_due(session, rows, now_utc, timers) if rows else 0
+
+    await _schedule_next(timers)
+    if sent:
+        logger.info("dispatch_tracker_reminders: sent=%d", sent)
+
+
+async def _fire_due(
+    session, rows: list[tuple], now_utc: datetime, timers: dict[str, datetime | None]  # noqa: ANN001
+) -> int:
+    """Send reminders for the due trackers in *rows*, updating their next *timers*."""
+    today_iso = now_utc.date().isoformat()
+    # ── 2. Filter to trackers whose reminder_time is due (per-user tz) ──
+    due: list[tuple] = []
+    for row in rows:
+        tracker, telegram_id, lang, pref_lang, notif_lang, tz_str, tz_src = row
+        config = tracker.config or {}
+        reminder_time: str | None = config.get("reminder_time")
+        if not telegram_id or not reminder_time:
+            continue
+        tz = _parse_tz(tz_str)
+        now_local = now_utc.astimezone(tz)
+        timers[str(tracker.id)] = next_fire_at(reminder_time, tz, now_utc)
+        repeat_mins = config.get("reminder_repeat_minutes")
+        if repeat_mins:
+            # Repeat mode: fire whenever dedup expires AND we're past reminder_time
+            if _is_past_reminder_time(reminder_time, now_local):
+                due.append(row)
+        else:
+            # One-shot: fire only shortly after the scheduled minute
+            if _in_fire_window(reminder_time, now_local):
+                due.append(row)
+
+    if not due:
+        return 0
+
+    # ── 3. Dedup via Redis ──────────────────────────────────────────────
+    from src.core.db import redis
+
+    filtered_due: list[tuple] = []
+    for row in due:
+        tracker = row[0]
+        dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
+        try:
+            already = await redis.get(dedup_key)
+            if already and (tracker.config or {}).get("reminder_repeat_minutes"):
+                # Still inside the repeat interval — come back when it ends
+                ttl = await redis.ttl(dedup_key)
+                if ttl and ttl > 0:
+                    timers[str(tracker.id)] = now_utc + timedelta(seconds=ttl)
+        except Exception as exc:
+            logger.warning(
+                "Redis dedup check failed for tracker %s, skipping: %s",
+                tracker.id, exc,
+            )
+            continue  # skip this tracker — don't double-fire on Redis failure
+        if already:
+            continue
+        filtered_due.append(row)
+
+    if not filtered_due:
+        return 0
+
+    # ── 4. Load today's entries for all candidate trackers in one query ──
+    tracker_ids = [row[0].id for row in filtered_due]
+    today_date = date.fromisoformat(today_iso)
+    entry_rows = (
+        await session.execute(
+            select(TrackerEntry.tracker_id, TrackerEntry.value)
+            .where(
+                TrackerEntry.tracker_id.in_(tracker_ids),
+                TrackerEntry.date == today_date,
             )
-        ).all()
-
-        if not rows:
-            return
-
-        # ── 2. Filter to trackers whose reminder_time matches now (per-user tz) ──
-        due: list[tuple] = []
-        for row in rows:
-            tracker, telegram_id, lang, pref_lang, notif_lang, tz_str, tz_src = row
-            if not telegram_id:
-                continue
-            config = tracker.config or {}
-            reminder_time: str | None = config.get("reminder_time")
-            if not reminder_time:
-                continue
-            tz = _parse_tz(tz_str)
-            now_local = now_utc.astimezone(tz)
+        )
+    ).all()
+
+    # Build: tracker_id → list of values logged today
+    today_values: dict = {}
+    for e_tracker_id, e_value in entry_rows:
+        today_values.setdefault(str(e_tracker_id), []).append(e_value or 0)
+
+    # ── 5. Send reminders for unlogged / goal-not-reached trackers ─────
+    sent = 0
+    for row in filtered_due:
+        tracker, telegram_id, lang, pref_lang, notif_lang, tz_str, tz_src = row
+        tid = str(tracker.id)
+        config = tracker.config or {}
+        value_mode = config.get("value_mode", "sum")
+        goal = config.get("goal")
+        logged_values = today_values.get(tid, [])
+
+        # Decide whether to skip (already done)
+        skip = False
+        if value_mode == "boolean":
+            skip = len(logged_values) > 0
+        elif value_mode == "single":
+            skip = len(logged_values) > 0
+        else:  # sum
+            if logged_values:
+                today_total = sum(logged_values)
+                if goal and today_total >= goal:
+                    skip = True  # goal reached
+                # if no goal → always remind once (don't skip)
+
+        if skip:
+            # Goal reached — silence for the rest of the day (always 25h)
+            dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
+            try:
+                await redis.set(dedup_key, "1", ex=_DEDUP_TTL)
+            except Exception as exc:
+                logger.warning("Redis set failed for dedup key %s: %s", dedup_key, exc)
+            continue
+
+        # Resolve locale for message language
+        resolved = resolve_notification_locale(
+            user_language=lang,
+            preferred_language=pref_lang,
+            notification_language=notif_lang,
+            timezone=tz_str,
+            timezone_source=tz_src,
+            use_v2_read=False,
+            prefer_user_on_desync=True,
+        )
+        message_lang = resolved.language
+
+        emoji = tracker.emoji or "📊"
+        text = _reminder_text(message_lang, emoji, tracker.name)
+
+        # Append goal progress for sum mode
+        if value_mode == "sum" and goal and logged_values:
+            today_total = sum(logged_values)
+            unit = config.get("unit", "")
+            text += f"\n<i>{today_total} / {goal} {unit} so far</i>"
+
+        try:
+            await send_telegram_message(telegram_id, text)
+            # Mark dedup — repeat mode uses shorter TTL so it fires again after interval
+            dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
             repeat_mins = config.get("reminder_repeat_minutes")
+            dedup_ttl = int(repeat_mins) * 60 if repeat_mins else _DEDUP_TTL
             if repeat_mins:
-                # Repeat mode: fire whenever dedup expires AND we're past reminder_time
-                if _is_past_reminder_time(reminder_time, now_local):
-                    due.append(row)
-            else:
-                # One-shot: fire only at the exact minute
-                if _matches_reminder_time(reminder_time, now_local):
-                    due.append(row)
-
-        if not due:
-            return
-
-        # ── 3. Dedup via Redis ──────────────────────────────────────────────
-        from src.core.redis_client import redis  # lazy import to avoid circular
-
-        filtered_due: list[tuple] = []
-        for row in due:
-            tracker = row[0]
-            dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
+                timers[tid] = now_utc + timedelta(seconds=dedup_ttl)
             try:
-                already = await redis.get(dedup_key)
+                await redis.set(dedup_key, "1", ex=dedup_ttl)
             except Exception as exc:
-                logger.warning(
-                    "Redis dedup check failed for tracker %s, skipping: %s",
-                    tracker.id, exc,
-                )
-                continue  # skip this tracker — don't double-fire on Redis failure
-            if already:
-                continue
-            filtered_due.append(row)
-
-        if not filtered_due:
-            return
-
-        # ── 4. Load today's entries for all candidate trackers in one query ──
-        tracker_ids = [row[0].id for row in filtered_due]
-        today_date = date.fromisoformat(today_iso)
-        entry_rows = (
-            await session.execute(
-                select(TrackerEntry.tracker_id, TrackerEntry.value)
-                .where(
-                    TrackerEntry.tracker_id.in_(tracker_ids),
-                    TrackerEntry.date == today_date,
-                )
+                logger.warning("Redis set failed after send for %s: %s", dedup_key, exc)
+            sent += 1
+            logger.info(
+                "Tracker reminder sent: tracker_id=%s user_id=%s telegram_id=%s",
+                tracker.id,
+                tracker.user_id,
+                telegram_id,
             )
-        ).all()
-
-        # Build: tracker_id → list of values logged today
-        today_values: dict = {}
-        for e_tracker_id, e_value in entry_rows:
-            today_values.setdefault(str(e_tracker_id), []).append(e_value or 0)
-
-        # ── 5. Send reminders for unlogged / goal-not-reached trackers ─────
-        sent = 0
-        for row in filtered_due:
-            tracker, telegram_id, lang, pref_lang, notif_lang, tz_str, tz_src = row
-            tid = str(tracker.id)
-            config = tracker.config or {}
-            value_mode = config.get("value_mode", "sum")
-            goal = config.get("goal")
-            logged_values = today_values.get(tid, [])
-
-            # Decide whether to skip (already done)
-            skip = False
-            if value_mode == "boolean":
-                skip = len(logged_values) > 0
-            elif value_mode == "single":
-                skip = len(logged_values) > 0
-            else:  # sum
-                if logged_values:
-                    today_total = sum(logged_values)
-                    if goal and today_total >= goal:
-                        skip = True  # goal reached
-                    # if no goal → always remind once (don't skip)
-
-            if skip:
-                # Goal reached — silence for the rest of the day (always 25h)
-                dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
-                try:
-                    await redis.set(dedup_key, "1", ex=_DEDUP_TTL)
-                except Exception as exc:
-                    logger.warning("Redis set failed for dedup key %s: %s", dedup_key, exc)
-                continue
-
-            # Resolve locale for message language
-            resolved = resolve_notification_locale(
-                user_language=lang,
-                preferred_language=pref_lang,
-                notification_language=notif_lang,
-                timezone=tz_str,
-                timezone_source=tz_src,
-                use_v2_read=False,
-                prefer_user_on_desync=True,
+        except Exception as exc:
+            logger.error(
+                "Failed to send tracker reminder tracker_id=%s: %s",
+                tracker.id,
+                exc,
             )
-            message_lang = resolved.language
 
-            emoji = tracker.emoji or "📊"
-            text = _reminder_text(message_lang, emoji, tracker.name)
+    return sent
 
-            # Append goal progress for sum mode
-            if value_mode == "sum" and goal and logged_values:
-                today_total = sum(logged_values)
-                unit = config.get("unit", "")
-                text += f"\n<i>{today_total} / {goal} {unit} so far</i>"
 
-            try:
-                await send_telegram_message(telegram_id, text)
-                # Mark dedup — repeat mode uses shorter TTL so it fires again after interval
-                dedup_key = f"tracker_remind:{tracker.id}:{today_iso}"
-                repeat_mins = config.get("reminder_repeat_minutes")
-                dedup_ttl = int(repeat_mins) * 60 if repeat_mins else _DEDUP_TTL
-                try:
-                    await redis.set(dedup_key, "1", ex=dedup_ttl)
-                except Exception as exc:
-                    logger.warning("Redis set failed after send for %s: %s", dedup_key, exc)
-                sent += 1
-                logger.info(
-                    "Tracker reminder sent: tracker_id=%s user_id=%s telegram_id=%s",
-                    tracker.id,
-                    tracker.user_id,
-                    telegram_id,
-                )
-            except Exception as exc:
-                logger.error(
-                    "Failed to send tracker reminder tracker_id=%s: %s",
-                    tracker.id,
-                    exc,
-                )
+async def _schedule_next(timers: dict[str, datetime | None]) -> None:
+    try:
+        await schedule_timers(("tracker", tid, at) for tid, at in timers.items())
+    except Exception as exc:
+        logger.warning("Failed to schedule %d tracker timers: %s", len(timers), exc)
 
-    if sent:
-        logger.info("dispatch_tracker_reminders: sent=%d", sent)
+
+async def tracker_timers(session, until: datetime) -> list[tuple]:  # noqa: ANN001
+    """Timer entries for trackers whose reminder fires before *until* (reconciliation).
+
+    One-shot reminders within ``TIMER_GRACE`` of their time and repeat-mode
+    trackers past theirs are due now; the dispatch task sorts out dedup.
+    """
+    now_utc = datetime.now(UTC)
+    entries = []
+    for tracker, telegram_id, *_, tz_str, _ in await _load_trackers(session, None):
+        config = tracker.config or {}
+        reminder_time = config.get("reminder_time")
+        if not telegram_id or not reminder_time:
+            continue
+        tz = _parse_tz(tz_str)
+        if config.get("reminder_repeat_minutes") and _is_past_reminder_time(
+            reminder_time, now_utc.astimezone(tz)
+        ):
+            fire_at = now_utc
+        else:
+            fire_at = next_fire_at(reminder_time, tz, now_utc, grace=TIMER_GRACE)
+        if fire_at and fire_at <= until:
+            entries.append(("tracker", str(tracker.id), fire_at))
+    return entries
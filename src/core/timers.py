@@ -0,0 +1,303 @@
+"""Delay-queue timer service for reminders, scheduled actions, trackers and bookings.
+
+Every time-triggered entity has one entry in a Redis sorted set::
+
+    timers:due    member = "{kind}:{id}"    score = next fire time (epoch seconds)
+
+* **Writers** don't call anything: session hooks (``after_flush`` /
+  ``after_commit``) compute the entry for every new, changed or deleted
+  ``Task``, ``ScheduledAction``, ``Tracker`` and ``Booking`` and apply it
+  once the transaction commits. Bulk ``update()`` statements bypass the ORM,
+  so code using them schedules explicitly with ``schedule_timers``.
+* **The dispatcher** (``run_timer_dispatcher``, started in each Taskiq
+  worker) sleeps until the earliest score — at most ``IDLE_SECONDS`` — then
+  atomically pops due members and kicks the kind's dispatch task with their
+  ids. Delivery has second-level precision and an idle system costs one
+  ``ZRANGE`` per second instead of four database scans per minute.
+* **Dispatch tasks** re-read their rows and re-check the due condition, so a
+  stale or duplicated timer is a no-op; a fire schedules the next one.
+* **Reconciliation** (``timer_tasks.reconcile_timers``, every
+  ``RECONCILE_MINUTES``) re-adds everything due within ``RECONCILE_HORIZON``
+  from the database. It repairs timers lost with Redis, and sweeps overdue
+  rows directly when Redis is unreachable.
+
+``sheets`` timers push a family's Google Sheets sync after writes to the
+synced tables (with ``ff_sheets_push``). They keep the earliest pending fire
+time, so a burst of writes is synced once, ``sheets_push_delay_seconds``
+after the first. ``summary`` timers work the same way for persisted
+conversation messages: ``summary_delay_seconds`` after the first of a burst,
+the user's new messages are folded into their session summary.
+
+Trackers fire at a local wall-clock time and the user's timezone is not on
+the row, so a tracker write enqueues it for *now*: its dispatch task works
+out the next fire time and reschedules.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.models.enums import ActionStatus, BookingStatus, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+TIMER_KEY = "timers:due"
+IDLE_SECONDS = 1.0
+RETRY_SECONDS = 30
+POP_BATCH = 200
+RECONCILE_MINUTES = 5
+RECONCILE_HORIZON = timedelta(minutes=2 * RECONCILE_MINUTES)
+# How late a wall-clock timer may still fire (e.g. after a reconciliation sweep).
+TIMER_GRACE = timedelta(minutes=RECONCILE_MINUTES)
+BOOKING_LEADS = (("24h", timedelta(hours=24)), ("1h", timedelta(hours=1)))
+
+_BOOKING_OPEN = (BookingStatus.scheduled, BookingStatus.confirmed)
+_SESSION_KEY = "timer_entries"
+# Tables whose writes push the family's sheets sync (src/core/sheets_sync.py)
+SHEETS_PUSH_TABLES = frozenset({"transactions", "tasks", "contacts"})
+# Kinds where an already pending timer wins over a later one
+_KEEP_EARLIEST = frozenset({"sheets", "summary"})
+
+TIMERS_FIRED = REGISTRY.counter(
+    "finbot_timers_fired_total",
+    "Delay-queue timers popped by the dispatcher, by kind.",
+    ("kind",),
+)
+
+# Pop up to ARGV[2] members with score <= ARGV[1] in one atomic step, so
+# concurrent dispatchers never fire the same timer twice.
+_POP_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+Entry = tuple[str, str, datetime | None]  # (kind, id, fire_at) — None cancels
+
+
+def _member(kind: str, entity_id: Any) -> str:
+    return f"{kind}:{entity_id}"
+
+
+async def schedule_timers(entries: Iterable[Entry]) -> int:
+    """Add, move or (with ``fire_at=None``) cancel timers. Returns entries applied."""
+    add: dict[str, float] = {}
+    add_new: dict[str, float] = {}
+    remove: list[str] = []
+    for kind, entity_id, fire_at in entries:
+        member = _member(kind, entity_id)
+        if fire_at is None:
+            remove.append(member)
+        elif kind in _KEEP_EARLIEST:
+            add_new[member] = fire_at.timestamp()
+        else:
+            add[member] = fire_at.timestamp()
+    if not add and not add_new and not remove:
+        return 0
+
+    from src.core.db import redis
+
+    async with redis.pipeline(transaction=False) as pipe:
+        if add:
+            pipe.zadd(TIMER_KEY, add)
+        if add_new:
+            pipe.zadd(TIMER_KEY, add_new, nx=True)
+        if remove:
+            pipe.zrem(TIMER_KEY, *remove)
+        await pipe.execute()
+    return len(add) + len(add_new) + len(remove)
+
+
+async def schedule_timer(kind: str, entity_id: Any, fire_at: datetime | None) -> None:
+    """Schedule (or cancel, with ``None``) a single timer, logging failures."""
+    try:
+        await schedule_timers([(kind, str(entity_id), fire_at)])
+    except Exception as e:
+        logger.debug("Timer schedule failed for %s:%s: %s", kind, entity_id, e)
+
+
+async def pop_due_timers(now: float | None = None, limit: int = POP_BATCH) -> dict[str, list[str]]:
+    """Atomically remove timers due at *now* (epoch seconds), grouped by kind."""
+    from src.core.db import redis
+
+    now = time.time() if now is None else now
+    members = await redis.eval(_POP_DUE, 1, TIMER_KEY, now, limit)
+    due: dict[str, list[str]] = {}
+    for member in members or []:
+        kind, _, entity_id = member.partition(":")
+        due.setdefault(kind, []).append(entity_id)
+    return due
+
+
+async def seconds_until_next(now: float | None = None, cap: float = IDLE_SECONDS) -> float:
+    """Seconds until the earliest timer, capped so new earlier timers are seen."""
+    from src.core.db import redis
+
+    now = time.time() if now is None else now
+    head = await redis.zrange(TIMER_KEY, 0, 0, withscores=True)
+    if not head:
+        return cap
+    return max(0.0, min(cap, head[0][1] - now))
+
+
+async def dispatch_due_timers(
+    fire: Callable[[str, list[str]], Awaitable[None]],
+    *,
+    now: float | None = None,
+    limit: int = POP_BATCH,
+) -> int:
+    """Pop due timers and hand each kind's ids to *fire*. Returns timers popped.
+
+    If *fire* fails the ids are put back ``RETRY_SECONDS`` later.
+    """
+    due = await pop_due_timers(now, limit)
+    popped = 0
+    for kind, ids in due.items():
+        popped += len(ids)
+        TIMERS_FIRED.inc(kind, amount=len(ids))
+        try:
+            await fire(kind, ids)
+        except Exception:
+            logger.exception("Timer fire failed for %d %s timers", len(ids), kind)
+            retry_at = datetime.now(UTC) + timedelta(seconds=RETRY_SECONDS)
+            await schedule_timers((kind, entity_id, retry_at) for entity_id in ids)
+    return popped
+
+
+async def run_timer_dispatcher(fire: Callable[[str, list[str]], Awaitable[None]]) -> None:
+    """Dispatch due timers until cancelled."""
+    while True:
+        try:
+            if await dispatch_due_timers(fire) >= POP_BATCH:
+                continue  # backlog — keep draining
+            delay = await seconds_until_next()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Timer dispatcher error: %s", e)
+            delay = RETRY_SECONDS
+        await asyncio.sleep(delay)
+
+
+# ── Fire times ────────────────────────────────────────────────────────────
+
+
+def booking_reminder_at(start_at: datetime, now: datetime) -> datetime | None:
+    """When the next (24h, then 1h) reminder for a booking starting at *start_at* fires."""
+    for _, lead in BOOKING_LEADS:
+        fire_at = start_at - lead
+        if fire_at >= now - TIMER_GRACE:
+            return fire_at
+    return None
+
+
+def timer_entry(obj: Any, now: datetime) -> Entry | None:
+    """The timer a persisted entity should have, or ``None`` if it has no timer kind."""
+    table = getattr(obj, "__tablename__", None)
+    entity_id = str(obj.id)
+    if table == "tasks":
+        due = obj.status == TaskStatus.pending and obj.reminder_at is not None
+        return "reminder", entity_id, obj.reminder_at if due else None
+    if table == "scheduled_actions":
+        if obj.status != ActionStatus.active or obj.next_run_at is None:
+            return "action", entity_id, None
+        # A leased action is retried when its lease expires
+        return "action", entity_id, max(obj.next_run_at, obj.claimed_until or obj.next_run_at)
+    if table == "bookings":
+        fire_at = None
+        if obj.status in _BOOKING_OPEN and not obj.reminder_sent and obj.start_at:
+            fire_at = booking_reminder_at(obj.start_at, now)
+        return "booking", entity_id, fire_at
+    if table == "trackers":
+        config = obj.config or {}
+        enabled = obj.is_active and config.get("reminder_enabled") and config.get("reminder_time")
+        return "tracker", entity_id, now if enabled else None
+    return None
+
+
+def sheets_push_entry(obj: Any, now: datetime) -> Entry | None:
+    """The sheets-sync push a write to *obj* triggers, if any."""
+    if not settings.ff_sheets_push:
+        return None
+    if getattr(obj, "__tablename__", None) not in SHEETS_PUSH_TABLES:
+        return None
+    family_id = getattr(obj, "family_id", None)
+    if family_id is None:
+        return None
+    return "sheets", str(family_id), now + timedelta(seconds=settings.sheets_push_delay_seconds)
+
+
+def summary_entry(obj: Any, now: datetime) -> Entry | None:
+    """The summarization run a newly persisted conversation message triggers."""
+    if getattr(obj, "__tablename__", None) != "conversation_messages":
+        return None
+    return (
+        "summary",
+        f"{obj.user_id}:{obj.family_id}",
+        now + timedelta(seconds=settings.summary_delay_seconds),
+    )
+
+
+# ── Session hooks ─────────────────────────────────────────────────────────
+
+_background: set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_timer_entries(session: Session, flush_context: Any) -> None:
+    now = datetime.now(UTC)
+    entries = session.info.setdefault(_SESSION_KEY, {})
+    for obj in (*session.new, *session.dirty):
+        entry = timer_entry(obj, now)
+        if entry and obj.id is not None:
+            entries[entry[:2]] = entry
+    for obj in session.deleted:
+        entry = timer_entry(obj, now)
+        if entry:
+            entries[entry[:2]] = (entry[0], entry[1], None)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        push = sheets_push_entry(obj, now)
+        if push:
+            entries.setdefault(push[:2], push)
+    for obj in session.new:
+        summary = summary_entry(obj, now)
+        if summary:
+            entries.setdefault(summary[:2], summary)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_timer_entries(session: Session) -> None:
+    entries = session.info.pop(_SESSION_KEY, None)
+    if not entries:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # sync session outside the app; reconciliation picks it up
+    task = loop.create_task(_apply(list(entries.values())))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_timer_entries(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+async def _apply(entries: list[Entry]) -> None:
+    try:
+        await schedule_timers(entries)
+    except Exception as e:
+        logger.debug("Timer update after commit failed (%d entries): %s", len(entries), e)
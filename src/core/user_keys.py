@@ -0,0 +1,79 @@
+"""Per-user Redis key registry for GDPR erasure.
+
+Erasure used to ``SCAN`` the whole keyspace once per pattern, which is
+O(total keys) per request. Instead, every per-user key is either:
+
+* fixed — fully determined by the user id (``USER_KEY_TEMPLATES``); or
+* dynamic — includes a value only known at write time (e.g. a domain), in
+  which case the writer records it with ``track_user_key`` in the user's
+  ``user_keys:<user_id>`` set.
+
+``delete_user_keys`` then removes exactly those keys in O(user's keys).
+"""
+
+import logging
+from typing import Any
+
+from src.core.db import redis
+from src.core.memory.procedural import PROCEDURAL_DOMAINS
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PREFIX = "user_keys"
+# Longest TTL of any dynamic key plus slack; refreshed on every write.
+REGISTRY_TTL = 30 * 86400
+_DELETE_CHUNK = 500
+
+USER_KEY_TEMPLATES: tuple[str, ...] = (
+    "conv:{user_id}:messages",
+    "session_facts:{user_id}",
+    "mem0_dlq:{user_id}",
+    "mem0_dlq_idem:{user_id}",
+    "core_identity:{user_id}",
+    "last_file:{user_id}:meta",
+    "undo:{user_id}",
+    "plan_pending:{user_id}",
+    "clarify_pending:{user_id}",
+    "maps_pending:{user_id}",
+    "video_session:{user_id}",
+    "invoice_active:{user_id}",
+    "user_last_program:{user_id}",
+    "personality_ema:{user_id}",
+    "onboarding_state:{user_id}",
+    "onboarding_lang:{user_id}",
+    # Realtime procedures: one list per (fixed) domain. Keys written before the
+    # registry existed are only reachable through these templates.
+    *(f"proc_rt:{{user_id}}:{domain}" for domain in sorted(PROCEDURAL_DOMAINS)),
+)
+
+
+def registry_key(user_id: str) -> str:
+    return f"{REGISTRY_PREFIX}:{user_id}"
+
+
+def track_user_key(user_id: str, key: str, pipe: Any) -> None:
+    """Queue registration of a dynamic per-user *key* onto *pipe*.
+
+    Callers add this to the pipeline that writes *key*, so registration costs
+    no extra round-trip.
+    """
+    reg = registry_key(user_id)
+    pipe.sadd(reg, key)
+    pipe.expire(reg, REGISTRY_TTL)
+
+
+async def list_user_keys(user_id: str) -> list[str]:
+    """Every Redis key that may hold data for *user_id*."""
+    fixed = [template.format(user_id=user_id) for template in USER_KEY_TEMPLATES]
+    tracked = await redis.smembers(registry_key(user_id))
+    return fixed + sorted(tracked or ())
+
+
+async def delete_user_keys(user_id: str) -> int:
+    """Delete all of *user_id*'s Redis keys and the registry itself."""
+    keys = await list_user_keys(user_id)
+    keys.append(registry_key(user_id))
+    deleted = 0
+    for start in range(0, len(keys), _DELETE_CHUNK):
+        deleted += await redis.unlink(*keys[start : start + _DELETE_CHUNK])
+    return deleted
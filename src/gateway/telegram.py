@@ -3,17 +3,18 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import BinaryIO
 
 try:
     from aiogram import Bot, Dispatcher, types
-    from aiogram.types import BufferedInputFile, MenuButtonWebApp, WebAppInfo
+    from aiogram.types import BufferedInputFile, InputFile, MenuButtonWebApp, WebAppInfo
     from aiogram.utils.keyboard import InlineKeyboardBuilder
 
     _AIOGRAM_AVAILABLE = True
 except ModuleNotFoundError:  # pragma: no cover - optional dependency in CI
     Bot = Dispatcher = types = None  # type: ignore[assignment]
-    BufferedInputFile = None  # type: ignore[assignment]
+    BufferedInputFile = InputFile = None  # type: ignore[assignment]
     InlineKeyboardBuilder = None  # type: ignore[assignment]
     _AIOGRAM_AVAILABLE = False
 
@@ -23,6 +24,20 @@ from src.gateway.types import IncomingMessage, MessageType, OutgoingMessage
 logger = logging.getLogger(__name__)
 
 
+if _AIOGRAM_AVAILABLE:
+
+    class FileObjectInputFile(InputFile):
+        """Upload an open binary file in chunks instead of loading it whole."""
+
+        def __init__(self, file: BinaryIO, filename: str | None = None):
+            super().__init__(filename=filename)
+            self.file = file
+
+        async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:  # noqa: ARG002
+            while chunk := self.file.read(self.chunk_size):
+                yield chunk
+
+
 class _NoopDispatcher:
     def message(self):
         def decorator(func):  # noqa: ANN001, ANN202
@@ -127,7 +142,17 @@ class TelegramGateway:
 
         kwargs = {"chat_id": int(message.chat_id), "parse_mode": message.parse_mode}
 
-        if message.document:
+        if message.document_file:
+            try:
+                file = FileObjectInputFile(
+                    message.document_file, filename=message.document_name or "file"
+                )
+                await self.bot.send_document(
+                    **kwargs, document=file, caption=message.text, reply_markup=reply_markup
+                )
+            finally:
+                message.document_file.close()
+        elif message.document:
             file = BufferedInputFile(message.document, filename=message.document_name or "file")
             await self.bot.send_document(
                 **kwargs, document=file, caption=message.text, reply_markup=reply_markup
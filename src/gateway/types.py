@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from enum import StrEnum
+from typing import BinaryIO
 
 
 class MessageType(StrEnum):
@@ -47,6 +48,9 @@ class OutgoingMessage:
     chat_id: str
     buttons: list[dict] | None = None
     document: bytes | None = None
+    # Open binary file sent in chunks instead of ``document``; the gateway
+    # closes it after sending.
+    document_file: BinaryIO | None = None
     document_name: str | None = None
     photo_url: str | None = None
     photo_bytes: bytes | None = None
@@ -317,7 +317,11 @@ class WhatsAppGateway:
         """
         client = await self._get_client()
 
-        # Handle document attachment
+        # Handle document attachment (the Cloud API upload takes the whole body)
+        if message.document_file:
+            with message.document_file as file:
+                message.document = file.read()
+            message.document_file = None
         if message.document:
             await self.send_document(
                 message.chat_id,
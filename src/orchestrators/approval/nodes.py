@@ -106,12 +106,12 @@ async def _dispatch(
         )
 
     if intent == "delete_all":
-        from src.core.db import async_session
-        from src.core.gdpr import MemoryGDPR
+        from src.core.gdpr import start_user_erasure
 
-        gdpr = MemoryGDPR()
-        async with async_session() as session:
-            await gdpr.delete_user_data(session, user_id)
-        return "All your data has been deleted. Send /start to begin again."
+        await start_user_erasure(user_id)
+        return (
+            "Deletion of all your data has started and will finish in a few minutes. "
+            "Send /start to begin again."
+        )
 
     return "Unknown action."
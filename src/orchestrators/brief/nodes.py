@@ -31,6 +31,7 @@ from src.core.models.enums import (
 from src.core.models.recurring_payment import RecurringPayment
 from src.core.models.task import Task
 from src.core.models.transaction import Transaction
+from src.core.query_cache import cached_query
 from src.orchestrators.brief.state import BriefState
 from src.orchestrators.resilience import with_retry, with_timeout
 
@@ -172,29 +173,11 @@ async def collect_finance(state: BriefState) -> dict[str, Any]:
 async def _collect_finance_summary(
     family_id: str, user_id: str, role: str = "owner"
 ) -> dict[str, Any]:
-    today = date.today()
-    yesterday = today - timedelta(days=1)
+    totals = await _expense_totals(family_id, date.today(), role=role, user_id=user_id)
+    yesterday_expense = totals["yesterday"]
+    month_expense = totals["month"]
 
     async with async_session() as session:
-        stmt1 = select(func.sum(Transaction.amount)).where(
-            Transaction.family_id == uuid.UUID(family_id),
-            Transaction.date >= yesterday,
-            Transaction.date < today,
-            Transaction.type == TransactionType.expense,
-        )
-        stmt1 = apply_visibility_filter(stmt1, Transaction, role, user_id)
-        result = await session.execute(stmt1)
-        yesterday_expense = float(result.scalar() or 0)
-
-        stmt2 = select(func.sum(Transaction.amount)).where(
-            Transaction.family_id == uuid.UUID(family_id),
-            Transaction.date >= today.replace(day=1),
-            Transaction.type == TransactionType.expense,
-        )
-        stmt2 = apply_visibility_filter(stmt2, Transaction, role, user_id)
-        result2 = await session.execute(stmt2)
-        month_expense = float(result2.scalar() or 0)
-
         # Epic G2: Fetch total monthly budget (where category_id is null)
         # Budget does NOT have visibility column — no filter needed
         budget_result = await session.execute(
@@ -220,10 +203,48 @@ async def _collect_finance_summary(
     return {"finance_data": "Money:\n" + "\n".join(f"- {p}" for p in parts)}
 
 
+@cached_query("brief.expense_totals")
+async def _expense_totals(
+    family_id: str, today: date, role: str = "owner", user_id: str = ""
+) -> dict[str, float]:
+    """Yesterday's and month-to-date expenses."""
+    yesterday = today - timedelta(days=1)
+    async with async_session() as session:
+        stmt1 = select(func.sum(Transaction.amount)).where(
+            Transaction.family_id == uuid.UUID(family_id),
+            Transaction.date >= yesterday,
+            Transaction.date < today,
+            Transaction.type == TransactionType.expense,
+        )
+        stmt1 = apply_visibility_filter(stmt1, Transaction, role, user_id)
+        result = await session.execute(stmt1)
+        yesterday_expense = float(result.scalar() or 0)
+
+        stmt2 = select(func.sum(Transaction.amount)).where(
+            Transaction.family_id == uuid.UUID(family_id),
+            Transaction.date >= today.replace(day=1),
+            Transaction.type == TransactionType.expense,
+        )
+        stmt2 = apply_visibility_filter(stmt2, Transaction, role, user_id)
+        result2 = await session.execute(stmt2)
+        month_expense = float(result2.scalar() or 0)
+    return {"yesterday": yesterday_expense, "month": month_expense}
+
+
 async def _collect_today_spending(
     family_id: str, user_id: str, role: str = "owner"
 ) -> dict[str, Any]:
-    today = date.today()
+    total, count = await _today_spending(family_id, date.today(), role=role, user_id=user_id)
+    if not total:
+        return {"finance_data": ""}
+    return {"finance_data": (f"Spending today:\n- ${total:.2f} across {count} transactions")}
+
+
+@cached_query("brief.today_spending")
+async def _today_spending(
+    family_id: str, today: date, role: str = "owner", user_id: str = ""
+) -> list:
+    """Today's expense total and transaction count."""
     async with async_session() as session:
         stmt = select(func.sum(Transaction.amount), func.count(Transaction.id)).where(
             Transaction.family_id == uuid.UUID(family_id),
@@ -233,13 +254,9 @@ async def _collect_today_spending(
         stmt = apply_visibility_filter(stmt, Transaction, role, user_id)
         result = await session.execute(stmt)
         row = result.one_or_none()
-
     if not row or not row[0]:
-        return {"finance_data": ""}
-
-    total = float(row[0])
-    count = row[1]
-    return {"finance_data": (f"Spending today:\n- ${total:.2f} across {count} transactions")}
+        return [0.0, 0]
+    return [float(row[0]), row[1]]
 
 
 @with_retry(max_retries=1, backoff_base=1.0)
@@ -41,10 +41,22 @@ def get_checkpointer() -> BaseCheckpointSaver:
 
     try:
         from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
         from psycopg_pool import AsyncConnectionPool
 
-        conninfo = _get_conninfo()
-        pool = AsyncConnectionPool(conninfo=conninfo, open=False)
+        from src.core.connection_budget import pool_budget, register_pool
+
+        budget = pool_budget("checkpointer")
+        pool = AsyncConnectionPool(
+            conninfo=_get_conninfo(),
+            min_size=budget.min_size,
+            max_size=budget.max_size,
+            timeout=settings.db_pool_timeout_seconds,
+            # No server-side prepared statements: PgBouncer transaction mode
+            kwargs={"autocommit": True, "prepare_threshold": None, "row_factory": dict_row},
+            open=False,
+        )
+        register_pool("checkpointer", pool)
         _checkpointer = AsyncPostgresSaver(conn=pool)
         logger.info("LangGraph checkpointer: AsyncPostgresSaver (PostgreSQL)")
     except Exception:
@@ -14,12 +14,13 @@ from sqlalchemy import func, select
 from src.core.access import apply_visibility_filter
 from src.core.charts import create_pie_chart
 from src.core.context import SessionContext
-from src.core.db import async_session
+from src.core.db import rls_read_session
 from src.core.llm.clients import generate_text
 from src.core.models.category import Category
 from src.core.models.enums import TransactionType
 from src.core.models.transaction import Transaction
 from src.core.observability import observe
+from src.core.query_cache import cached_query
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings, t_cached
 from src.skills.base import SkillResult
@@ -230,11 +231,12 @@ class FinancialSummarySkill:
         return SkillResult(response_text=response, chart_url=chart_url)
 
     @staticmethod
+    @cached_query("financial_summary.categories")
     async def _get_category_breakdown(
         family_id: str, start: date, end: date, role: str = "owner", user_id: str = "",
     ) -> list[dict[str, Any]]:
         """Get expense totals grouped by category."""
-        async with async_session() as session:
+        async with rls_read_session(family_id, user_id or None) as session:
             stmt = (
                 select(
                     Category.name.label("category"),
@@ -264,12 +266,13 @@ class FinancialSummarySkill:
             ]
 
     @staticmethod
+    @cached_query("financial_summary.merchants")
     async def _get_top_merchants(
         family_id: str, start: date, end: date, role: str = "owner", user_id: str = "",
         limit: int = 5,
     ) -> list[dict[str, Any]]:
         """Get top merchants by spend."""
-        async with async_session() as session:
+        async with rls_read_session(family_id, user_id or None) as session:
             stmt = (
                 select(
                     Transaction.merchant,
@@ -296,11 +299,12 @@ class FinancialSummarySkill:
             ]
 
     @staticmethod
+    @cached_query("financial_summary.income")
     async def _get_income_total(
         family_id: str, start: date, end: date, role: str = "owner", user_id: str = "",
     ) -> float:
         """Get total income for the period."""
-        async with async_session() as session:
+        async with rls_read_session(family_id, user_id or None) as session:
             stmt = select(func.sum(Transaction.amount)).where(
                 Transaction.family_id == uuid.UUID(family_id),
                 Transaction.type == TransactionType.income,
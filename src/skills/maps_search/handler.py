@@ -14,6 +14,7 @@ from src.core.db import redis
 from src.core.llm.clients import google_client
 from src.core.observability import observe
 from src.core.research.dual_search import dual_search
+from src.core.research.search_cache import cached_search
 from src.core.research.signal_detector import detect_signals
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings
@@ -53,6 +54,8 @@ Rules:
 
 MAPS_API_BASE = "https://maps.googleapis.com/maps/api"
 
+PLACES_NOT_FOUND = "I couldn't find places. Try again or rephrase your query?"
+
 FALLBACK_NOTE = (
     "\n\n<i>Based on Google Search — for bulk place lists, configure GOOGLE_MAPS_API_KEY.</i>"
 )
@@ -243,7 +246,27 @@ async def _maps_grounding_adapter(
 async def search_places_grounding(
     query: str, language: str, *, location_hint: str = "", original_message: str = ""
 ) -> str:
-    """Search for places using Gemini with Google Search grounding."""
+    """Search for places using Gemini with Google Search grounding.
+
+    Answers are shared across users with the same query and location hint
+    (see ``search_cache``).
+    """
+    return await cached_search(
+        "places",
+        query,
+        language,
+        lambda: _search_places_grounding(query, language, location_hint, original_message),
+        locale=location_hint,
+        original_message=original_message,
+        cacheable=lambda answer: (
+            bool(answer) and answer != PLACES_NOT_FOUND and not answer.endswith(FALLBACK_NOTE)
+        ),
+    )
+
+
+async def _search_places_grounding(
+    query: str, language: str, location_hint: str, original_message: str
+) -> str:
     client = google_client()
     system = MAPS_GROUNDING_PROMPT.format(language=language, location_hint=location_hint)
     user_msg = original_message or query
@@ -277,7 +300,7 @@ async def search_places_grounding(
     except Exception as e:
         logger.error("Gemini maps fallback also failed: %s", e)
 
-    return "I couldn't find places. Try again or rephrase your query?"
+    return PLACES_NOT_FOUND
 
 
 # ---------------------------------------------------------------------------
@@ -19,6 +19,7 @@ from src.core.models.category import Category
 from src.core.models.enums import TransactionType
 from src.core.models.transaction import Transaction
 from src.core.observability import observe
+from src.core.query_cache import cached_query
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings
 from src.skills.base import SkillResult
@@ -138,6 +139,7 @@ class QueryStatsSkill:
     intents = ["query_stats"]
     model = "gemini-3.1-flash-lite-preview"
 
+    @cached_query("query_stats.comparison")
     async def _get_comparison_data(
         self,
         family_id: str,
@@ -219,6 +221,61 @@ class QueryStatsSkill:
             "by_category": comparison,
         }
 
+    @cached_query("query_stats.period")
+    async def _get_period_stats(
+        self,
+        family_id: str,
+        start: date,
+        end: date,
+        role: str = "owner",
+        user_id: str = "",
+    ) -> dict:
+        """Expense totals by category, total expense and total income for a period."""
+        async with async_session() as session:
+            stats_stmt = (
+                select(
+                    Category.name,
+                    func.sum(Transaction.amount).label("total"),
+                )
+                .join(Category, Transaction.category_id == Category.id)
+                .where(
+                    Transaction.family_id == uuid.UUID(family_id),
+                    Transaction.date >= start,
+                    Transaction.date < end,
+                    Transaction.type == TransactionType.expense,
+                )
+                .group_by(Category.name)
+                .order_by(func.sum(Transaction.amount).desc())
+            )
+            result = await session.execute(
+                apply_visibility_filter(stats_stmt, Transaction, role, user_id)
+            )
+            by_category = [[name, float(amount or 0)] for name, amount in result.all()]
+
+            total_stmt = select(func.sum(Transaction.amount)).where(
+                Transaction.family_id == uuid.UUID(family_id),
+                Transaction.date >= start,
+                Transaction.date < end,
+                Transaction.type == TransactionType.expense,
+            )
+            total_result = await session.execute(
+                apply_visibility_filter(total_stmt, Transaction, role, user_id)
+            )
+            total = total_result.scalar() or 0
+
+            income_stmt = select(func.sum(Transaction.amount)).where(
+                Transaction.family_id == uuid.UUID(family_id),
+                Transaction.date >= start,
+                Transaction.date < end,
+                Transaction.type == TransactionType.income,
+            )
+            income_result = await session.execute(
+                apply_visibility_filter(income_stmt, Transaction, role, user_id)
+            )
+            income = income_result.scalar() or 0
+
+        return {"by_category": by_category, "expense": float(total), "income": float(income)}
+
     @observe(name="query_stats")
     async def execute(
         self,
@@ -254,55 +311,14 @@ class QueryStatsSkill:
                 ]
             else:
                 # SQL query — LLM NEVER calculates
-                async with async_session() as session:
-                    stats_stmt = (
-                        select(
-                            Category.name,
-                            func.sum(Transaction.amount).label("total"),
-                        )
-                        .join(Category, Transaction.category_id == Category.id)
-                        .where(
-                            Transaction.family_id == uuid.UUID(context.family_id),
-                            Transaction.date >= start_date,
-                            Transaction.date < end_date,
-                            Transaction.type == TransactionType.expense,
-                        )
-                        .group_by(Category.name)
-                        .order_by(func.sum(Transaction.amount).desc())
-                    )
-                    result = await session.execute(
-                        apply_visibility_filter(
-                            stats_stmt, Transaction, context.role, context.user_id
-                        )
-                    )
-                    stats = result.all()
-
-                    total_stmt = select(func.sum(Transaction.amount)).where(
-                        Transaction.family_id == uuid.UUID(context.family_id),
-                        Transaction.date >= start_date,
-                        Transaction.date < end_date,
-                        Transaction.type == TransactionType.expense,
-                    )
-                    total_result = await session.execute(
-                        apply_visibility_filter(
-                            total_stmt, Transaction, context.role, context.user_id
-                        )
-                    )
-                    total = total_result.scalar() or Decimal("0")
-
-                    # Income query
-                    income_stmt = select(func.sum(Transaction.amount)).where(
-                        Transaction.family_id == uuid.UUID(context.family_id),
-                        Transaction.date >= start_date,
-                        Transaction.date < end_date,
-                        Transaction.type == TransactionType.income,
-                    )
-                    income_result = await session.execute(
-                        apply_visibility_filter(
-                            income_stmt, Transaction, context.role, context.user_id
-                        )
-                    )
-                    total_income = income_result.scalar() or Decimal("0")
+                period_stats = await self._get_period_stats(
+                    context.family_id, start_date, end_date, context.role, context.user_id
+                )
+                stats = [
+                    (name, Decimal(str(amount))) for name, amount in period_stats["by_category"]
+                ]
+                total = Decimal(str(period_stats["expense"]))
+                total_income = Decimal(str(period_stats["income"]))
         except Exception as e:
             logger.exception("query_stats SQL error for family_id=%s: %s", context.family_id, e)
             return SkillResult(
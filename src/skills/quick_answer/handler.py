@@ -6,7 +6,8 @@ from typing import Any
 from zoneinfo import ZoneInfo
 
 from src.core.context import SessionContext
-from src.core.llm.clients import google_client
+from src.core.llm.clients import generate_text, google_client
+from src.core.llm.hedging import hedged_call
 from src.core.observability import observe
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings
@@ -69,7 +70,7 @@ async def generate_answer(
     original_message: str = "",
     timezone: str = "UTC",
 ) -> str:
-    """Generate a factual answer using Gemini Flash."""
+    """Generate a factual answer using Gemini Flash, hedged with Claude Haiku."""
     client = google_client()
     system = QUICK_ANSWER_SYSTEM_PROMPT.format(language=language)
 
@@ -89,12 +90,26 @@ async def generate_answer(
 
     user_msg = original_message or query
 
-    try:
+    contents = f"{system}\n\nUser's original message: {user_msg}\nQuestion: {query}"
+
+    async def _gemini() -> str:
         response = await client.aio.models.generate_content(
             model="gemini-3.1-flash-lite-preview",
-            contents=f"{system}\n\nUser's original message: {user_msg}\nQuestion: {query}",
+            contents=contents,
+        )
+        return response.text or ""
+
+    async def _claude() -> str:
+        return await generate_text(
+            "claude-haiku-4-5",
+            system=system,
+            prompt=f"User's original message: {user_msg}\nQuestion: {query}",
+            trace_name="quick_answer_hedge",
         )
-        return response.text or "I couldn't find an answer. Try rephrasing?"
+
+    try:
+        answer = await hedged_call("quick_answer", _gemini, _claude)
+        return answer or "I couldn't find an answer. Try rephrasing?"
     except Exception as e:
         logger.warning("Quick answer generation failed: %s", e)
         return "Something went wrong. Try asking again?"
@@ -1,7 +1,7 @@
 ﻿"""Reschedule booking skill — move an appointment to a new time."""
 
 import logging
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 from zoneinfo import ZoneInfo
 
@@ -14,6 +14,7 @@ from src.core.models.enums import BookingStatus
 from src.core.observability import observe
 from src.core.search_utils import ilike_all_words, split_search_words
 from src.core.text_utils import fuzzy_find
+from src.core.timers import booking_reminder_at, schedule_timers
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings
 from src.skills.base import SkillResult
@@ -128,6 +129,13 @@ class RescheduleBookingSkill:
             )
             await session.commit()
 
+        # Bulk update() bypasses the timer session hooks
+        fire_at = booking_reminder_at(new_start, datetime.now(UTC))
+        try:
+            await schedule_timers([("booking", str(booking.id), fire_at)])
+        except Exception as e:
+            logger.warning("Failed to reschedule reminder for booking %s: %s", booking.id, e)
+
         return SkillResult(
             response_text=(
                 f"Rescheduled: <b>{booking.title}</b>\n"
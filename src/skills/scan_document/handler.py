@@ -1,5 +1,6 @@
 """Universal document scanner — classifies and extracts data from any photo/document."""
 
+import asyncio
 import base64
 import json
 import logging
@@ -9,6 +10,7 @@ from typing import Any
 import instructor
 from pydantic import BaseModel
 
+from src.core.blob_store import get_blob_store
 from src.core.context import SessionContext
 from src.core.db import redis
 from src.core.llm.clients import anthropic_client, google_client
@@ -20,6 +22,12 @@ from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings, t_cached
 from src.skills.base import SkillResult
 from src.tools.document_reader import extract_pages_as_images
+from src.tools.image_preprocess import (
+    DOCUMENT_PROFILE,
+    PDF_PAGE_PROFILE,
+    PreparedImage,
+    prepare_ocr_image,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -284,11 +292,14 @@ async def store_pending_doc(
     user_id: str,
     family_id: str,
 ) -> None:
-    """Store pending document data in Redis for later save on user confirm."""
+    """Store pending document data in Redis for later save on user confirm.
+
+    The image goes to the blob store; Redis keeps only its handle.
+    """
     payload = {
         "doc_type": doc_type,
         "ocr_data": ocr_data,
-        "image_b64": base64.b64encode(image_bytes).decode(),
+        "image_blob": await get_blob_store().put(image_bytes, mime_type),
         "mime_type": mime_type,
         "fallback_used": fallback_used,
         "user_id": user_id,
@@ -336,12 +347,23 @@ class ScanDocumentSkill:
         # Extract all pages as PNG images when the input is a PDF.
         # The page images are used for both classification and OCR so the LLM
         # sees the full document rather than only the first page.
-        pdf_page_images: list[bytes] = []
+        pdf_page_images: list[PreparedImage] = []
         if _is_pdf(mime_type, filename):
             try:
-                all_pages = await extract_pages_as_images(image_bytes, filename or "doc.pdf")
+                all_pages = await extract_pages_as_images(
+                    image_bytes,
+                    filename or "doc.pdf",
+                    target_long_edge=PDF_PAGE_PROFILE.target_long_edge,
+                )
                 if all_pages:
-                    pdf_page_images = all_pages[:MAX_PDF_PAGES]
+                    pdf_page_images = list(
+                        await asyncio.gather(
+                            *(
+                                prepare_ocr_image(page, "image/png", PDF_PAGE_PROFILE)
+                                for page in all_pages[:MAX_PDF_PAGES]
+                            )
+                        )
+                    )
                     logger.info(
                         "PDF split into %d page(s) (total %d)",
                         len(pdf_page_images),
@@ -350,10 +372,20 @@ class ScanDocumentSkill:
             except Exception as e:
                 logger.warning("PDF page extraction failed: %s, falling back to raw bytes", e)
 
+        # Photos/scans: EXIF fix, crop, downscale and re-encode before OCR.
+        # The original bytes are still what gets stored.
+        prepared = (
+            await prepare_ocr_image(image_bytes, mime_type, DOCUMENT_PROFILE)
+            if not pdf_page_images
+            else None
+        )
+        ocr_bytes = prepared.data if prepared else image_bytes
+        ocr_mime = prepared.mime_type if prepared else mime_type
+
         # Step 1: Classify document type
         # Use first page image for classification (covers the document header).
-        classify_bytes = pdf_page_images[0] if pdf_page_images else image_bytes
-        classify_mime = "image/png" if pdf_page_images else mime_type
+        classify_bytes = pdf_page_images[0].data if pdf_page_images else ocr_bytes
+        classify_mime = pdf_page_images[0].mime_type if pdf_page_images else ocr_mime
         try:
             doc_type = await self._classify(classify_bytes, classify_mime)
         except Exception as e:
@@ -363,8 +395,8 @@ class ScanDocumentSkill:
         # Step 2: Extract data — pass all PDF pages in one request when available
         try:
             raw_data = await self._extract(
-                image_bytes=image_bytes,
-                mime_type=mime_type,
+                image_bytes=ocr_bytes,
+                mime_type=ocr_mime,
                 doc_type=doc_type,
                 pdf_pages=pdf_page_images,
             )
@@ -372,8 +404,8 @@ class ScanDocumentSkill:
             logger.warning("Gemini extraction failed: %s, trying Claude fallback", e)
             try:
                 raw_data = await self._extract_claude(
-                    image_bytes=image_bytes,
-                    mime_type=mime_type,
+                    image_bytes=ocr_bytes,
+                    mime_type=ocr_mime,
                     doc_type=doc_type,
                     pdf_pages=pdf_page_images,
                 )
@@ -443,7 +475,7 @@ class ScanDocumentSkill:
         image_bytes: bytes,
         mime_type: str,
         doc_type: str,
-        pdf_pages: list[bytes],
+        pdf_pages: list[PreparedImage],
     ) -> dict:
         """Extract structured data using Gemini 3 Flash.
 
@@ -457,12 +489,12 @@ class ScanDocumentSkill:
         if pdf_pages:
             # Build a multi-image request: one inline_data block per PDF page
             parts: list = [prompt]
-            for page_bytes in pdf_pages:
+            for page in pdf_pages:
                 parts.append(
                     {
                         "inline_data": {
-                            "mime_type": "image/png",
-                            "data": base64.b64encode(page_bytes).decode(),
+                            "mime_type": page.mime_type,
+                            "data": base64.b64encode(page.data).decode(),
                         }
                     }
                 )
@@ -490,7 +522,7 @@ class ScanDocumentSkill:
         image_bytes: bytes,
         mime_type: str,
         doc_type: str,
-        pdf_pages: list[bytes],
+        pdf_pages: list[PreparedImage],
     ) -> dict:
         """Fallback extraction using Claude Sonnet via Instructor for typed output.
 
@@ -506,14 +538,14 @@ class ScanDocumentSkill:
         content: list[dict] = []
 
         if pdf_pages:
-            for page_bytes in pdf_pages:
+            for page in pdf_pages:
                 content.append(
                     {
                         "type": "image",
                         "source": {
                             "type": "base64",
-                            "media_type": "image/png",
-                            "data": base64.b64encode(page_bytes).decode(),
+                            "media_type": page.mime_type,
+                            "data": base64.b64encode(page.data).decode(),
                         },
                     }
                 )
@@ -9,6 +9,7 @@ from decimal import Decimal
 from pathlib import Path
 from typing import Any
 
+from src.core.blob_store import get_blob_store
 from src.core.context import SessionContext
 from src.core.db import async_session, redis
 from src.core.llm.clients import anthropic_client
@@ -21,6 +22,7 @@ from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings, t_cached
 from src.skills.base import SkillResult
 from src.skills.prompt_loader import load_prompt
+from src.tools.image_preprocess import RECEIPT_PROFILE, PreparedImage, prepare_ocr_image
 from src.tools.storage import upload_document
 
 logger = logging.getLogger(__name__)
@@ -112,10 +114,13 @@ async def store_pending_receipt(
     user_id: str,
     family_id: str,
 ) -> None:
-    """Store pending receipt data in Redis for later save on user confirm."""
+    """Store pending receipt data in Redis for later save on user confirm.
+
+    The image goes to the blob store; Redis keeps only its handle.
+    """
     payload = {
         "receipt": receipt.model_dump(mode="json"),
-        "image_b64": base64.b64encode(image_bytes).decode() if image_bytes else "",
+        "image_blob": await get_blob_store().put(image_bytes, mime_type) if image_bytes else "",
         "mime_type": mime_type,
         "user_id": user_id,
         "family_id": family_id,
@@ -172,13 +177,20 @@ class ScanReceiptSkill:
                 response_text=t_cached(_STRINGS, "ask_photo", lang, "scan_receipt"),
             )
 
+        # Downscale/crop/normalize once; both OCR providers get the same payload
+        image = (
+            await prepare_ocr_image(message.photo_bytes, "image/jpeg", RECEIPT_PROFILE)
+            if message.photo_bytes
+            else None
+        )
+
         # OCR with Gemini Flash (primary)
         try:
-            receipt = await self._ocr_gemini(message)
+            receipt = await self._ocr_gemini(message, image)
         except Exception as e:
             logger.warning("Gemini OCR failed: %s, trying Claude fallback", e)
             try:
-                receipt = await self._ocr_claude(message)
+                receipt = await self._ocr_claude(message, image)
             except Exception as e2:
                 logger.error("All OCR models failed: %s", e2)
                 return SkillResult(
@@ -424,14 +436,17 @@ class ScanReceiptSkill:
             return str(tx.id)
 
     @observe(name="ocr_gemini")
-    async def _ocr_gemini(self, message: IncomingMessage) -> ReceiptData:
+    async def _ocr_gemini(
+        self, message: IncomingMessage, image: PreparedImage | None = None
+    ) -> ReceiptData:
         parts = [OCR_PROMPT]
-        if message.photo_bytes:
+        data, mime_type = _ocr_payload(message, image)
+        if data:
             parts.append(
                 {
                     "inline_data": {
-                        "mime_type": "image/jpeg",
-                        "data": base64.b64encode(message.photo_bytes).decode(),
+                        "mime_type": mime_type,
+                        "data": base64.b64encode(data).decode(),
                     }
                 }
             )
@@ -447,19 +462,22 @@ class ScanReceiptSkill:
         return ReceiptData(**data)
 
     @observe(name="ocr_claude")
-    async def _ocr_claude(self, message: IncomingMessage) -> ReceiptData:
+    async def _ocr_claude(
+        self, message: IncomingMessage, image: PreparedImage | None = None
+    ) -> ReceiptData:
         client = anthropic_client()
 
         content = [{"type": "text", "text": OCR_PROMPT}]
-        if message.photo_bytes:
+        data, mime_type = _ocr_payload(message, image)
+        if data:
             content.insert(
                 0,
                 {
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/jpeg",
-                        "data": base64.b64encode(message.photo_bytes).decode(),
+                        "media_type": mime_type,
+                        "data": base64.b64encode(data).decode(),
                     },
                 },
             )
@@ -500,6 +518,15 @@ _FUEL_STATION_KEYWORDS = {
 }
 
 
+def _ocr_payload(
+    message: IncomingMessage, image: PreparedImage | None
+) -> tuple[bytes | None, str]:
+    """Image bytes and MIME type to send to the vision model."""
+    if image is not None:
+        return image.data, image.mime_type
+    return message.photo_bytes, "image/jpeg"
+
+
 def _looks_like_fuel_station(merchant: str | None) -> bool:
     """Return True if the merchant name suggests a fuel/gas station."""
     if not merchant:
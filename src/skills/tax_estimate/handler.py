@@ -18,6 +18,7 @@ from src.core.models.category import Category
 from src.core.models.enums import TransactionType
 from src.core.models.transaction import Transaction
 from src.core.observability import observe
+from src.core.query_cache import cached_query
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings, t_cached
 from src.skills.base import SkillResult
@@ -212,6 +213,7 @@ class TaxEstimateSkill:
         return SkillResult(response_text=response)
 
     @staticmethod
+    @cached_query("tax_estimate.total")
     async def _get_total(
         family_id: str, start: date, end: date, tx_type: str,
     ) -> float:
@@ -228,6 +230,7 @@ class TaxEstimateSkill:
             return float(result or 0)
 
     @staticmethod
+    @cached_query("tax_estimate.categories")
     async def _get_expense_categories(
         family_id: str, start: date, end: date,
     ) -> list[dict[str, Any]]:
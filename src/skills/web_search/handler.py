@@ -10,6 +10,7 @@ from src.core.context import SessionContext
 from src.core.llm.clients import google_client
 from src.core.observability import observe
 from src.core.research.dual_search import dual_search
+from src.core.research.search_cache import cached_search
 from src.core.research.signal_detector import detect_signals
 from src.gateway.types import IncomingMessage
 from src.skills._i18n import register_strings, t
@@ -91,7 +92,25 @@ class WebSearchSkill:
 async def search_and_answer(
     query: str, language: str, original_message: str = ""
 ) -> str:
-    """Search the web via Gemini grounding and return a summarized answer."""
+    """Search the web via Gemini grounding and return a summarized answer.
+
+    Non-personal answers are shared across users (see ``search_cache``).
+    """
+    lang = language if language in _STRINGS else "en"
+    error_text = t(_STRINGS, "error", lang)
+    return await cached_search(
+        "web",
+        query,
+        language,
+        lambda: _search_and_answer(query, language, original_message),
+        original_message=original_message,
+        cacheable=lambda answer: (
+            bool(answer) and answer != error_text and not answer.endswith(FALLBACK_DISCLAIMER)
+        ),
+    )
+
+
+async def _search_and_answer(query: str, language: str, original_message: str) -> str:
     client = google_client()
     system = WEB_SEARCH_SYSTEM_PROMPT.format(language=language)
     user_msg = original_message or query
@@ -64,6 +64,29 @@ class WeeklyDigestSkill:
         context: SessionContext,
         intent_data: dict[str, Any],
     ) -> SkillResult:
+        built = await self.build_prompt(context)
+        if built is None:
+            return SkillResult(response_text=self.no_data_text(context.language))
+
+        system, user_content = built
+        response = await generate_text(
+            model=self.model,
+            system=system,
+            messages=[{"role": "user", "content": user_content}],
+        )
+
+        return SkillResult(response_text=response)
+
+    @staticmethod
+    def no_data_text(language: str) -> str:
+        return t_cached(_STRINGS, "no_data", language, namespace="weekly_digest")
+
+    async def build_prompt(self, context: SessionContext) -> tuple[str, str] | None:
+        """Collect the week's data into ``(system, user message)``; None if empty.
+
+        Split from ``execute`` so the weekly cron can submit every user's
+        prompt as one provider batch.
+        """
         today = date.today()
         week_start = today - timedelta(days=7)
 
@@ -85,22 +108,11 @@ class WeeklyDigestSkill:
                 logger.warning("Weekly digest collector failed: %s", r)
 
         if not sections:
-            return SkillResult(
-                response_text=t_cached(
-                    _STRINGS, "no_data", context.language, namespace="weekly_digest"
-                )
-            )
+            return None
 
         combined = "\n\n".join(sections)
         prompt = WEEKLY_DIGEST_SYSTEM_PROMPT.format(language=context.language)
-
-        response = await generate_text(
-            model=self.model,
-            system=prompt,
-            messages=[{"role": "user", "content": f"Weekly data:\n{combined}"}],
-        )
-
-        return SkillResult(response_text=response)
+        return prompt, f"Weekly data:\n{combined}"
 
     async def _collect_spending(
         self, context: SessionContext, week_start: date, today: date
@@ -69,12 +69,18 @@ async def extract_text(file_bytes: bytes, filename: str, mime_type: str) -> str:
 
 
 async def extract_pages_as_images(
-    file_bytes: bytes, filename: str, max_pages: int = 50
+    file_bytes: bytes,
+    filename: str,
+    max_pages: int = 50,
+    target_long_edge: int | None = None,
 ) -> list[bytes]:
     """Convert PDF pages to PNG images for Sonnet vision API.
 
     Args:
         max_pages: Maximum pages to render (default 50 to avoid OOM on huge PDFs).
+        target_long_edge: Render each page so its long edge is about this many
+            pixels (never above the default 2x scale). Large-format pages are
+            otherwise rendered far beyond what vision models can use.
     """
     ext = _get_extension(filename)
     if ext != "pdf":
@@ -88,7 +94,10 @@ async def extract_pages_as_images(
         page_count = min(len(pdf), max_pages)
         for i in range(page_count):
             page = pdf[i]
-            bitmap = page.render(scale=2)  # 2x for better OCR
+            scale = 2.0  # 2x for better OCR
+            if target_long_edge:
+                scale = min(scale, target_long_edge / max(page.get_size()))
+            bitmap = page.render(scale=scale)
             pil_image = bitmap.to_pil()
             buf = io.BytesIO()
             pil_image.save(buf, format="PNG")
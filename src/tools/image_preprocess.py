@@ -0,0 +1,295 @@
+"""CPU-side image preprocessing before vision OCR.
+
+Phone photos arrive at 3–12 MP; vision models read receipts just as well at
+~1600 px on the long edge, at a fraction of the request bytes, tokens and
+latency. ``prepare_ocr_image`` runs these stages on a bounded worker pool:
+
+1. ``decode``    — open the image, letting JPEG decode at reduced DCT scale
+2. ``exif``      — apply EXIF orientation
+3. ``crop``      — trim background around the document's edges
+4. ``downscale`` — fit the long edge to the profile target
+5. ``normalize`` — grayscale (receipts) and auto-contrast
+6. ``encode``    — re-encode as JPEG or WebP
+
+Each result carries per-stage timings; aggregate numbers are available from
+``get_preprocess_report()`` (``/ops/ocr/preprocess``). Input that is not a
+decodable image (PDF bytes, corrupt uploads) is passed through untouched, as
+is any result that would not be smaller than the original.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("decode", "exif", "crop", "downscale", "normalize", "encode")
+
+
+@dataclass(frozen=True)
+class PreprocessProfile:
+    """Knobs for one kind of OCR input."""
+
+    name: str
+    target_long_edge: int = 1600
+    grayscale: bool = True
+    crop: bool = True
+    format: str = "JPEG"  # JPEG | WEBP
+    quality: int = 82
+
+
+RECEIPT_PROFILE = PreprocessProfile("receipt")
+# Documents may turn out to be ordinary photos; keep colour for classification.
+DOCUMENT_PROFILE = PreprocessProfile("document", grayscale=False)
+# Rendered PDF pages have no background to crop and no EXIF.
+PDF_PAGE_PROFILE = PreprocessProfile("pdf_page", crop=False)
+
+_EXIF_ORIENTATION = 0x0112
+_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# Crop detection works on a thumbnail of this long edge.
+_CROP_PROBE_EDGE = 256
+_CROP_EDGE_THRESHOLD = 40
+_CROP_MIN_DENSITY = 0.02
+_CROP_MARGIN = 0.03
+_CROP_DRAFT_HEADROOM = 1.6
+
+
+@dataclass
+class PreparedImage:
+    """An OCR-ready image plus what it took to produce it."""
+
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    width: int = 0
+    height: int = 0
+    original_size: tuple[int, int] = (0, 0)
+    applied: list[str] = field(default_factory=list)
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.applied)
+
+    def summary(self) -> str:
+        stages = " ".join(f"{k}={v:.1f}ms" for k, v in self.timings_ms.items())
+        return (
+            f"{self.original_bytes / 1024:.0f}KB {self.original_size[0]}x{self.original_size[1]}"
+            f" -> {len(self.data) / 1024:.0f}KB {self.width}x{self.height} [{stages}]"
+        )
+
+
+@dataclass
+class _Stats:
+    images: int = 0
+    passthrough: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    stage_ms: dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    def as_dict(self) -> dict[str, Any]:
+        processed = self.images - self.passthrough
+        return {
+            "images": self.images,
+            "passthrough": self.passthrough,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "size_ratio": round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+            "avg_stage_ms": {
+                stage: round(ms / processed, 2) if processed else 0.0
+                for stage, ms in self.stage_ms.items()
+            },
+        }
+
+
+_stats: dict[str, _Stats] = {}
+_executor: ThreadPoolExecutor | None = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    # Pillow releases the GIL while decoding, resampling and encoding, so a
+    # small dedicated thread pool gives real parallelism without pickling
+    # multi-MB payloads across processes.
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.ocr_preprocess_workers),
+            thread_name_prefix="ocr-preprocess",
+        )
+    return _executor
+
+
+def _document_bbox(gray) -> tuple[int, int, int, int] | None:
+    """Bounding box of the edge-dense region, in *gray*'s coordinates."""
+    from PIL import Image, ImageFilter
+
+    scale = _CROP_PROBE_EDGE / max(gray.size)
+    if scale < 1:
+        probe = gray.resize(
+            (max(1, round(gray.width * scale)), max(1, round(gray.height * scale))),
+            Image.Resampling.BILINEAR,
+        )
+    else:
+        probe, scale = gray, 1.0
+    edges = probe.filter(ImageFilter.FIND_EDGES)
+    # Drop the 1px frame where the kernel sees the image border as an edge.
+    edges = edges.crop((1, 1, edges.width - 1, edges.height - 1))
+    mask = edges.point(lambda v: 255 if v > _CROP_EDGE_THRESHOLD else 0)
+    if mask.width < 4 or mask.height < 4:
+        return None
+
+    # Row/column edge density via BOX downsampling (computed in C).
+    cols = mask.resize((mask.width, 1), Image.Resampling.BOX).tobytes()
+    rows = mask.resize((1, mask.height), Image.Resampling.BOX).tobytes()
+    limit = 255 * _CROP_MIN_DENSITY
+    xs = [i for i, v in enumerate(cols) if v > limit]
+    ys = [i for i, v in enumerate(rows) if v > limit]
+    if not xs or not ys:
+        return None
+
+    mx, my = mask.width * _CROP_MARGIN, mask.height * _CROP_MARGIN
+    left = max(0.0, xs[0] + 1 - mx) / scale
+    top = max(0.0, ys[0] + 1 - my) / scale
+    right = min(float(probe.width), xs[-1] + 2 + mx) / scale
+    bottom = min(float(probe.height), ys[-1] + 2 + my) / scale
+    box = (int(left), int(top), min(gray.width, int(right)), min(gray.height, int(bottom)))
+
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    full = gray.width * gray.height
+    # Only crop when it removes real background and keeps a plausible document.
+    if area > 0.9 * full or area < 0.2 * full:
+        return None
+    return box
+
+
+def preprocess_image(
+    data: bytes, mime_type: str, profile: PreprocessProfile = RECEIPT_PROFILE
+) -> PreparedImage:
+    """Run the preprocessing stages synchronously (call via ``prepare_ocr_image``)."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    result = PreparedImage(data=data, mime_type=mime_type, original_bytes=len(data))
+    timings = result.timings_ms
+    clock = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = (now - clock) * 1000
+        clock = now
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        result.original_size = img.size
+        if img.format == "JPEG":
+            # Decode straight at 1/2, 1/4 or 1/8 scale (and to grayscale) when
+            # that still covers the target — the biggest win on 12 MP photos.
+            # Leave headroom for the crop so the document itself keeps the target.
+            headroom = _CROP_DRAFT_HEADROOM if profile.crop else 1.0
+            fit = profile.target_long_edge * headroom / max(img.size)
+            img.draft(
+                "L" if profile.grayscale else img.mode,
+                (math.ceil(img.width * fit), math.ceil(img.height * fit)),
+            )
+        img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.debug("OCR preprocess passthrough (%s): %s", mime_type, e)
+        return result
+    lap("decode")
+
+    if img.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+        img = ImageOps.exif_transpose(img)
+        result.applied.append("exif")
+    lap("exif")
+
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    if profile.crop:
+        box = _document_bbox(img if img.mode == "L" else img.convert("L"))
+        if box:
+            img = img.crop(box)
+            result.applied.append("crop")
+    lap("crop")
+
+    if max(img.size) > profile.target_long_edge:
+        factor = profile.target_long_edge / max(img.size)
+        size = (max(1, round(img.width * factor)), max(1, round(img.height * factor)))
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        result.applied.append("downscale")
+    lap("downscale")
+
+    if profile.grayscale:
+        if img.mode != "L":
+            img = img.convert("L")
+        img = ImageOps.autocontrast(img, cutoff=1)
+    else:
+        img = ImageOps.autocontrast(img, cutoff=1, preserve_tone=True)
+    lap("normalize")
+
+    out = io.BytesIO()
+    if profile.format == "WEBP":
+        img.save(out, format="WEBP", quality=profile.quality, method=4)
+    else:
+        img.save(out, format="JPEG", quality=profile.quality, optimize=True)
+    encoded = out.getvalue()
+    lap("encode")
+
+    if len(encoded) >= len(data) and not ({"exif", "crop"} & set(result.applied)):
+        # Already small and upright: the original is the better payload.
+        result.applied.clear()
+        result.width, result.height = result.original_size
+        return result
+
+    result.data = encoded
+    result.mime_type = _MIME.get(profile.format, "image/jpeg")
+    result.width, result.height = img.size
+    result.applied.append("encode")
+    return result
+
+
+def _record(profile: PreprocessProfile, result: PreparedImage) -> None:
+    stats = _stats.setdefault(profile.name, _Stats())
+    stats.images += 1
+    stats.bytes_in += result.original_bytes
+    stats.bytes_out += len(result.data)
+    if not result.changed:
+        stats.passthrough += 1
+        return
+    for stage, ms in result.timings_ms.items():
+        stats.stage_ms[stage] += ms
+
+
+async def prepare_ocr_image(
+    data: bytes, mime_type: str, profile: PreprocessProfile = RECEIPT_PROFILE
+) -> PreparedImage:
+    """Preprocess *data* on the worker pool; never raises, falls back to the input."""
+    if not settings.ff_ocr_preprocess or not data:
+        return PreparedImage(data=data, mime_type=mime_type, original_bytes=len(data))
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(_pool(), preprocess_image, data, mime_type, profile)
+    except Exception as e:
+        logger.warning("OCR preprocess failed, using original image: %s", e)
+        return PreparedImage(data=data, mime_type=mime_type, original_bytes=len(data))
+    _record(profile, result)
+    if result.changed:
+        logger.info("OCR preprocess %s: %s", profile.name, result.summary())
+    return result
+
+
+def get_preprocess_report() -> dict[str, Any]:
+    """Per-profile image counts, byte savings and average stage timings."""
+    return {name: stats.as_dict() for name, stats in sorted(_stats.items())}
+
+
+def reset_preprocess_stats() -> None:
+    _stats.clear()
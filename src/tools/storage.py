@@ -1,9 +1,13 @@
-"""Supabase Storage utilities for document upload/download."""
+"""Supabase Storage utilities for document upload/download.
+
+All calls go through the shared async Storage client from
+``src.core.blob_store`` — no per-call client construction, no blocking I/O.
+"""
 
 import logging
 import uuid as uuid_mod
 
-from src.core.config import settings
+from src.core.blob_store import get_supabase_backend
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +24,17 @@ async def upload_document(
     Returns the storage path (bucket/family_id/unique_filename).
     Falls back to 'pending' if Supabase is not configured or upload fails.
     """
-    if not settings.supabase_url or not settings.supabase_service_key:
+    backend = get_supabase_backend()
+    if backend is None:
         logger.warning("Supabase not configured — storage_path will be 'pending'")
         return "pending"
 
     try:
-        from supabase import create_client
-
-        client = create_client(settings.supabase_url, settings.supabase_service_key)
-
         # Generate unique path to avoid collisions
         unique_name = f"{uuid_mod.uuid4().hex[:8]}_{filename}"
         path = f"{family_id}/{unique_name}"
 
-        client.storage.from_(bucket).upload(
-            path,
-            file_bytes,
-            file_options={"content-type": mime_type},
-        )
+        await backend.put(path, file_bytes, mime_type, bucket=bucket)
 
         return f"{bucket}/{path}"
     except Exception as e:
@@ -52,16 +49,13 @@ async def download_document(storage_path: str) -> bytes | None:
     """
     if not storage_path or storage_path == "pending":
         return None
-    if not settings.supabase_url or not settings.supabase_service_key:
+    backend = get_supabase_backend()
+    if backend is None:
         return None
 
     try:
-        from supabase import create_client
-
-        client = create_client(settings.supabase_url, settings.supabase_service_key)
         bucket, _, file_path = storage_path.partition("/")
-        data = client.storage.from_(bucket).download(file_path)
-        return data
+        return await backend.get(file_path, bucket=bucket)
     except Exception as e:
         logger.warning("Supabase download failed for %s: %s", storage_path, e)
         return None
@@ -74,16 +68,13 @@ async def delete_document(storage_path: str) -> bool:
     """
     if not storage_path or storage_path == "pending":
         return False
-    if not settings.supabase_url or not settings.supabase_service_key:
+    backend = get_supabase_backend()
+    if backend is None:
         return False
 
     try:
-        from supabase import create_client
-
-        client = create_client(settings.supabase_url, settings.supabase_service_key)
         bucket, _, file_path = storage_path.partition("/")
-        client.storage.from_(bucket).remove([file_path])
-        return True
+        return await backend.delete(file_path, bucket=bucket)
     except Exception as e:
         logger.warning("Supabase delete failed for %s: %s", storage_path, e)
         return False
@@ -29,6 +29,9 @@ TOOL_FUNCTIONS = {
     "aggregate_data": aggregate_data,
 }
 
+# Tools without side effects — safe to run concurrently within one LLM round.
+READ_ONLY_TOOLS = frozenset({"query_data", "aggregate_data"})
+
 _TABLE_ALIASES = {
     "transaction": "transactions",
     "transactions": "transactions",
@@ -3,7 +3,7 @@
 import logging
 import uuid
 from collections.abc import Awaitable, Callable
-from datetime import datetime
+from datetime import UTC, datetime
 from zoneinfo import ZoneInfo
 
 from sqlalchemy import select, update
@@ -14,6 +14,7 @@ from src.core.models.booking import Booking
 from src.core.models.enums import BookingStatus
 from src.core.pending_actions import store_pending_action
 from src.core.request_context import reset_family_context, set_family_context
+from src.core.timers import booking_reminder_at, schedule_timers
 from src.gateway.sms_gw import SMSGateway
 from src.gateway.types import IncomingMessage, MessageType, OutgoingMessage
 from src.skills.base import SkillResult
@@ -24,6 +25,14 @@ from src.voice.verification import voice_verification_store
 logger = logging.getLogger(__name__)
 
 
+async def _schedule_booking_timer(booking_id: uuid.UUID, fire_at: datetime | None) -> None:
+    """Bulk ``update(Booking)`` bypasses the timer session hooks; schedule explicitly."""
+    try:
+        await schedule_timers([("booking", str(booking_id), fire_at)])
+    except Exception as e:
+        logger.warning("Failed to schedule reminder for booking %s: %s", booking_id, e)
+
+
 class VoiceToolAdapter:
     """Dispatch voice tool calls to the existing skill/backend layer."""
 
@@ -554,6 +563,12 @@ class VoiceToolAdapter:
                         )
                     )
                     await session.commit()
+                    fire_at = (
+                        None
+                        if booking.reminder_sent
+                        else booking_reminder_at(booking.start_at, datetime.now(UTC))
+                    )
+                    await _schedule_booking_timer(booking.id, fire_at)
                     return {
                         "ok": True,
                         "message": f"Confirmed booking: {booking.title}",
@@ -612,6 +627,9 @@ class VoiceToolAdapter:
                         )
                     )
                     await session.commit()
+                    await _schedule_booking_timer(
+                        booking.id, booking_reminder_at(new_start, datetime.now(UTC))
+                    )
                     return {
                         "ok": True,
                         "message": (
@@ -39,6 +39,7 @@ const state = {
   charts: {},
   txFilter: { type: null, category: null, search: '' },
   txPage: 1,
+  txCursor: null,
   txTotal: 0,
   statsperiod: 'month',
 };
@@ -390,13 +391,15 @@ async function loadTransactions(append = false) {
   if (!container) return;
   if (!append) container.innerHTML = spinner();
   const f = state.txFilter;
-  const params = new URLSearchParams({ page: state.txPage, per_page: 20 });
+  const params = new URLSearchParams({ per_page: 20, count: append ? 'none' : 'estimated' });
+  if (append && state.txCursor) params.set('cursor', state.txCursor);
   if (f.type)     params.set('type', f.type);
   if (f.category) params.set('category_id', f.category);
   if (f.search)   params.set('search', f.search);
   try {
     const data = await get(`/transactions?${params}`);
-    state.txTotal = data.total;
+    if (!append) { state.txTotal = data.total; state.txTotalEstimated = data.total_estimated; }
+    state.txCursor = data.next_cursor;
     const cur = state.user?.currency || 'USD';
     if (data.items.length === 0 && !append) {
       container.innerHTML = `<div class="empty"><div class="empty-icon">💸</div><p>No transactions</p><small>Try adjusting filters</small></div>`;
@@ -411,9 +414,11 @@ async function loadTransactions(append = false) {
       container.innerHTML = `
         <div class="tx-list">${data.items.map(tx => txRow(tx, cur)).join('')}</div>`;
     }
-    if (data.total > state.txPage * 20) {
+    if (data.next_cursor) {
+      const left = state.txTotal != null ? Math.max(state.txTotal - state.txPage * 20, 0) : 0;
+      const label = left ? `Load more (${state.txTotalEstimated ? '~' : ''}${left} left)` : 'Load more';
       container.insertAdjacentHTML('beforeend',
-        `<div class="btn-wrap"><button class="btn btn-ghost" onclick="loadMoreTx()">Load more (${data.total - state.txPage*20} left)</button></div>`);
+        `<div class="btn-wrap"><button class="btn btn-ghost" onclick="loadMoreTx()">${label}</button></div>`);
     }
     if (!append) container.insertAdjacentHTML('beforeend', '<div style="height:16px"></div>');
   } catch (e) {
@@ -17,6 +17,17 @@ from src.gateway.mock import MockGateway
 from src.gateway.types import IncomingMessage, MessageType
 
 
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path):
+    """Route blob storage to a per-test local directory."""
+    from src.core.blob_store import BlobStore, LocalBlobBackend, set_blob_store
+
+    store = BlobStore(LocalBlobBackend(tmp_path / "blobs"))
+    set_blob_store(store)
+    yield store
+    set_blob_store(None)
+
+
 @pytest.fixture
 def mock_gateway():
     """Mock gateway for testing."""
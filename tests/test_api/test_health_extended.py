@@ -66,6 +66,7 @@ async def test_health_detailed_ok(mock_dependencies):
     assert "circuits" in data
     assert data["mem0"] == "ok"
     assert data["langfuse"] == "ok"
+    assert data["db_pools"]["pools"]["sqlalchemy"]["max"] > 0
 
 
 async def test_health_detailed_mem0_error(mock_dependencies):
@@ -13,6 +13,7 @@ from urllib.parse import urlencode
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 
 from api.miniapp import (
     CategoryStats,
@@ -172,33 +173,33 @@ def _make_mock_user():
 class TestGetStatsEndpoint:
     """Tests for GET /api/stats/{period}."""
 
+    @staticmethod
+    def _stats_session(mock_session_maker, rows: list, version: int | None = 3):
+        mock_session = AsyncMock()
+        mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        # execute #1: (currency, data version); execute #2: grouped totals
+        validator_result = MagicMock()
+        validator_result.first.return_value = ("USD", version)
+        totals_result = MagicMock()
+        totals_result.all.return_value = rows
+        mock_session.execute = AsyncMock(side_effect=[validator_result, totals_result])
+        return mock_session
+
     def test_stats_month_returns_correct_structure(self):
         """GET /api/stats/month returns StatsResponse structure."""
-        mock_user = _make_mock_user()
-        cat_id = uuid.uuid4()
+        from src.core.models.enums import TransactionType
 
-        # Stats endpoint: scalar(Family), execute(expense cats), execute(income cats)
-        mock_exp_rows = [
-            (cat_id, "Food", "🍔", Decimal("800.00")),
-            (cat_id, "Gas", "⛽", Decimal("200.00")),
+        mock_user = _make_mock_user()
+        food_id, gas_id = uuid.uuid4(), uuid.uuid4()
+        rows = [
+            (TransactionType.expense, gas_id, "Gas", "⛽", Decimal("200.00")),
+            (TransactionType.expense, food_id, "Food", "🍔", Decimal("800.00")),
         ]
-        mock_inc_rows: list = []
-
-        with patch("api.miniapp.async_session") as mock_session_maker:
-            mock_session = AsyncMock()
-            mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
-
-            mock_fam = MagicMock()
-            mock_fam.currency = "USD"
-            mock_session.scalar = AsyncMock(return_value=mock_fam)
 
-            exp_result = MagicMock()
-            exp_result.all.return_value = mock_exp_rows
-            inc_result = MagicMock()
-            inc_result.all.return_value = mock_inc_rows
-
-            mock_session.execute = AsyncMock(side_effect=[exp_result, inc_result])
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
+            mock_session = self._stats_session(mock_session_maker, rows)
 
             app = _create_test_app(auth_user_override=mock_user)
             client = TestClient(app)
@@ -214,26 +215,16 @@ class TestGetStatsEndpoint:
         assert len(data["expense_categories"]) == 2
         assert data["expense_categories"][0]["name"] == "Food"
         assert data["expense_categories"][0]["percent"] == 80.0
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert mock_session.execute.call_count == 2
 
     def test_stats_week_period(self):
         """GET /api/stats/week uses correct period."""
         mock_user = _make_mock_user()
 
-        with patch("api.miniapp.async_session") as mock_session_maker:
-            mock_session = AsyncMock()
-            mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
-
-            mock_fam = MagicMock()
-            mock_fam.currency = "USD"
-            mock_session.scalar = AsyncMock(return_value=mock_fam)
-
-            exp_result = MagicMock()
-            exp_result.all.return_value = []
-            inc_result = MagicMock()
-            inc_result.all.return_value = []
-
-            mock_session.execute = AsyncMock(side_effect=[exp_result, inc_result])
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
+            self._stats_session(mock_session_maker, [])
 
             app = _create_test_app(auth_user_override=mock_user)
             client = TestClient(app)
@@ -245,6 +236,65 @@ class TestGetStatsEndpoint:
         assert data["total_expense"] == 0
         assert data["total_income"] == 0
 
+    def test_stats_returns_304_when_version_unchanged(self):
+        mock_user = _make_mock_user()
+        app = _create_test_app(auth_user_override=mock_user)
+        client = TestClient(app)
+
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
+            self._stats_session(mock_session_maker, [])
+            etag = client.get("/api/stats/month").headers["etag"]
+
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
+            mock_session = self._stats_session(mock_session_maker, [])
+            response = client.get("/api/stats/month", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        # Only the version lookup ran; the aggregate query was skipped.
+        assert mock_session.execute.call_count == 1
+
+    def test_stats_etag_changes_with_version_and_period(self):
+        mock_user = _make_mock_user()
+        client = TestClient(_create_test_app(auth_user_override=mock_user))
+
+        def _etag(url: str, version: int) -> str:
+            with patch("api.miniapp.rls_read_session") as mock_session_maker:
+                self._stats_session(mock_session_maker, [], version=version)
+                return client.get(url).headers["etag"]
+
+        assert _etag("/api/stats/month", 3) == _etag("/api/stats/month", 3)
+        assert _etag("/api/stats/month", 3) != _etag("/api/stats/month", 4)
+        assert _etag("/api/stats/month", 3) != _etag("/api/stats/week", 3)
+
+    def test_monthly_trend_is_one_grouped_query(self):
+        from src.core.models.enums import TransactionType
+        from src.core.stats_engine import month_starts
+
+        mock_user = _make_mock_user()
+        months = month_starts(date.today(), 24)
+        cat_id = uuid.uuid4()
+        rows = [
+            (months[-1], TransactionType.expense, cat_id, "Food", "🍔", Decimal("50")),
+            (months[-1], TransactionType.income, cat_id, "Salary", "💰", Decimal("900")),
+            (months[0], TransactionType.expense, cat_id, "Food", "🍔", Decimal("10")),
+        ]
+
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
+            mock_session = self._stats_session(mock_session_maker, rows)
+            client = TestClient(_create_test_app(auth_user_override=mock_user))
+            response = client.get("/api/stats/trend/monthly?months=24")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 24
+        assert data[0] == {"month": months[0].strftime("%b %Y"), "expense": 10.0, "income": 0.0}
+        assert data[-1]["expense"] == 50.0
+        assert data[-1]["income"] == 900.0
+        assert all(m["expense"] == 0 for m in data[1:-1])
+        assert mock_session.execute.call_count == 2
+        assert "date_trunc" in str(mock_session.execute.call_args_list[1].args[0])
+
 
 class TestListTransactionsEndpoint:
     """Tests for GET /api/transactions."""
@@ -315,6 +365,149 @@ class TestListTransactionsEndpoint:
         assert data["items"] == []
 
 
+    @staticmethod
+    def _mock_tx(day: int):
+        from datetime import UTC, datetime
+
+        tx = MagicMock()
+        tx.id = uuid.uuid4()
+        tx.type.value = "expense"
+        tx.amount = Decimal("10.00")
+        tx.merchant = None
+        tx.description = None
+        tx.date = date(2026, 2, day)
+        tx.created_at = datetime(2026, 2, day, 12, 0, tzinfo=UTC)
+        tx.scope.value = "family"
+        return tx
+
+    def _get(self, url: str, rows: list, total: int = 0):
+        mock_user = _make_mock_user()
+        with patch("api.miniapp.async_session") as mock_session_maker:
+            mock_session = AsyncMock()
+            mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_session.scalar = AsyncMock(return_value=total)
+            data_result = MagicMock()
+            data_result.all.return_value = rows
+            mock_session.execute = AsyncMock(return_value=data_result)
+
+            client = TestClient(_create_test_app(auth_user_override=mock_user))
+            response = client.get(url)
+        return response, mock_session
+
+    def test_next_cursor_returned_when_more_rows_exist(self):
+        cat_id = uuid.uuid4()
+        rows = [(self._mock_tx(d), "Food", cat_id) for d in (20, 19, 18)]
+        response, session = self._get("/api/transactions?per_page=2", rows, total=3)
+
+        data = response.json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 2
+        assert data["next_cursor"]
+        query = str(session.execute.call_args.args[0])
+        assert "LIMIT" in query and "OFFSET" not in query
+
+        # Following the cursor adds a keyset predicate instead of OFFSET.
+        response, session = self._get(
+            f"/api/transactions?per_page=2&count=none&cursor={data['next_cursor']}", rows[2:]
+        )
+        data = response.json()
+        assert data["next_cursor"] is None
+        assert data["total"] is None
+        session.scalar.assert_not_called()
+        query = str(session.execute.call_args.args[0])
+        assert "(transactions.date, transactions.created_at, transactions.id) <" in query
+        assert "OFFSET" not in query
+
+    def test_cursor_round_trip(self):
+        from api.miniapp import _decode_tx_cursor, _encode_tx_cursor
+
+        tx = self._mock_tx(5)
+        assert _decode_tx_cursor(_encode_tx_cursor(tx)) == (tx.date, tx.created_at, tx.id)
+
+    def test_invalid_cursor_returns_400(self):
+        response, _ = self._get("/api/transactions?cursor=not-a-cursor", [])
+        assert response.status_code == 400
+
+    def test_estimated_count_falls_back_to_exact(self):
+        """Non-PostgreSQL sessions have no planner estimate; exact count is used."""
+        with patch("api.miniapp._estimate_count", AsyncMock(return_value=None)):
+            response, session = self._get("/api/transactions?count=estimated", [], total=7)
+        data = response.json()
+        assert data["total"] == 7
+        assert data["total_estimated"] is False
+
+    def test_estimated_count_skips_count_query(self):
+        with patch("api.miniapp._estimate_count", AsyncMock(return_value=120_000)):
+            response, session = self._get("/api/transactions?count=estimated", [])
+        data = response.json()
+        assert data["total"] == 120_000
+        assert data["total_estimated"] is True
+        session.scalar.assert_not_called()
+
+    async def test_estimate_binds_search_text(self):
+        from sqlalchemy.dialects.postgresql.asyncpg import dialect
+
+        from api.miniapp import _estimate_count
+        from src.core.models.transaction import Transaction
+
+        search = "x'; DROP TABLE transactions; --"
+        stmt = select(Transaction).where(Transaction.merchant.ilike(f"%{search}%"))
+        result = MagicMock()
+        result.scalar.return_value = [{"Plan": {"Plan Rows": 42}}]
+        conn = MagicMock(dialect=dialect())
+        conn.execute = AsyncMock(return_value=result)
+        session = MagicMock(connection=AsyncMock(return_value=conn))
+
+        assert await _estimate_count(session, stmt) == 42
+        compiled = conn.execute.await_args.args[0].compile(dialect=conn.dialect)
+        assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert search not in str(compiled)
+        assert f"%{search}%" in compiled.params.values()
+
+
+class TestExportCsvEndpoint:
+    """Tests for GET /api/export/csv streaming."""
+
+    def test_export_streams_batches_without_row_cap(self):
+        mock_user = _make_mock_user()
+        expense = MagicMock(value="expense")
+        family = MagicMock(value="family")
+        batches = [
+            [(date(2026, 2, 1), expense, Decimal("1.50"), "Еда", "Магазин", None, family)] * 3,
+            [(date(2026, 1, 31), expense, Decimal("2.00"), "Fuel", None, "note", family)],
+        ]
+
+        async def _partitions():
+            for batch in batches:
+                yield batch
+
+        stream_result = MagicMock()
+        stream_result.partitions = _partitions
+
+        with (
+            patch("api.miniapp.async_session") as mock_session_maker,
+            patch("api.miniapp._check_permission", AsyncMock()),
+        ):
+            mock_session = AsyncMock()
+            mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_session.stream = AsyncMock(return_value=stream_result)
+
+            client = TestClient(_create_test_app(auth_user_override=mock_user))
+            response = client.get("/api/export/csv?excel=true")
+
+        assert response.status_code == 200
+        body = response.content.decode("utf-8")
+        assert body.startswith("\ufeffDate,Type,Amount")
+        lines = body.strip().splitlines()
+        assert len(lines) == 5
+        assert lines[1] == "2026-02-01,expense,1.5,Еда,Магазин,,family"
+        stmt = mock_session.stream.call_args.args[0]
+        assert "LIMIT" not in str(stmt)
+        assert stmt.get_execution_options()["yield_per"] == 1000
+
+
 class TestCreateTransactionEndpoint:
     """Tests for POST /api/transactions."""
 
@@ -662,28 +855,24 @@ class TestMiniappScopeFilters:
         mock_user = _make_mock_user()
         mock_user.role.value = "member"
 
-        with patch("api.miniapp.async_session") as mock_session_maker:
+        with patch("api.miniapp.rls_read_session") as mock_session_maker:
             mock_session = AsyncMock()
             mock_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
             mock_session_maker.return_value.__aexit__ = AsyncMock(return_value=False)
 
-            mock_fam = MagicMock()
-            mock_fam.currency = "USD"
-            mock_session.scalar = AsyncMock(return_value=mock_fam)
-
-            exp_result = MagicMock()
-            exp_result.all.return_value = []
-            inc_result = MagicMock()
-            inc_result.all.return_value = []
-            mock_session.execute = AsyncMock(side_effect=[exp_result, inc_result])
+            validator_result = MagicMock()
+            validator_result.first.return_value = ("USD", 1)
+            totals_result = MagicMock()
+            totals_result.all.return_value = []
+            mock_session.execute = AsyncMock(side_effect=[validator_result, totals_result])
 
             app = _create_test_app(auth_user_override=mock_user)
             client = TestClient(app)
             response = client.get("/api/stats/month")
 
         assert response.status_code == 200
-        first_query = mock_session.execute.call_args_list[0].args[0]
-        assert "transactions.scope" in str(first_query)
+        totals_query = mock_session.execute.call_args_list[1].args[0]
+        assert "transactions.scope" in str(totals_query)
 
     def test_member_transactions_queries_are_scope_filtered(self):
         mock_user = _make_mock_user()
@@ -0,0 +1,181 @@
+"""Tests for stream-backed analytics storage, compaction and rollups."""
+
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+from src.core.analytics_store import (
+    compact_analytics_streams,
+    get_analytics_rollup,
+    rollup_fields,
+    rollup_group,
+)
+
+
+class _FakePipeline:
+    def __init__(self, results=None):
+        self.calls = []
+        self.execute = AsyncMock(return_value=results or [])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+
+def _entry_id(dt: datetime, seq: int = 0) -> str:
+    return f"{int(dt.timestamp() * 1000)}-{seq}"
+
+
+def _entry(dt: datetime, payload: dict, seq: int = 0):
+    return (_entry_id(dt, seq), {"data": json.dumps(payload)})
+
+
+def test_rollup_fields_cover_each_kind():
+    trace = {"outcome": "error", "intent": "add_expense", "review_label": "tool_failure"}
+    assert rollup_fields("trace", {**trace, "queued_for_review": True}) == [
+        "trace:total",
+        "trace:outcome:error",
+        "trace:review_label:tool_failure",
+        "trace:intent:add_expense",
+        "trace:queued_for_review",
+    ]
+    review = {"final_label": "success", "action": "close", "rubric": {"safe": True, "x": False}}
+    assert rollup_fields("review", review) == [
+        "review:total",
+        "review:label:success",
+        "review:action:close",
+        "review:rubric:safe",
+    ]
+    assert rollup_group({"review:label:a": 2, "review:action:b": 1}, "review:label:") == {"a": 2}
+
+
+async def test_compaction_archives_rolls_up_and_trims(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.analytics_store.settings.analytics_archive_dir", str(tmp_path))
+    day1 = datetime(2026, 3, 10, 23, 0, tzinfo=UTC)
+    day2 = day1 + timedelta(hours=2)
+    reviews = [
+        _entry(day1, {"final_label": "wrong_route", "action": "follow_up", "rubric": {}}),
+        _entry(day1, {"final_label": "success", "action": "close", "rubric": {}}, seq=1),
+        ("1-0", {"data": "not json"}),
+        _entry(day2, {"final_label": "success", "action": "close", "rubric": {"safe": True}}),
+    ]
+    pipes = []
+
+    def _pipeline(**kwargs):
+        pipes.append((kwargs, _FakePipeline()))
+        return pipes[-1][1]
+
+    async def _xrange(stream, min, count):
+        return reviews if stream == "analytics:stream:reviews" and min == "(0-0" else []
+
+    with patch("src.core.analytics_store.redis") as mock_redis:
+        mock_redis.set = AsyncMock(return_value=True)
+        mock_redis.hget = AsyncMock(return_value=None)
+        mock_redis.xrange = AsyncMock(side_effect=_xrange)
+        mock_redis.xtrim = AsyncMock(return_value=3)
+        mock_redis.xlen = AsyncMock(return_value=10)
+        mock_redis.hscan = AsyncMock(return_value=(0, {}))
+        mock_redis.delete = AsyncMock()
+        mock_redis.pipeline = MagicMock(side_effect=_pipeline)
+        result = await compact_analytics_streams()
+
+    stats = result["streams"]["review"]
+    assert stats["compacted"] == 4
+    assert stats["cursor"] == reviews[-1][0]
+    assert result["streams"]["trace"]["compacted"] == 0
+
+    # Rollup increments and the cursor move commit atomically.
+    ((kwargs, pipe),) = pipes
+    assert kwargs == {"transaction": True}
+    pipe.execute.assert_awaited_once()
+    incr = {(args[0], args[1]): args[2] for name, args, _ in pipe.calls if name == "hincrby"}
+    assert incr[("analytics:rollup:day:2026-03-10", "review:total")] == 2
+    assert incr[("analytics:rollup:day:2026-03-11", "review:rubric:safe")] == 1
+    assert ("hset", ("analytics:rollup:cursor", "review", reviews[-1][0]), {}) in pipe.calls
+
+    # Compacted entries are trimmed, never past the cursor.
+    trim_kwargs = mock_redis.xtrim.await_args.kwargs
+    assert int(trim_kwargs["minid"].split("-")[0]) <= int(reviews[-1][0].split("-")[0])
+    mock_redis.delete.assert_any_await("analytics:rollup:lock")
+
+    segments = sorted((tmp_path / "review").glob("dt=*/*.ndjson.gz"))
+    assert [p.parent.name for p in segments] == ["dt=2026-03-10", "dt=2026-03-11"]
+    with gzip.open(segments[0], "rt") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [row["final_label"] for row in rows] == ["wrong_route", "success"]
+
+
+async def test_oversized_stream_trims_compacted_entries_up_to_the_cursor(monkeypatch):
+    monkeypatch.setattr("src.core.analytics_store.settings.analytics_archive_dir", "")
+    traces = [_entry(datetime.now(UTC), {"outcome": "success"})]
+
+    async def _xrange(stream, min, count):
+        return traces if stream == "analytics:stream:traces" and min == "(0-0" else []
+
+    with patch("src.core.analytics_store.redis") as mock_redis:
+        mock_redis.set = AsyncMock(return_value=True)
+        mock_redis.hget = AsyncMock(return_value=None)
+        mock_redis.xrange = AsyncMock(side_effect=_xrange)
+        mock_redis.xlen = AsyncMock(return_value=10**6)
+        mock_redis.xtrim = AsyncMock(return_value=0)
+        mock_redis.hscan = AsyncMock(return_value=(0, {}))
+        mock_redis.delete = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=_FakePipeline())
+        await compact_analytics_streams()
+
+    # Within the retention window, but over budget: trimmed exactly to the cursor.
+    cursor_ms = traces[0][0].split("-")[0]
+    mock_redis.xtrim.assert_awaited_once_with(
+        "analytics:stream:traces", minid=f"{cursor_ms}-0", approximate=True
+    )
+
+
+async def test_compaction_skips_when_another_run_holds_the_lock():
+    with patch("src.core.analytics_store.redis") as mock_redis:
+        mock_redis.set = AsyncMock(return_value=None)
+        mock_redis.xrange = AsyncMock()
+        result = await compact_analytics_streams()
+
+    assert result == {"status": "locked"}
+    mock_redis.xrange.assert_not_awaited()
+
+
+async def test_rollup_sums_days_and_uncompacted_tail():
+    now = datetime.now(UTC)
+    today = now.date().isoformat()
+    read_pipe = _FakePipeline(
+        [
+            {"review:total": "2", "review:label:success": "2"},
+            {"review:total": "1", "review:label:wrong_route": "1"},
+            {"review": "1700000000000-0"},
+        ]
+    )
+    tail_pipe = _FakePipeline(
+        [
+            [],
+            [
+                _entry(now, {"final_label": "success", "action": "close", "rubric": {}}),
+                _entry(now - timedelta(days=30), {"final_label": "stale", "action": "close"}),
+            ],
+            [],
+        ]
+    )
+    with patch("src.core.analytics_store.redis") as mock_redis:
+        mock_redis.pipeline = MagicMock(side_effect=[read_pipe, tail_pipe])
+        rollup = await get_analytics_rollup(days=2)
+
+    assert rollup["to"] == today
+    assert rollup["counts"]["review:total"] == 4
+    assert rollup["counts"]["review:label:success"] == 3
+    assert "review:label:stale" not in rollup["counts"]
+    assert rollup["tail_events"] == 1
+    assert [c[0] for c in read_pipe.calls] == ["hgetall", "hgetall", "hgetall"]
+    assert call("analytics:stream:reviews", min="(1700000000000-0", count=5000) in [
+        call(*args, **kwargs) for name, args, kwargs in tail_pipe.calls
+    ]
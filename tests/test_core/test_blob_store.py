@@ -0,0 +1,191 @@
+"""Tests for the content-addressed blob store and its callers."""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.core.blob_store import (
+    BlobStore,
+    LocalBlobBackend,
+    SupabaseBlobBackend,
+    is_blob_handle,
+)
+from src.gateway.types import IncomingMessage, MessageType
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalBlobBackend(tmp_path)
+
+
+async def test_put_returns_sha256_handle_and_round_trips(backend):
+    store = BlobStore(backend)
+    data = b"\x89PNG\r\n\x1a\n" + bytes(range(256))
+
+    handle = await store.put(data, "image/png")
+
+    assert handle == f"tmp/{hashlib.sha256(data).hexdigest()}"
+    assert is_blob_handle(handle)
+    assert await store.get(handle) == data
+
+
+async def test_identical_bytes_are_uploaded_once(backend):
+    store = BlobStore(backend)
+    with patch.object(backend, "put", wraps=backend.put) as put:
+        first = await store.put(b"same", namespace="docs")
+        second = await store.put(b"same", namespace="docs")
+
+    assert first == second
+    assert put.await_count == 1
+    assert store.status()["dedup_hits"] == 1
+
+
+async def test_stale_blob_is_rewritten_so_sweep_keeps_it(backend, tmp_path):
+    store = BlobStore(backend, refresh_after_s=60)
+    handle = await store.put(b"old")
+    old = time.time() - 3600
+    os.utime(tmp_path / handle, (old, old))
+
+    await store.put(b"old")
+    assert await store.sweep(max_age_s=600) == 0
+    assert await store.get(handle) == b"old"
+
+
+async def test_sweep_removes_only_expired_tmp_blobs(backend, tmp_path):
+    store = BlobStore(backend)
+    expired = await store.put(b"expired")
+    fresh = await store.put(b"fresh")
+    kept = await store.put(b"durable", namespace="docs")
+    old = time.time() - 3600
+    for handle in (expired, kept):
+        os.utime(tmp_path / handle, (old, old))
+
+    assert await store.sweep(max_age_s=600) == 1
+    assert await store.get(expired) is None
+    assert await store.get(fresh) == b"fresh"
+    assert await store.get(kept) == b"durable"
+
+
+async def test_invalid_handles_are_rejected(backend):
+    store = BlobStore(backend)
+    assert await store.get("../../etc/passwd") is None
+    assert await store.get("") is None
+    assert await store.delete("tmp/not-a-digest") is False
+
+
+async def test_delete(backend):
+    store = BlobStore(backend)
+    handle = await store.put(b"bye")
+    assert await store.delete(handle) is True
+    assert await store.get(handle) is None
+    assert await store.delete(handle) is False
+
+
+async def test_supabase_backend_uses_storage_rest_api():
+    objects: dict[str, bytes] = {}
+    seen: list[tuple[str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path))
+        assert request.headers["authorization"] == "Bearer svc"
+        path = request.url.path.removeprefix("/storage/v1/object/")
+        if request.method == "POST":
+            objects[path] = request.content
+            return httpx.Response(200, json={"Key": path})
+        if request.method == "HEAD":
+            if path not in objects:
+                return httpx.Response(400)
+            return httpx.Response(200, headers={"last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        if request.method == "GET":
+            if path not in objects:
+                return httpx.Response(400)
+            return httpx.Response(200, content=objects[path])
+        if request.method == "DELETE":
+            for prefix in json.loads(request.content)["prefixes"]:
+                objects.pop(f"{path}/{prefix}", None)
+            return httpx.Response(200, json=[])
+        return httpx.Response(405)
+
+    backend = SupabaseBlobBackend("https://proj.supabase.co/", "svc", "blobs")
+    backend._client = httpx.AsyncClient(
+        headers=backend._headers, transport=httpx.MockTransport(handler)
+    )
+    store = BlobStore(backend, refresh_after_s=10**12)
+
+    handle = await store.put(b"receipt", "image/jpeg")
+    assert objects == {f"blobs/{handle}": b"receipt"}
+    assert await store.put(b"receipt", "image/jpeg") == handle
+    assert [m for m, _ in seen].count("POST") == 1
+    assert await store.get(handle) == b"receipt"
+    assert await store.delete(handle) is True
+    assert await store.get(handle) is None
+    await backend.close()
+
+
+async def test_supabase_sweep_keeps_refreshed_blobs():
+    def iso(ts: float) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+    old, now = iso(time.time() - 3600), iso(time.time())
+    listing = [
+        {"name": "a" * 64, "created_at": old, "updated_at": old},
+        {"name": "b" * 64, "created_at": old, "updated_at": now},
+    ]
+    deleted: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path == "/storage/v1/object/list/blobs":
+            column = body["sortBy"]["column"]
+            return httpx.Response(200, json=sorted(listing, key=lambda item: item[column]))
+        if request.method == "DELETE":
+            deleted.extend(body["prefixes"])
+            return httpx.Response(200, json=[])
+        return httpx.Response(405)
+
+    backend = SupabaseBlobBackend("https://proj.supabase.co/", "svc", "blobs")
+    backend._client = httpx.AsyncClient(
+        headers=backend._headers, transport=httpx.MockTransport(handler)
+    )
+
+    assert await backend.sweep("tmp", max_age_s=600) == 1
+    assert deleted == [f"tmp/{'a' * 64}"]
+    await backend.close()
+
+
+async def test_last_file_cache_keeps_only_handle_in_redis(blob_store):
+    from src.core.router import _cache_last_file, _get_cached_file
+
+    cache: dict[str, str] = {}
+    redis = AsyncMock()
+    redis.set.side_effect = lambda key, value, ex=None: cache.__setitem__(key, value)
+    redis.get.side_effect = lambda key: cache.get(key)
+    photo = b"\xff\xd8\xff" + b"\x00" * 4096
+    message = IncomingMessage(
+        id="1", user_id="u1", chat_id="c1", type=MessageType.photo, photo_bytes=photo
+    )
+
+    with patch("src.core.db.redis", redis):
+        await _cache_last_file("u1", message)
+        cached = await _get_cached_file("u1")
+
+    assert list(cache) == ["last_file:u1:meta"]
+    assert len(cache["last_file:u1:meta"]) < 200
+    assert cached["bytes"] == photo
+    assert cached["is_photo"] is True
+
+
+async def test_pending_scan_image_reads_blob_and_legacy_base64(blob_store):
+    from src.core.router import _pending_image_bytes
+
+    handle = await blob_store.put(b"scan")
+    assert await _pending_image_bytes({"image_blob": handle}) == b"scan"
+    legacy = {"image_b64": base64.b64encode(b"inline").decode()}
+    assert await _pending_image_bytes(legacy) == b"inline"
+    assert await _pending_image_bytes({"image_blob": ""}) is None
@@ -182,10 +182,6 @@ async def test_high_confidence_skips_clarify(sample_ctx, high_confidence_result)
         ),
         patch(f"{MODULE}.get_domain_router", return_value=mock_dr),
         patch(f"{MODULE}._persist_message", new_callable=AsyncMock),
-        patch(
-            f"{MODULE}.summarize_dialog",
-            new_callable=AsyncMock,
-        ),
         patch(
             f"{MODULE}.sliding_window.add_message",
             new_callable=AsyncMock,
@@ -0,0 +1,91 @@
+"""Tests for the per-process Postgres connection budget."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core import connection_budget
+from src.core.connection_budget import POOL_CONNECTIONS, budgets, pool_stats, process_role
+from src.core.metrics import REGISTRY
+
+
+@pytest.fixture
+def pools():
+    saved = dict(connection_budget._pools)
+    connection_budget._pools.clear()
+    REGISTRY.reset()
+    yield connection_budget._pools
+    connection_budget._pools.clear()
+    connection_budget._pools.update(saved)
+    REGISTRY.reset()
+
+
+@pytest.mark.parametrize("role", ["web", "worker"])
+@pytest.mark.parametrize("total", [3, 10, 15, 30, 100])
+def test_pools_split_the_whole_budget(role, total):
+    split = budgets(role, total)
+
+    assert set(split) == {"sqlalchemy", "checkpointer", "mem0"}
+    assert sum(b.max_size for b in split.values()) == total
+    for b in split.values():
+        assert 1 <= b.min_size <= b.max_size
+    assert split["sqlalchemy"].max_size >= split["checkpointer"].max_size
+
+
+def test_budget_below_pool_count_still_gives_each_pool_a_connection():
+    split = budgets("worker", 1)
+    assert [b.max_size for b in split.values()] == [1, 1, 1]
+
+
+def test_role_comes_from_settings_then_railway_process_type(monkeypatch):
+    monkeypatch.setattr(connection_budget.settings, "process_role", "")
+    monkeypatch.setenv("RAILWAY_PROCESS_TYPE", "worker")
+    assert process_role() == "worker"
+
+    monkeypatch.setattr(connection_budget.settings, "process_role", "web")
+    assert process_role() == "web"
+
+    monkeypatch.setattr(connection_budget.settings, "process_role", "cron")
+    assert process_role() == "web"
+
+
+def test_pool_stats_reports_saturation_and_sets_gauges(pools):
+    psycopg_pool = MagicMock()
+    psycopg_pool.get_stats.return_value = {
+        "pool_max": 4,
+        "pool_size": 4,
+        "pool_available": 1,
+        "requests_waiting": 2,
+        "requests_num": 10,
+        "requests_wait_ms": 250,
+    }
+    sqlalchemy_pool = SimpleNamespace(
+        checkedout=lambda: 3, checkedin=lambda: 2, size=lambda: 6, _max_overflow=12, waiting=0
+    )
+    connection_budget.register_pool("checkpointer", psycopg_pool)
+    connection_budget.register_pool("sqlalchemy", sqlalchemy_pool)
+
+    with patch.object(connection_budget.settings, "process_role", "web"):
+        report = pool_stats()
+
+    assert report["role"] == "web"
+    checkpointer = report["pools"]["checkpointer"]
+    assert checkpointer["in_use"] == 3
+    assert checkpointer["saturation"] == 0.75
+    assert checkpointer["waiting"] == 2
+    assert checkpointer["wait_avg_ms"] == 25.0
+    assert report["pools"]["sqlalchemy"]["max"] == 18
+    assert report["pools"]["sqlalchemy"]["saturation"] == pytest.approx(0.17)
+    assert POOL_CONNECTIONS.value("checkpointer", "in_use") == 3
+
+
+def test_snapshot_refreshes_pool_gauges(pools):
+    pool = MagicMock()
+    pool.get_stats.return_value = {"pool_max": 2, "pool_size": 2, "pool_available": 0}
+    connection_budget.register_pool("mem0", pool)
+
+    snapshot = REGISTRY.snapshot()
+
+    series = dict((tuple(k), v) for k, v in snapshot["db_pool_connections"]["series"])
+    assert series[("mem0", "in_use")] == 2
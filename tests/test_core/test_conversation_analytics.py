@@ -1,7 +1,7 @@
 import json
 import logging
 import uuid
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.core.context import SessionContext
 from src.core.conversation_analytics import (
@@ -32,6 +32,24 @@ from src.core.conversation_analytics import (
 from src.gateway.types import IncomingMessage, MessageType, OutgoingMessage
 
 
+class _FakePipeline:
+    def __init__(self):
+        self.calls = []
+        self.execute = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def names(self) -> list[str]:
+        return [name for name, _, _ in self.calls]
+
+
 def _context() -> SessionContext:
     return SessionContext(
         user_id=str(uuid.uuid4()),
@@ -175,8 +193,13 @@ async def test_get_review_queue_snapshot_returns_review_and_trace_items():
         '{"trace_key":"trace-1","review_label":"wrong_route","tags":["golden_replay"],"source":"test_bot_live_golden_replay","queued_for_review":true,"review_suggestion":{"suggested_final_label":"wrong_route","suggested_action":"promote_to_dataset"}}',
         '{"review_label":"tool_failure","queued_for_review":true}',
     ]
-    with patch("src.core.conversation_analytics.redis") as mock_redis:
-        mock_redis.lrange = AsyncMock(side_effect=[items, items])
+    stream_entries = [(f"1700000000000-{i}", {"data": item}) for i, item in enumerate(items)]
+    with (
+        patch("src.core.conversation_analytics.redis") as mock_redis,
+        patch("src.core.analytics_store.redis") as mock_store_redis,
+    ):
+        mock_redis.lrange = AsyncMock(return_value=items)
+        mock_store_redis.xrevrange = AsyncMock(return_value=stream_entries)
         snapshot = await get_review_queue_snapshot(
             limit=2,
             tag="golden_replay",
@@ -186,6 +209,7 @@ async def test_get_review_queue_snapshot_returns_review_and_trace_items():
     assert snapshot["review_queue_size"] == 2
     assert snapshot["filtered_review_queue_size"] == 1
     assert snapshot["trace_export_size"] == 2
+    mock_store_redis.xrevrange.assert_awaited_once_with("analytics:stream:traces", count=2)
     assert snapshot["review_queue"][0]["review_label"] == "wrong_route"
     assert (
         snapshot["review_queue"][0]["review_suggestion"]["suggested_final_label"]
@@ -230,69 +254,50 @@ async def test_get_review_batches_returns_recent_items():
     assert batches[0]["applied_count"] == 2
 
 
-async def test_get_quality_metrics_snapshot_aggregates_review_and_feedback_rates():
-    review_results = [
-        {
-            "final_label": "wrong_route",
-            "action": "promote_to_dataset",
-            "rubric": {
-                "intent_correct": False,
-                "response_useful": False,
-                "action_completed": False,
-                "clarification_appropriate": False,
-                "memory_applied": True,
-                "safe": True,
-                "language_correct": True,
-                "formatting_correct": True,
-                "latency_acceptable": True,
-            },
-        },
-        {
-            "final_label": "success",
-            "action": "close",
-            "rubric": {
-                "intent_correct": True,
-                "response_useful": True,
-                "action_completed": True,
-                "clarification_appropriate": True,
-                "memory_applied": True,
-                "safe": True,
-                "language_correct": True,
-                "formatting_correct": True,
-                "latency_acceptable": False,
-            },
+async def test_get_quality_metrics_snapshot_reads_rates_from_rollups():
+    rollup = {
+        "days": 7,
+        "from": "2026-03-06",
+        "to": "2026-03-12",
+        "counts": {
+            "trace:total": 40,
+            "review:total": 2,
+            "review:label:wrong_route": 1,
+            "review:label:success": 1,
+            "review:action:promote_to_dataset": 1,
+            "review:action:close": 1,
+            "review:rubric:action_completed": 1,
+            "review:rubric:safe": 2,
+            "feedback:total": 2,
+            "feedback:value:helpful": 1,
+            "feedback:value:unhelpful": 1,
         },
-    ]
-    feedback_items = [
-        {"feedback": "helpful"},
-        {"feedback": "unhelpful"},
-    ]
+    }
+    pipe = _FakePipeline()
+    pipe.execute.return_value = [3, 1]
     with (
         patch(
-            "src.core.conversation_analytics.get_review_results",
-            AsyncMock(return_value=review_results),
-        ),
-        patch(
-            "src.core.conversation_analytics.get_dataset_candidates",
-            AsyncMock(return_value=[{"trace_key": "trace-1"}]),
-        ),
-        patch(
-            "src.core.conversation_analytics.get_review_queue",
-            AsyncMock(return_value=[{"trace_key": "trace-1"}]),
-        ),
-        patch(
-            "src.core.conversation_analytics.get_user_feedback",
-            AsyncMock(return_value=feedback_items),
-        ),
+            "src.core.conversation_analytics.get_analytics_rollup",
+            AsyncMock(return_value=rollup),
+        ) as mock_rollup,
+        patch("src.core.conversation_analytics.redis") as mock_redis,
     ):
-        snapshot = await get_quality_metrics_snapshot(limit=20)
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        snapshot = await get_quality_metrics_snapshot(days=7)
 
+    mock_rollup.assert_awaited_once_with(days=7)
+    mock_redis.lrange.assert_not_called()  # no per-call list re-aggregation
     assert snapshot["status"] == "monitor"
+    assert snapshot["window_days"] == 7
     assert snapshot["review_count"] == 2
-    assert snapshot["review_queue_size"] == 1
+    assert snapshot["trace_count"] == 40
+    assert snapshot["review_queue_size"] == 3
     assert snapshot["dataset_candidate_size"] == 1
+    assert snapshot["review_label_counts"] == {"wrong_route": 1, "success": 1}
     assert snapshot["rates"]["wrong_route_rate"] == 0.5
     assert snapshot["rates"]["task_completion_rate"] == 0.5
+    assert snapshot["rates"]["safety_correctness_rate"] == 1.0
+    assert snapshot["rates"]["intent_correct_rate"] == 0.0
     assert snapshot["rates"]["helpful_feedback_rate"] == 0.5
     assert snapshot["rates"]["user_dissatisfaction_signal_rate"] == 0.5
 
@@ -323,12 +328,10 @@ async def test_submit_user_feedback_persists_record():
         "channel": "telegram",
         "created_at": "2026-03-12T00:00:00+00:00",
     }
+    pipe = _FakePipeline()
     with patch("src.core.conversation_analytics.redis") as mock_redis:
         mock_redis.get = AsyncMock(return_value=json.dumps(prompt_payload))
-        mock_redis.hset = AsyncMock()
-        mock_redis.lpush = AsyncMock()
-        mock_redis.ltrim = AsyncMock()
-        mock_redis.delete = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
         result = await submit_user_feedback(
             token="token-1",
             feedback="helpful",
@@ -340,8 +343,12 @@ async def test_submit_user_feedback_persists_record():
 
     assert result["trace_key"] == "corr-1"
     assert result["feedback"] == "helpful"
-    mock_redis.hset.assert_awaited_once()
-    mock_redis.delete.assert_awaited_once()
+    # Index, queue, stream event and prompt cleanup in a single round-trip.
+    pipe.execute.assert_awaited_once()
+    assert pipe.names() == ["hset", "lpush", "ltrim", "xadd", "delete"]
+    xadd_args = pipe.calls[3][1]
+    assert xadd_args[0] == "analytics:stream:feedback"
+    assert json.loads(xadd_args[1]["data"])["feedback"] == "helpful"
 
 
 async def test_get_user_feedback_returns_recent_items():
@@ -402,11 +409,10 @@ async def test_submit_trace_review_promotes_dataset_candidate():
         "outcome": "wrong_route",
     }
     serialized_trace = json.dumps(trace_payload)
+    pipe = _FakePipeline()
     with patch("src.core.conversation_analytics.redis") as mock_redis:
-        mock_redis.hget = AsyncMock(return_value=serialized_trace)
-        mock_redis.hset = AsyncMock()
-        mock_redis.lpush = AsyncMock()
-        mock_redis.ltrim = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=serialized_trace)
+        mock_redis.pipeline = MagicMock(return_value=pipe)
         result = await submit_trace_review(
             trace_key="corr-123",
             reviewer="qa-1",
@@ -432,6 +438,9 @@ async def test_submit_trace_review_promotes_dataset_candidate():
     assert result["review"]["final_label"] == "wrong_route"
     assert result["review"]["rubric"]["intent_correct"] is False
     assert result["trace"]["trace_key"] == trace_payload["trace_key"]
+    mock_redis.get.assert_awaited_once_with("analytics:trace:corr-123")
+    pipe.execute.assert_awaited_once()
+    assert pipe.names() == ["hset", "lpush", "ltrim", "xadd", "hset", "lpush", "ltrim"]
 
 
 async def test_apply_trace_review_suggestion_uses_prefill():
@@ -459,10 +468,8 @@ async def test_apply_trace_review_suggestion_uses_prefill():
     }
     serialized_trace = json.dumps(trace_payload)
     with patch("src.core.conversation_analytics.redis") as mock_redis:
-        mock_redis.hget = AsyncMock(return_value=serialized_trace)
-        mock_redis.hset = AsyncMock()
-        mock_redis.lpush = AsyncMock()
-        mock_redis.ltrim = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=serialized_trace)
+        mock_redis.pipeline = MagicMock(return_value=_FakePipeline())
         result = await apply_trace_review_suggestion(
             trace_key="corr-123",
             reviewer="qa-2",
@@ -569,10 +576,9 @@ async def test_apply_trace_review_suggestions_batch_selects_from_queue():
 
 
 async def test_ingest_review_trace_stores_external_candidate():
+    pipe = _FakePipeline()
     with patch("src.core.conversation_analytics.redis") as mock_redis:
-        mock_redis.hset = AsyncMock()
-        mock_redis.lpush = AsyncMock()
-        mock_redis.ltrim = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
         payload = await ingest_review_trace(
             {
                 "trace_key": "replay-123",
@@ -593,11 +599,17 @@ async def test_ingest_review_trace_stores_external_candidate():
     assert payload["queued_for_review"] is True
     assert payload["metadata"]["source_trace_key"] == "corr-1"
     assert payload["review_suggestion"]["suggested_action"] == "promote_to_dataset"
+    pipe.execute.assert_awaited_once()
+    assert pipe.names() == ["set", "xadd", "lpush", "ltrim"]
+    set_args, set_kwargs = pipe.calls[0][1], pipe.calls[0][2]
+    assert set_args[0] == "analytics:trace:replay-123"
+    assert set_kwargs["ex"] > 0  # bounded, unlike the old trace index hash
+    assert "maxlen" not in pipe.calls[1][2]  # only compaction trims, up to its cursor
 
 
 async def test_submit_trace_review_rejects_missing_rubric_fields():
     with patch("src.core.conversation_analytics.redis") as mock_redis:
-        mock_redis.hget = AsyncMock(return_value='{"trace_key":"corr-123"}')
+        mock_redis.get = AsyncMock(return_value='{"trace_key":"corr-123"}')
         try:
             await submit_trace_review(
                 trace_key="corr-123",
@@ -706,6 +718,22 @@ async def test_get_weekly_curation_snapshot_aggregates_reviews():
             "src.core.conversation_analytics.get_user_feedback",
             AsyncMock(return_value=user_feedback),
         ),
+        patch(
+            "src.core.conversation_analytics.get_analytics_rollup",
+            AsyncMock(
+                return_value={
+                    "from": "2026-03-06",
+                    "to": "2026-03-12",
+                    "counts": {
+                        "review:label:wrong_route": 1,
+                        "review:label:tool_failure": 1,
+                        "review:action:promote_to_dataset": 1,
+                        "review:action:follow_up": 1,
+                        "feedback:value:unhelpful": 1,
+                    },
+                }
+            ),
+        ),
     ):
         snapshot = await get_weekly_curation_snapshot(limit=5)
 
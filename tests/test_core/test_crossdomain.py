@@ -2,20 +2,55 @@
 
 import uuid
 from datetime import date, timedelta
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.core.models.enums import LifeEventType, TransactionType
+from src.core.pattern_engine import EventColumns, TxColumns, user_findings
 from src.core.tasks.crossdomain_tasks import (
     MAX_INSIGHTS_PER_USER,
     MIN_LIFE_EVENTS,
     MIN_TRANSACTIONS,
-    _analyze_drink_patterns,
-    _analyze_food_spending,
-    _analyze_mood_spending,
-    _analyze_time_patterns,
 )
 
 
+def _insights(kind: str, events: list[dict], txns: list[dict], event_type=None) -> list[str]:
+    """Run the engine for one user and return the texts of *kind* findings."""
+    dates = [t["date"] for t in txns] + [e["date"] for e in events]
+    start = min(dates)
+    days = (max(dates) - start).days + 1
+    tx = TxColumns.from_rows(
+        [
+            SimpleNamespace(
+                family_id="fam",
+                date=t["date"],
+                amount=t["amount"],
+                merchant=t.get("merchant"),
+                description=t.get("description"),
+                category="Other",
+            )
+            for t in txns
+            if t["type"] == TransactionType.expense
+        ],
+        start=start,
+        days=days,
+    )
+    ev = EventColumns.from_rows(
+        [
+            SimpleNamespace(
+                user_id="usr",
+                type=e.get("type", event_type),
+                date=e["date"],
+                data=e.get("data"),
+            )
+            for e in events
+        ],
+        tx,
+        [("usr", "fam")],
+    )
+    return [f.text for f in user_findings(tx, ev).get("usr", []) if f.kind == kind]
+
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -31,7 +66,7 @@ class TestConstants:
 
 
 # ---------------------------------------------------------------------------
-# _analyze_mood_spending
+# Mood × spending
 # ---------------------------------------------------------------------------
 class TestAnalyzeMoodSpending:
     def test_higher_spending_on_bad_days(self):
@@ -51,7 +86,7 @@ class TestAnalyzeMoodSpending:
             for i in range(5)
         ]
 
-        insights = _analyze_mood_spending(moods, txns)
+        insights = _insights("mood_spending", moods, txns, LifeEventType.mood)
         assert len(insights) >= 1
         assert "low-mood" in insights[0]
 
@@ -72,7 +107,7 @@ class TestAnalyzeMoodSpending:
             for i in range(5)
         ]
 
-        insights = _analyze_mood_spending(moods, txns)
+        insights = _insights("mood_spending", moods, txns, LifeEventType.mood)
         assert len(insights) >= 1
         assert "good-mood" in insights[0]
 
@@ -81,7 +116,7 @@ class TestAnalyzeMoodSpending:
         moods = [{"date": today, "data": {"score": 3}}]
         txns = [{"date": today, "type": TransactionType.expense, "amount": 100}]
 
-        insights = _analyze_mood_spending(moods, txns)
+        insights = _insights("mood_spending", moods, txns, LifeEventType.mood)
         assert insights == []
 
     def test_no_mood_score_skipped(self):
@@ -95,12 +130,12 @@ class TestAnalyzeMoodSpending:
             for i in range(5)
         ]
 
-        insights = _analyze_mood_spending(moods, txns)
+        insights = _insights("mood_spending", moods, txns, LifeEventType.mood)
         assert insights == []
 
 
 # ---------------------------------------------------------------------------
-# _analyze_food_spending
+# Meal tracking × food spending
 # ---------------------------------------------------------------------------
 class TestAnalyzeFoodSpending:
     def test_lower_spend_on_tracked_days(self):
@@ -131,7 +166,7 @@ class TestAnalyzeFoodSpending:
             for i in range(5)
         ]
 
-        insights = _analyze_food_spending(food_events, txns)
+        insights = _insights("food_tracking", food_events, txns, LifeEventType.food)
         assert len(insights) >= 1
         assert "track meals" in insights[0]
 
@@ -148,12 +183,12 @@ class TestAnalyzeFoodSpending:
             }
         ]
 
-        insights = _analyze_food_spending(food_events, txns)
+        insights = _insights("food_tracking", food_events, txns, LifeEventType.food)
         assert insights == []
 
 
 # ---------------------------------------------------------------------------
-# _analyze_time_patterns
+# Weekday seasonality
 # ---------------------------------------------------------------------------
 class TestAnalyzeTimePatterns:
     def test_peak_spending_day(self):
@@ -183,7 +218,7 @@ class TestAnalyzeTimePatterns:
                     "merchant": "",
                 })
 
-        insights = _analyze_time_patterns(txns, [])
+        insights = _insights("weekday", [], txns)
         assert len(insights) >= 1
         assert "Monday" in insights[0]
 
@@ -197,12 +232,12 @@ class TestAnalyzeTimePatterns:
             }
         ]
 
-        insights = _analyze_time_patterns(txns, [])
+        insights = _insights("weekday", [], txns)
         assert insights == []
 
 
 # ---------------------------------------------------------------------------
-# _analyze_drink_patterns
+# Drinks × spending
 # ---------------------------------------------------------------------------
 class TestAnalyzeDrinkPatterns:
     def test_heavy_drink_days_higher_spending(self):
@@ -222,7 +257,7 @@ class TestAnalyzeDrinkPatterns:
             for i in range(5)
         ]
 
-        insights = _analyze_drink_patterns(drink_events, txns)
+        insights = _insights("drink_spending", drink_events, txns, LifeEventType.drink)
         assert len(insights) >= 1
         assert "3+ drinks" in insights[0]
 
@@ -235,7 +270,7 @@ class TestAnalyzeDrinkPatterns:
             for i in range(5)
         ]
 
-        insights = _analyze_drink_patterns(drink_events, txns)
+        insights = _insights("drink_spending", drink_events, txns, LifeEventType.drink)
         assert insights == []
 
 
@@ -259,41 +294,56 @@ class TestWeeklyCron:
         mock_ctx.__aexit__.return_value = False
 
         today = date.today()
-        fake_txns = [
-            {
-                "amount": 100,
-                "type": TransactionType.expense,
-                "date": today - timedelta(days=i),
-                "description": "test",
-                "merchant": "store",
-            }
-            for i in range(10)
-        ]
-        fake_events = [
-            {"type": LifeEventType.mood, "date": today - timedelta(days=i),
-             "data": {"score": 3}, "tags": []}
-            for i in range(5)
-        ]
+        start = today - timedelta(days=29)
+        tx = TxColumns.from_rows(
+            [
+                SimpleNamespace(
+                    family_id=str(family_id),
+                    date=today - timedelta(days=i),
+                    amount=300 if i < 3 else 50,
+                    merchant="store",
+                    description="test",
+                    category="Other",
+                )
+                for i in range(10)
+            ],
+            start=start,
+            days=30,
+        )
+        events = EventColumns.from_rows(
+            [
+                SimpleNamespace(
+                    user_id=str(user_id),
+                    type=LifeEventType.mood,
+                    date=today - timedelta(days=i),
+                    data={"score": 1 if i < 3 else 5},
+                )
+                for i in range(6)
+            ],
+            tx,
+            [(str(user_id), str(family_id))],
+        )
 
         with (
             patch("src.core.tasks.crossdomain_tasks.async_session", return_value=mock_ctx),
             patch(
-                "src.core.tasks.crossdomain_tasks._get_crossdomain_data",
+                "src.core.tasks.crossdomain_tasks._load_crossdomain_data",
                 new_callable=AsyncMock,
-                return_value=(fake_txns, fake_events),
-            ),
+                return_value=(tx, events),
+            ) as mock_load,
             patch(
                 "src.core.tasks.crossdomain_tasks._store_insights",
                 new_callable=AsyncMock,
-                return_value=2,
-            ),
+                return_value=1,
+            ) as mock_store,
         ):
             await async_crossdomain_insights.original_func()
 
-        # Should have attempted to store insights
-        # (may or may not have insights depending on data patterns)
-        # At minimum, the function should complete without error
-        assert True  # reached here without exception
+        mock_load.assert_awaited_once_with([(str(user_id), str(family_id))])
+        mock_store.assert_awaited_once()
+        stored_user, insights = mock_store.call_args.args
+        assert stored_user == str(user_id)
+        assert "low-mood" in insights[0]
 
     async def test_cron_skips_users_with_little_data(self):
         from src.core.tasks.crossdomain_tasks import async_crossdomain_insights
@@ -310,12 +360,15 @@ class TestWeeklyCron:
         mock_ctx.__aenter__.return_value = mock_session
         mock_ctx.__aexit__.return_value = False
 
+        tx = TxColumns.from_rows([], start=date.today() - timedelta(days=29), days=30)
+        events = EventColumns.from_rows([], tx, [(str(user_id), str(family_id))])
+
         with (
             patch("src.core.tasks.crossdomain_tasks.async_session", return_value=mock_ctx),
             patch(
-                "src.core.tasks.crossdomain_tasks._get_crossdomain_data",
+                "src.core.tasks.crossdomain_tasks._load_crossdomain_data",
                 new_callable=AsyncMock,
-                return_value=([], []),  # No data
+                return_value=(tx, events),  # No data
             ),
             patch(
                 "src.core.tasks.crossdomain_tasks._store_insights",
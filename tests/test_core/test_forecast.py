@@ -0,0 +1,142 @@
+"""Tests for the cash-flow forecasting engine (src/core/forecast.py)."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.forecast import (
+    LOOKBACK_DAYS,
+    DailySeries,
+    Forecast,
+    forecast_families,
+    next_occurrence,
+    project_recurring,
+)
+from src.core.models.enums import PaymentFrequency
+
+_TODAY = date(2026, 3, 16)  # a Monday
+_START = _TODAY - timedelta(days=LOOKBACK_DAYS)
+
+
+def _day(family: str, days_ago: int, total: float, type_="expense", recurring=False, today=_TODAY):
+    return SimpleNamespace(
+        family_id=family,
+        date=today - timedelta(days=days_ago),
+        type=type_,
+        recurring=recurring,
+        total=total,
+    )
+
+
+def _payment(family: str, amount: float, frequency: PaymentFrequency, next_date: date):
+    return SimpleNamespace(
+        family_id=family, name="Rent", amount=amount, frequency=frequency, next_date=next_date
+    )
+
+
+def _series(rows) -> DailySeries:
+    return DailySeries.from_rows(rows, start=_START, days=LOOKBACK_DAYS)
+
+
+def test_recurring_schedule_matches_the_cron():
+    assert next_occurrence(date(2026, 1, 31), PaymentFrequency.monthly) == date(2026, 2, 28)
+    assert next_occurrence(date(2026, 11, 15), PaymentFrequency.quarterly) == date(2027, 2, 15)
+    assert next_occurrence(date(2026, 3, 1), PaymentFrequency.yearly) == date(2027, 3, 1)
+
+    weekly = _payment("f1", 10, PaymentFrequency.weekly, _TODAY - timedelta(days=2))
+    hits = project_recurring(weekly, start=_TODAY, horizon=30)
+    assert hits[0] == (0, _TODAY, 10.0)  # overdue → today
+    assert [offset for offset, _, _ in hits] == [0, 5, 12, 19, 26]
+
+
+def test_baseline_seasonality_and_recurring_projection():
+    rows = []
+    for d in range(1, 181):
+        weekday = (_TODAY - timedelta(days=d)).weekday()
+        rows.append(_day("f1", d, 100 if weekday == 5 else 30))
+        rows.append(_day("f2", d, 5))
+    rows += [_day("f1", d, 3000, "income") for d in range(14, 181, 30)]
+    rows += [_day("f1", d, 800, recurring=True) for d in range(10, 181, 30)]  # rent, recorded
+    rent = _payment("f1", 800, PaymentFrequency.monthly, _TODAY + timedelta(days=20))
+
+    forecasts = forecast_families(_series(rows), [rent])
+
+    f1, f2 = forecasts["f1"], forecasts["f2"]
+    assert f1.start == _TODAY and f1.horizon == 90
+    assert f1.history_days == 180
+    saturday = 5  # _TODAY is a Monday
+    assert f1.expense[saturday] == pytest.approx(100, rel=0.1)
+    assert f1.expense[0] == pytest.approx(30, rel=0.1)
+    assert f2.expense[0] == pytest.approx(5, abs=0.5)
+    # Recorded rent stays out of the baseline and comes from the schedule instead.
+    assert sum(f1.recurring[:30]) == 800
+    assert f1.payments[0] == ((_TODAY + timedelta(days=20)).isoformat(), "Rent", 800.0)
+    month = f1.checkpoint(30)
+    assert month["income"] == pytest.approx(3000, rel=0.1)
+    assert month["low"] < month["net"] < month["high"]
+    assert f1.band[89] > f1.band[29] > f1.band[0] > 0
+    assert f2.band[29] < 1  # perfectly regular spending
+
+
+def test_shortfall_needs_income_and_history():
+    rows = [_day("short", d, 120) for d in range(1, 60)]
+    rows += [_day("short", d, 2000, "income") for d in (3, 33)]
+    rows += [_day("no_income", d, 50) for d in range(1, 60)]
+    rows += [_day("new", d, 500) for d in range(1, 8)]
+    rows += [_day("new", 2, 100, "income")]
+
+    forecasts = forecast_families(_series(rows))
+
+    deficit = forecasts["short"].shortfall()
+    assert deficit == pytest.approx(30 * 120 - 2000, rel=0.15)
+    assert forecasts["no_income"].shortfall() is None
+    assert forecasts["new"].history_days == 7
+    assert forecasts["new"].shortfall() is None
+    assert "Warning: expected shortfall" in forecasts["short"].describe(30, "USD")
+
+
+def test_forecast_json_round_trip():
+    rows = [_day("f1", d, 10) for d in range(1, 20)]
+    rent = _payment("f1", 50, PaymentFrequency.weekly, _TODAY)
+    forecast = forecast_families(_series(rows), [rent])["f1"]
+
+    assert Forecast.from_json(forecast.to_json()) == forecast
+
+
+async def test_shortfall_alert_and_nightly_precompute():
+    from src.core.notifications import check_forecast_shortfall
+    from src.core.tasks.notification_tasks import precompute_cash_flow_forecasts
+
+    today = date.today()
+    rows = [_day("f1", d, 120, today=today) for d in range(1, 60)]
+    rows += [_day("f1", 3, 1000, "income", today=today)]
+    rows += [_day("f2", d, 10, today=today) for d in range(1, 60)]
+    session = MagicMock()
+    session.execute = AsyncMock(
+        side_effect=[
+            MagicMock(all=MagicMock(return_value=rows)),
+            MagicMock(all=MagicMock(return_value=[])),
+        ]
+    )
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=session)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+
+    with (
+        patch("src.core.forecast.async_session", return_value=ctx),
+        patch("src.core.forecast.cache_forecasts", new_callable=AsyncMock) as mock_put,
+    ):
+        await precompute_cash_flow_forecasts()
+
+    cached = {fc.family_id: fc for fc in mock_put.call_args.args[0]}
+    assert set(cached) == {"f1", "f2"}
+
+    with patch("src.core.forecast.get_forecast", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = cached["f1"]
+        alerts = await check_forecast_shortfall("f1", language="ru")
+        mock_get.return_value = cached["f2"]
+        assert await check_forecast_shortfall("f2") == []
+
+    assert len(alerts) == 1 and alerts[0].startswith("📉 Прогноз")
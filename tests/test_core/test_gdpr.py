@@ -1,34 +1,77 @@
-"""Tests for GDPR memory registry integration."""
+"""Tests for GDPR export, batched erasure and the per-user Redis key registry."""
 
+import io
+import json
 import uuid
+import zipfile
+from datetime import date
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.core.gdpr import MemoryGDPR
+from src.core.gdpr import (
+    ERASURE_STEPS,
+    MemoryGDPR,
+    erasure_pending,
+    get_erasure_status,
+    run_user_erasure,
+    start_user_erasure,
+)
+from src.core.models.conversation import ConversationMessage
+from src.core.models.transaction import Transaction
+from src.core.user_keys import delete_user_keys, list_user_keys
 
 
-def _result(items):
-    result = MagicMock()
-    result.scalars.return_value = items
-    return result
+class _Stream:
+    def __init__(self, partitions):
+        self._partitions = partitions
 
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
 
-async def test_export_user_data_includes_memory_registry():
+
+class _FakePipeline:
+    def __init__(self):
+        self.calls = []
+        self.execute = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+
+def _tx(i: int):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        type=SimpleNamespace(value="expense"),
+        amount=i,
+        merchant=f"shop-{i}",
+        date=date(2026, 3, 1),
+        scope=SimpleNamespace(value="family"),
+    )
+
+
+async def test_export_streams_zip_of_ndjson_sections():
     user_id = str(uuid.uuid4())
     session = AsyncMock()
-    session.execute = AsyncMock(
-        side_effect=[
-            _result([]),  # transactions
-            _result([]),  # messages
-            _result([]),  # summaries
-            _result([]),  # life events
-            _result([]),  # tasks
-            _result([]),  # scheduled actions
-            _result([]),  # projects
-            _result([]),  # contacts
-            _result([]),  # bookings
-            _result([]),  # documents
-        ]
-    )
+
+    async def _stream_scalars(stmt):
+        entity = stmt.column_descriptions[0]["entity"]
+        if entity is Transaction:
+            return _Stream([[_tx(1), _tx(2)], [_tx(3)]])
+        if entity is ConversationMessage:
+            msg = SimpleNamespace(
+                role=SimpleNamespace(value="user"), content="привет", created_at=None
+            )
+            return _Stream([[msg]])
+        return _Stream([])
+
+    session.stream_scalars = AsyncMock(side_effect=_stream_scalars)
     session.scalar = AsyncMock(return_value=None)
 
     with (
@@ -39,36 +82,183 @@ async def test_export_user_data_includes_memory_registry():
             return_value=[{"id": "identity:name", "store": "identity", "text": "Alice"}],
         ),
     ):
-        payload = await MemoryGDPR().export_user_data(session, user_id)
+        chunks = [chunk async for chunk in MemoryGDPR().iter_export_zip(session, user_id)]
 
-    assert payload["memory_registry"] == [
+    assert len(chunks) > 2  # yielded incrementally, not as one blob
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    rows = [json.loads(line) for line in archive.read("transactions.ndjson").splitlines()]
+    assert [row["merchant"] for row in rows] == ["shop-1", "shop-2", "shop-3"]
+    assert json.loads(archive.read("conversation_logs.ndjson"))["content"] == "привет"
+    assert archive.read("tasks.ndjson") == b""
+    assert archive.read("summary_rollups.ndjson") == b""
+    assert json.loads(archive.read("memory_registry.json")) == [
         {"id": "identity:name", "store": "identity", "text": "Alice"}
     ]
+    assert json.loads(archive.read("manifest.json"))["user_id"] == user_id
+    for call in session.stream_scalars.await_args_list:
+        assert call.args[0].get_execution_options()["yield_per"] == 500
 
 
-async def test_delete_user_data_uses_unified_memory_registry_clear():
+async def test_delete_user_data_commits_in_batches_and_reports_progress(monkeypatch):
+    monkeypatch.setattr("src.core.gdpr.settings.gdpr_erasure_batch_size", 2)
     user_id = str(uuid.uuid4())
-    uid = uuid.UUID(user_id)
     session = AsyncMock()
-    session.execute = AsyncMock(side_effect=[_result([])] + [MagicMock()] * 12)
-    session.commit = AsyncMock()
+    # conversation_messages: 2 + 1 rows (two batches); every other table empty.
+    rowcounts = iter([2, 1])
+    session.execute = AsyncMock(
+        side_effect=lambda stmt: MagicMock(rowcount=next(rowcounts, 0))
+    )
+    progress = []
 
-    async def _empty_scan_iter(match):  # noqa: ARG001
-        if False:
-            yield None
+    async def _on_progress(step, name, rows):
+        progress.append((step, name, rows))
 
     with (
         patch("src.core.gdpr.clear_memory_registry", new_callable=AsyncMock) as mock_clear,
-        patch("src.core.gdpr.redis.scan_iter", side_effect=_empty_scan_iter),
-        patch("src.core.gdpr.redis.delete", new_callable=AsyncMock),
+        patch("src.core.gdpr.delete_user_keys", new_callable=AsyncMock, return_value=4),
     ):
-        deleted = await MemoryGDPR().delete_user_data(session, user_id)
+        mock_clear.return_value = {"mem0": 3, "identity": 1, "rule": 0, "summary": 0}
+        deleted = await MemoryGDPR().delete_user_data(
+            session, user_id, on_progress=_on_progress
+        )
 
-    assert deleted is True
-    session.execute.assert_awaited()
-    session.commit.assert_awaited_once()
+    assert deleted["conversation_messages"] == 3
+    assert deleted["memory_registry"] == 4
+    assert deleted["redis"] == 4
+    assert list(deleted) == [step.name for step in ERASURE_STEPS]
+    assert {"session_summaries", "summary_rollups"} <= set(deleted)
+    # 2 batches for messages + 1 per remaining table step, each committed.
+    table_steps = [s for s in ERASURE_STEPS if s.model is not None]
+    assert session.execute.await_count == len(table_steps) + 1
+    assert session.commit.await_count == len(table_steps) + 2  # + memory registry
+    assert progress[:3] == [
+        (0, "conversation_messages", 2),
+        (0, "conversation_messages", 1),
+        (1, "conversation_messages", 0),
+    ]
     mock_clear.assert_awaited_once_with(
-        str(uid),
+        user_id,
         session=session,
         include_stores={"mem0", "identity", "rule", "summary"},
     )
+
+
+async def test_start_user_erasure_queues_job_once():
+    user_id = str(uuid.uuid4())
+    pipe = _FakePipeline()
+    states = [{}, {"status": "queued", "step": "0", "requested_at": "x", "updated_at": "x"}]
+    with (
+        patch("src.core.gdpr.redis") as mock_redis,
+        patch("src.core.tasks.gdpr_tasks.erase_user_data_task.kiq", new_callable=AsyncMock) as kiq,
+    ):
+        mock_redis.hgetall = AsyncMock(side_effect=states)
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        status = await start_user_erasure(user_id)
+
+        mock_redis.hgetall = AsyncMock(return_value={"status": "running", "step": "3"})
+        again = await start_user_erasure(user_id)
+
+    assert status["status"] == "queued"
+    assert again["status"] == "running" and again["step"] == 3
+    kiq.assert_awaited_once_with(user_id)
+    assert ("sadd", ("gdpr:erasure:active", user_id), {}) in pipe.calls
+
+
+async def test_run_user_erasure_resumes_from_recorded_step():
+    user_id = str(uuid.uuid4())
+    state = {"status": "failed", "step": "5", "requested_at": "x", "updated_at": "x"}
+    with (
+        patch("src.core.gdpr.redis") as mock_redis,
+        patch("src.core.gdpr.async_session") as mock_session_factory,
+        patch.object(MemoryGDPR, "delete_user_data", new_callable=AsyncMock) as mock_delete,
+    ):
+        mock_session_factory.return_value.__aenter__ = AsyncMock(return_value="session")
+        mock_session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_redis.hgetall = AsyncMock(return_value=state)
+        mock_redis.hset = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=_FakePipeline())
+        await run_user_erasure(user_id)
+
+    assert mock_delete.await_args.kwargs["start_step"] == 5
+    running = mock_redis.hset.await_args_list[0].kwargs["mapping"]
+    assert running["status"] == "running"
+
+
+async def test_sender_is_held_off_until_erasure_is_done():
+    user_id = str(uuid.uuid4())
+    start_pipe = _FakePipeline()
+    with (
+        patch("src.core.gdpr.redis") as mock_redis,
+        patch("src.core.tasks.gdpr_tasks.erase_user_data_task.kiq", new_callable=AsyncMock),
+    ):
+        mock_redis.hgetall = AsyncMock(return_value={})
+        mock_redis.pipeline = MagicMock(return_value=start_pipe)
+        await start_user_erasure(user_id, channel="telegram", sender_id="42", chat_id="42")
+        mock_redis.exists = AsyncMock(return_value=1)
+        assert await erasure_pending("telegram", "42")
+
+    marker = ("set", ("gdpr:erasure:sender:telegram:42", user_id), {"ex": 30 * 86400})
+    assert marker in start_pipe.calls
+
+    state = {
+        "status": "queued",
+        "step": "0",
+        "channel": "telegram",
+        "sender_id": "42",
+        "chat_id": "42",
+        "requested_at": "x",
+        "updated_at": "x",
+    }
+    done_pipe = _FakePipeline()
+    with (
+        patch("src.core.gdpr.redis") as mock_redis,
+        patch("src.core.gdpr.async_session") as mock_session_factory,
+        patch.object(MemoryGDPR, "delete_user_data", new_callable=AsyncMock),
+        patch(
+            "src.core.notifications_pkg.dispatch.send_telegram_message", new_callable=AsyncMock
+        ) as send,
+    ):
+        mock_session_factory.return_value.__aenter__ = AsyncMock(return_value="session")
+        mock_session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_redis.hgetall = AsyncMock(return_value=state)
+        mock_redis.hset = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=done_pipe)
+        await run_user_erasure(user_id)
+
+    assert ("delete", ("gdpr:erasure:sender:telegram:42",), {}) in done_pipe.calls
+    assert send.await_args.args[0] == 42 and "/start" in send.await_args.args[1]
+
+
+async def test_erasure_status_exposes_per_step_counts():
+    with patch("src.core.gdpr.redis") as mock_redis:
+        mock_redis.hgetall = AsyncMock(
+            return_value={"status": "running", "step": "2", "deleted:transactions": "1500"}
+        )
+        status = await get_erasure_status("u1")
+
+    assert status["deleted"] == {"transactions": 1500}
+    assert status["total_steps"] == len(ERASURE_STEPS)
+
+
+async def test_user_key_registry_deletes_without_scanning():
+    user_id = "u1"
+    with patch("src.core.user_keys.redis") as mock_redis:
+        mock_redis.smembers = AsyncMock(return_value={"proc_rt:u1:finance"})
+        mock_redis.unlink = AsyncMock(return_value=3)
+        mock_redis.scan_iter = MagicMock(side_effect=AssertionError("no keyspace scan"))
+        keys = await list_user_keys(user_id)
+        deleted = await delete_user_keys(user_id)
+
+    assert "conv:u1:messages" in keys and "proc_rt:u1:finance" in keys
+    assert deleted == 3
+    unlinked = mock_redis.unlink.await_args.args
+    assert "user_keys:u1" in unlinked and "mem0_dlq_idem:u1" in unlinked
+
+
+async def test_legacy_procedural_keys_are_registered_as_templates():
+    with patch("src.core.user_keys.redis") as mock_redis:
+        mock_redis.smembers = AsyncMock(return_value=set())
+        keys = await list_user_keys("u1")
+
+    assert {"proc_rt:u1:finance", "proc_rt:u1:booking"} <= set(keys)
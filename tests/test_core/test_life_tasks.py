@@ -65,7 +65,7 @@ async def test_weekly_digest_sends_to_users_with_events():
         ),
         patch(_SEND, new_callable=AsyncMock) as mock_send,
         patch(
-            "src.core.tasks.life_tasks._generate_digest_analysis",
+            "src.core.llm.clients.generate_text",
             new_callable=AsyncMock,
             return_value="Some insight",
         ),
@@ -0,0 +1,171 @@
+"""Tests for the provider batch-API layer (src/core/llm/batch.py)."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.config import settings
+from src.core.llm import batch as batch_mod
+from src.core.llm.batch import AnthropicBatchProvider, BatchRequest, LLMBatch, set_batch_provider
+from src.core.llm.fake_batch import FakeBatchServer
+
+_GEN = "src.core.llm.clients.generate_text"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeBatchServer()
+    set_batch_provider("anthropic", fake)
+    monkeypatch.setattr(settings, "ff_llm_batch", True)
+    monkeypatch.setattr(settings, "llm_batch_min_requests", 2)
+    monkeypatch.setattr(settings, "llm_batch_poll_interval_s", 0.0)
+    monkeypatch.setattr(settings, "llm_batch_max_wait_s", 5.0)
+    monkeypatch.setattr(batch_mod, "_FIRST_POLL_S", 0.0)
+    yield fake
+    set_batch_provider("anthropic", None)
+
+
+def _batch(n: int, handler=None, *, model: str = "claude-haiku-4-5") -> LLMBatch:
+    batch = LLMBatch("test_job")
+    for i in range(n):
+        batch.add(f"user-{i}", model=model, system="sys", prompt=f"prompt {i}", on_result=handler)
+    return batch
+
+
+async def test_batch_path_answers_every_item_once(server):
+    server.polls_to_complete = 3
+    seen = []
+
+    async def handler(result):
+        seen.append((result.key, result.mode, result.text))
+
+    with patch(_GEN, new_callable=AsyncMock) as mock_live:
+        results = await _batch(4, handler).run()
+
+    mock_live.assert_not_awaited()
+    assert server.submitted == 4
+    assert sorted(seen) == [
+        (f"user-{i}", "batch", f"[claude-haiku-4-5] prompt {i}") for i in range(4)
+    ]
+    assert set(results) == {f"user-{i}" for i in range(4)}
+
+
+async def test_small_group_and_disabled_flag_go_live(server, monkeypatch):
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(1).run()
+    assert results["user-0"].mode == "live"
+    assert server.submitted == 0
+
+    monkeypatch.setattr(settings, "ff_llm_batch", False)
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(3).run()
+    assert mock_live.await_count == 3
+    assert {r.mode for r in results.values()} == {"live"}
+    assert server.submitted == 0
+
+
+async def test_submit_failure_falls_back_to_live(server):
+    server.fail_submit = True
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(3).run()
+
+    assert mock_live.await_count == 3
+    assert all(r.ok and r.mode == "live" for r in results.values())
+
+
+async def test_timeout_cancels_batch_and_goes_live(server, monkeypatch):
+    server.never_complete = True
+    monkeypatch.setattr(settings, "llm_batch_max_wait_s", 0.0)
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(2).run()
+
+    assert all(b.cancelled for b in server.batches.values())
+    assert mock_live.await_count == 2
+    assert {r.mode for r in results.values()} == {"live"}
+
+
+async def test_timeout_keeps_items_answered_before_cancel(server, monkeypatch):
+    server.never_complete = True
+    server.polls_to_cancel = 2
+    server.done_before_cancel = 2
+    monkeypatch.setattr(settings, "llm_batch_max_wait_s", 0.0)
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(3).run()
+
+    (batch,) = server.batches.values()
+    assert batch.cancelled and batch.cancel_polls == 3
+    mock_live.assert_awaited_once()
+    assert mock_live.call_args.args[2][-1]["content"] == "prompt 2"
+    assert results["user-0"].mode == results["user-1"].mode == "batch"
+    assert results["user-2"].mode == "live"
+
+
+async def test_wait_is_capped_at_minutes(server, monkeypatch):
+    server.never_complete = True
+    monkeypatch.setattr(settings, "llm_batch_max_wait_s", 4 * 3600.0)
+    monkeypatch.setattr(batch_mod, "MAX_BATCH_WAIT_S", 0.0)
+    with patch(_GEN, new_callable=AsyncMock, return_value="live"):
+        results = await _batch(2).run()
+
+    assert all(b.cancelled for b in server.batches.values())
+    assert {r.mode for r in results.values()} == {"live"}
+
+
+async def test_only_errored_items_are_retried_live(server):
+    server.error_on = ("prompt 1",)
+    with patch(_GEN, new_callable=AsyncMock, return_value="live") as mock_live:
+        results = await _batch(3).run()
+
+    mock_live.assert_awaited_once()
+    assert mock_live.call_args.args[2][-1]["content"] == "prompt 1"
+    assert results["user-1"].mode == "live"
+    assert results["user-0"].mode == results["user-2"].mode == "batch"
+
+
+async def test_live_error_and_handler_error_are_contained(server):
+    server.fail_submit = True
+    handler = AsyncMock(side_effect=RuntimeError("handler boom"))
+    with patch(_GEN, new_callable=AsyncMock, side_effect=RuntimeError("provider down")):
+        results = await _batch(2, handler).run()
+
+    assert handler.await_count == 2
+    assert all(not r.ok and r.error == "provider down" for r in results.values())
+
+
+async def test_anthropic_adapter_payload_and_results():
+    client = MagicMock()
+    client.messages.batches.create = AsyncMock(return_value=SimpleNamespace(id="msgbatch_1"))
+
+    async def _entries():
+        yield SimpleNamespace(
+            custom_id="r0",
+            result=SimpleNamespace(
+                type="succeeded",
+                message=SimpleNamespace(content=[SimpleNamespace(type="text", text="hello")]),
+            ),
+        )
+        yield SimpleNamespace(
+            custom_id="r1",
+            result=SimpleNamespace(
+                type="errored",
+                error=SimpleNamespace(error=SimpleNamespace(message="overloaded")),
+            ),
+        )
+
+    client.messages.batches.results = AsyncMock(return_value=_entries())
+    provider = AnthropicBatchProvider()
+    request = BatchRequest(
+        "r0", "claude-haiku-4-5", "be brief", [{"role": "user", "content": "hi"}], 50
+    )
+    with patch.object(provider, "_client", return_value=client):
+        batch_id = await provider.submit("job", "claude-haiku-4-5", [request])
+        results = await provider.results(batch_id)
+
+    payload = client.messages.batches.create.call_args.kwargs["requests"]
+    assert payload[0]["custom_id"] == "r0"
+    assert payload[0]["params"]["max_tokens"] == 50
+    assert payload[0]["params"]["messages"] == [{"role": "user", "content": "hi"}]
+    assert "system" in payload[0]["params"]
+    assert results["r0"].text == "hello"
+    assert results["r1"].error == "overloaded"
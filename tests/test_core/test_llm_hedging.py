@@ -0,0 +1,230 @@
+"""Tests for LLM request hedging (src/core/llm/hedging.py)."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.core.llm import hedging
+from src.core.llm.hedging import (
+    MIN_SAMPLES_FOR_PERCENTILE,
+    HedgeBudget,
+    LatencyHistogram,
+    LatencyTracker,
+    hedged_call,
+)
+from src.core.llm.router import TASK_MODEL_MAP, ModelConfig
+
+
+@pytest.fixture(autouse=True)
+def _reset_hedging_state():
+    hedging.latency_tracker.reset()
+    hedging._budgets.clear()
+    yield
+    hedging.latency_tracker.reset()
+    hedging._budgets.clear()
+
+
+def _delayed(value, delay: float, calls: list | None = None, name: str = ""):
+    async def _call():
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return _call
+
+
+def _warm(provider: str, model: str, latency_ms: float) -> None:
+    for _ in range(MIN_SAMPLES_FOR_PERCENTILE):
+        hedging.latency_tracker.record(provider, model, latency_ms)
+
+
+def test_histogram_percentile_nearest_rank():
+    hist = LatencyHistogram(window=100)
+    for v in range(1, 101):
+        hist.record(float(v))
+    assert hist.percentile(0.5) == 50.0
+    assert hist.percentile(0.9) == 90.0
+    assert hist.percentile(1.0) == 100.0
+
+
+def test_histogram_window_rolls_off_old_samples():
+    hist = LatencyHistogram(window=3)
+    for v in (1000.0, 10.0, 20.0, 30.0):
+        hist.record(v)
+    assert len(hist) == 3
+    assert hist.percentile(1.0) == 30.0
+
+
+def test_tracker_uses_default_delay_until_warm():
+    tracker = LatencyTracker()
+    config = ModelConfig(provider="google", model_id="m", hedge=True, hedge_delay_ms=700)
+    assert tracker.hedge_delay_ms(config) == 700
+    for _ in range(MIN_SAMPLES_FOR_PERCENTILE):
+        tracker.record("google", "m", 200.0)
+    assert tracker.hedge_delay_ms(config) == 200.0
+
+
+def test_tracker_clamps_delay():
+    tracker = LatencyTracker()
+    config = ModelConfig(provider="google", model_id="m", hedge=True)
+    for _ in range(MIN_SAMPLES_FOR_PERCENTILE):
+        tracker.record("google", "m", 1.0)
+    assert tracker.hedge_delay_ms(config) == hedging.MIN_HEDGE_DELAY_MS
+
+
+def test_budget_caps_hedge_ratio():
+    budget = HedgeBudget(ratio=0.1, burst=1.0)
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+    for _ in range(10):
+        budget.deposit()
+    assert budget.try_spend() is True
+    assert budget.hedges == 2
+    assert budget.denied == 1
+
+
+def test_latency_critical_tasks_are_hedged():
+    for task in ("intent_detection", "guardrails", "quick_answer"):
+        assert TASK_MODEL_MAP[task].hedge and TASK_MODEL_MAP[task].fallback_provider
+    assert not TASK_MODEL_MAP["analytics"].hedge
+    assert not TASK_MODEL_MAP["onboarding"].hedge
+
+
+async def test_fast_primary_never_starts_fallback():
+    calls: list[str] = []
+    result = await hedged_call(
+        "intent_detection",
+        _delayed("primary", 0, calls, "primary"),
+        _delayed("fallback", 0, calls, "fallback"),
+    )
+    assert result == "primary"
+    assert calls == ["primary"]
+
+
+async def test_slow_primary_is_hedged_and_fallback_wins():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+    calls: list[str] = []
+    result = await hedged_call(
+        "intent_detection",
+        _delayed("primary", 1.0, calls, "primary"),
+        _delayed("fallback", 0.01, calls, "fallback"),
+    )
+    assert result == "fallback"
+    assert calls == ["primary", "fallback"]
+    assert hedging.get_hedge_budget("intent_detection").hedges == 1
+
+
+async def test_hedge_loser_is_cancelled():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+    cancelled = asyncio.Event()
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    result = await hedged_call("intent_detection", slow_primary, _delayed("fb", 0.01))
+    assert result == "fb"
+    assert cancelled.is_set()
+
+
+async def test_hedge_loser_records_censored_latency():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+
+    await hedged_call("intent_detection", _delayed("primary", 5), _delayed("fb", 0.2))
+
+    hist = hedging.latency_tracker._histograms[("google", "gemini-3.1-flash-lite-preview")]
+    assert len(hist) == MIN_SAMPLES_FOR_PERCENTILE + 1
+    assert hist.percentile(1.0) >= 200.0  # ran at least until the fallback won
+
+
+async def test_primary_error_falls_back():
+    result = await hedged_call(
+        "intent_detection",
+        _delayed(RuntimeError("down"), 0),
+        _delayed("fallback", 0),
+    )
+    assert result == "fallback"
+
+
+async def test_primary_error_without_fallback_on_error_raises():
+    calls: list[str] = []
+    with pytest.raises(RuntimeError, match="down"):
+        await hedged_call(
+            "guardrails",
+            _delayed(RuntimeError("down"), 0),
+            _delayed("fallback", 0, calls, "fallback"),
+            fallback_on_error=False,
+        )
+    assert calls == []
+
+
+async def test_hedged_fallback_error_waits_for_primary():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+    result = await hedged_call(
+        "intent_detection",
+        _delayed("primary", 0.2),
+        _delayed(RuntimeError("fallback down"), 0),
+    )
+    assert result == "primary"
+
+
+async def test_both_fail_raises_primary_error():
+    with pytest.raises(RuntimeError, match="primary"):
+        await hedged_call(
+            "intent_detection",
+            _delayed(RuntimeError("primary"), 0),
+            _delayed(RuntimeError("fallback"), 0),
+        )
+
+
+async def test_exhausted_budget_waits_for_primary():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+    hedging._budgets["intent_detection"] = HedgeBudget(ratio=0.0, burst=0.0)
+    calls: list[str] = []
+    result = await hedged_call(
+        "intent_detection",
+        _delayed("primary", 0.1, calls, "primary"),
+        _delayed("fallback", 0, calls, "fallback"),
+    )
+    assert result == "primary"
+    assert calls == ["primary"]
+    assert hedging._budgets["intent_detection"].denied == 1
+
+
+async def test_non_hedged_task_does_not_hedge():
+    _warm("anthropic", "claude-sonnet-4-6", 50.0)
+    calls: list[str] = []
+    result = await hedged_call(
+        "analytics",
+        _delayed("primary", 0.1, calls, "primary"),
+        _delayed("fallback", 0, calls, "fallback"),
+    )
+    assert result == "primary"
+    assert calls == ["primary"]
+
+
+async def test_feature_flag_disables_hedging():
+    _warm("google", "gemini-3.1-flash-lite-preview", 50.0)
+    calls: list[str] = []
+    with patch("src.core.config.settings.ff_llm_hedging", False):
+        result = await hedged_call(
+            "intent_detection",
+            _delayed("primary", 0.1, calls, "primary"),
+            _delayed("fallback", 0, calls, "fallback"),
+        )
+    assert result == "primary"
+    assert calls == ["primary"]
+
+
+async def test_successful_calls_feed_latency_histogram():
+    await hedged_call("intent_detection", _delayed("ok", 0), _delayed("fb", 0))
+    snapshot = hedging.hedging_status()
+    assert snapshot["latency"]["google:gemini-3.1-flash-lite-preview"]["samples"] == 1
+    assert "intent_detection" in snapshot["budgets"]
@@ -39,23 +39,21 @@ from src.core.memory.context import (
 # ---------------------------------------------------------------------------
 class TestCountTokens:
     def test_empty_string(self):
-        assert count_tokens("") == 1  # len("") // 4 + 1
+        assert count_tokens("") == 0
 
     def test_short_english(self):
-        # "hello" = 5 chars -> 5 // 4 + 1 = 2
-        assert count_tokens("hello") == 2
+        assert 1 <= count_tokens("hello") <= 3
 
-    def test_longer_text(self):
-        text = "a" * 100  # 100 chars -> 100 // 4 + 1 = 26
-        assert count_tokens(text) == 26
+    def test_russian_text_not_undercounted(self):
+        # Cyrillic runs ~2-3 chars per token, far more than the old len // 4
+        text = "Потратил 450 рублей на кофе в кофейне у дома"
+        assert count_tokens(text) > len(text) // 4 + 1
 
-    def test_russian_text(self):
-        text = "Привет мир"  # each Cyrillic char is 2 bytes but len() counts chars
-        result = count_tokens(text)
-        assert result == len(text) // 4 + 1
+    def test_memoized_counts_are_stable(self):
+        text = "Бюджет на продукты 30000 рублей в месяц. " * 10
+        assert count_tokens(text) == count_tokens(text)
 
-    def test_always_positive(self):
-        assert count_tokens("") >= 1
+    def test_always_positive_for_text(self):
         assert count_tokens("a") >= 1
 
 
@@ -79,11 +77,11 @@ class TestTruncateToBudget:
         result = _truncate_to_budget("some text", 0)
         assert result.endswith("\n...[обрезано]")
 
-    def test_exact_boundary(self):
-        # 10 tokens * 4 chars = budget allows 36 chars ((10-1)*4 = 36)
-        text = "a" * 36
-        result = _truncate_to_budget(text, 10)
-        assert result == text  # fits exactly
+    def test_result_fits_budget(self):
+        text = "Потратил 450 на кофе, 1200 на продукты и 300 на такси. " * 20
+        result = _truncate_to_budget(text, 40)
+        assert count_tokens(result) <= 40
+        assert text.startswith(result.removesuffix("\n...[обрезано]"))
 
 
 # ---------------------------------------------------------------------------
@@ -140,7 +138,11 @@ class TestTrimMemories:
             },
         ]
 
-        result = _trim_memories(memories, 14)
+        # Room for the block header and exactly one memory line
+        budget = count_tokens("\n\n## Что я знаю о вас:\n") + count_tokens(
+            "- critical explicit fact\n"
+        )
+        result = _trim_memories(memories, budget)
 
         assert len(result) == 1
         assert result[0]["memory"] == "critical explicit fact"
@@ -872,6 +874,32 @@ class TestAssembleContext:
             intent_data={"period": "week"},
         )
 
+    @pytest.mark.asyncio
+    async def test_prompt_cache_layout_shared_user_volatile(self, mock_deps):
+        """Shared prompt, then per-user identity, then the per-request suffix."""
+        from src.core.llm.prompts import CACHE_BREAKPOINT
+
+        with patch(
+            "src.core.identity.get_core_identity",
+            new_callable=AsyncMock,
+            return_value={"name": "Alice"},
+        ):
+            result = await assemble_context(
+                user_id="user-1",
+                family_id="family-1",
+                current_message="hello",
+                intent="general_chat",
+                system_prompt="Shared agent prompt." + CACHE_BREAKPOINT + "Respond in en.",
+                volatile_prompt="Today is 2026-01-01.",
+            )
+
+        shared, user_segment, volatile = result.system_prompt.split(CACHE_BREAKPOINT)
+        assert shared == "Shared agent prompt."
+        assert "Alice" in user_segment
+        assert user_segment.index("Alice") < user_segment.index("Respond in en.")
+        assert volatile.startswith("Today is 2026-01-01.")
+        assert result.token_usage["volatile"] > 0
+
 
 class TestLoadSqlStats:
     @pytest.mark.asyncio
@@ -0,0 +1,159 @@
+"""Tests for the in-process metrics registry and stage timers."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.metrics import (
+    PROCESS_ID,
+    REGISTRY,
+    STAGE_ERRORS,
+    STAGE_SECONDS,
+    MetricsRegistry,
+    latency_report,
+    merge_snapshots,
+    publish_snapshot,
+    record_stage,
+    render_all,
+    render_prometheus,
+    request_scope,
+    stage_timer,
+    timed,
+)
+from src.core.request_context import reset_request_context, set_request_context
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def test_histogram_quantiles_are_within_bucket_resolution():
+    registry = MetricsRegistry()
+    hist = registry.histogram("t_seconds", "test", ("stage",))
+    for ms in range(1, 1001):
+        hist.observe(ms / 1000, "llm")
+
+    for q, expected in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+        assert hist.quantile(q, "llm") == pytest.approx(expected, rel=0.1)
+    assert hist.quantile(0.5, "other") == 0.0
+
+
+def test_label_arity_is_enforced():
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", "test", ("event",))
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        registry.histogram("c_total", "same name, other type")
+
+
+def test_prometheus_exposition_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs.", ("kind",)).inc('a"b', amount=3)
+    registry.gauge("pool_size", "Pool.").set(7)
+    hist = registry.histogram("lat_seconds", "Latency.", ("stage",))
+    hist.observe(0.004, "db")
+    hist.observe(0.5, "db")
+
+    text = render_prometheus(merge_snapshots([registry.snapshot()]))
+    lines = text.splitlines()
+
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="a\\"b"} 3' in lines
+    assert "pool_size 7" in lines
+    assert "# TYPE lat_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith("lat_seconds_bucket")]
+    assert buckets[-1] == 'lat_seconds_bucket{stage="db",le="+Inf"} 2'
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)  # cumulative
+    assert 'lat_seconds_count{stage="db"} 2' in lines
+    assert 'lat_seconds_sum{stage="db"} 0.504' in lines
+
+
+def test_snapshots_from_several_processes_are_summed():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs.").inc()
+    registry.histogram("lat_seconds", "Latency.").observe(0.01)
+    snap = json.loads(json.dumps(registry.snapshot()))  # as stored in Redis
+
+    merged = merge_snapshots([snap, snap, snap])
+    assert merged["jobs_total"]["series"][()] == 3
+    assert merged["lat_seconds"]["series"][()]["count"] == 3
+
+
+async def test_request_scope_labels_all_stages_with_final_intent():
+    with request_scope():
+        with stage_timer("guardrails"):
+            pass
+        record_stage("db", 0.002)
+        # The intent is only known after detection, mid-request.
+        token = set_request_context(
+            request_id="r1", correlation_id="c1", request_intent="add_expense"
+        )
+        async with stage_timer("skill"):
+            await asyncio.sleep(0)
+        assert STAGE_SECONDS.series == {}  # buffered until the request finishes
+    reset_request_context(token)
+
+    keys = set(STAGE_SECONDS.series)
+    assert keys == {
+        ("guardrails", "add_expense"),
+        ("db", "add_expense"),
+        ("skill", "add_expense"),
+        ("handle_message", "add_expense"),
+    }
+
+
+async def test_timed_decorator_records_errors():
+    @timed("llm")
+    async def boom():
+        raise RuntimeError("provider down")
+
+    @timed("llm")
+    async def ok():
+        return 42
+
+    assert await ok() == 42
+    with pytest.raises(RuntimeError):
+        await boom()
+
+    assert STAGE_SECONDS.series[("llm", "unknown")].count == 2
+    assert STAGE_ERRORS.value("llm", "unknown") == 1
+    assert latency_report()["llm"]["unknown"]["count"] == 2
+
+
+async def test_render_all_merges_peer_snapshots():
+    peer = MetricsRegistry()
+    peer.counter("finbot_release_events_total", "x", ("event",)).inc("requests_total", amount=5)
+    record_stage("redis", 0.001)
+
+    fake_redis = MagicMock()
+    fake_redis.zrangebyscore = AsyncMock(return_value=["worker-1:123"])
+    fake_redis.mget = AsyncMock(return_value=[json.dumps(peer.snapshot())])
+    fake_redis.scan_iter = MagicMock(side_effect=AssertionError("no keyspace scan"))
+    with patch("src.core.db.redis", fake_redis):
+        text = await render_all()
+
+    fake_redis.mget.assert_awaited_once_with(["metrics:snapshot:worker-1:123"])
+
+    assert 'finbot_release_events_total{event="requests_total"} 5' in text
+    assert 'finbot_stage_seconds_count{stage="redis",intent="unknown"} 1' in text
+
+
+async def test_publish_snapshot_indexes_the_process():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    fake_redis = MagicMock()
+    fake_redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    fake_redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch("src.core.db.redis", fake_redis):
+        await publish_snapshot(force=True)
+
+    assert pipe.set.call_args.args[0] == f"metrics:snapshot:{PROCESS_ID}"
+    assert PROCESS_ID in pipe.zadd.call_args.args[1]
+    pipe.zremrangebyscore.assert_called_once()
@@ -252,7 +252,7 @@ async def test_check_budgets_no_category():
 
 @pytest.mark.asyncio
 async def test_collect_alerts_combines():
-    """collect_alerts combines anomaly and budget alerts."""
+    """collect_alerts combines anomaly, budget and forecast alerts."""
     with (
         patch(
             "src.core.notifications.check_anomalies",
@@ -264,12 +264,17 @@ async def test_collect_alerts_combines():
             new_callable=AsyncMock,
             return_value=["budget1", "budget2"],
         ),
+        patch(
+            "src.core.notifications.check_forecast_shortfall",
+            new_callable=AsyncMock,
+            return_value=["shortfall1"],
+        ),
     ):
         from src.core.notifications import collect_alerts
 
         alerts = await collect_alerts(FAMILY_ID)
 
-    assert alerts == ["anomaly1", "budget1", "budget2"]
+    assert alerts == ["anomaly1", "budget1", "budget2", "shortfall1"]
 
 
 @pytest.mark.asyncio
@@ -25,13 +25,16 @@ from src.core.memory.observational import (
 # ---------------------------------------------------------------------------
 class TestEstimateTokens:
     def test_empty_string(self):
-        assert estimate_tokens("") == 1
+        assert estimate_tokens("") == 0
 
     def test_short_text(self):
-        assert estimate_tokens("hello") == 2  # 5 // 4 + 1
+        assert 1 <= estimate_tokens("hello") <= 3
 
-    def test_long_text(self):
-        assert estimate_tokens("a" * 100) == 26  # 100 // 4 + 1
+    def test_matches_context_tokenizer(self):
+        from src.core.llm.tokenizer import count_tokens
+
+        text = "Каждую пятницу заправляется на Лукойле примерно на 2000 рублей"
+        assert estimate_tokens(text) == count_tokens(text)
 
 
 class TestEstimateMessageTokens:
@@ -40,15 +43,17 @@ class TestEstimateMessageTokens:
 
     def test_single_message(self):
         msgs = [{"content": "a" * 100}]
-        assert estimate_message_tokens(msgs) == 26
+        assert estimate_message_tokens(msgs) == estimate_tokens("a" * 100)
 
     def test_multiple_messages(self):
         msgs = [{"content": "a" * 100}, {"content": "b" * 200}]
-        assert estimate_message_tokens(msgs) == 26 + 51  # 100//4+1 + 200//4+1
+        assert estimate_message_tokens(msgs) == estimate_tokens("a" * 100) + estimate_tokens(
+            "b" * 200
+        )
 
     def test_missing_content(self):
         msgs = [{"role": "user"}, {"content": "test"}]
-        assert estimate_message_tokens(msgs) == 1 + 2  # "" -> 1, "test" -> 2
+        assert estimate_message_tokens(msgs) == estimate_tokens("test")
 
 
 # ---------------------------------------------------------------------------
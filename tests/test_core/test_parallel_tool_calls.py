@@ -0,0 +1,143 @@
+"""Tests for concurrent tool execution within one LLM tool round."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.llm.clients import _execute_tool_round, generate_text_with_tools
+
+READS = frozenset({"query_data", "aggregate_data"})
+
+
+class _RecordingExecutor:
+    """Fake tool executor that records start/finish order and peak concurrency."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.events: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, name: str, args: dict) -> dict:
+        tag = args.get("tag", name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.events.append(f"start:{tag}")
+        await asyncio.sleep(args.get("delay", self.delay))
+        self.events.append(f"end:{tag}")
+        self.active -= 1
+        if args.get("fail"):
+            raise RuntimeError(f"{tag} failed")
+        return {"tag": tag}
+
+
+async def test_reads_run_concurrently_and_keep_call_order():
+    executor = _RecordingExecutor()
+    calls = [
+        ("aggregate_data", {"tag": "a", "delay": 0.06}),
+        ("aggregate_data", {"tag": "b", "delay": 0.01}),
+        ("query_data", {"tag": "c", "delay": 0.03}),
+    ]
+    entries = await _execute_tool_round(calls, executor, 0, READS, max_concurrency=4)
+
+    assert executor.peak == 3
+    assert [e["result"]["tag"] for e in entries] == ["a", "b", "c"]
+    assert all(e["parallel"] for e in entries)
+    assert all(e["round"] == 0 for e in entries)
+    assert entries[0]["duration_ms"] >= entries[1]["duration_ms"]
+
+
+async def test_concurrency_cap_is_respected():
+    executor = _RecordingExecutor(delay=0.01)
+    calls = [("query_data", {"tag": str(i)}) for i in range(6)]
+    await _execute_tool_round(calls, executor, 0, READS, max_concurrency=2)
+    assert executor.peak == 2
+
+
+async def test_writes_are_barriers_between_reads():
+    executor = _RecordingExecutor(delay=0.01)
+    calls = [
+        ("query_data", {"tag": "r1"}),
+        ("create_record", {"tag": "w1"}),
+        ("update_record", {"tag": "w2"}),
+        ("query_data", {"tag": "r2"}),
+        ("aggregate_data", {"tag": "r3"}),
+    ]
+    entries = await _execute_tool_round(calls, executor, 1, READS, max_concurrency=4)
+
+    events = executor.events
+    assert events.index("end:r1") < events.index("start:w1")
+    assert events.index("end:w1") < events.index("start:w2")
+    assert events.index("end:w2") < events.index("start:r2")
+    assert [e["parallel"] for e in entries] == [False, False, False, True, True]
+
+
+async def test_feature_flag_forces_sequential_execution():
+    executor = _RecordingExecutor(delay=0.01)
+    calls = [("query_data", {"tag": str(i)}) for i in range(3)]
+    with patch("src.core.config.settings.ff_parallel_tool_calls", False):
+        entries = await _execute_tool_round(calls, executor, 0, READS, max_concurrency=4)
+    assert executor.peak == 1
+    assert not any(e["parallel"] for e in entries)
+
+
+async def test_error_in_parallel_batch_propagates_after_batch_finishes():
+    executor = _RecordingExecutor(delay=0.01)
+    calls = [
+        ("query_data", {"tag": "bad", "fail": True}),
+        ("query_data", {"tag": "ok", "delay": 0.03}),
+    ]
+    with pytest.raises(RuntimeError, match="bad failed"):
+        await _execute_tool_round(calls, executor, 0, READS, max_concurrency=4)
+    assert "end:ok" in executor.events
+
+
+def _tool_use(block_id: str, name: str, tag: str) -> MagicMock:
+    block = MagicMock(type="tool_use", id=block_id, input={"tag": tag})
+    block.name = name
+    block.model_dump.return_value = {"type": "tool_use", "id": block_id, "name": name}
+    return block
+
+
+async def test_claude_round_reassembles_results_in_call_order():
+    executor = _RecordingExecutor()
+    first = SimpleNamespace(
+        content=[
+            _tool_use("t1", "aggregate_data", "slow"),
+            _tool_use("t2", "query_data", "fast"),
+        ],
+        usage=None,
+    )
+    executor_args = {"slow": 0.05, "fast": 0.0}
+
+    async def _executor(name: str, args: dict) -> dict:
+        return await executor(name, {**args, "delay": executor_args[args["tag"]]})
+
+    text_block = MagicMock(type="text", text="done")
+    second = SimpleNamespace(content=[text_block], usage=None)
+
+    with patch("src.core.llm.clients.anthropic_client") as mock_factory:
+        client = MagicMock()
+        client.messages.create = AsyncMock(side_effect=[first, second])
+        mock_factory.return_value = client
+
+        messages = [{"role": "user", "content": "compare"}]
+        text, log = await generate_text_with_tools(
+            model="claude-sonnet-4-6",
+            system="sys",
+            messages=messages,
+            tools=[],
+            tool_executor=_executor,
+            read_only_tools=READS,
+        )
+
+    assert text == "done"
+    assert executor.peak == 2
+    assert [entry["name"] for entry in log] == ["aggregate_data", "query_data"]
+    assert all("duration_ms" in entry for entry in log)
+    tool_results = messages[-1]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2"]
+    assert json.loads(tool_results[0]["content"]) == {"tag": "slow"}
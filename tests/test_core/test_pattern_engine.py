@@ -0,0 +1,134 @@
+"""Tests for the vectorized pattern engine (src/core/pattern_engine.py)."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.core.models.enums import LifeEventType
+from src.core.pattern_engine import (
+    EventColumns,
+    TxColumns,
+    family_findings,
+    recurring_payees,
+    user_findings,
+    zscore_anomalies,
+)
+
+_TODAY = date.today()
+_START = _TODAY - timedelta(days=89)
+
+
+def _tx(family: str, days_ago: int, amount: float, payee: str = "Shop", category: str = "Food"):
+    return SimpleNamespace(
+        family_id=family,
+        date=_TODAY - timedelta(days=days_ago),
+        amount=amount,
+        merchant=payee,
+        description="",
+        category=category,
+    )
+
+
+def _columns(rows) -> TxColumns:
+    return TxColumns.from_rows(rows, start=_START, days=90)
+
+
+def test_anomaly_is_flagged_against_its_own_family_and_category():
+    rows = [_tx("f1", d, 20 + d % 3) for d in range(8, 90)]
+    rows += [_tx("f2", d, 400 + d % 5) for d in range(8, 90)]  # big spender baseline
+    rows += [_tx("f1", 2, 400), _tx("f2", 2, 401), _tx("f1", 3, 22)]
+
+    hits = [(f, finding.data) for f, finding in zscore_anomalies(_columns(rows))]
+
+    assert len(hits) == 1
+    family, data = hits[0]
+    assert _columns(rows).families[family] == "f1"
+    assert data["amount"] == 400
+    assert data["z"] >= 3
+
+
+def test_recurring_payee_period_and_next_date():
+    rows = [_tx("f1", d, 9.99, payee="Netflix", category="Subs") for d in (3, 33, 63)]
+    rows += [_tx("f1", d, 15.0, payee="Gym", category="Sport") for d in (1, 8, 15, 22, 29)]
+    rows += [_tx("f1", d, 5.0 * (d % 4 + 1), payee="Kiosk") for d in (1, 2, 11, 40, 41, 70)]
+    rows += [_tx("f1", d, 50.0, payee="Old club") for d in (60, 67, 74, 81)]  # stopped
+
+    found = {f.data["payee"]: f for _, f in recurring_payees(_columns(rows))}
+
+    assert set(found) == {"Netflix", "Gym"}
+    assert found["Netflix"].data["period_days"] == 30
+    assert found["Netflix"].data["next_date"] == (_TODAY + timedelta(days=27)).isoformat()
+    assert "weekly" in found["Gym"].text
+
+
+def test_family_findings_trend_weekday_and_min_transactions():
+    rows = [
+        _tx("f1", d, 200 if (_TODAY - timedelta(days=d)).weekday() == 5 else 40)
+        for d in range(0, 90)
+    ]
+    rows += [_tx("f1", d, 30, category="Taxi") for d in range(0, 30, 3)]
+    rows += [_tx("f2", d, 10) for d in range(3)]
+
+    findings = family_findings(_columns(rows), min_transactions=5)
+
+    assert set(findings) == {"f1"}
+    kinds = [f.kind for f in findings["f1"]]
+    assert kinds.count("trend") == 2
+    taxi = next(f for f in findings["f1"] if f.data.get("category") == "Taxi")
+    assert "new this period" in taxi.text
+    weekday = next(f for f in findings["f1"] if f.kind == "weekday")
+    assert weekday.data["peak_day"] == "Saturday"
+
+
+def test_user_findings_use_each_users_family_spending():
+    rows = [_tx("f1", d, 300 if d < 3 else 50) for d in range(10)]
+    rows += [_tx("f2", d, 50 if d < 3 else 300) for d in range(10)]
+    tx = _columns(rows)
+    mood = [
+        SimpleNamespace(
+            user_id=user,
+            type=LifeEventType.mood,
+            date=_TODAY - timedelta(days=d),
+            data={"score": 1 if d < 3 else 5},
+        )
+        for user in ("u1", "u2", "u3")
+        for d in range(6)
+    ]
+    users = [("u1", "f1"), ("u2", "f2"), ("u3", "no-expenses")]
+
+    found = user_findings(tx, EventColumns.from_rows(mood, tx, users))
+
+    assert "low-mood" in found["u1"][0].text
+    assert found["u1"][0].data["r"] < 0
+    assert "good-mood" in found["u2"][0].text
+    assert "u3" not in found
+
+
+async def test_weekly_pattern_analysis_stores_findings_when_llm_fails():
+    from src.core.tasks.notification_tasks import weekly_pattern_analysis
+
+    rows = [_tx("f1", d, 9.99, payee="Netflix", category="Subs") for d in (3, 33, 63)]
+    rows += [_tx("f1", d, 20) for d in range(5)]
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=session)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+
+    with (
+        patch("src.core.tasks.notification_tasks.async_session", return_value=ctx),
+        patch(
+            "src.core.llm.clients.generate_text",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("down"),
+        ) as mock_llm,
+        patch("src.core.patterns.store_patterns", new_callable=AsyncMock) as mock_store,
+    ):
+        await weekly_pattern_analysis()
+
+    mock_llm.assert_awaited_once()
+    assert "[recurring] Netflix" in mock_llm.call_args.args[2][-1]["content"]
+    family_id, stored = mock_store.call_args.args
+    assert family_id == "f1"
+    assert any("Netflix" in p for p in stored["patterns"])
+    assert stored["recommendations"] == []
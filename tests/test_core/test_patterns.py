@@ -205,10 +205,10 @@ async def test_detect_patterns_llm_exception():
 
 @pytest.mark.asyncio
 async def test_detect_patterns_merchant_fallback():
-    """When merchant is None, description is used in the prompt text."""
+    """When merchant is None, description identifies the payee in the findings."""
     today = date.today()
     rows = [
-        _make_tx_row(today - timedelta(days=i), "Food", None, f"описание-{i}", 10.0)
+        _make_tx_row(today - timedelta(days=7 * i), "Subscriptions", None, "Netflix", 9.99)
         for i in range(6)
     ]
     ctx = _build_session_ctx(_rows_result(rows))
@@ -227,10 +227,10 @@ async def test_detect_patterns_merchant_fallback():
 
         result = await detect_patterns(FAMILY_ID)
 
-    # Verify the prompt was built with description (not None)
+    # Only the statistical findings are sent, with the description as payee
     call_args = client_mock.aio.models.generate_content.call_args
     prompt_sent = call_args.kwargs.get("contents") or call_args[1].get("contents")
-    assert "описание-0" in prompt_sent
+    assert "[recurring] Netflix: 10 weekly" in prompt_sent
     assert result == {"patterns": ["test"], "anomalies": [], "recommendations": []}
 
 
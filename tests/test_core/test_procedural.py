@@ -235,45 +235,45 @@ class TestExtractProcedures:
 
 
 # ---------------------------------------------------------------------------
-# _parse_procedures
+# parse_procedures
 # ---------------------------------------------------------------------------
 class TestParseProcedures:
     def test_parses_when_then_format(self):
-        from src.core.memory.procedural import _parse_procedures
+        from src.core.memory.procedural import parse_procedures
 
         text = (
             "- КОГДА пользователь добавляет Starbucks, ТОГДА категория = Кафе\n"
             "- КОГДА пользователь пишет клиенту, ТОГДА тон = деловой\n"
         )
-        result = _parse_procedures(text)
+        result = parse_procedures(text)
         assert len(result) == 2
 
     def test_skips_short_lines(self):
-        from src.core.memory.procedural import _parse_procedures
+        from src.core.memory.procedural import parse_procedures
 
         text = "short\nline\n- КОГДА условие длинное, ТОГДА выполни действие"
-        result = _parse_procedures(text)
+        result = parse_procedures(text)
         assert len(result) == 1
 
     def test_accepts_arrow_format(self):
-        from src.core.memory.procedural import _parse_procedures
+        from src.core.memory.procedural import parse_procedures
 
         text = "- Starbucks → категория Кафе (а не Еда)"
-        result = _parse_procedures(text)
+        result = parse_procedures(text)
         assert len(result) == 1
 
     def test_accepts_long_implicit_rules(self):
-        from src.core.memory.procedural import _parse_procedures
+        from src.core.memory.procedural import parse_procedures
 
         text = "- Пользователь предпочитает краткие ответы без эмодзи в деловой переписке"
-        result = _parse_procedures(text)
+        result = parse_procedures(text)
         assert len(result) == 1
 
     def test_empty_text(self):
-        from src.core.memory.procedural import _parse_procedures
+        from src.core.memory.procedural import parse_procedures
 
-        assert _parse_procedures("") == []
-        assert _parse_procedures("   \n  \n") == []
+        assert parse_procedures("") == []
+        assert parse_procedures("   \n  \n") == []
 
 
 # ---------------------------------------------------------------------------
@@ -504,9 +504,9 @@ class TestWeeklyCron:
         with (
             patch("src.core.db.async_session", return_value=mock_ctx),
             patch(
-                "src.core.memory.procedural.extract_procedures",
+                "src.core.llm.clients.generate_text",
                 new_callable=AsyncMock,
-                return_value=["КОГДА X, ТОГДА Y"],
+                return_value="- КОГДА X, ТОГДА Y",
             ) as mock_extract,
             patch(
                 "src.core.memory.procedural.save_procedures",
@@ -537,7 +537,7 @@ class TestWeeklyCron:
         with (
             patch("src.core.db.async_session", return_value=mock_ctx),
             patch(
-                "src.core.memory.procedural.extract_procedures",
+                "src.core.llm.clients.generate_text",
                 new_callable=AsyncMock,
             ) as mock_extract,
         ):
@@ -571,7 +571,7 @@ class TestWeeklyCron:
         with (
             patch("src.core.db.async_session", return_value=mock_ctx),
             patch(
-                "src.core.memory.procedural.extract_procedures",
+                "src.core.llm.clients.generate_text",
                 new_callable=AsyncMock,
             ) as mock_extract,
         ):
@@ -609,9 +609,9 @@ class TestWeeklyCron:
         with (
             patch("src.core.db.async_session", return_value=mock_ctx),
             patch(
-                "src.core.memory.procedural.extract_procedures",
+                "src.core.llm.clients.generate_text",
                 new_callable=AsyncMock,
-                return_value=["КОГДА X, ТОГДА Y"],
+                return_value="- КОГДА X, ТОГДА Y",
             ) as mock_extract,
             patch(
                 "src.core.memory.procedural.save_procedures",
@@ -622,5 +622,6 @@ class TestWeeklyCron:
 
         assert mock_extract.await_count == 1
         _, args, kwargs = mock_extract.mock_calls[0]
-        assert args[0] == "finance"
-        assert "Active topics: finance" in args[2]
+        prompt = args[2][-1]["content"]
+        assert "finance" in prompt
+        assert "Active topics: finance" in prompt
@@ -0,0 +1,113 @@
+"""Tests for prompt-cache-aware prompt layout and per-intent cache stats."""
+
+import pytest
+
+from src.core.llm.prompts import CACHE_BREAKPOINT, PromptAdapter, strip_cache_breakpoints
+from src.core.observability import (
+    LLMUsage,
+    get_prompt_cache_report,
+    record_prompt_cache_usage,
+    reset_prompt_cache_stats,
+)
+
+_MSGS = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    reset_prompt_cache_stats()
+    yield
+    reset_prompt_cache_stats()
+
+
+def test_claude_without_marker_caches_whole_prompt():
+    result = PromptAdapter.for_claude("static", _MSGS)
+    assert result["system"] == [
+        {"type": "text", "text": "static", "cache_control": {"type": "ephemeral", "ttl": "1h"}}
+    ]
+
+
+def test_claude_gets_breakpoint_per_cacheable_section():
+    system = "shared" + CACHE_BREAKPOINT + "user" + CACHE_BREAKPOINT + "volatile"
+    blocks = PromptAdapter.for_claude(system, _MSGS)["system"]
+    assert [b["text"] for b in blocks] == ["shared", "user", "volatile"]
+    assert "cache_control" in blocks[0]
+    assert "cache_control" in blocks[1]
+    assert "cache_control" not in blocks[2]
+
+
+def test_claude_skips_empty_sections_and_empty_suffix():
+    system = "shared" + CACHE_BREAKPOINT + "  " + CACHE_BREAKPOINT
+    blocks = PromptAdapter.for_claude(system, _MSGS)["system"]
+    assert [b["text"] for b in blocks] == ["shared"]
+
+
+def test_claude_folds_surplus_breakpoints():
+    system = CACHE_BREAKPOINT.join(["a", "b", "c", "d", "e", "tail"])
+    blocks = PromptAdapter.for_claude(system, _MSGS)["system"]
+    cached = [b for b in blocks if "cache_control" in b]
+    assert len(cached) == 3
+    assert cached[-1]["text"] == "c\nd\ne"
+    assert blocks[-1]["text"] == "tail"
+
+
+def test_claude_without_cache_strips_markers():
+    blocks = PromptAdapter.for_claude("a" + CACHE_BREAKPOINT + "b", _MSGS, cache=False)["system"]
+    assert blocks == [{"type": "text", "text": "a\nb"}]
+
+
+def test_openai_and_gemini_strip_markers():
+    system = "shared" + CACHE_BREAKPOINT + "volatile"
+    openai = PromptAdapter.for_openai(system, _MSGS, cache_key="finance")
+    assert openai["messages"][0]["content"] == "shared\nvolatile"
+    assert openai["prompt_cache_key"] == "finance"
+    assert "prompt_cache_key" not in PromptAdapter.for_openai(system, _MSGS)
+    responses = PromptAdapter.for_openai_responses(system, _MSGS, cache_key="finance")
+    assert responses["instructions"] == "shared\nvolatile"
+    assert PromptAdapter.for_gemini(system, _MSGS)["system_instruction"] == strip_cache_breakpoints(
+        system
+    )
+
+
+def test_cache_report_per_intent():
+    record_prompt_cache_usage(
+        "add_expense",
+        LLMUsage(
+            model="claude-haiku-4-5",
+            tokens_input=100,
+            cache_read_tokens=900,
+            duration_ms=400,
+        ),
+    )
+    record_prompt_cache_usage(
+        "add_expense",
+        LLMUsage(model="claude-haiku-4-5", tokens_input=100, cache_creation_tokens=900),
+    )
+    record_prompt_cache_usage(
+        "general_chat", LLMUsage(model="gpt-5.2", tokens_input=1000, cache_read_tokens=500)
+    )
+
+    report = get_prompt_cache_report()
+    expense = report["intents"]["add_expense"]
+    assert expense["calls"] == 2
+    assert expense["cache_hit_rate"] == 0.5
+    assert expense["prompt_tokens"] == 2000
+    assert expense["cached_token_ratio"] == 0.45
+    assert expense["avg_latency_hit_ms"] == 400
+    # OpenAI prompt_tokens already include cached tokens
+    assert report["intents"]["general_chat"]["cached_token_ratio"] == 0.5
+    assert report["overall"]["calls"] == 3
+    assert list(report["intents"]) == ["add_expense", "general_chat"]
+
+
+def test_cache_report_falls_back_to_request_intent():
+    from src.core.request_context import reset_request_context, set_request_context
+
+    token = set_request_context(
+        request_id="req-1", correlation_id="corr-1", request_intent="track_food"
+    )
+    try:
+        record_prompt_cache_usage(None, LLMUsage(model="gemini-3-flash", tokens_input=10))
+    finally:
+        reset_request_context(token)
+    assert get_prompt_cache_report()["intents"]["track_food"]["calls"] == 1
@@ -0,0 +1,116 @@
+"""Tests for the family aggregate query cache (src/core/query_cache.py)."""
+
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.query_cache import cached_aggregate, cached_query, query_cache_report
+
+FAMILY_ID = "11111111-1111-1111-1111-111111111111"
+
+
+class _Redis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    REGISTRY.reset()
+    redis = _Redis()
+    version = AsyncMock(return_value=7)
+    monkeypatch.setattr(settings, "ff_query_cache", True)
+    with (
+        patch("src.core.db.redis", redis),
+        patch("src.core.query_cache.data_version", version),
+    ):
+        yield redis, version
+    REGISTRY.reset()
+
+
+class _Stats:
+    def __init__(self):
+        self.calls = 0
+
+    @cached_query("test.totals")
+    async def totals(self, family_id, start, end, role="owner", user_id="", session=None):
+        self.calls += 1
+        return {"expense": 10.5 * self.calls, "start": str(start)}
+
+
+async def test_hit_after_miss_and_scope_in_key(cache):
+    redis, _ = cache
+    stats = _Stats()
+    start, end = date(2026, 1, 1), date(2026, 2, 1)
+
+    first = await stats.totals(FAMILY_ID, start, end, "owner", "u1", session=object())
+    again = await stats.totals(FAMILY_ID, start, end, "owner", "u1", session=object())
+    other_user = await stats.totals(FAMILY_ID, start, end, "member", "u2")
+    other_period = await stats.totals(FAMILY_ID, start, date(2026, 3, 1), "owner", "u1")
+
+    assert first == again == {"expense": 10.5, "start": "2026-01-01"}
+    assert other_user["expense"] == 21.0
+    assert other_period["expense"] == 31.5
+    assert stats.calls == 3
+    assert all(key.startswith(f"qcache:{FAMILY_ID}:") for key in redis.store)
+    assert any(":member:u2:test.totals:v7:" in key for key in redis.store)
+    report = query_cache_report()["test.totals"]
+    assert (report["hit"], report["miss"], report["bypass"]) == (1, 3, 0)
+    assert report["hit_rate"] == 0.25
+
+
+async def test_write_bumps_version_and_invalidates(cache):
+    _, version = cache
+    compute = AsyncMock(side_effect=[[1.0], [2.0]])
+
+    async def _get():
+        return await cached_aggregate("test.shape", compute, family_id=FAMILY_ID)
+
+    assert await _get() == [1.0]
+    assert await _get() == [1.0]
+    version.return_value = 8  # a transaction write fired the trigger
+    assert await _get() == [2.0]
+    assert compute.await_count == 2
+
+
+async def test_unavailable_version_or_disabled_flag_bypasses(cache, monkeypatch):
+    redis, version = cache
+    version.side_effect = ConnectionRefusedError("db down")
+    compute = AsyncMock(return_value={"n": 1})
+
+    assert await cached_aggregate("test.down", compute, family_id=FAMILY_ID) == {"n": 1}
+    assert redis.store == {}
+    assert query_cache_report()["test.down"]["bypass"] == 1
+
+    monkeypatch.setattr(settings, "ff_query_cache", False)
+    await cached_aggregate("test.off", compute, family_id=FAMILY_ID)
+    assert compute.await_count == 2
+    assert "test.off" not in query_cache_report()
+
+
+async def test_skill_helper_reads_entry_without_querying(cache):
+    from src.skills.financial_summary.handler import FinancialSummarySkill
+
+    start, end = date(2026, 1, 1), date(2026, 2, 1)
+    await cached_aggregate(
+        "financial_summary.income",
+        AsyncMock(return_value=123.45),
+        family_id=FAMILY_ID,
+        params={"start": start, "end": end},
+    )
+    with patch(
+        "src.skills.financial_summary.handler.rls_read_session",
+        side_effect=AssertionError("aggregate query should not run"),
+    ):
+        total = await FinancialSummarySkill._get_income_total(FAMILY_ID, start, end)
+
+    assert total == 123.45
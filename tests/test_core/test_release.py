@@ -1,8 +1,10 @@
-from unittest.mock import AsyncMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.core.context import SessionContext
 from src.core.release import (
     apply_release_override,
+    flush_release_events,
     get_effective_release_runtime_state,
     get_release_action_history,
     get_release_flag_snapshot,
@@ -59,17 +61,58 @@ def test_resolve_release_cohort_uses_sensitive_role_then_default(monkeypatch):
     assert resolve_release_cohort(None) == "new_user"
 
 
-async def test_record_release_event_updates_redis():
+class _FakePipeline:
+    def __init__(self):
+        self.calls = []
+        self.execute = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+
+async def test_record_release_event_batches_increments_into_one_pipeline(monkeypatch):
+    monkeypatch.setattr("src.core.release.settings.release_health_flush_interval_s", 3600)
+    monkeypatch.setattr("src.core.release._last_release_flush", time.monotonic())
+    monkeypatch.setattr("src.core.release._pending_release_events", {})
+    pipe = _FakePipeline()
     with patch("src.core.release.redis") as mock_redis:
-        mock_redis.hincrby = AsyncMock()
-        mock_redis.hset = AsyncMock()
-        mock_redis.expire = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.pipeline = MagicMock(return_value=pipe)
 
         await record_release_event("requests_total")
+        await record_release_event("requests_total")
+        await record_release_event("errors_total")
+        assert not pipe.calls  # buffered, no Redis round-trip per event
+
+        assert await flush_release_events() == 3
+
+    pipe.execute.assert_awaited_once()
+    names = [name for name, _, _ in pipe.calls]
+    assert names == ["hincrby", "hincrby", "hset", "expire"]
+    assert ("hincrby", ("release_health:default", "requests_total", 2), {}) in pipe.calls
+    assert await flush_release_events() == 0
+
+
+async def test_release_event_flush_failure_keeps_counts(monkeypatch):
+    monkeypatch.setattr("src.core.release.settings.release_health_flush_interval_s", 3600)
+    monkeypatch.setattr("src.core.release._last_release_flush", time.monotonic())
+    monkeypatch.setattr("src.core.release._pending_release_events", {})
+    pipe = _FakePipeline()
+    pipe.execute.side_effect = ConnectionError("redis down")
+    with patch("src.core.release.redis") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        await record_release_event("completed_total")
+        assert await flush_release_events() == 0
 
-    mock_redis.hincrby.assert_awaited_once()
-    mock_redis.hset.assert_awaited_once()
-    mock_redis.expire.assert_awaited_once()
+        pipe.execute.side_effect = None
+        assert await flush_release_events() == 1
 
 
 async def test_release_health_snapshot_rolls_back_when_thresholds_exceeded():
@@ -0,0 +1,121 @@
+"""Tests for read-replica routing (src/core/replica.py, db.read_session)."""
+
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core import replica
+
+
+@pytest.fixture(autouse=True)
+def _replica_state(monkeypatch):
+    monkeypatch.setattr(replica.settings, "database_replica_url", "postgresql://replica/db")
+    monkeypatch.setattr(replica.settings, "replica_max_lag_seconds", 5.0)
+    replica._local_writes.clear()
+    monkeypatch.setattr(replica, "_lag", None)
+    monkeypatch.setattr(replica, "_lag_checked_at", 0.0)
+    redis = MagicMock()
+    redis.mget = AsyncMock(return_value=[None, None])
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch("src.core.db.redis", redis):
+        yield redis
+    replica._local_writes.clear()
+
+
+def _fresh_lag(monkeypatch, lag):
+    monkeypatch.setattr(replica, "_lag", lag)
+    monkeypatch.setattr(replica, "_lag_checked_at", time.monotonic())
+
+
+async def test_no_replica_reads_from_primary():
+    assert await replica.route_read(None, "fam", "user") == "primary"
+
+
+async def test_healthy_replica_serves_reads(monkeypatch):
+    _fresh_lag(monkeypatch, 0.4)
+    assert await replica.route_read(object(), "fam", "user") == "replica"
+
+
+async def test_lagging_or_down_replica_falls_back_to_primary(monkeypatch):
+    _fresh_lag(monkeypatch, 12.0)
+    assert await replica.route_read(object(), "fam", "user") == "primary"
+
+    _fresh_lag(monkeypatch, None)
+    assert await replica.route_read(object(), "fam", "user") == "primary"
+
+
+async def test_lag_is_sampled_once_per_interval(monkeypatch):
+    result = MagicMock()
+    result.scalar.return_value = 1.5
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value=result)
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    assert await replica.replica_lag(engine) == 1.5
+    assert await replica.replica_lag(engine) == 1.5
+    conn.execute.assert_awaited_once()
+    assert replica.REPLICA_LAG.value() == 1.5
+
+
+async def test_committed_write_makes_reads_sticky_to_primary(monkeypatch):
+    _fresh_lag(monkeypatch, 0.0)
+    family_id = uuid.uuid4()
+    row = SimpleNamespace(family_id=family_id)
+    session = SimpleNamespace(info={}, new=[row], dirty=[], deleted=[])
+
+    replica._collect_written_scopes(session, None)
+    replica._mark_written_scopes(session)
+
+    assert await replica.route_read(object(), str(family_id), None) == "primary"
+    assert (
+        await replica.route_read(object(), str(family_id), None, read_your_writes=False)
+        == "replica"
+    )
+    assert await replica.route_read(object(), str(uuid.uuid4()), None) == "replica"
+
+
+async def test_write_seen_by_another_process_via_redis(monkeypatch, _replica_state):
+    _fresh_lag(monkeypatch, 0.0)
+    _replica_state.mget = AsyncMock(return_value=["1", None])
+
+    assert await replica.route_read(object(), "fam", "user") == "primary"
+    _replica_state.mget.assert_awaited_once_with(["db:wrote:family:fam", "db:wrote:user:user"])
+
+
+async def test_rolled_back_writes_are_not_sticky():
+    session = SimpleNamespace(info={}, new=[SimpleNamespace(family_id="fam")], dirty=[], deleted=[])
+
+    replica._collect_written_scopes(session, None)
+    replica._discard_written_scopes(session)
+    replica._mark_written_scopes(session)
+
+    assert not replica._local_writes
+
+
+async def test_rls_read_session_sets_rls_in_one_statement_on_the_replica():
+    from src.core import db
+
+    session = AsyncMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with (
+        patch.object(db, "replica_session", factory),
+        patch.object(db, "route_read", AsyncMock(return_value="replica")),
+    ):
+        async with db.rls_read_session("fam-1", "user-1") as s:
+            assert s is session
+
+    factory.assert_called_once()
+    sql, params = session.execute.await_args.args
+    assert str(sql).count("set_config") == 2
+    assert params == {"fid": "fam-1", "uid": "user-1"}
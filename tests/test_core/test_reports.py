@@ -169,7 +169,7 @@ async def test_generate_monthly_report_with_data():
     fake_pdf = b"%PDF-1.4 fake content"
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf) as mock_to_pdf,
     ):
         pdf_bytes, filename = await generate_monthly_report(family_id=family_id, year=2026, month=1)
@@ -199,7 +199,7 @@ async def test_generate_monthly_report_empty_data():
     fake_pdf = b"%PDF-1.4 empty"
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf) as mock_to_pdf,
     ):
         pdf_bytes, filename = await generate_monthly_report(family_id=family_id, year=2026, month=2)
@@ -228,7 +228,7 @@ async def test_generate_monthly_report_defaults_to_current_month():
     today = date.today()
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf),
     ):
         pdf_bytes, filename = await generate_monthly_report(family_id=family_id)
@@ -252,7 +252,7 @@ async def test_generate_monthly_report_december_boundary():
     fake_pdf = b"%PDF"
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf) as mock_to_pdf,
     ):
         pdf_bytes, filename = await generate_monthly_report(
@@ -288,7 +288,7 @@ async def test_generate_monthly_report_includes_life_events():
     fake_pdf = b"%PDF-life"
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf) as mock_to_pdf,
     ):
         pdf_bytes, filename = await generate_monthly_report(family_id=family_id, year=2026, month=1)
@@ -315,7 +315,7 @@ async def test_generate_monthly_report_filters_scope_and_private_life_events_for
     fake_pdf = b"%PDF-scope"
 
     with (
-        patch("src.core.reports.async_session", return_value=mock_session_ctx),
+        patch("src.core.reports.rls_read_session", return_value=mock_session_ctx),
         patch("src.core.reports.html_to_pdf", return_value=fake_pdf),
     ):
         pdf_bytes, _ = await generate_monthly_report(
@@ -67,7 +67,6 @@ async def test_domain_router_fallback_preserves_memory_intent():
         ),
         patch(f"{MODULE}.sliding_window.add_message", new_callable=AsyncMock),
         patch(f"{MODULE}._persist_message", new_callable=AsyncMock),
-        patch(f"{MODULE}.summarize_dialog", new_callable=AsyncMock),
         patch(f"{MODULE}.asyncio.create_task", return_value=None),
         patch(f"{MODULE}.settings.ff_post_gen_check", False),
     ):
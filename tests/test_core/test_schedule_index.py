@@ -0,0 +1,108 @@
+"""Tests for the timezone scheduling index used by local-time crons."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from src.core.notifications_pkg.dispatch import is_send_window
+from src.core.schedule_index import (
+    offset_buckets,
+    open_timezones,
+    timezone_filter,
+    timezones_in_window,
+)
+
+_ZONES = ["UTC", "Europe/Moscow", "America/New_York", "Asia/Kolkata", "Not/AZone", ""]
+
+
+def test_offset_buckets_follow_dst_and_map_unknown_zones_to_utc():
+    winter = offset_buckets(_ZONES, datetime(2026, 1, 15, 12, 0, tzinfo=UTC))
+    summer = offset_buckets(_ZONES, datetime(2026, 7, 15, 12, 0, tzinfo=UTC))
+
+    assert winter[0] == ["UTC", "Not/AZone", ""]
+    assert winter[-300] == ["America/New_York"]
+    assert summer[-240] == ["America/New_York"]
+    assert winter[330] == ["Asia/Kolkata"]
+    assert winter[180] == ["Europe/Moscow"]
+
+
+def test_open_timezones_matches_is_send_window_for_every_tick():
+    day = datetime(2026, 3, 8, tzinfo=UTC)  # US DST switch day
+    zones = ["UTC", "Europe/Moscow", "America/New_York", "Asia/Kolkata", "Australia/Adelaide"]
+    for minute in range(0, 24 * 60, 15):
+        now = day.replace(hour=minute // 60, minute=minute % 60)
+        expected = sorted(
+            zone for zone in zones if _send_window_at(zone, now, target_hour=8, target_minute=0)
+        )
+        assert open_timezones(zones, now, target_hour=8, target_minute=0) == expected, now
+
+
+def _send_window_at(zone: str, now: datetime, **window) -> bool:
+    with patch("src.core.notifications_pkg.dispatch.datetime") as mock_dt:
+        mock_dt.now.return_value = now
+        return is_send_window(zone, **window)
+
+
+async def test_timezones_in_window_reads_only_zone_catalog():
+    session = MagicMock()
+    session.scalars = AsyncMock(
+        return_value=MagicMock(all=MagicMock(return_value=["Europe/Moscow", "UTC"]))
+    )
+    # 05:00 UTC is 08:00 in Moscow, 05:00 in UTC.
+    zones, utc_open = await timezones_in_window(
+        session,
+        target_hour=8,
+        now=datetime(2026, 5, 1, 5, 0, tzinfo=UTC),
+    )
+
+    assert zones == ["Europe/Moscow"]
+    assert utc_open is False
+    session.scalars.assert_awaited_once()
+
+
+def test_timezone_filter_includes_profileless_users_only_when_utc_is_open():
+    def _sql(clause) -> str:
+        return str(
+            clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        )
+
+    assert _sql(timezone_filter(["Asia/Kolkata"], False)) == (
+        "user_profiles.timezone IN ('Asia/Kolkata')"
+    )
+    assert "user_profiles.id IS NULL" in _sql(timezone_filter(["UTC"], True))
+    assert _sql(timezone_filter([], False)) == "false"
+
+
+async def test_morning_reminder_loads_only_users_in_the_local_window():
+    from src.core.tasks.life_tasks import _MORNING_WINDOW, morning_plan_reminder
+
+    with patch(
+        "src.core.tasks.life_tasks._get_family_users",
+        new_callable=AsyncMock,
+        return_value=[],
+    ) as mock_users:
+        await morning_plan_reminder()
+
+    mock_users.assert_awaited_once_with(local_window=_MORNING_WINDOW)
+
+
+async def test_get_family_users_skips_query_when_no_zone_is_open():
+    from src.core.tasks.life_tasks import _get_family_users
+
+    session = MagicMock()
+    session.execute = AsyncMock()
+    with (
+        patch("src.core.tasks.life_tasks.async_session") as mock_factory,
+        patch(
+            "src.core.tasks.life_tasks.timezones_in_window",
+            new_callable=AsyncMock,
+            return_value=([], False),
+        ),
+    ):
+        mock_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        mock_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        users = await _get_family_users(local_window=(8, 0))
+
+    assert users == []
+    session.execute.assert_not_awaited()
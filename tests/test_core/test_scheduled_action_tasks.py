@@ -1,15 +1,19 @@
 """Tests for scheduled action dispatcher execution paths."""
 
+import asyncio
 import uuid
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.core.models.enums import ActionStatus, OutputMode, ScheduleKind
+from src.core.models.enums import ActionStatus, OutputMode, RunStatus, ScheduleKind
+from src.core.models.scheduled_action_run import ScheduledActionRun
 from src.core.tasks.scheduled_action_tasks import (
     RUN_RETENTION_DAYS,
+    WORKER_ID,
     _execute_action,
     cleanup_old_scheduled_action_runs,
+    dispatch_scheduled_actions,
 )
 
 
@@ -48,6 +52,9 @@ class _Session:
     async def flush(self) -> None:
         return None
 
+    async def commit(self) -> None:
+        return None
+
     async def scalar(self, statement):  # noqa: ANN001
         del statement
         return self.telegram_id
@@ -289,3 +296,81 @@ async def test_cleanup_old_runs_deletes_only_completed_actions():
 
 def test_run_retention_days_constant():
     assert RUN_RETENTION_DAYS == 90
+
+
+def _leasing_sessions(actions, run=None):
+    """A claim session returning *actions*, then one session per claimed action."""
+    claim = AsyncMock()
+    claim.execute = AsyncMock(
+        return_value=MagicMock(scalars=MagicMock(return_value=MagicMock(all=lambda: actions)))
+    )
+    by_id = {action.id: action for action in actions}
+    sessions = [claim]
+
+    def _factory():
+        session = claim
+        if claim.commit.await_count:  # claimed — each action gets its own session
+            session = AsyncMock()
+            session.get = AsyncMock(side_effect=lambda model, action_id: by_id[action_id])
+            session.scalar = AsyncMock(return_value=run)
+            sessions.append(session)
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=session)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        return ctx
+
+    return _factory, sessions
+
+
+async def test_dispatch_leases_actions_and_runs_them_concurrently_in_own_sessions():
+    now = datetime(2026, 3, 6, 8, 0, tzinfo=UTC)
+    actions = [_action(claimed_until=None, worker_id=None) for _ in range(5)]
+    factory, sessions = _leasing_sessions(actions)
+    running = peak = 0
+
+    async def _fake_execute(session, action, run_now):  # noqa: ANN001
+        nonlocal running, peak
+        assert action.worker_id == WORKER_ID and action.claimed_until > now
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with (
+        patch("src.core.tasks.scheduled_action_tasks.settings.ff_scheduled_actions", True),
+        patch("src.core.tasks.scheduled_action_tasks.settings.sia_dispatch_concurrency", 2),
+        patch("src.core.tasks.scheduled_action_tasks.now_utc", return_value=now),
+        patch("src.core.tasks.scheduled_action_tasks.async_session", new=factory),
+        patch("src.core.tasks.scheduled_action_tasks._execute_action", new=_fake_execute),
+    ):
+        await dispatch_scheduled_actions()
+
+    sessions[0].commit.assert_awaited_once()  # the claim commits before any action runs
+    assert len(sessions) == 6
+    assert peak == 2
+    for action, session in zip(actions, sessions[1:], strict=True):
+        assert action.claimed_until is None and action.worker_id is None
+        session.commit.assert_awaited_once()
+
+
+async def test_dispatch_fails_run_interrupted_by_expired_lease_without_resending():
+    now = datetime(2026, 3, 6, 8, 0, tzinfo=UTC)
+    action = _action(claimed_until=now, worker_id="crashed-worker:1")
+    run = ScheduledActionRun(status=RunStatus.running, started_at=now - timedelta(minutes=15))
+    factory, _ = _leasing_sessions([action], run=run)
+
+    with (
+        patch("src.core.tasks.scheduled_action_tasks.settings.ff_scheduled_actions", True),
+        patch("src.core.tasks.scheduled_action_tasks.now_utc", return_value=now),
+        patch("src.core.tasks.scheduled_action_tasks.async_session", new=factory),
+        patch(
+            "src.core.tasks.scheduled_action_tasks._execute_action", new_callable=AsyncMock
+        ) as mock_execute,
+    ):
+        await dispatch_scheduled_actions()
+
+    mock_execute.assert_not_awaited()
+    assert run.status == RunStatus.failed
+    assert run.error_code == "lease_expired"
+    assert action.failure_count == 1
+    assert action.worker_id is None
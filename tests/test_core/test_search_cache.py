@@ -0,0 +1,156 @@
+"""Tests for the shared search answer cache (src/core/research/search_cache.py)."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.research import search_cache
+from src.core.research.search_cache import (
+    cache_key,
+    cached_search,
+    classify_freshness,
+    is_personal,
+    search_cache_report,
+)
+
+
+class _Redis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    REGISTRY.reset()
+    monkeypatch.setattr(settings, "ff_search_cache", True)
+    fake = _Redis()
+    with patch("src.core.db.redis", fake):
+        yield fake
+    REGISTRY.reset()
+
+
+def test_freshness_tiers_and_personal_queries():
+    assert classify_freshness("Weather in Berlin") == "news"
+    assert classify_freshness("EUR to USD") == "news"
+    assert classify_freshness("курс доллара") == "news"
+    assert classify_freshness("best sushi near Times Square") == "places"
+    assert classify_freshness("sushi, Times Square", "places") == "places"
+    assert classify_freshness("Who wrote War and Peace?") == "evergreen"
+
+    assert is_personal("when is my dentist appointment")
+    assert is_personal("sushi", "call me at +1 (555) 123-4567")
+    assert not is_personal("weather in Berlin", "what's the weather in Berlin?")
+
+    key = cache_key("web", "Weather in  Berlin!", "en")
+    assert key == cache_key("web", "weather in berlin", "en")
+    assert key != cache_key("web", "weather in berlin", "de")
+    assert key != cache_key("places", "weather in berlin", "en", locale="Berlin")
+
+
+def test_symbols_stay_in_the_key_and_currencies_are_news():
+    assert cache_key("web", "$100 to eur", "en") != cache_key("web", "€100 to eur", "en")
+    assert cache_key("web", "c++ tutorial", "en") != cache_key("web", "c# tutorial", "en")
+    assert cache_key("web", "x > 5", "en") != cache_key("web", "x < 5", "en")
+
+    assert classify_freshness("$100 to eur") == "news"
+    assert classify_freshness("how much is 100usd") == "news"
+    assert classify_freshness("100 dollars in rubles") == "news"
+    assert classify_freshness("500 рублей в евро") == "news"
+    assert classify_freshness("c++ tutorial") == "evergreen"
+
+
+async def test_answer_shared_across_users(redis):
+    fetch = AsyncMock(return_value="Sunny, 21°C")
+
+    assert await cached_search("web", "Weather in Berlin", "en", fetch) == "Sunny, 21°C"
+    assert await cached_search("web", "weather in berlin?", "en", fetch) == "Sunny, 21°C"
+    fetch.assert_awaited_once()
+
+    (entry,) = redis.store.values()
+    assert json.loads(entry)["tier"] == "news"
+    assert search_cache_report()["web"] == {
+        "fresh": 1,
+        "stale": 0,
+        "miss": 1,
+        "bypass": 0,
+        "hit_rate": 0.5,
+    }
+
+
+async def test_answers_shaped_by_different_messages_are_not_shared(redis):
+    """Same search query, different original messages → separate answers."""
+    fetch_a = AsyncMock(return_value="Flights to Rome under 300 EUR for Anna and Marco")
+    fetch_b = AsyncMock(return_value="Flights to Rome in business class")
+
+    answer_a = await cached_search(
+        "web",
+        "flights to Rome",
+        "en",
+        fetch_a,
+        original_message="find flights to Rome under 300 EUR for Anna and Marco",
+    )
+    answer_b = await cached_search(
+        "web",
+        "flights to Rome",
+        "en",
+        fetch_b,
+        original_message="flights to Rome, business class only",
+    )
+
+    assert answer_a != answer_b
+    fetch_a.assert_awaited_once()
+    fetch_b.assert_awaited_once()
+    # The same message (or a bare query) still hits the shared entry
+    assert (
+        await cached_search(
+            "web",
+            "flights to rome",
+            "en",
+            fetch_b,
+            original_message="Flights to Rome — business class only!",
+        )
+        == answer_b
+    )
+    assert cache_key("web", "eclipse", "en", message="Eclipse?") == cache_key(
+        "web", "eclipse", "en"
+    )
+
+
+async def test_personal_and_error_answers_are_not_cached(redis):
+    fetch = AsyncMock(return_value="Your balance is 10")
+    await cached_search("web", "my balance", "en", fetch)
+    assert not redis.store
+
+    fetch = AsyncMock(return_value="Couldn't complete the search.")
+    await cached_search("web", "eclipse", "en", fetch, cacheable=lambda a: "Couldn't" not in a)
+    assert not redis.store
+    assert search_cache_report()["web"]["bypass"] == 1
+
+
+async def test_stale_answer_served_while_refreshing(redis):
+    key = cache_key("web", "weather in berlin", "en")
+    stale_at = time.time() - search_cache.FRESHNESS_TIERS["news"] - 1
+    redis.store[key] = json.dumps({"answer": "Rain", "fetched_at": stale_at, "tier": "news"})
+    fetch = AsyncMock(return_value="Sunny")
+
+    assert await cached_search("web", "weather in Berlin", "en", fetch) == "Rain"
+    assert await cached_search("web", "weather in Berlin", "en", fetch) == "Rain"
+    await asyncio.gather(*search_cache._background)
+
+    fetch.assert_awaited_once()  # one refresh despite two stale reads
+    assert json.loads(redis.store[key])["answer"] == "Sunny"
+    assert await cached_search("web", "weather in Berlin", "en", fetch) == "Sunny"
@@ -0,0 +1,148 @@
+"""Tests for incremental Google Sheets sync (src/core/sheets_sync.py)."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core import sheets_sync, timers
+from src.core.config import settings
+from src.core.models.transaction import Transaction
+from src.core.sheets_sync import plan_delta, plan_rebuild, row_hash, sync_config
+
+_T0 = datetime(2026, 3, 16, 9, 0, tzinfo=UTC)
+_HEADER = ["Date", "Merchant", "Category", "Amount", "Description"]
+
+
+def _record(i, minutes=0, amount="10.00"):
+    return (f"id{i}", _T0 + timedelta(minutes=minutes), ["2026-03-16", f"shop{i}", "", amount, ""])
+
+
+def _synced(*records):
+    plan = plan_rebuild({}, list(records), _HEADER, "2026-03")
+    return plan.state
+
+
+def test_delta_appends_new_rows_and_rewrites_edited_ones():
+    state = _synced(_record(1), _record(2), _record(3))
+
+    changed = [_record(2, 1), _record(3, 2, amount="99.00"), _record(4, 3), _record(5, 4)]
+    plan = plan_delta(state, changed, count=5)
+
+    assert plan.appends == [changed[2][2], changed[3][2]]
+    assert plan.append_at == 5  # header + 3 synced rows
+    assert plan.updates == {4: changed[1][2]}  # id2 unchanged (overlap), id3 edited
+    assert plan.state["rows"]["id5"] == [6, row_hash(changed[3][2])]
+    assert plan.state["next_row"] == 7
+    assert plan.state["cursor"] == (_T0 + timedelta(minutes=4)).isoformat()
+    assert sheets_sync._runs({4: ["a"], 5: ["b"], 9: ["c"]}) == [(4, [["a"], ["b"]]), (9, [["c"]])]
+
+    unchanged = plan_delta(plan.state, [_record(5, 4)], count=5)
+    assert not unchanged.has_writes
+    assert unchanged.state == plan.state
+
+
+def test_deleted_rows_force_a_rebuild_that_blanks_leftovers():
+    state = _synced(_record(1), _record(2), _record(3))
+    assert plan_delta(state, [], count=2) is None  # a record was deleted
+    assert plan_delta(state, [_record(4)], count=3) is None  # deleted one, added one
+
+    plan = plan_rebuild(state, [_record(1), _record(3)], _HEADER, "2026-03")
+    assert plan.rebuild and plan.append_at == 1
+    assert plan.appends[0] == _HEADER
+    assert plan.clear_rows == 1
+    assert plan.state["rows"]["id3"][0] == 3
+
+
+def _config(**kwargs):
+    defaults = {
+        "id": uuid.uuid4(),
+        "family_id": uuid.uuid4(),
+        "user_id": None,
+        "spreadsheet_id": "sheet-1",
+        "sheet_name": "Expenses",
+        "sync_scope": "expenses",
+        "sync_state": None,
+    }
+    return SimpleNamespace(**{**defaults, **kwargs})
+
+
+@pytest.fixture
+def db():
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=MagicMock())
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    with (
+        patch.object(sheets_sync, "async_session", return_value=ctx),
+        patch.object(sheets_sync, "_count", AsyncMock()) as count,
+        patch.object(sheets_sync, "_load", AsyncMock()) as load,
+        patch.object(sheets_sync, "_save", AsyncMock()) as save,
+    ):
+        yield SimpleNamespace(count=count, load=load, save=save)
+
+
+async def test_sync_config_writes_only_the_delta(db):
+    user_id = uuid.uuid4()
+    config = _config(
+        user_id=user_id,
+        sync_state={
+            **_synced(_record(1), _record(2)),
+            "window": datetime.now(UTC).strftime("%Y-%m"),
+        },
+    )
+    db.count.return_value = 3
+    db.load.return_value = [_record(2, 1, amount="12.00"), _record(3, 2)]
+    client = MagicMock(write_values=AsyncMock())
+
+    with patch.object(sheets_sync, "_resolve_client", AsyncMock(return_value=(client, user_id))):
+        assert await sync_config(config) == "delta"
+
+    writes = [call.args[1:] for call in client.write_values.await_args_list]
+    assert writes == [
+        ("Expenses!A4", [_record(3)[2]]),
+        ("Expenses!A3", [_record(2, amount="12.00")[2]]),
+    ]
+    assert (
+        db.load.await_args.args[3]
+        == datetime.fromisoformat(config.sync_state["cursor"]) - sheets_sync.CURSOR_OVERLAP
+    )
+    assert db.save.await_args.kwargs["state"]["next_row"] == 5
+
+
+async def test_failed_write_drops_state_for_a_rebuild(db):
+    config = _config()
+    db.count.return_value = 1
+    db.load.return_value = [_record(1)]
+    client = MagicMock(write_values=AsyncMock(side_effect=RuntimeError("quota")))
+
+    with (
+        patch.object(sheets_sync, "_resolve_client", AsyncMock(return_value=(client, "u1"))),
+        pytest.raises(RuntimeError),
+    ):
+        await sync_config(config)
+    assert db.save.await_args.kwargs == {"state": None}
+
+    assert await sheets_sync.sync_configs([config]) == {"failed": 1}
+
+
+async def test_writes_push_one_debounced_sheets_timer(monkeypatch):
+    monkeypatch.setattr(settings, "ff_sheets_push", True)
+    family_id = uuid.uuid4()
+    txns = [Transaction(id=uuid.uuid4(), family_id=family_id) for _ in range(3)]
+    session = SimpleNamespace(new=txns[:2], dirty=[], deleted=txns[2:], info={})
+
+    timers._collect_timer_entries(session, None)
+    (entry,) = session.info[timers._SESSION_KEY].values()
+    assert entry[:2] == ("sheets", str(family_id))
+
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    pipe.execute = AsyncMock()
+    with patch("src.core.db.redis", MagicMock(pipeline=MagicMock(return_value=pipe))):
+        await timers.schedule_timers([entry])
+    pipe.zadd.assert_called_once_with(
+        timers.TIMER_KEY, {f"sheets:{family_id}": entry[2].timestamp()}, nx=True
+    )
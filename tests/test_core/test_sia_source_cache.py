@@ -0,0 +1,116 @@
+"""Tests for shared SIA source fetches (src/core/scheduled_actions/source_cache.py)."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY
+from src.core.scheduled_actions.source_cache import (
+    clear_local_cache,
+    fetch_key,
+    normalize_topic,
+    shared_fetch,
+    source_cache_report,
+)
+
+
+class _Redis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    REGISTRY.reset()
+    clear_local_cache()
+    monkeypatch.setattr(settings, "ff_sia_source_cache", True)
+    fake = _Redis()
+    with patch("src.core.db.redis", fake):
+        yield fake
+    clear_local_cache()
+    REGISTRY.reset()
+
+
+def test_topic_normalization_and_key():
+    assert normalize_topic("  Bitcoin   PRICE! ") == "bitcoin price"
+    now = 1_800_000_000
+    ttl = settings.sia_source_cache_ttl_seconds
+    key = fetch_key("news", "Bitcoin price", "en", now)
+    assert key == fetch_key("news", "bitcoin, price", "en", now)
+    assert key != fetch_key("news", "bitcoin price", "ru", now)
+    assert key != fetch_key("news", "bitcoin price", "en", now + ttl)
+
+
+def test_event_check_keys_keep_operators_and_symbols():
+    now = 1_700_000_000.0
+    assert fetch_key("event_check", "BTC > 100k", "en", now) != fetch_key(
+        "event_check", "BTC < 100k", "en", now
+    )
+    assert fetch_key("event_check", "gold above $2000", "en", now) != fetch_key(
+        "event_check", "gold above €2000", "en", now
+    )
+    assert fetch_key("event_check", "BTC  >  100K", "en", now) == fetch_key(
+        "event_check", "btc > 100k", "en", now
+    )
+    # News topics stay loosely normalized
+    assert fetch_key("news", "BTC > 100k", "en", now) == fetch_key("news", "btc 100k", "en", now)
+
+
+async def test_concurrent_callers_share_one_fetch(redis):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "BTC at 100k", "success"
+
+    results = await asyncio.gather(
+        *(shared_fetch("news", topic, "en", fetch) for topic in ["Bitcoin", "bitcoin", "BITCOIN."])
+    )
+    assert results == [("BTC at 100k", "success")] * 3
+    assert await shared_fetch("news", "bitcoin", "en", fetch) == ("BTC at 100k", "success")
+    assert calls == 1
+
+    report = source_cache_report()
+    assert report["news"]["miss"] == 1
+    assert report["news"]["coalesced"] == 2
+    assert report["news"]["local"] == 1
+    assert report["news"]["saved_fetches"] == 3
+    assert report["news"]["hit_rate"] == 0.75
+
+
+async def test_other_worker_result_is_reused_from_redis(redis):
+    async def fetch():
+        return "Event happened", "triggered"
+
+    await shared_fetch("event_check", "Fed cuts rates", "en", fetch)
+    clear_local_cache()  # as if another process asked
+
+    async def not_called():
+        raise AssertionError("fetched twice")
+
+    assert await shared_fetch("event_check", "fed cuts rates", "en", not_called) == (
+        "Event happened",
+        "triggered",
+    )
+    assert source_cache_report()["event_check"]["hit"] == 1
+
+
+async def test_failed_fetches_are_not_cached(redis):
+    results = iter([("", "failed"), ("Recovered", "success")])
+
+    async def fetch():
+        return next(results)
+
+    assert await shared_fetch("news", "oil", "en", fetch) == ("", "failed")
+    assert await shared_fetch("news", "oil", "en", fetch) == ("Recovered", "success")
+    assert len(redis.store) == 1
@@ -0,0 +1,88 @@
+"""Tests for the single-pass stats engine (src/core/stats_engine.py)."""
+
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.models.enums import TransactionType
+from src.core.stats_engine import (
+    TotalsRow,
+    category_breakdown,
+    grouped_totals,
+    month_starts,
+    monthly_series,
+)
+
+FOOD, FUEL = uuid.uuid4(), uuid.uuid4()
+
+
+def test_month_starts_crosses_year_boundary():
+    assert month_starts(date(2026, 2, 15), 4) == [
+        date(2025, 11, 1),
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+    ]
+
+
+def test_category_breakdown_merges_buckets_and_sorts():
+    rows = [
+        TotalsRow(date(2026, 1, 1), TransactionType.expense, FOOD, "Food", None, 30.0),
+        TotalsRow(date(2026, 2, 1), TransactionType.expense, FOOD, "Food", None, 30.0),
+        TotalsRow(date(2026, 2, 1), TransactionType.expense, FUEL, "Fuel", None, 40.0),
+        TotalsRow(date(2026, 2, 1), TransactionType.income, FOOD, "Food", None, 999.0),
+    ]
+    total, categories = category_breakdown(rows, TransactionType.expense)
+    assert total == 100.0
+    assert [(c["name"], c["total"], c["percent"]) for c in categories] == [
+        ("Food", 60.0, 60.0),
+        ("Fuel", 40.0, 40.0),
+    ]
+
+
+def test_monthly_series_zero_fills_and_ignores_out_of_range():
+    months = month_starts(date(2026, 3, 10), 3)
+    rows = [
+        TotalsRow(date(2026, 3, 1), TransactionType.income, FOOD, "Pay", None, 10.0),
+        TotalsRow(date(2025, 1, 1), TransactionType.expense, FOOD, "Old", None, 5.0),
+    ]
+    assert monthly_series(rows, months) == [
+        {"month": "Jan 2026", "expense": 0.0, "income": 0.0},
+        {"month": "Feb 2026", "expense": 0.0, "income": 0.0},
+        {"month": "Mar 2026", "expense": 0.0, "income": 10.0},
+    ]
+
+
+async def test_grouped_totals_single_query_with_bucket():
+    session = MagicMock()
+    result = MagicMock()
+    result.all.return_value = [
+        (date(2026, 2, 1), TransactionType.expense, FOOD, "Food", "🍔", 12),
+    ]
+    session.execute = AsyncMock(return_value=result)
+
+    rows = await grouped_totals(
+        session,
+        family_id=uuid.uuid4(),
+        role="owner",
+        user_id=str(uuid.uuid4()),
+        start=date(2025, 9, 1),
+        bucket="month",
+    )
+
+    session.execute.assert_awaited_once()
+    sql = str(session.execute.call_args.args[0])
+    assert "CAST(date_trunc(" in sql and "AS DATE)" in sql and "GROUP BY" in sql
+    assert rows == [
+        TotalsRow(date(2026, 2, 1), TransactionType.expense, FOOD, "Food", "🍔", 12.0)
+    ]
+
+
+async def test_grouped_totals_rejects_unknown_bucket():
+    with pytest.raises(ValueError):
+        await grouped_totals(
+            MagicMock(), family_id="f", role="owner", user_id="u", start=date.today(),
+            bucket="fortnight",
+        )
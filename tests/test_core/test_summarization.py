@@ -13,25 +13,103 @@ from src.core.models.enums import MessageRole
 # ---------------------------------------------------------------------------
 
 
-def _make_message(role: MessageRole, content: str) -> MagicMock:
+def _make_message(role: MessageRole, content: str, msg_id: int = 0) -> MagicMock:
     """Create a mock ConversationMessage."""
     msg = MagicMock()
+    msg.id = msg_id
     msg.role = role
     msg.content = content
     msg.created_at = datetime.now(UTC)
     return msg
 
 
-def _make_summary(summary_text: str, message_count: int) -> MagicMock:
+def _make_summary(
+    summary_text: str, message_count: int, last_message_id: int | None = None
+) -> MagicMock:
     """Create a mock SessionSummary."""
     s = MagicMock()
     s.summary = summary_text
     s.message_count = message_count
+    s.last_message_id = last_message_id
     s.token_count = len(summary_text.split())
     s.updated_at = datetime.now(UTC)
+    s.episode_metadata = {}
     return s
 
 
+def _dialog(count: int, first_id: int = 1, content: str = "Потратил 500 на кофе") -> list:
+    roles = (MessageRole.user, MessageRole.assistant)
+    return [_make_message(roles[i % 2], content, first_id + i) for i in range(count)]
+
+
+class _Redis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+@pytest.fixture
+def redis():
+    fake = _Redis()
+    with patch("src.core.db.redis", fake):
+        yield fake
+
+
+def _db(session_id, existing, *pages):
+    """Mock DB: user context, then the summary row, then pages of pending messages."""
+    results = []
+    ctx_result = MagicMock()
+    ctx_result.scalar_one_or_none.return_value = _make_user_context(session_id)
+    results.append(ctx_result)
+    summary_result = MagicMock()
+    summary_result.scalar_one_or_none.return_value = existing
+    results.append(summary_result)
+    for page in pages:
+        page_result = MagicMock()
+        page_result.scalars.return_value.all.return_value = page
+        results.append(page_result)
+
+    mock_session = AsyncMock()
+    mock_session.execute = AsyncMock(side_effect=results)
+    mock_session.add = MagicMock()
+    mock_session.commit = AsyncMock()
+    mock_session_ctx = AsyncMock()
+    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
+    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
+    return mock_session, mock_session_ctx
+
+
+def _gemini(*texts, error=None):
+    client = MagicMock()
+    if error:
+        client.aio.models.generate_content = AsyncMock(side_effect=error)
+    else:
+        client.aio.models.generate_content = AsyncMock(
+            side_effect=[MagicMock(text=t) for t in texts]
+        )
+    return client
+
+
+def _patches(session_ctx, gemini):
+    return (
+        patch("src.core.memory.summarization.async_session", return_value=session_ctx),
+        patch("src.core.memory.summarization.google_client", return_value=gemini),
+        patch(
+            "src.core.memory.episodic.extract_episode_metadata",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+    )
+
+
 def _make_user_context(session_id: uuid.UUID, message_count: int = 0) -> MagicMock:
     ctx = MagicMock()
     ctx.session_id = session_id
@@ -46,202 +124,210 @@ def _make_user_context(session_id: uuid.UUID, message_count: int = 0) -> MagicMo
 
 
 @pytest.mark.asyncio
-async def test_summarize_below_threshold_returns_none():
-    """When message_count < 15, summarize_dialog should return None."""
-    user_id = str(uuid.uuid4())
-    family_id = str(uuid.uuid4())
+async def test_summarize_below_threshold_returns_none(redis):
+    """With fewer than SUMMARY_THRESHOLD new messages, no summary is written."""
     session_id = uuid.uuid4()
+    mock_session, session_ctx = _db(session_id, None, _dialog(10))
+    gemini = _gemini()
 
-    # Mock the DB session
-    mock_session = AsyncMock()
-    mock_ctx_result = MagicMock()
-    mock_ctx_result.scalar_one_or_none.return_value = _make_user_context(session_id)
-
-    # count query returns 10 (below threshold of 15)
-    mock_count_result = MagicMock()
-    mock_count_result.scalar.return_value = 10
-    mock_session.execute = AsyncMock(side_effect=[mock_ctx_result, mock_count_result])
-    mock_session.commit = AsyncMock()
-
-    mock_session_ctx = AsyncMock()
-    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
-
-    with patch("src.core.memory.summarization.async_session", return_value=mock_session_ctx):
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
         from src.core.memory.summarization import summarize_dialog
 
-        result = await summarize_dialog(user_id, family_id)
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
     assert result is None
+    gemini.aio.models.generate_content.assert_not_awaited()
+    mock_session.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_summarize_creates_new_summary():
-    """When no existing summary and msg_count > 15, create a new summary."""
-    user_id = str(uuid.uuid4())
-    family_id = str(uuid.uuid4())
+async def test_summarize_creates_new_summary_with_cursor(redis):
+    """The first fold creates the summary and sets the cursor to the last message."""
     session_id = uuid.uuid4()
+    messages = _dialog(20, first_id=101)
+    mock_session, session_ctx = _db(session_id, None, messages, [])
+    gemini = _gemini("## Финансовые данные\n- Расход 500 RUB на кофе")
 
-    messages = [
-        _make_message(MessageRole.user, "Потратил 5000 на продукты"),
-        _make_message(MessageRole.assistant, "Записал расход 5000 RUB в категорию Продукты."),
-    ]
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
+        from src.core.memory.summarization import summarize_dialog
 
-    mock_session = AsyncMock()
-    call_count = 0
-
-    async def _mock_execute(stmt):
-        nonlocal call_count
-        call_count += 1
-        result = MagicMock()
-        if call_count == 1:
-            result.scalar_one_or_none.return_value = _make_user_context(session_id)
-        elif call_count == 2:
-            # count query
-            result.scalar.return_value = 20
-        elif call_count == 3:
-            # existing summary query
-            result.scalar_one_or_none.return_value = None
-        elif call_count == 4:
-            # messages query
-            result.scalars.return_value.all.return_value = messages
-        return result
-
-    mock_session.execute = AsyncMock(side_effect=_mock_execute)
-    mock_session.add = MagicMock()
-    mock_session.commit = AsyncMock()
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
-    mock_session_ctx = AsyncMock()
-    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
+    assert result == "## Финансовые данные\n- Расход 500 RUB на кофе"
+    mock_session.add.assert_called_once()
+    created = mock_session.add.call_args.args[0]
+    assert created.session_id == session_id
+    assert created.last_message_id == 120
+    assert created.message_count == 20
+    mock_session.commit.assert_awaited_once()
 
-    # Mock Gemini response
-    mock_response = MagicMock()
-    mock_response.text = "## Финансовые данные\n- Расход 5000 RUB на продукты"
 
-    mock_google = MagicMock()
-    mock_google.aio.models.generate_content = AsyncMock(return_value=mock_response)
+@pytest.mark.asyncio
+async def test_summarize_folds_only_messages_after_cursor(redis):
+    """An existing summary is updated from its cursor with just the new messages."""
+    session_id = uuid.uuid4()
+    existing = _make_summary("## Финансовые данные\n- Расход 3000 RUB", 16, last_message_id=16)
+    new_messages = _dialog(10, first_id=17, content="Ещё потратил 2000 на кафе")
+    mock_session, session_ctx = _db(session_id, existing, new_messages, [])
+    gemini = _gemini("## Финансовые данные\n- Расход 3000 RUB\n- Расход 2000 RUB на кафе")
 
-    with (
-        patch("src.core.memory.summarization.async_session", return_value=mock_session_ctx),
-        patch("src.core.memory.summarization.google_client", return_value=mock_google),
-    ):
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
         from src.core.memory.summarization import summarize_dialog
 
-        result = await summarize_dialog(user_id, family_id)
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
-    assert result == "## Финансовые данные\n- Расход 5000 RUB на продукты"
-    mock_session.add.assert_called_once()
+    assert "2000 RUB" in result
+    assert existing.summary == result
+    assert existing.last_message_id == 26
+    assert existing.message_count == 26
+    page_query = str(mock_session.execute.await_args_list[2].args[0])
+    assert "conversation_messages.id >" in page_query
+    prompt = gemini.aio.models.generate_content.await_args.kwargs["contents"]
+    assert "Расход 3000 RUB" in prompt and "Ещё потратил 2000" in prompt
     mock_session.commit.assert_awaited_once()
-    created_summary = mock_session.add.call_args.args[0]
-    assert created_summary.session_id == session_id
 
 
 @pytest.mark.asyncio
-async def test_summarize_updates_existing_summary():
-    """When an existing summary exists, it should be updated in place."""
-    user_id = str(uuid.uuid4())
-    family_id = str(uuid.uuid4())
-    session_id = uuid.uuid4()
-
-    existing = _make_summary("## Финансовые данные\n- Расход 3000 RUB", message_count=16)
-    new_messages = [
-        _make_message(MessageRole.user, "Ещё потратил 2000 на кафе"),
-        _make_message(MessageRole.assistant, "Записал 2000 RUB в категорию Кафе."),
-    ]
+async def test_long_backlog_is_folded_in_bounded_chunks(redis):
+    """A large backlog becomes several bounded folds, each committing its cursor."""
+    from src.core.llm.tokenizer import count_tokens
+    from src.core.memory.summarization import FOLD_MAX_TOKENS, MESSAGE_MAX_TOKENS
 
-    mock_session = AsyncMock()
-    call_count = 0
-
-    async def _mock_execute(stmt):
-        nonlocal call_count
-        call_count += 1
-        result = MagicMock()
-        if call_count == 1:
-            result.scalar_one_or_none.return_value = _make_user_context(session_id)
-        elif call_count == 2:
-            # count query
-            result.scalar.return_value = 20
-        elif call_count == 3:
-            # existing summary query
-            result.scalar_one_or_none.return_value = existing
-        elif call_count == 4:
-            # messages query
-            result.scalars.return_value.all.return_value = new_messages
-        return result
-
-    mock_session.execute = AsyncMock(side_effect=_mock_execute)
-    mock_session.commit = AsyncMock()
+    session_id = uuid.uuid4()
+    existing = _make_summary("Саммари", 10, last_message_id=10)
+    long_text = "Обсуждали бюджет на отпуск и расходы на перелёт. " * 150
+    backlog = _dialog(12, first_id=11, content=long_text)
+    per_message = min(count_tokens(long_text), MESSAGE_MAX_TOKENS)
+    per_fold = FOLD_MAX_TOKENS // per_message
+    pages = [backlog[i:] for i in range(0, 12, per_fold)] + [[]]
+    mock_session, session_ctx = _db(session_id, existing, *pages)
+    gemini = _gemini(*[f"Саммари v{i}" for i in range(len(pages))])
+
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
+        from src.core.memory.summarization import summarize_dialog
 
-    mock_session_ctx = AsyncMock()
-    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
-    mock_response = MagicMock()
-    mock_response.text = "## Финансовые данные\n- Расход 3000 RUB\n- Расход 2000 RUB на кафе"
+    calls = gemini.aio.models.generate_content.await_args_list
+    assert len(calls) > 1
+    for call in calls:
+        assert count_tokens(call.kwargs["contents"]) < FOLD_MAX_TOKENS + 1000
+    assert result == f"Саммари v{len(calls) - 1}"
+    # The cursor advances chunk by chunk; a short, small tail waits for the next run
+    assert existing.last_message_id == 10 + per_fold * len(calls)
+    assert mock_session.commit.await_count == len(calls)
 
-    mock_google = MagicMock()
-    mock_google.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
-    with (
-        patch("src.core.memory.summarization.async_session", return_value=mock_session_ctx),
-        patch("src.core.memory.summarization.google_client", return_value=mock_google),
-    ):
+@pytest.mark.asyncio
+async def test_summarize_no_new_messages_returns_existing(redis):
+    """Nothing after the cursor: return the existing summary without an LLM call."""
+    existing = _make_summary("Existing summary", 20, last_message_id=20)
+    mock_session, session_ctx = _db(uuid.uuid4(), existing, [])
+    gemini = _gemini()
+
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
         from src.core.memory.summarization import summarize_dialog
 
-        result = await summarize_dialog(user_id, family_id)
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
-    assert result is not None
-    assert "2000 RUB" in result
-    # Existing summary object should have been mutated (updated in place)
-    assert existing.summary == result
-    assert existing.message_count == 20
-    mock_session.commit.assert_awaited_once()
+    assert result == "Existing summary"
+    gemini.aio.models.generate_content.assert_not_awaited()
+    mock_session.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_summarize_no_new_messages_returns_existing():
-    """When msg_count equals last_count, return existing summary text."""
+async def test_concurrent_run_is_skipped(redis):
+    """A run for a user whose summary is already being folded does nothing."""
     user_id = str(uuid.uuid4())
-    family_id = str(uuid.uuid4())
-    session_id = uuid.uuid4()
+    redis.store[f"summary:lock:{user_id}"] = "1"
 
-    existing = _make_summary("Existing summary", message_count=20)
+    with patch("src.core.memory.summarization.async_session") as session_factory:
+        from src.core.memory.summarization import summarize_dialog
 
-    mock_session = AsyncMock()
-    call_count = 0
-
-    async def _mock_execute(stmt):
-        nonlocal call_count
-        call_count += 1
-        result = MagicMock()
-        if call_count == 1:
-            result.scalar_one_or_none.return_value = _make_user_context(session_id)
-        elif call_count == 2:
-            # count query — same as existing.message_count
-            result.scalar.return_value = 20
-        elif call_count == 3:
-            # existing summary query
-            result.scalar_one_or_none.return_value = existing
-        return result
-
-    mock_session.execute = AsyncMock(side_effect=_mock_execute)
-    mock_session.commit = AsyncMock()
+        assert await summarize_dialog(user_id, str(uuid.uuid4())) is None
 
-    mock_session_ctx = AsyncMock()
-    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
+    session_factory.assert_not_called()
 
-    with patch("src.core.memory.summarization.async_session", return_value=mock_session_ctx):
+
+@pytest.mark.asyncio
+async def test_summarize_handles_gemini_error(redis):
+    """summarize_dialog should return None (and keep the cursor) if Gemini fails."""
+    existing = _make_summary("Саммари", 10, last_message_id=10)
+    mock_session, session_ctx = _db(uuid.uuid4(), existing, _dialog(15, first_id=11))
+    gemini = _gemini(error=Exception("Gemini API error"))
+
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
         from src.core.memory.summarization import summarize_dialog
 
-        result = await summarize_dialog(user_id, family_id)
+        result = await summarize_dialog(str(uuid.uuid4()), str(uuid.uuid4()))
 
-    assert result == "Existing summary"
-    # Gemini should not have been called
+    assert result is None
+    assert existing.last_message_id == 10
+    mock_session.commit.assert_not_awaited()
+    assert not redis.store  # lock released
+
+
+# ---------------------------------------------------------------------------
+# Rollups and triggering
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_rollup_is_idempotent_when_sources_unchanged():
+    """Re-running a rollup whose sources did not change makes no LLM call."""
+    from datetime import date, timedelta
+
+    written = datetime.now(UTC)
+    sources = MagicMock()
+    sources.all.return_value = [
+        ("Саммари утро", written - timedelta(hours=5)),
+        ("Саммари вечер", written - timedelta(hours=1)),
+    ]
+    rollup = MagicMock(summary="Сводка за день", source_count=2, updated_at=written)
+    rollup_result = MagicMock()
+    rollup_result.scalar_one_or_none.return_value = rollup
+    mock_session, session_ctx = _db(uuid.uuid4(), None)
+    mock_session.execute = AsyncMock(side_effect=[sources, rollup_result])
+    gemini = _gemini()
+
+    p1, p2, p3 = _patches(session_ctx, gemini)
+    with p1, p2, p3:
+        from src.core.memory.summarization import rollup_period
+
+        result = await rollup_period(
+            str(uuid.uuid4()), str(uuid.uuid4()), "day", date.today() - timedelta(days=1)
+        )
+
+    assert result == "Сводка за день"
+    gemini.aio.models.generate_content.assert_not_awaited()
     mock_session.commit.assert_not_awaited()
 
 
+def test_persisted_message_schedules_one_summary_timer():
+    """New conversation messages schedule a keep-earliest ``summary`` timer."""
+    from src.core import timers
+    from src.core.models.conversation import ConversationMessage
+
+    user_id, family_id = uuid.uuid4(), uuid.uuid4()
+    msg = ConversationMessage(
+        user_id=user_id, family_id=family_id, session_id=uuid.uuid4(), content="hi"
+    )
+    now = datetime.now(UTC)
+
+    kind, entity_id, fire_at = timers.summary_entry(msg, now)
+
+    assert (kind, entity_id) == ("summary", f"{user_id}:{family_id}")
+    assert fire_at > now
+    assert "summary" in timers._KEEP_EARLIEST
+    assert timers.summary_entry(MagicMock(__tablename__="tasks"), now) is None
+
+
 # ---------------------------------------------------------------------------
 # Tests for get_session_summary
 # ---------------------------------------------------------------------------
@@ -317,50 +403,3 @@ async def test_get_session_summary_handles_db_error():
         result = await get_session_summary(user_id)
 
     assert result is None
-
-
-@pytest.mark.asyncio
-async def test_summarize_handles_gemini_error():
-    """summarize_dialog should return None if Gemini call fails."""
-    user_id = str(uuid.uuid4())
-    family_id = str(uuid.uuid4())
-    session_id = uuid.uuid4()
-
-    messages = [_make_message(MessageRole.user, "Test message")]
-
-    mock_session = AsyncMock()
-    call_count = 0
-
-    async def _mock_execute(stmt):
-        nonlocal call_count
-        call_count += 1
-        result = MagicMock()
-        if call_count == 1:
-            result.scalar_one_or_none.return_value = _make_user_context(session_id)
-        elif call_count == 2:
-            result.scalar.return_value = 20
-        elif call_count == 3:
-            result.scalar_one_or_none.return_value = None
-        elif call_count == 4:
-            result.scalars.return_value.all.return_value = messages
-        return result
-
-    mock_session.execute = AsyncMock(side_effect=_mock_execute)
-    mock_session.commit = AsyncMock()
-
-    mock_session_ctx = AsyncMock()
-    mock_session_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_session_ctx.__aexit__ = AsyncMock(return_value=False)
-
-    mock_google = MagicMock()
-    mock_google.aio.models.generate_content = AsyncMock(side_effect=Exception("Gemini API error"))
-
-    with (
-        patch("src.core.memory.summarization.async_session", return_value=mock_session_ctx),
-        patch("src.core.memory.summarization.google_client", return_value=mock_google),
-    ):
-        from src.core.memory.summarization import summarize_dialog
-
-        result = await summarize_dialog(user_id, family_id)
-
-    assert result is None
@@ -0,0 +1,222 @@
+"""Tests for the delay-queue timer service (src/core/timers.py)."""
+
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.core import timers
+from src.core.models.booking import Booking
+from src.core.models.enums import ActionStatus, BookingStatus, TaskStatus
+from src.core.models.scheduled_action import ScheduledAction
+from src.core.models.task import Task
+from src.core.models.tracker import Tracker
+
+_NOW = datetime(2026, 3, 16, 9, 0, tzinfo=UTC)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def zadd(self, key, mapping):
+        self._ops.append(lambda: self._redis.zset.update(mapping))
+
+    def zrem(self, key, *members):
+        self._ops.append(lambda: [self._redis.zset.pop(m, None) for m in members])
+
+    async def execute(self):
+        for op in self._ops:
+            op()
+
+
+class _Redis:
+    """Sorted-set subset of Redis, with the pop script's semantics for ``eval``."""
+
+    def __init__(self):
+        self.zset: dict[str, float] = {}
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    async def eval(self, script, numkeys, key, now, limit):
+        due = sorted((s, m) for m, s in self.zset.items() if s <= now)[: int(limit)]
+        for _, member in due:
+            del self.zset[member]
+        return [m for _, m in due]
+
+    async def zrange(self, key, start, end, withscores=False):
+        ordered = sorted(self.zset.items(), key=lambda item: item[1])
+        return ordered[start : end + 1]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _Redis()
+    with patch("src.core.db.redis", redis):
+        yield redis
+
+
+async def test_schedule_pop_and_cancel(fake_redis):
+    t0 = _NOW.timestamp()
+    await timers.schedule_timers(
+        [
+            ("reminder", "r1", _NOW),
+            ("action", "a1", _NOW - timedelta(seconds=5)),
+            ("tracker", "t1", _NOW + timedelta(seconds=30)),
+            ("reminder", "r2", _NOW + timedelta(hours=1)),
+        ]
+    )
+    await timers.schedule_timers([("reminder", "r2", None)])  # cancelled
+
+    assert await timers.seconds_until_next(t0 - 0.25) == pytest.approx(0, abs=1e-6)
+    assert await timers.pop_due_timers(t0) == {"action": ["a1"], "reminder": ["r1"]}
+    assert await timers.pop_due_timers(t0) == {}
+    assert await timers.seconds_until_next(t0) == timers.IDLE_SECONDS
+    assert await timers.seconds_until_next(t0 + 29.5) == pytest.approx(0.5)
+    assert list(fake_redis.zset) == ["tracker:t1"]
+
+
+async def test_dispatch_retries_failed_kinds(fake_redis):
+    t0 = _NOW.timestamp()
+    await timers.schedule_timers([("reminder", "r1", _NOW), ("booking", "b1", _NOW)])
+    fired = []
+
+    async def fire(kind, ids):
+        if kind == "booking":
+            raise RuntimeError("broker down")
+        fired.append((kind, ids))
+
+    assert await timers.dispatch_due_timers(fire, now=t0) == 2
+    assert fired == [("reminder", ["r1"])]
+    assert fake_redis.zset["booking:b1"] > datetime.now(UTC).timestamp()  # retried later
+
+
+def test_timer_entries_follow_entity_state():
+    task = Task(id=uuid.uuid4(), status=TaskStatus.pending, reminder_at=_NOW)
+    assert timers.timer_entry(task, _NOW) == ("reminder", str(task.id), _NOW)
+    task.status = TaskStatus.done
+    assert timers.timer_entry(task, _NOW)[2] is None
+
+    action = ScheduledAction(id=uuid.uuid4(), status=ActionStatus.paused, next_run_at=_NOW)
+    assert timers.timer_entry(action, _NOW)[2] is None
+    action.status = ActionStatus.active
+    action.claimed_until = _NOW + timedelta(minutes=10)
+    assert timers.timer_entry(action, _NOW)[2] == _NOW + timedelta(minutes=10)  # lease expiry
+
+    booking = Booking(
+        id=uuid.uuid4(),
+        status=BookingStatus.scheduled,
+        reminder_sent=False,
+        start_at=_NOW + timedelta(hours=30),
+    )
+    assert timers.timer_entry(booking, _NOW)[2] == _NOW + timedelta(hours=6)  # 24h before
+    booking.start_at = _NOW + timedelta(hours=3)
+    assert timers.timer_entry(booking, _NOW)[2] == _NOW + timedelta(hours=2)  # 1h before
+    booking.start_at = _NOW + timedelta(minutes=30)
+    assert timers.timer_entry(booking, _NOW)[2] is None
+
+    tracker = Tracker(
+        id=uuid.uuid4(), is_active=True, config={"reminder_enabled": True, "reminder_time": "9:00"}
+    )
+    assert timers.timer_entry(tracker, _NOW) == ("tracker", str(tracker.id), _NOW)
+    assert timers.timer_entry(SimpleNamespace(id=1, __tablename__="users"), _NOW) is None
+
+
+async def test_session_hooks_schedule_after_commit_only():
+    task = Task(id=uuid.uuid4(), status=TaskStatus.pending, reminder_at=_NOW)
+    done = Task(id=uuid.uuid4(), status=TaskStatus.done, reminder_at=_NOW)
+    session = SimpleNamespace(new=[task], dirty=[done], deleted=[], info={})
+
+    with patch("src.core.timers.schedule_timers", new_callable=AsyncMock) as mock_schedule:
+        timers._collect_timer_entries(session, None)
+        timers._discard_timer_entries(session)
+        timers._apply_timer_entries(session)
+        assert not timers._background
+
+        timers._collect_timer_entries(session, None)
+        timers._apply_timer_entries(session)
+        await asyncio.gather(*timers._background)
+
+    entries = sorted(mock_schedule.call_args.args[0], key=lambda e: e[2] is None)
+    assert entries == [("reminder", str(task.id), _NOW), ("reminder", str(done.id), None)]
+    assert timers._SESSION_KEY not in session.info
+
+
+def test_tracker_next_fire_in_users_timezone():
+    from src.core.tasks.tracker_tasks import _in_fire_window, next_fire_at
+
+    tz = ZoneInfo("America/New_York")  # 05:00 local at _NOW (EDT)
+    assert next_fire_at("07:30", tz, _NOW) == datetime(2026, 3, 16, 11, 30, tzinfo=UTC)
+    assert next_fire_at("04:58", tz, _NOW) == datetime(2026, 3, 17, 8, 58, tzinfo=UTC)
+    grace = timers.TIMER_GRACE
+    assert next_fire_at("04:58", tz, _NOW, grace=grace) == datetime(2026, 3, 16, 8, 58, tzinfo=UTC)
+    assert next_fire_at("25:00", tz, _NOW) is None
+    assert _in_fire_window("04:58", _NOW.astimezone(tz))
+    assert not _in_fire_window("04:50", _NOW.astimezone(tz))
+
+
+async def test_tracker_dispatch_sends_and_schedules_next_day():
+    from src.core.tasks.tracker_tasks import dispatch_tracker_reminders
+
+    now = datetime.now(UTC)
+    local = now.astimezone(ZoneInfo("Asia/Tokyo"))
+    tracker = Tracker(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        name="Water",
+        emoji="💧",
+        is_active=True,
+        config={"reminder_enabled": True, "reminder_time": local.strftime("%H:%M")},
+    )
+    row = (tracker, 42, "en", None, None, "Asia/Tokyo", None)
+    session = MagicMock()
+    session.execute = AsyncMock(
+        side_effect=[
+            MagicMock(all=MagicMock(return_value=[row])),
+            MagicMock(all=MagicMock(return_value=[])),  # nothing logged today
+        ]
+    )
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=session)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    redis = MagicMock(get=AsyncMock(return_value=None), set=AsyncMock())
+
+    with (
+        patch("src.core.tasks.tracker_tasks.async_session", return_value=ctx),
+        patch("src.core.db.redis", redis),
+        patch("src.core.tasks.tracker_tasks.send_telegram_message", new_callable=AsyncMock) as send,
+        patch("src.core.tasks.tracker_tasks.schedule_timers", new_callable=AsyncMock) as schedule,
+    ):
+        await dispatch_tracker_reminders([str(tracker.id)])
+
+    assert send.call_args.args == (42, "⏰ Don't forget to log your 💧 <b>Water</b> today!")
+    ((kind, tid, fire_at),) = list(schedule.call_args.args[0])
+    assert (kind, tid) == ("tracker", str(tracker.id))
+    assert timedelta(hours=23) < fire_at - now <= timedelta(days=1)
+
+
+async def test_reconcile_sweeps_directly_when_redis_is_down():
+    from src.core.tasks import timer_tasks
+
+    sweeps = {kind: AsyncMock() for kind in timer_tasks.DISPATCH_TASKS}
+    with (
+        patch.object(timer_tasks, "due_timers", AsyncMock(return_value=[("reminder", "r1", _NOW)])),
+        patch.object(timer_tasks, "schedule_timers", AsyncMock(side_effect=ConnectionError)),
+        patch.dict(timer_tasks.DISPATCH_TASKS, sweeps),
+    ):
+        await timer_tasks.reconcile_timers()
+
+    for sweep in sweeps.values():
+        sweep.assert_awaited_once_with()
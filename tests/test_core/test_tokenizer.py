@@ -0,0 +1,66 @@
+"""Tests for local token counting (src/core/llm/tokenizer.py)."""
+
+import pytest
+
+from src.core.llm import tokenizer
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    tokenizer.clear_cache()
+    yield
+    tokenizer.clear_cache()
+
+
+@pytest.fixture
+def heuristic(monkeypatch):
+    """Force the script-aware fallback (as when tiktoken is unavailable)."""
+    monkeypatch.setattr(tokenizer, "_encoding", lambda family: None)
+
+
+def test_fallback_counts_cyrillic_denser_than_latin(heuristic):
+    latin = "Spent 450 on coffee at the cafe near home"
+    cyrillic = "Потратил 450 на кофе в кафе возле дома"
+    assert tokenizer.count_tokens(cyrillic, "openai") > tokenizer.count_tokens(latin, "openai")
+    assert tokenizer.count_tokens(cyrillic, "openai") > len(cyrillic) // 4 + 1
+
+
+def test_counts_are_memoized_per_block(monkeypatch):
+    calls = []
+    real = tokenizer._count
+    monkeypatch.setattr(tokenizer, "_count", lambda t, f: calls.append(t) or real(t, f))
+    block = "Бюджет на продукты 30000 рублей в месяц, на кафе 8000. " * 5
+
+    first = tokenizer.count_tokens(block)
+    assert tokenizer.count_tokens(block) == first
+    assert len(calls) == 1
+    # Families are cached separately
+    tokenizer.count_tokens(block, "openai")
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("force_heuristic", [True, False])
+def test_truncate_cuts_on_token_boundary_within_budget(monkeypatch, force_heuristic):
+    if force_heuristic:
+        monkeypatch.setattr(tokenizer, "_encoding", lambda family: None)
+    text = "Потратил 450 на кофе, 1200 на продукты и 300 на такси. " * 30
+
+    cut = tokenizer.truncate_to_tokens(text, 50)
+
+    assert text.startswith(cut)
+    assert 0 < tokenizer.count_tokens(cut) <= 50
+    assert tokenizer.truncate_to_tokens(text, 0) == ""
+    assert tokenizer.truncate_to_tokens("short", 50) == "short"
+
+
+def test_token_window_trims_oldest_and_keeps_minimum(heuristic):
+    messages = [{"role": "user", "content": f"сообщение номер {i} " * 10} for i in range(6)]
+    window = tokenizer.TokenWindow(messages)
+    per_message = tokenizer.count_tokens(messages[0]["content"])
+    assert window.total == tokenizer.count_message_tokens(messages)
+
+    dropped = window.trim(per_message * 3, keep=4)
+
+    assert dropped == 2
+    assert window.messages == messages[2:]
+    assert window.total == tokenizer.count_message_tokens(messages[2:])
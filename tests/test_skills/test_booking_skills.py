@@ -1,6 +1,8 @@
 """Tests for booking skills (create, list, cancel, reschedule)."""
 
 import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.core.context import SessionContext
@@ -187,6 +189,37 @@ async def test_reschedule_booking_no_time():
     assert "when" in result.response_text.lower()
 
 
+async def test_reschedule_booking_moves_reminder_timer():
+    skill = RescheduleBookingSkill()
+    ctx = _make_context()
+    start = datetime.now(UTC) + timedelta(days=2)
+    booking = SimpleNamespace(
+        id=uuid.uuid4(), title="Haircut", start_at=start, end_at=start + timedelta(hours=1)
+    )
+    new_start = start + timedelta(days=3)
+
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [booking]
+    mock_session = AsyncMock()
+    mock_session.__aenter__ = AsyncMock(return_value=mock_session)
+    mock_session.__aexit__ = AsyncMock(return_value=False)
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    with (
+        patch("src.skills.reschedule_booking.handler.async_session", return_value=mock_session),
+        patch(
+            "src.skills.reschedule_booking.handler.schedule_timers", new_callable=AsyncMock
+        ) as mock_schedule,
+    ):
+        await skill.execute(
+            _make_message("move haircut"), ctx, {"event_datetime": new_start.isoformat()}
+        )
+
+    mock_schedule.assert_awaited_once_with(
+        [("booking", str(booking.id), new_start - timedelta(hours=24))]
+    )
+
+
 async def test_create_booking_system_prompt():
     skill = CreateBookingSkill()
     ctx = _make_context()
@@ -1,8 +1,10 @@
 """Tests for CashFlowForecastSkill."""
 
 from datetime import date, timedelta
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from src.core.models.enums import PaymentFrequency
 from src.gateway.types import IncomingMessage, MessageType
 from src.skills.cash_flow_forecast.handler import CashFlowForecastSkill, skill
 
@@ -43,26 +45,49 @@ async def test_no_family_id():
     assert "set up" in result.response_text.lower()
 
 
-async def test_insufficient_data(sample_context):
-    """Returns message when less than 14 days of data."""
-    message = _make_message("cash flow forecast")
-    intent_data = {}
-
-    # First transaction 5 days ago — not enough
-    first_date = date.today() - timedelta(days=5)
-
+def _session(tx_rows, recurring_rows=()):
+    """Session whose two queries return the daily series and recurring payments."""
     mock_sess = AsyncMock()
-    mock_sess.scalar = AsyncMock(return_value=first_date)
-
+    mock_sess.execute = AsyncMock(
+        side_effect=[
+            MagicMock(all=MagicMock(return_value=list(tx_rows))),
+            MagicMock(all=MagicMock(return_value=list(recurring_rows))),
+        ]
+    )
     ctx = MagicMock()
     ctx.__aenter__ = AsyncMock(return_value=mock_sess)
     ctx.__aexit__ = AsyncMock(return_value=False)
+    return ctx
+
+
+def _day(family_id: str, days_ago: int, total: float, type_="expense", recurring=False):
+    return SimpleNamespace(
+        family_id=family_id,
+        date=date.today() - timedelta(days=days_ago),
+        type=type_,
+        recurring=recurring,
+        total=total,
+    )
 
-    with patch(
-        "src.skills.cash_flow_forecast.handler.async_session",
-        return_value=ctx,
-    ):
-        result = await skill.execute(message, sample_context, intent_data)
+
+def _patch_forecast(ctx):
+    return (
+        patch("src.core.forecast.async_session", return_value=ctx),
+        patch("src.core.forecast.cached_forecast", new_callable=AsyncMock, return_value=None),
+        patch("src.core.forecast.cache_forecasts", new_callable=AsyncMock),
+    )
+
+
+async def test_insufficient_data(sample_context):
+    """Returns message when less than 14 days of data."""
+    message = _make_message("cash flow forecast")
+
+    fid = sample_context.family_id
+
+    # First transaction 5 days ago — not enough
+    session_p, get_p, put_p = _patch_forecast(_session([_day(fid, 5, 20), _day(fid, 1, 30)]))
+    with session_p, get_p, put_p:
+        result = await skill.execute(message, sample_context, {})
 
     assert "14" in result.response_text
     assert "5" in result.response_text
@@ -71,20 +96,10 @@ async def test_insufficient_data(sample_context):
 async def test_no_transactions_at_all(sample_context):
     """Returns message when no transactions at all."""
     message = _make_message("forecast")
-    intent_data = {}
 
-    mock_sess = AsyncMock()
-    mock_sess.scalar = AsyncMock(return_value=None)
-
-    ctx = MagicMock()
-    ctx.__aenter__ = AsyncMock(return_value=mock_sess)
-    ctx.__aexit__ = AsyncMock(return_value=False)
-
-    with patch(
-        "src.skills.cash_flow_forecast.handler.async_session",
-        return_value=ctx,
-    ):
-        result = await skill.execute(message, sample_context, intent_data)
+    session_p, get_p, put_p = _patch_forecast(_session([]))
+    with session_p, get_p, put_p:
+        result = await skill.execute(message, sample_context, {})
 
     assert "14" in result.response_text
     assert "0" in result.response_text
@@ -109,56 +124,40 @@ async def test_parse_horizon_90():
 
 
 async def test_forecast_with_data_calls_llm(sample_context):
-    """When sufficient data exists, LLM is called to generate forecast."""
-    message = _make_message("forecast next month")
-    intent_data = {}
-
-    first_date = date.today() - timedelta(days=60)
-
-    # We need multiple sessions: _get_first_transaction_date, _get_daily_averages (x2),
-    # _get_recurring_payments, _get_monthly_totals
-    # Each opens its own async_session().
-
-    call_count = 0
-
-    def session_factory():
-        nonlocal call_count
-        call_count += 1
-
-        mock_sess = AsyncMock()
-
-        if call_count == 1:
-            # _get_first_transaction_date → scalar
-            mock_sess.scalar = AsyncMock(return_value=first_date)
-        elif call_count in (2, 3):
-            # _get_daily_averages (30d, 90d) → two scalars per call (income, expense)
-            mock_sess.scalar = AsyncMock(side_effect=[500.0, 300.0])
-        elif call_count == 4:
-            # _get_recurring_payments → scalars().all()
-            scalars_result = MagicMock()
-            scalars_result.all.return_value = []
-            mock_sess.scalars = AsyncMock(return_value=scalars_result)
-        else:
-            # _get_monthly_totals → scalar for each month (income, expense x months)
-            mock_sess.scalar = AsyncMock(return_value=0)
-
-        ctx = MagicMock()
-        ctx.__aenter__ = AsyncMock(return_value=mock_sess)
-        ctx.__aexit__ = AsyncMock(return_value=False)
-        return ctx
-
+    """With enough history the LLM narrates the computed forecast."""
+    message = _make_message("forecast next 2 months")
+    fid = sample_context.family_id
+    rows = [_day(fid, d, 40) for d in range(1, 61)]
+    rows += [_day(fid, d, 2000, "income") for d in (5, 35)]
+    rows += [_day(fid, 20, 15, recurring=True)]
+    recurring = [
+        SimpleNamespace(
+            family_id=sample_context.family_id,
+            name="Netflix",
+            amount=15,
+            frequency=PaymentFrequency.monthly,
+            next_date=date.today() + timedelta(days=10),
+        )
+    ]
+
+    session_p, get_p, put_p = _patch_forecast(_session(rows, recurring))
     with (
-        patch(
-            "src.skills.cash_flow_forecast.handler.async_session",
-            side_effect=session_factory,
-        ),
+        session_p,
+        get_p,
+        put_p as mock_put,
         patch(
             "src.skills.cash_flow_forecast.handler.generate_text",
             new_callable=AsyncMock,
-            return_value="<b>30-Day Forecast:</b> Net +$6,000",
+            return_value="<b>60-Day Forecast:</b> Net +$1,200",
         ) as mock_llm,
     ):
-        result = await skill.execute(message, sample_context, intent_data)
+        result = await skill.execute(message, sample_context, {})
 
     mock_llm.assert_called_once()
-    assert result.response_text is not None
+    prompt = mock_llm.call_args.kwargs["prompt"]
+    assert "Next 30 days" in prompt and "Next 60 days" in prompt
+    assert "Next 90 days" not in prompt
+    assert "Netflix 15.00" in prompt
+    mock_put.assert_awaited_once()
+    assert result.response_text.startswith("<i>60 ")
+    assert "Net +$1,200" in result.response_text
@@ -25,7 +25,7 @@ def _make_ctx(mock_sess):
 
 
 def _session_factory(categories, merchants, income_val, prev_categories=None):
-    """Build a side_effect callable for async_session.
+    """Build a side_effect callable for rls_read_session.
 
     Call order in execute():
       1. _get_category_breakdown (current) → session.execute().all()
@@ -63,7 +63,7 @@ def _session_factory(categories, merchants, income_val, prev_categories=None):
 
     call_idx = 0
 
-    def factory():
+    def factory(*_args):
         nonlocal call_idx
         idx = call_idx
         call_idx += 1
@@ -139,7 +139,7 @@ async def test_no_data_returns_message(sample_context):
         categories=[], merchants=[], income_val=None,
     )
     with patch(
-        "src.skills.financial_summary.handler.async_session",
+        "src.skills.financial_summary.handler.rls_read_session",
         side_effect=factory,
     ):
         result = await skill.execute(message, sample_context, intent_data)
@@ -163,7 +163,7 @@ async def test_with_data_calls_llm(sample_context):
     )
     with (
         patch(
-            "src.skills.financial_summary.handler.async_session",
+            "src.skills.financial_summary.handler.rls_read_session",
             side_effect=factory,
         ),
         patch(
@@ -198,7 +198,7 @@ async def test_chart_generated_with_categories(sample_context):
     )
     with (
         patch(
-            "src.skills.financial_summary.handler.async_session",
+            "src.skills.financial_summary.handler.rls_read_session",
             side_effect=factory,
         ),
         patch(
@@ -223,7 +223,7 @@ async def test_member_summary_queries_are_scope_filtered(member_context):
     intent_data = {"period": "month"}
     session_calls = []
 
-    def factory():
+    def factory(*_args):
         index = len(session_calls)
         mock_sess = AsyncMock()
         if index in (0, 3):
@@ -241,7 +241,7 @@ async def test_member_summary_queries_are_scope_filtered(member_context):
         return _make_ctx(mock_sess)
 
     with (
-        patch("src.skills.financial_summary.handler.async_session", side_effect=factory),
+        patch("src.skills.financial_summary.handler.rls_read_session", side_effect=factory),
         patch(
             "src.skills.financial_summary.handler.generate_text",
             new_callable=AsyncMock,
@@ -189,7 +189,7 @@ async def test_execute_receipt(skill, context, photo_message, mock_redis):
     stored_data = json.loads(call_args[0][1])
     assert stored_data["doc_type"] == "receipt"
     assert stored_data["ocr_data"]["merchant"] == "Walmart"
-    assert stored_data["image_b64"]  # image bytes stored
+    assert stored_data["image_blob"].startswith("tmp/")  # image in blob store, handle in Redis
     assert stored_data["user_id"] == context.user_id
     assert stored_data["family_id"] == context.family_id
 
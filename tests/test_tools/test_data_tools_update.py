@@ -0,0 +1,46 @@
+"""update_record against a real async session (server-maintained updated_at)."""
+
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core.models.contact import Contact
+from src.tools.data_tools import update_record
+
+
+@pytest.fixture
+async def sessionmaker():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Contact.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_update_returns_serialized_row_with_updated_at(sessionmaker):
+    family_id, user_id = uuid.uuid4(), uuid.uuid4()
+    async with sessionmaker() as session:
+        contact = Contact(family_id=family_id, user_id=user_id, name="Anna")
+        session.add(contact)
+        await session.commit()
+        contact_id = contact.id
+
+    @asynccontextmanager
+    async def _rls_session(*_args):
+        async with sessionmaker() as session:
+            yield session
+
+    with (
+        patch("src.tools.data_tools.rls_session", _rls_session),
+        patch("src.tools.data_tools.log_action", new_callable=AsyncMock),
+    ):
+        result = await update_record(
+            str(family_id), str(user_id), "contacts", str(contact_id), {"name": "Anna K."}
+        )
+
+    assert "error" not in result
+    assert result["record"]["name"] == "Anna K."
+    assert result["record"]["updated_at"]
@@ -0,0 +1,114 @@
+"""Tests for OCR image preprocessing."""
+
+import io
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+
+from src.tools.image_preprocess import (
+    DOCUMENT_PROFILE,
+    PDF_PAGE_PROFILE,
+    RECEIPT_PROFILE,
+    PreprocessProfile,
+    get_preprocess_report,
+    prepare_ocr_image,
+    preprocess_image,
+    reset_preprocess_stats,
+)
+
+
+def _receipt_photo(size=(4000, 3000), exif_orientation: int | None = None) -> bytes:
+    """A light 'receipt' with text lines on a dark table."""
+    img = Image.new("RGB", size, (90, 70, 60))
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    paper = (int(w * 0.3), int(h * 0.1), int(w * 0.7), int(h * 0.9))
+    draw.rectangle(paper, fill=(245, 245, 240))
+    for y in range(paper[1] + 50, paper[3] - 50, 60):
+        draw.line((paper[0] + 60, y, paper[2] - 60, y), fill=(30, 30, 30), width=3)
+    buf = io.BytesIO()
+    kwargs = {}
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        kwargs["exif"] = exif
+    img.save(buf, format="JPEG", quality=92, **kwargs)
+    return buf.getvalue()
+
+
+def test_large_photo_is_cropped_downscaled_and_reencoded():
+    data = _receipt_photo()
+    result = preprocess_image(data, "image/jpeg", RECEIPT_PROFILE)
+
+    assert result.applied == ["crop", "downscale", "encode"]
+    assert max(result.width, result.height) == RECEIPT_PROFILE.target_long_edge
+    # Portrait receipt kept, table background trimmed.
+    assert result.height > result.width
+    assert len(result.data) < len(data) / 3
+    out = Image.open(io.BytesIO(result.data))
+    assert out.mode == "L"
+    assert result.mime_type == "image/jpeg"
+    assert set(result.timings_ms) == {"decode", "exif", "crop", "downscale", "normalize", "encode"}
+
+
+def test_exif_orientation_is_applied():
+    data = _receipt_photo(size=(3000, 2000), exif_orientation=6)
+    result = preprocess_image(data, "image/jpeg", PDF_PAGE_PROFILE)
+
+    assert "exif" in result.applied
+    assert result.height > result.width
+
+
+def test_document_profile_keeps_colour_and_webp_encodes():
+    profile = PreprocessProfile("doc-webp", grayscale=False, format="WEBP")
+    result = preprocess_image(_receipt_photo(), "image/jpeg", profile)
+
+    assert result.mime_type == "image/webp"
+    assert Image.open(io.BytesIO(result.data)).mode == "RGB"
+
+
+def test_no_crop_without_clear_document_edges():
+    img = Image.new("RGB", (2000, 1500), (200, 200, 200))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    result = preprocess_image(buf.getvalue(), "image/jpeg", RECEIPT_PROFILE)
+
+    assert "crop" not in result.applied
+    assert (result.width, result.height) == (1600, 1200)
+
+
+def test_non_image_and_small_images_pass_through():
+    pdf = b"%PDF-1.7 not an image"
+    result = preprocess_image(pdf, "application/pdf", DOCUMENT_PROFILE)
+    assert result.data is pdf and not result.changed
+
+    tiny = io.BytesIO()
+    Image.effect_noise((120, 80), 64).save(tiny, format="JPEG", quality=10)
+    result = preprocess_image(tiny.getvalue(), "image/jpeg", RECEIPT_PROFILE)
+    assert result.data == tiny.getvalue()
+    assert result.mime_type == "image/jpeg"
+
+
+async def test_prepare_runs_in_pool_and_reports_stats():
+    reset_preprocess_stats()
+    data = _receipt_photo()
+    result = await prepare_ocr_image(data, "image/jpeg", RECEIPT_PROFILE)
+    await prepare_ocr_image(b"garbage", "image/jpeg", RECEIPT_PROFILE)
+
+    report = get_preprocess_report()["receipt"]
+    assert report["images"] == 2
+    assert report["passthrough"] == 1
+    assert report["bytes_out"] == len(result.data) + len(b"garbage")
+    assert report["avg_stage_ms"]["downscale"] > 0
+    reset_preprocess_stats()
+
+
+async def test_feature_flag_and_failures_fall_back_to_original():
+    data = _receipt_photo(size=(800, 600))
+    with patch("src.tools.image_preprocess.settings.ff_ocr_preprocess", False):
+        result = await prepare_ocr_image(data, "image/jpeg")
+    assert result.data is data
+
+    with patch("src.tools.image_preprocess.preprocess_image", side_effect=MemoryError):
+        result = await prepare_ocr_image(data, "image/jpeg")
+    assert result.data is data and result.mime_type == "image/jpeg"